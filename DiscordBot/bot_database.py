@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Database access for the Discord bot
+
+The bot uses the project's database package (one connection pool per process,
+shared with the scanner-side code it imports) with PostgreSQL and a 10 second
+statement timeout unless the environment or DiscordBot/.env set DATABASE_TYPE /
+DB_STATEMENT_TIMEOUT.
+Import it before anything else that touches the database:
+
+    from bot_database import Database, init_database
+"""
+
+import os
+import sys
+from dotenv import load_dotenv
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(BOT_DIR, ".env"))
+for name, value in (("DATABASE_TYPE", "postgres"), ("DB_STATEMENT_TIMEOUT", "10000")):
+    if not os.getenv(name):
+        os.environ[name] = value
+
+# Appended, not prepended: modules in DiscordBot/ keep precedence over same-named ones in the root
+PROJECT_ROOT = os.path.dirname(BOT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
+
+from database import (Database, DatabaseConnection, get_db_manager, init_database, query_profiler,
+                      DATABASE_TYPE, PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT)
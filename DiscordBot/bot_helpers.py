@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Interaction helpers shared by the Discord bot and its extensions
+
+Deferring, replying with Discord's message limits in mind, replaying cached
+listings and running blocking calls off the event loop.
+"""
+
+import re
+import asyncio
+import logging
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+import discord
+
+from query_cache import query_cache
+
+logger = logging.getLogger('ollama_bot')
+
+# Thread pool for running sync functions in async context
+_thread_pool = ThreadPoolExecutor(max_workers=10)
+
+async def run_in_thread(func, *args, **kwargs):
+    """
+    Compatibility wrapper for asyncio.to_thread() (Python 3.9+)
+    Works on all Python versions by using ThreadPoolExecutor
+    """
+    loop = asyncio.get_event_loop()
+    pfunc = partial(func, *args, **kwargs)
+    return await loop.run_in_executor(_thread_pool, pfunc)
+
+async def safe_defer(interaction):
+    """Safely defer an interaction with error handling for expired interactions"""
+    try:
+        # Check if the interaction is already responded to
+        if interaction.response.is_done():
+            logger.debug(f"Interaction {interaction.id} has already been responded to")
+            return True
+        
+        # Set a shorter timeout for deferring to avoid common timeouts
+        logger.debug(f"Deferring interaction {interaction.id}")
+        
+        # Use a timeout to ensure defer doesn't hang
+        try:
+            # Give a reasonable timeout for the defer operation
+            await asyncio.wait_for(
+                interaction.response.defer(thinking=True, ephemeral=False),
+                timeout=2.0
+            )
+            logger.debug(f"Successfully deferred interaction {interaction.id}")
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Defer operation timed out for interaction {interaction.id}")
+            # Try to proceed anyway
+            return True
+            
+    except discord.errors.NotFound as e:
+        if e.code == 10062:  # Unknown interaction error code
+            logger.warning(f"Interaction {interaction.id} expired before deferring")
+            return False
+        else:
+            logger.error(f"Unidentified NotFound error in defer operation: {e}")
+            raise
+    except Exception as e:
+        logger.error(f"Error during defer operation: {str(e)}")
+        logger.error(f"Exception type: {type(e).__name__}")
+        return False
+
+def _has_markdown(text):
+    """True when text uses Discord markdown that a code block would hide"""
+    return (
+        "**" in text or  # Bold
+        "*" in text or   # Italic
+        "~~" in text or  # Strikethrough
+        "`" in text or   # Inline code
+        "```" in text or # Code block
+        ">" in text or   # Quote
+        "||" in text     # Spoiler
+    )
+
+def split_message(content):
+    """
+    Split text into Discord-sized messages
+
+    Long content with code blocks is split between blocks (1950 chars per
+    message), other long content into 1900-char chunks marked with "...".
+    Chunks without markdown are wrapped in a code block.
+
+    Returns:
+        list: message strings in send order (one entry when content fits in a message)
+    """
+    # Check if content contains code blocks that might need to be preserved
+    contains_codeblock = "```" in content
+    
+    # If content is too long and contains codeblocks, handle special splitting
+    if len(content) > 2000 and contains_codeblock:
+        # Regex to find code blocks with or without language specification
+        code_block_pattern = r'```(?:\w+)?\n([\s\S]*?)```'
+        
+        # Split the content around code blocks
+        parts = re.split(code_block_pattern, content)
+        
+        # Extract the code blocks themselves
+        code_blocks = re.findall(code_block_pattern, content)
+        
+        # Initialize variables for reconstructing the message
+        messages = []
+        current_message = ""
+        
+        # If the content starts with text before a code block
+        if not content.startswith("```"):
+            current_message = parts[0]
+            parts = parts[1:]
+        
+        # Process each code block and the text after it
+        for i, code_block in enumerate(code_blocks):
+            # Determine the language if specified
+            # Look for the language specifier in the original content
+            content_before_this_block = content[:content.find(code_block)]
+            last_code_marker = content_before_this_block.rfind("```")
+            if last_code_marker >= 0:
+                # Extract the text between ``` and the newline
+                lang_line = content_before_this_block[last_code_marker+3:].split("\n")[0].strip()
+                lang_spec = lang_line if lang_line else ""
+            else:
+                lang_spec = ""
+            
+            # Format the code block with language specifier
+            if lang_spec:
+                formatted_block = f"```{lang_spec}\n{code_block}```"
+            else:
+                formatted_block = f"```\n{code_block}```"
+            
+            # Check if adding this block would exceed Discord's limit
+            if len(current_message) + len(formatted_block) > 1950:
+                # Send the current message before it gets too long
+                if current_message:
+                    messages.append(current_message)
+                current_message = formatted_block
+            else:
+                current_message += formatted_block
+            
+            # Add any text that follows this code block (if any)
+            if i < len(parts) - 1:
+                text_after = parts[i + 1]
+                if len(current_message) + len(text_after) > 1950:
+                    messages.append(current_message)
+                    current_message = text_after
+                else:
+                    current_message += text_after
+        
+        # Add any remaining content
+        if current_message:
+            messages.append(current_message)
+        return messages
+    
+    # For simple content without code blocks or short enough content
+    if len(content) > 2000:
+        # Split into multiple messages of 2000 characters or less
+        messages = []
+        for i in range(0, len(content), 1900):
+            chunk = content[i:i+1900]
+            
+            # Add indicators for continuation
+            if i > 0:
+                chunk = "... " + chunk
+            if i + 1900 < len(content):
+                chunk = chunk + " ..."
+            
+            # Wrap non-embed content in code blocks to prevent message splitting
+            # But preserve content that contains Discord markdown formatting
+            if not _has_markdown(chunk):
+                chunk = f"```\n{chunk}\n```"
+            messages.append(chunk)
+        return messages
+    
+    # Standard handling for content within Discord's limits
+    if not _has_markdown(content):
+        content = f"```\n{content}\n```"
+    return [content]
+
+async def safe_followup(interaction, content, ephemeral=False):
+    """Safely send a followup message with error handling"""
+    try:
+        # For embeds, just send directly with length check
+        if isinstance(content, discord.Embed):
+            return await interaction.followup.send(content, ephemeral=ephemeral)
+        
+        messages = split_message(content)
+        if len(content) <= 2000:
+            return await interaction.followup.send(messages[0], ephemeral=ephemeral)
+        
+        # Send all the message parts
+        responses = []
+        for i, msg in enumerate(messages):
+            if i == 0:
+                responses.append(await interaction.followup.send(msg, ephemeral=ephemeral))
+            else:
+                responses.append(await interaction.channel.send(msg))
+        return responses
+    except discord.errors.NotFound:
+        logger.warning(f"Interaction {interaction.id} expired before followup could be sent")
+        return None
+    except discord.errors.HTTPException as e:
+        logger.error(f"HTTP error sending followup: {str(e)}")
+        # Try to send a simpler message if possible
+        try:
+            return await interaction.followup.send("```\nError sending response. Message may exceed length limitations.\n```", ephemeral=True)
+        except:
+            return None
+    except Exception as e:
+        logger.error(f"Error sending followup message: {str(e)}")
+        return None
+
+async def followup_from_cache(interaction, cache_key):
+    """Replay a cached listing; returns True if the cache had an entry"""
+    messages = query_cache.get(cache_key)
+    if messages is None:
+        return False
+    for message in messages:
+        await safe_followup(interaction, message)
+    return True
+
+async def safe_response(interaction, content, ephemeral=False):
+    """Safely send a direct response message with error handling"""
+    try:
+        # For embeds, just send directly with length check
+        if isinstance(content, discord.Embed):
+            return await interaction.response.send_message(content, ephemeral=ephemeral)
+        
+        # Check if content contains code blocks that might need to be preserved
+        contains_codeblock = "```" in content
+        
+        # If content is too long and contains codeblocks, handle special splitting
+        if len(content) > 2000 and contains_codeblock:
+            # Need to defer first to enable followup messages
+            try:
+                if not interaction.response.is_done():
+                    await interaction.response.defer(ephemeral=ephemeral)
+            except:
+                pass  # Already responded or deferred
+                
+            # Use safe_followup since we're sending multiple messages
+            return await safe_followup(interaction, content, ephemeral=ephemeral)
+        
+        # For simple content without code blocks or short enough content
+        elif len(content) > 2000:
+            # Need to use followup for multiple messages
+            try:
+                if not interaction.response.is_done():
+                    await interaction.response.defer(ephemeral=ephemeral)
+            except:
+                pass  # Already responded or deferred
+                
+            # Use safe_followup for sending multiple messages
+            return await safe_followup(interaction, content, ephemeral=ephemeral)
+        else:
+            # Standard handling for content within Discord's limits
+            # Wrap non-embed content in code blocks to prevent message splitting
+            # But preserve content that contains Discord markdown formatting
+            if not (
+                "**" in content or  # Bold
+                "*" in content or   # Italic
+                "~~" in content or  # Strikethrough
+                "`" in content or   # Inline code
+                "```" in content or # Code block
+                ">" in content or   # Quote
+                "||" in content     # Spoiler
+            ):
+                content = f"```\n{content}\n```"
+                
+            return await interaction.response.send_message(content, ephemeral=ephemeral)
+    except discord.errors.NotFound:
+        logger.warning(f"Interaction {interaction.id} expired before response could be sent")
+        return None
+    except discord.errors.HTTPException as e:
+        logger.error(f"HTTP error sending response: {str(e)}")
+        # Try to send a simpler message if possible
+        try:
+            return await interaction.response.send_message("```\nError sending response. Message may exceed length limitations.\n```", ephemeral=True)
+        except:
+            return None
+    except Exception as e:
+        logger.error(f"Error sending response message: {str(e)}")
+        return None
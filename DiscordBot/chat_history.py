@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Chat History Storage for the Discord bot
+
+Owns the chat_history table: schema and migration, inserts, the /history
+search and retention. Rows carry a real timestamp and are indexed by
+(user_id, timestamp DESC), and prompt/response text is full-text indexed
+(a GIN tsvector expression index on PostgreSQL, an FTS5 table on SQLite) so
+lookups stay fast however much history accumulates. Rows older than the
+retention window are moved to chat_history_archive in small batches.
+
+Run directly to apply retention from cron:
+    python chat_history.py --prune
+"""
+
+import os
+import sys
+import asyncio
+import logging
+import atexit
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from bot_database import Database, DATABASE_TYPE
+
+logger = logging.getLogger('chat_history')
+
+# Retention configuration (0 days keeps history forever)
+CHAT_HISTORY_RETENTION_DAYS = int(os.getenv("CHAT_HISTORY_RETENTION_DAYS", "90"))
+CHAT_HISTORY_ARCHIVE = os.getenv("CHAT_HISTORY_ARCHIVE", "true").lower() in ("1", "true", "yes")
+CHAT_HISTORY_PRUNE_BATCH = int(os.getenv("CHAT_HISTORY_PRUNE_BATCH", "5000"))
+CHAT_HISTORY_PRUNE_INTERVAL = int(os.getenv("CHAT_HISTORY_PRUNE_INTERVAL", "3600"))
+
+# Background writer configuration: flush every BATCH_SIZE rows or FLUSH_MS milliseconds
+CHAT_HISTORY_BATCH_SIZE = int(os.getenv("CHAT_HISTORY_BATCH_SIZE", "50"))
+CHAT_HISTORY_FLUSH_MS = int(os.getenv("CHAT_HISTORY_FLUSH_MS", "500"))
+CHAT_HISTORY_QUEUE_SIZE = int(os.getenv("CHAT_HISTORY_QUEUE_SIZE", "5000"))
+
+# Text search configuration for PostgreSQL; 'simple' avoids English-only stemming of prompts
+CHAT_HISTORY_TS_CONFIG = os.getenv("CHAT_HISTORY_TS_CONFIG", "simple")
+
+# Columns written for each chat exchange, in the order used by insert_chat_rows
+INSERT_COLUMNS = ("user_id, model_id, prompt, system_prompt, response, "
+                  "temperature, max_tokens, timestamp, eval_count, eval_duration")
+
+# Columns shared by chat_history and chat_history_archive, in insert order
+HISTORY_COLUMNS = ("id, user_id, model_id, prompt, system_prompt, response, "
+                   "temperature, max_tokens, timestamp, eval_count, eval_duration")
+
+# Must match the indexed expression exactly for PostgreSQL to use the GIN index
+PG_SEARCH_VECTOR = (f"to_tsvector('{CHAT_HISTORY_TS_CONFIG}', "
+                    f"COALESCE(prompt, '') || ' ' || COALESCE(response, ''))")
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def _postgres_schema():
+    return [
+        """
+        CREATE TABLE IF NOT EXISTS chat_history (
+            id SERIAL PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            model_id INTEGER,
+            prompt TEXT,
+            system_prompt TEXT,
+            response TEXT,
+            temperature REAL,
+            max_tokens INTEGER,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+            eval_count INTEGER,
+            eval_duration REAL,
+            FOREIGN KEY (model_id) REFERENCES models (id) ON DELETE SET NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS chat_history_archive (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            model_id INTEGER,
+            prompt TEXT,
+            system_prompt TEXT,
+            response TEXT,
+            temperature REAL,
+            max_tokens INTEGER,
+            timestamp TIMESTAMP WITH TIME ZONE,
+            eval_count INTEGER,
+            eval_duration REAL,
+            archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+        )
+        """,
+    ]
+
+
+def _postgres_indexes():
+    return [
+        "DROP INDEX IF EXISTS idx_chat_history_user_id",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_user_ts ON chat_history (user_id, timestamp DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_model_id ON chat_history (model_id)",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_ts ON chat_history (timestamp)",
+        f"CREATE INDEX IF NOT EXISTS idx_chat_history_search ON chat_history USING GIN ({PG_SEARCH_VECTOR})",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_archive_user_ts ON chat_history_archive (user_id, timestamp DESC)",
+    ]
+
+
+def _sqlite_schema():
+    return [
+        """
+        CREATE TABLE IF NOT EXISTS chat_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            model_id INTEGER,
+            prompt TEXT,
+            system_prompt TEXT,
+            response TEXT,
+            temperature REAL,
+            max_tokens INTEGER,
+            timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            eval_count INTEGER,
+            eval_duration REAL,
+            FOREIGN KEY (model_id) REFERENCES models (id) ON DELETE SET NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS chat_history_archive (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            model_id INTEGER,
+            prompt TEXT,
+            system_prompt TEXT,
+            response TEXT,
+            temperature REAL,
+            max_tokens INTEGER,
+            timestamp TIMESTAMP,
+            eval_count INTEGER,
+            eval_duration REAL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        # External-content FTS5 table kept in sync by triggers
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS chat_history_fts
+        USING fts5(prompt, response, content='chat_history', content_rowid='id')
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS chat_history_fts_ai AFTER INSERT ON chat_history BEGIN
+            INSERT INTO chat_history_fts (rowid, prompt, response) VALUES (new.id, new.prompt, new.response);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS chat_history_fts_ad AFTER DELETE ON chat_history BEGIN
+            INSERT INTO chat_history_fts (chat_history_fts, rowid, prompt, response)
+            VALUES ('delete', old.id, old.prompt, old.response);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS chat_history_fts_au AFTER UPDATE ON chat_history BEGIN
+            INSERT INTO chat_history_fts (chat_history_fts, rowid, prompt, response)
+            VALUES ('delete', old.id, old.prompt, old.response);
+            INSERT INTO chat_history_fts (rowid, prompt, response) VALUES (new.id, new.prompt, new.response);
+        END
+        """,
+    ]
+
+
+def _sqlite_indexes():
+    return [
+        "DROP INDEX IF EXISTS idx_chat_history_user_id",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_user_ts ON chat_history (user_id, timestamp DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_model_id ON chat_history (model_id)",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_ts ON chat_history (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_chat_history_archive_user_ts ON chat_history_archive (user_id, timestamp DESC)",
+    ]
+
+
+def _migrate_postgres_timestamp():
+    """Convert a legacy TEXT timestamp column to TIMESTAMP WITH TIME ZONE"""
+    row = Database.fetch_one("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'chat_history' AND column_name = 'timestamp'
+    """)
+    if not row or row[0] != 'text':
+        return
+    logger.info("Migrating chat_history.timestamp from TEXT to TIMESTAMP WITH TIME ZONE")
+    Database.transaction([
+        ("""
+            ALTER TABLE chat_history ALTER COLUMN timestamp TYPE TIMESTAMP WITH TIME ZONE
+            USING CASE WHEN timestamp ~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}' THEN timestamp::TIMESTAMP WITH TIME ZONE END
+        """, None),
+        ("UPDATE chat_history SET timestamp = TIMESTAMP WITH TIME ZONE 'epoch' WHERE timestamp IS NULL", None),
+        ("ALTER TABLE chat_history ALTER COLUMN timestamp SET DEFAULT NOW()", None),
+        ("ALTER TABLE chat_history ALTER COLUMN timestamp SET NOT NULL", None),
+    ])
+
+
+def _backfill_sqlite_fts():
+    """Index rows written before the FTS5 table existed"""
+    row = Database.fetch_one("SELECT COUNT(*) FROM chat_history_fts")
+    if row and row[0] == 0:
+        Database.execute("INSERT INTO chat_history_fts (chat_history_fts) VALUES ('rebuild')")
+
+
+def ensure_schema():
+    """Create or migrate the chat history tables and indexes once per process"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if _schema_ready:
+            return
+        if DATABASE_TYPE == "postgres":
+            for statement in _postgres_schema():
+                Database.execute(statement)
+            _migrate_postgres_timestamp()
+            for statement in _postgres_indexes():
+                Database.execute(statement)
+        else:
+            for statement in _sqlite_schema():
+                Database.execute(statement)
+            _backfill_sqlite_fts()
+            for statement in _sqlite_indexes():
+                Database.execute(statement)
+        _schema_ready = True
+        logger.info("Chat history schema ready")
+
+
+def _timestamp_now():
+    """Timestamp for a row captured at enqueue time, in the column's native format"""
+    now = datetime.now(timezone.utc)
+    if DATABASE_TYPE == "postgres":
+        return now
+    # Match CURRENT_TIMESTAMP so string comparisons in SQLite stay chronological
+    return now.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def chat_row(user_id, model_id, prompt, system_prompt, response, temperature, max_tokens,
+             eval_count, eval_duration):
+    """Build a row tuple in INSERT_COLUMNS order"""
+    return (str(user_id), model_id, prompt, system_prompt, response, temperature, max_tokens,
+            _timestamp_now(), eval_count, eval_duration)
+
+
+def insert_chat_rows(rows):
+    """Insert chat rows (from chat_row) with a single multi-row INSERT"""
+    if not rows:
+        return
+    ensure_schema()
+    values = ", ".join(["(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"] * len(rows))
+    params = []
+    for row in rows:
+        params.extend(row)
+    Database.execute(f"INSERT INTO chat_history ({INSERT_COLUMNS}) VALUES {values}", tuple(params))
+
+
+def save_chat(user_id, model_id, prompt, system_prompt, response, temperature, max_tokens,
+              eval_count, eval_duration):
+    """Insert one chat exchange synchronously (prefer chat_writer.enqueue in the bot)"""
+    insert_chat_rows([chat_row(user_id, model_id, prompt, system_prompt, response, temperature,
+                               max_tokens, eval_count, eval_duration)])
+
+
+class ChatHistoryWriter:
+    """
+    Batches chat history inserts on a background task
+
+    enqueue() never waits on the database: rows go into a bounded asyncio queue
+    and are written as one multi-row INSERT when CHAT_HISTORY_BATCH_SIZE rows
+    are waiting or CHAT_HISTORY_FLUSH_MS has passed. Rows are dropped (and
+    counted) when the queue is full.
+    """
+
+    def __init__(self, batch_size=CHAT_HISTORY_BATCH_SIZE, flush_ms=CHAT_HISTORY_FLUSH_MS,
+                 queue_size=CHAT_HISTORY_QUEUE_SIZE):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0, flush_ms) / 1000.0
+        self.queue_size = queue_size
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_depth = 0
+        self._queue = None
+        self._has_rows = None
+        self._batch_ready = None
+        self._task = None
+        self._closing = False
+        # Batch handed to the executor and not yet committed (counted in depth())
+        self._in_flight = []
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._has_rows = asyncio.Event()
+            self._batch_ready = asyncio.Event()
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    def enqueue(self, user_id, model_id, prompt, system_prompt, response, temperature, max_tokens,
+                eval_count, eval_duration):
+        """
+        Queue a chat exchange for writing; must be called from the event loop
+
+        Returns:
+            bool: False if the row was dropped because the queue is full
+        """
+        if self._task is None or self._task.done():
+            self.start()
+        row = chat_row(user_id, model_id, prompt, system_prompt, response, temperature, max_tokens,
+                       eval_count, eval_duration)
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(f"Chat history queue full, {self.dropped} rows dropped so far")
+            return False
+        self.enqueued += 1
+        depth = self._queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self._has_rows.set()
+        if depth >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    def _take_batch(self):
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    def _write(self, batch):
+        """Write one batch, retrying once before counting the rows as failed"""
+        for attempt in range(2):
+            try:
+                insert_chat_rows(batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception as e:
+                if attempt == 0:
+                    logger.warning(f"Chat history batch insert failed, retrying: {str(e)}")
+                    time.sleep(0.5)
+                else:
+                    self.failed += len(batch)
+                    logger.error(f"Dropping {len(batch)} chat history rows after insert failure: {str(e)}")
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            if self._queue.empty():
+                if self._closing:
+                    break
+                self._has_rows.clear()
+                await self._has_rows.wait()
+                continue
+            # Give the batch up to the flush interval to fill, waking early once it is full
+            if self._queue.qsize() < self.batch_size and not self._closing:
+                self._batch_ready.clear()
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self._take_batch()
+            if batch:
+                self._in_flight = batch
+                try:
+                    await loop.run_in_executor(None, self._write, batch)
+                finally:
+                    self._in_flight = []
+
+    async def close(self, timeout=10.0):
+        """Write everything still queued and stop the writer task"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._has_rows.set()
+        self._batch_ready.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Chat history writer did not drain within {timeout}s, {self.depth()} rows pending")
+
+    def drain_sync(self):
+        """Write queued rows without an event loop (used at interpreter exit)"""
+        # The in-flight batch is left alone: its executor write runs to completion
+        # (executor threads are joined before atexit handlers), so rewriting it would insert it twice
+        rows = []
+        if self._queue is not None:
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except (asyncio.QueueEmpty, RuntimeError):
+                    break
+        for start in range(0, len(rows), self.batch_size):
+            self._write(rows[start:start + self.batch_size])
+
+    def depth(self):
+        """Rows waiting to be written"""
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return queued + len(self._in_flight)
+
+    def stats(self):
+        """Counters for the admin stats command"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "depth": self.depth(),
+            "max_depth": self.max_depth,
+            "queue_size": self.queue_size,
+            "batch_size": self.batch_size,
+            "flush_ms": int(self.flush_interval * 1000),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+def format_writer_stats(stats):
+    """Render writer counters as a short Discord message"""
+    message = "**Chat History Writer**\n"
+    message += f"Running: {'yes' if stats['running'] else 'no'}\n"
+    message += f"Queue depth: {stats['depth']}/{stats['queue_size']} (peak {stats['max_depth']})\n"
+    message += f"Batching: {stats['batch_size']} rows or {stats['flush_ms']} ms\n"
+    message += f"Enqueued: {stats['enqueued']} | Written: {stats['written']} in {stats['batches']} batches\n"
+    message += f"Dropped (queue full): {stats['dropped']} | Failed writes: {stats['failed']}\n"
+    return message
+
+
+# Process-wide writer shared by all chat commands
+chat_writer = ChatHistoryWriter()
+
+
+@atexit.register
+def _drain_chat_writer():
+    if chat_writer.depth():
+        chat_writer.drain_sync()
+
+
+def _fts5_query(search_term):
+    """Quote each word so user input is matched literally by FTS5"""
+    words = search_term.split()
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def search_history(user_id, model_id=None, search_term=None, limit=5, before_id=None):
+    """
+    Fetch a user's most recent chat history, newest first
+
+    Args:
+        user_id: Discord user ID
+        model_id: Optional model filter
+        search_term: Optional full-text search over prompts and responses
+        limit: Maximum rows to return
+        before_id: Optional id to page backwards from
+
+    Returns:
+        list: Rows of (id, model_id, model_name, prompt, response, system_prompt,
+        temperature, max_tokens, timestamp, eval_count, eval_duration)
+    """
+    ensure_schema()
+    conditions = ["ch.user_id = ?"]
+    params = [str(user_id)]
+
+    if model_id:
+        conditions.append("ch.model_id = ?")
+        params.append(model_id)
+
+    if search_term and search_term.strip():
+        if DATABASE_TYPE == "postgres":
+            conditions.append(f"{PG_SEARCH_VECTOR} @@ websearch_to_tsquery('{CHAT_HISTORY_TS_CONFIG}', ?)")
+            params.append(search_term.strip())
+        else:
+            conditions.append("ch.id IN (SELECT rowid FROM chat_history_fts WHERE chat_history_fts MATCH ?)")
+            params.append(_fts5_query(search_term))
+
+    if before_id:
+        conditions.append("ch.id < ?")
+        params.append(before_id)
+
+    params.append(limit)
+    return Database.fetch_all(f"""
+        SELECT
+            ch.id,
+            ch.model_id,
+            COALESCE(m.name, '(removed model)'),
+            ch.prompt,
+            ch.response,
+            ch.system_prompt,
+            ch.temperature,
+            ch.max_tokens,
+            ch.timestamp,
+            ch.eval_count,
+            ch.eval_duration
+        FROM chat_history ch
+        LEFT JOIN models m ON ch.model_id = m.id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY ch.timestamp DESC, ch.id DESC
+        LIMIT ?
+    """, tuple(params)) or []
+
+
+def prune_expired(retention_days=None, archive=None, batch_size=None, now=None):
+    """
+    Move (or delete) chat history older than the retention window
+
+    Work is done in batches of batch_size rows, each in its own transaction,
+    so a large backlog never holds long locks on chat_history.
+
+    Returns:
+        int: Number of rows removed from chat_history
+    """
+    retention_days = CHAT_HISTORY_RETENTION_DAYS if retention_days is None else retention_days
+    archive = CHAT_HISTORY_ARCHIVE if archive is None else archive
+    batch_size = batch_size or CHAT_HISTORY_PRUNE_BATCH
+    if retention_days <= 0:
+        return 0
+
+    ensure_schema()
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+    if DATABASE_TYPE != "postgres":
+        # SQLite stores CURRENT_TIMESTAMP text in UTC, which compares correctly as a string
+        cutoff = cutoff.strftime('%Y-%m-%d %H:%M:%S')
+
+    batch_ids = "SELECT id FROM chat_history WHERE timestamp < ? ORDER BY id LIMIT ?"
+    removed = 0
+    while True:
+        rows = Database.fetch_all(batch_ids, (cutoff, batch_size)) or []
+        if not rows:
+            break
+        ids = [row[0] for row in rows]
+        placeholders = ", ".join(["?"] * len(ids))
+        queries = []
+        if archive:
+            queries.append((f"""
+                INSERT INTO chat_history_archive ({HISTORY_COLUMNS})
+                SELECT {HISTORY_COLUMNS} FROM chat_history WHERE id IN ({placeholders})
+                ON CONFLICT (id) DO NOTHING
+            """, tuple(ids)))
+        queries.append((f"DELETE FROM chat_history WHERE id IN ({placeholders})", tuple(ids)))
+        Database.transaction(queries)
+        removed += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    if removed:
+        logger.info(f"Chat history retention: {'archived' if archive else 'deleted'} {removed} rows "
+                    f"older than {retention_days} days")
+    return removed
+
+
+async def retention_loop(is_closed, interval=None):
+    """
+    Apply retention periodically until is_closed() returns True
+
+    Args:
+        is_closed: Callable telling the loop when the bot has shut down
+        interval: Seconds between runs (default CHAT_HISTORY_PRUNE_INTERVAL)
+    """
+    interval = interval or CHAT_HISTORY_PRUNE_INTERVAL
+    loop = asyncio.get_event_loop()
+    while not is_closed():
+        try:
+            await loop.run_in_executor(None, prune_expired)
+        except Exception as e:
+            logger.error(f"Error applying chat history retention: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+_retention_task = None
+
+
+def start_retention(bot):
+    """
+    Start retention_loop for a bot once per process.
+    Must be called from a running event loop (on_ready or setup_hook).
+    """
+    global _retention_task
+    if CHAT_HISTORY_RETENTION_DAYS <= 0:
+        return None
+    if _retention_task is None or _retention_task.done():
+        _retention_task = asyncio.ensure_future(retention_loop(bot.is_closed))
+    return _retention_task
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat history schema and retention maintenance")
+    parser.add_argument("--prune", action="store_true", help="Archive or delete history past the retention window")
+    parser.add_argument("--retention-days", type=int, default=None,
+                        help=f"Override CHAT_HISTORY_RETENTION_DAYS (default {CHAT_HISTORY_RETENTION_DAYS})")
+    parser.add_argument("--no-archive", action="store_true", help="Delete expired rows instead of archiving them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    ensure_schema()
+    if args.prune:
+        removed = prune_expired(retention_days=args.retention_days,
+                                archive=False if args.no_archive else None)
+        print(f"Removed {removed} chat history rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Discord bot extensions loaded from setup_hook"""
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Admin commands for the Discord bot
+
+Cache, chat-log and query profile statistics and the slash command refresh
+commands. Loaded as an extension from the bot's setup_hook so none of this
+runs at import.
+"""
+
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from bot_helpers import safe_defer, safe_followup
+from query_cache import query_cache
+from chat_history import chat_writer, format_writer_stats
+from command_registry import format_sync_results
+from bot_database import query_profiler, get_db_manager
+from database.pool import format_pool_stats
+
+logger = logging.getLogger('ollama_bot')
+
+
+class AdminCog(commands.Cog):
+    """Administrator-only maintenance commands"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="cache_stats", description="Show listing cache hit rates (admin only)")
+    @app_commands.describe(clear="Clear the cache after showing statistics")
+    async def cache_stats(self, interaction: discord.Interaction, clear: bool = False):
+        if not await safe_defer(interaction):
+            return
+
+        try:
+            if not interaction.user.guild_permissions.administrator:
+                await safe_followup(interaction, "This command requires administrator permissions.")
+                return
+
+            stats = query_cache.stats()
+            message = "**Query Cache Statistics**\n"
+            message += f"Entries: {stats['entries']}/{stats['max_entries']} (TTL {stats['ttl']:.0f}s)\n"
+            message += f"Hits: {stats['hits']} | Misses: {stats['misses']} | Hit rate: {stats['hit_rate']:.1%}\n"
+            message += f"Evictions: {stats['evictions']} | Invalidations: {stats['invalidations']}\n"
+
+            if stats["commands"]:
+                message += "\nCommand | Hits | Misses | Hit rate\n"
+                message += "-" * 50 + "\n"
+                for name, counts in stats["commands"].items():
+                    total = counts["hits"] + counts["misses"]
+                    rate = counts["hits"] / total if total else 0.0
+                    message += f"{name} | {counts['hits']} | {counts['misses']} | {rate:.1%}\n"
+
+            if clear:
+                query_cache.invalidate()
+                message += "\nCache cleared."
+
+            await safe_followup(interaction, message)
+        except Exception as e:
+            logger.error(f"Error in cache_stats: {str(e)}")
+            await safe_followup(interaction, f"Error retrieving cache statistics: {str(e)}")
+
+    @app_commands.command(name="chat_log_stats", description="Show chat history writer queue and drop counters (admin only)")
+    async def chat_log_stats(self, interaction: discord.Interaction):
+        if not await safe_defer(interaction):
+            return
+
+        try:
+            if not interaction.user.guild_permissions.administrator:
+                await safe_followup(interaction, "This command requires administrator permissions.")
+                return
+
+            await safe_followup(interaction, format_writer_stats(chat_writer.stats()))
+        except Exception as e:
+            logger.error(f"Error in chat_log_stats: {str(e)}")
+            await safe_followup(interaction, f"Error retrieving chat log statistics: {str(e)}")
+
+    @app_commands.command(name="db_profile", description="Show the bot's slowest and busiest database queries and pool usage (admin only)")
+    @app_commands.describe(
+        sort_by="Order queries by",
+        limit="Number of queries to show (default 10)",
+        reset="Clear the counters after showing them"
+    )
+    @app_commands.choices(sort_by=[
+        app_commands.Choice(name="Total time", value="total"),
+        app_commands.Choice(name="Calls", value="calls"),
+        app_commands.Choice(name="Mean time", value="mean"),
+        app_commands.Choice(name="p99 time", value="p99"),
+        app_commands.Choice(name="Rows", value="rows")
+    ])
+    async def db_profile(self, interaction: discord.Interaction, sort_by: str = "total", limit: int = 10, reset: bool = False):
+        if not await safe_defer(interaction):
+            return
+
+        try:
+            if not interaction.user.guild_permissions.administrator:
+                await safe_followup(interaction, "This command requires administrator permissions.")
+                return
+
+            if not query_profiler.enabled:
+                await safe_followup(interaction, "Query profiling is disabled (DB_PROFILE_ENABLED).")
+                return
+
+            message = f"**Database Query Profile** (since {query_profiler.started_at}, sample rate {query_profiler.sample_rate:g})\n"
+            message += format_pool_stats(get_db_manager().pool_stats()) + "\n"
+            message += "```\n" + query_profiler.report(limit=max(1, min(limit, 25)), sort=sort_by, width=60) + "\n```"
+
+            if reset:
+                query_profiler.reset()
+                message += "\nCounters reset."
+
+            await safe_followup(interaction, message)
+        except Exception as e:
+            logger.error(f"Error in db_profile: {str(e)}")
+            await safe_followup(interaction, f"Error retrieving query profile: {str(e)}")
+
+    @app_commands.command(name="refreshcommands", description="Force refresh of bot commands (admin only)")
+    @app_commands.describe(force="Push commands even if their schema hasn't changed since the last sync")
+    async def refresh_commands(self, interaction: discord.Interaction, force: bool = False):
+        if not await safe_defer(interaction):
+            return
+
+        try:
+            # Check if user has admin permissions
+            if not interaction.user.guild_permissions.administrator:
+                await safe_followup(interaction, "This command requires administrator permissions.")
+                return
+
+            await safe_followup(interaction, "Refreshing commands. This may take up to a minute...")
+
+            # Clear guild-specific copies; the global commands cover this guild
+            self.bot.tree.clear_commands(guild=interaction.guild)
+
+            # Sync globally and to the current guild; unchanged scopes are skipped unless forced
+            results = await self.bot.command_registry.sync(guilds=[interaction.guild], force=force)
+
+            global_commands = results["global"][1]
+            command_list = [f"- {name}" for name in global_commands]
+
+            message = f"**Command Refresh Complete**\n"
+            message += format_sync_results(results) + "\n\n"
+            message += "**Available Commands:**\n" + "\n".join(command_list)
+
+            await safe_followup(interaction, message)
+
+            logger.info(f"Commands refreshed by user {interaction.user.name} in guild {interaction.guild.name} (force={force})")
+            logger.info(f"Refresh results:\n{format_sync_results(results)}")
+
+        except Exception as e:
+            logger.error(f"Error in refresh_commands: {str(e)}")
+            logger.error(f"Exception type: {type(e).__name__}")
+            await safe_followup(interaction, f"Error refreshing commands: {str(e)}")
+
+    @app_commands.command(name="guild_sync", description="Force sync commands to this guild (admin only)")
+    @app_commands.describe(force="Push commands even if their schema hasn't changed since the last sync")
+    async def guild_sync_command(self, interaction: discord.Interaction, force: bool = False):
+        if not await safe_defer(interaction):
+            return
+
+        try:
+            # Check if user has admin permissions
+            if not interaction.user.guild_permissions.administrator:
+                await safe_followup(interaction, "This command requires administrator permissions.")
+                return
+
+            await safe_followup(interaction, "Syncing commands to this guild. This may take a moment...")
+
+            # Do NOT clear commands first - this was causing problems
+            # Just sync directly to the guild
+            results = await self.bot.command_registry.sync(guilds=[interaction.guild], include_global=False, force=force)
+            status, synced = results[f"guild:{interaction.guild.id}"]
+
+            # Log the sync operation
+            logger.info(f"Guild commands synced by {interaction.user.name} in guild {interaction.guild.name}")
+            logger.info(f"Guild {interaction.guild.id} sync {status}: {len(synced)} commands")
+
+            # List all command names for verification
+            command_list = [f"- {name}" for name in synced]
+
+            message = f"**Command Sync Complete**\n"
+            message += format_sync_results(results) + "\n\n"
+            message += "**Guild Commands:**\n" + ("\n".join(command_list) if command_list else "(none - global commands apply)")
+
+            await safe_followup(interaction, message)
+
+        except Exception as e:
+            logger.error(f"Error in guild_sync: {str(e)}")
+            logger.error(f"Exception type: {type(e).__name__}")
+            await safe_followup(interaction, f"Error syncing commands to guild: {str(e)}")
+
+    @app_commands.command(name="refreshcommandsv2", description="Force complete refresh of all bot commands (admin only)")
+    async def refresh_commands_v2(self, interaction: discord.Interaction):
+        if not await safe_defer(interaction):
+            return
+
+        try:
+            # Check if user has admin permissions
+            if not interaction.user.guild_permissions.administrator:
+                await safe_followup(interaction, "This command requires administrator permissions.")
+                return
+
+            await safe_followup(interaction, "Refreshing all commands with a complete reset. This may take a minute...")
+
+            try:
+                # Complete reset: push every scope regardless of the recorded hashes.
+                # Guild first so there's no period without commands in this guild
+                guild_results = await self.bot.command_registry.sync(guilds=[interaction.guild], include_global=False, force=True)
+                global_results = await self.bot.command_registry.sync(include_global=True, force=True)
+                results = {**global_results, **guild_results}
+
+                global_commands = results["global"][1]
+                command_list = [f"- {name}" for name in global_commands]
+
+                message = f"**Command Refresh Complete**\n"
+                message += format_sync_results(results) + "\n\n"
+
+                # Verify quickprompt is included
+                quickprompt_included = "quickprompt" in global_commands
+                if quickprompt_included:
+                    message += "✅ quickprompt command successfully registered\n\n"
+                else:
+                    message += "❌ quickprompt command NOT registered! Please contact the developer.\n\n"
+
+                message += "**Available Commands:**\n" + "\n".join(command_list)
+
+                await safe_followup(interaction, message)
+
+                logger.info(f"Commands refreshed by user {interaction.user.name} in guild {interaction.guild.name}")
+                logger.info(f"Refresh results:\n{format_sync_results(results)}")
+
+            except Exception as e:
+                logger.error(f"Error during command sync: {str(e)}")
+                await safe_followup(interaction, f"Error during command sync: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error in refresh_commands_v2: {str(e)}")
+            logger.error(f"Exception type: {type(e).__name__}")
+            await safe_followup(interaction, f"Error refreshing commands: {str(e)}")
+
+
+async def setup(bot):
+    await bot.add_cog(AdminCog(bot))
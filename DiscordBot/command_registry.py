@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Command Registry for the Discord bots
+
+Every path that pushes slash commands to Discord goes through here. The
+registry hashes the full command schema for each scope (global or one
+guild) - names, descriptions, options, choices and permissions - and keeps
+the hash of the last successful sync in a small JSON manifest. Scopes whose
+hash matches are skipped without any API call, so restarts and reconnects
+with an unchanged command tree cost nothing, and a changed tree only syncs
+the scopes that actually changed.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+import discord
+
+logger = logging.getLogger('command_registry')
+
+# Where the last-synced hashes are kept (one file shared by all bots, keyed by application id)
+COMMAND_MANIFEST_PATH = os.getenv(
+    "COMMAND_MANIFEST_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".command_manifest.json")
+)
+
+GLOBAL_SCOPE = "global"
+
+_manifest_lock = threading.Lock()
+
+
+def scope_key(guild=None):
+    """Manifest key for a sync scope"""
+    if guild is None:
+        return GLOBAL_SCOPE
+    return f"guild:{guild.id}"
+
+
+def _command_payload(command, tree):
+    # discord.py 2.4 added the tree argument to to_dict()
+    try:
+        return command.to_dict(tree)
+    except TypeError:
+        return command.to_dict()
+
+
+def command_schema(tree, guild=None):
+    """The payload Discord would receive for a scope, in a stable order"""
+    payload = [_command_payload(command, tree) for command in tree.get_commands(guild=guild)]
+    return sorted(payload, key=lambda c: (c.get("type", 1), c.get("name", "")))
+
+
+def schema_hash(tree, guild=None):
+    """Stable digest of a scope's command schema"""
+    canonical = json.dumps(command_schema(tree, guild), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path=COMMAND_MANIFEST_PATH):
+    """Read the manifest, treating a missing or corrupt file as empty"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable command manifest {path}: {e}")
+        return {}
+
+
+def save_manifest(manifest, path=COMMAND_MANIFEST_PATH):
+    """Write the manifest atomically"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def forget_scopes(guild_id=None, application_id=None, path=COMMAND_MANIFEST_PATH):
+    """
+    Drop recorded hashes so the next sync pushes those scopes again
+
+    Args:
+        guild_id: Only forget this guild's scope (default: every scope)
+        application_id: Only forget entries for this application (default: all)
+
+    Returns:
+        int: Number of scope entries removed
+    """
+    with _manifest_lock:
+        manifest = load_manifest(path)
+        removed = 0
+        for app_id, scopes in manifest.items():
+            if application_id is not None and app_id != str(application_id):
+                continue
+            for key in list(scopes):
+                if guild_id is None or key == f"guild:{guild_id}":
+                    del scopes[key]
+                    removed += 1
+        save_manifest(manifest, path)
+        return removed
+
+
+class CommandRegistry:
+    """Hash-gated command sync for one bot's command tree"""
+
+    def __init__(self, tree, application_id=None, path=COMMAND_MANIFEST_PATH):
+        self.tree = tree
+        self.application_id = application_id
+        self.path = path
+
+    def _app_key(self):
+        app_id = self.application_id or getattr(self.tree.client, "application_id", None)
+        return str(app_id or "default")
+
+    def recorded_hash(self, guild=None):
+        """Hash of the last successful sync for a scope, or None"""
+        entry = load_manifest(self.path).get(self._app_key(), {}).get(scope_key(guild))
+        return entry.get("hash") if entry else None
+
+    def is_current(self, guild=None):
+        """True if the scope's schema matches what was last synced"""
+        return self.recorded_hash(guild) == schema_hash(self.tree, guild)
+
+    def _record(self, guild, digest, synced):
+        with _manifest_lock:
+            manifest = load_manifest(self.path)
+            manifest.setdefault(self._app_key(), {})[scope_key(guild)] = {
+                "hash": digest,
+                "commands": sorted(command.name for command in synced),
+                "synced_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            try:
+                save_manifest(manifest, self.path)
+            except OSError as e:
+                logger.warning(f"Could not write command manifest {self.path}: {e}")
+
+    async def sync_scope(self, guild=None, force=False):
+        """
+        Sync one scope if its schema changed
+
+        Returns:
+            tuple: (status, command names) where status is "unchanged",
+            "synced", "rate_limited" or "error"
+        """
+        key = scope_key(guild)
+        digest = schema_hash(self.tree, guild)
+        names = sorted(command.name for command in self.tree.get_commands(guild=guild))
+        if not force and self.recorded_hash(guild) == digest:
+            logger.info(f"Command schema for {key} unchanged - skipping sync")
+            return "unchanged", names
+
+        try:
+            synced = await self.tree.sync(guild=guild)
+        except discord.errors.HTTPException as e:
+            if e.status == 429:
+                logger.warning(f"Rate limited syncing commands for {key} - retry after "
+                               f"{getattr(e, 'retry_after', 'unknown')} seconds")
+                return "rate_limited", names
+            logger.error(f"HTTP error syncing commands for {key}: {e}")
+            return "error", names
+
+        self._record(guild, digest, synced)
+        logger.info(f"Synced {len(synced)} commands for {key}")
+        return "synced", sorted(command.name for command in synced)
+
+    async def sync(self, guilds=(), include_global=True, force=False, max_guild_syncs=None):
+        """
+        Sync the global scope and the given guilds, skipping unchanged ones
+
+        Args:
+            guilds: Guilds (or discord.Object) whose guild scope should be checked
+            include_global: Also check the global scope
+            force: Sync even when the hash matches
+            max_guild_syncs: Cap on guild scopes actually pushed in this call;
+                unchanged guilds don't count towards it
+
+        Returns:
+            dict: scope key -> (status, command names)
+        """
+        results = {}
+        if include_global:
+            results[GLOBAL_SCOPE] = await self.sync_scope(None, force=force)
+
+        pushed = 0
+        for guild in guilds:
+            key = scope_key(guild)
+            if not force and self.is_current(guild):
+                results[key] = ("unchanged", sorted(c.name for c in self.tree.get_commands(guild=guild)))
+                continue
+            if max_guild_syncs is not None and pushed >= max_guild_syncs:
+                logger.info(f"Deferring command sync for {key} to a later start-up")
+                results[key] = ("deferred", [])
+                continue
+            results[key] = await self.sync_scope(guild, force=force)
+            pushed += 1
+        return results
+
+
+def format_sync_results(results):
+    """Render sync results as a short Discord message"""
+    lines = []
+    for key, (status, names) in results.items():
+        lines.append(f"- {key}: {status} ({len(names)} commands)")
+    return "\n".join(lines)
@@ -13,7 +13,9 @@ import random
 from datetime import datetime
 
 # Added by migration script
-from database import Database, init_database
+from bot_database import Database, init_database
+from database.catalog import sync_endpoint_catalog
+from chat_history import chat_writer
 
 # This function will be called by discord_bot.py to register the commands
 def register_additional_commands(bot, DB_FILE, safe_defer, safe_followup, session, check_server_connectivity, logger):
@@ -168,13 +170,9 @@ def register_additional_commands(bot, DB_FILE, safe_defer, safe_followup, sessio
                         
                         # Store in chat history if available
                         try:
-                            history_query = """
-                                INSERT INTO chat_history 
-                                (user_id, model_id, prompt, system_prompt, response, temperature, max_tokens, eval_count, eval_duration)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """
-                            history_params = (
-                                str(interaction.user.id),
+                            # Queued for the background writer so the reply above isn't held up
+                            chat_writer.enqueue(
+                                interaction.user.id,
                                 model_id,
                                 prompt,
                                 system_prompt,
@@ -182,9 +180,8 @@ def register_additional_commands(bot, DB_FILE, safe_defer, safe_followup, sessio
                                 temperature,
                                 max_tokens,
                                 eval_count,
-                                eval_duration/1000000  # Convert to seconds
+                                eval_duration/1000000000  # Convert to seconds
                             )
-                            Database.execute(history_query, history_params)
                         except Exception as e:
                             logger.error(f"Error saving chat history: {str(e)}")
                     else:
@@ -295,84 +292,17 @@ def register_additional_commands(bot, DB_FILE, safe_defer, safe_followup, sessio
                         server_models = await response.json()
                         models_list = server_models.get("models", [])
                     
-                    # Get existing models for this server
-                    conn = Database()
-                    # Using Database methods instead of cursor
-                    query = "SELECT id, name FROM models WHERE endpoint_id = ?"
-                    params = (server_id,)
-                    result = Database.fetch_all(query, params)
-                    existing_models = {row[1]: row[0] for row in result}
+                    # Mirror the listing; unchanged catalogs are skipped by digest
+                    diff = sync_endpoint_catalog(server_id, models_list)
+                    added_models.extend(f"{name} on {ip}:{port}" for name in diff.added)
+                    updated_models.extend(f"{name} on {ip}:{port}" for name in diff.updated)
+                    deleted_models.extend(f"{name} on {ip}:{port}" for name in diff.deleted)
                     
-                    # Track models found on server
-                    found_models = set()
-                    
-                    # Process models from server
-                    for model in models_list:
-                        name = model.get("name", "")
-                        if not name:
-                            continue
-                        
-                        found_models.add(name)
-                        
-                        # Extract model details
-                        model_size_mb = model.get("size", 0) / (1024 * 1024)  # Convert to MB
-                        
-                        parameter_size = ""
-                        quantization_level = ""
-                        
-                        # Get detailed info if available
-                        if "details" in model:
-                            parameter_size = model["details"].get("parameter_size", "")
-                            quantization_level = model["details"].get("quantization_level", "")
-                        
-                        # Check if model exists in database
-                        if name in existing_models:
-                            # Update model details
-                            query = """
-                                UPDATE models SET 
-                                parameter_size = ?, 
-                                quantization_level = ?, 
-                                size_mb = ?
-                                WHERE id = ?
-                            """
-                            params = (parameter_size, quantization_level, model_size_mb, existing_models[name])
-                            Database.execute(query, params)
-                            
-                            # Since we can't access rowcount directly with our Database abstraction
-                            updated_models.append(f"{name} on {ip}:{port}")
-                        else:
-                            # Add new model
-                            query = """
-                                INSERT INTO models (endpoint_id, name, parameter_size, quantization_level, size_mb)
-                                VALUES (?, ?, ?, ?, ?)
-                            """
-                            params = (server_id, name, parameter_size, quantization_level, model_size_mb)
-                            Database.execute(query, params)
-                            
-                            added_models.append(f"{name} on {ip}:{port}")
-                    
-                    # Remove models that are no longer on the server
-                    for db_name, model_id in existing_models.items():
-                        if db_name not in found_models:
-                            query = "DELETE FROM models WHERE id = ?"
-                            params = (model_id,)
-                            Database.execute(query, params)
-                            deleted_models.append(f"{db_name} on {ip}:{port}")
-                    
-                    # Update server scan date
-                    query = "UPDATE servers SET scan_date = ? WHERE id = ?"
-                    params = (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), server_id)
-                    Database.execute(query, params)
-                    
-                    # Commit handled by Database methods
                     success_count += 1
                     
                 except Exception as e:
                     logger.error(f"Error syncing models for server {ip}:{port}: {str(e)}")
                     failed_count += 1
-                finally:
-                    if conn:
-                        conn.close()
             
             # Prepare final report
             summary = []
@@ -22,7 +22,7 @@ import requests
 import psycopg2
 
 # Import database abstraction layer
-from database import Database, init_database, get_db_manager
+from bot_database import Database, init_database, get_db_manager
 
 # Set up logging
 logging.basicConfig(
@@ -207,7 +207,7 @@ async def db_info(interaction: discord.Interaction):
         await safe_followup(interaction, "Querying database statistics... this might take a moment.")
         
         # Get database connection parameters from database.py
-        from database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
+        from bot_database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
         
         # Connect directly to the database using psycopg2
         import psycopg2
@@ -368,7 +368,7 @@ async def quickprompt(
         await safe_followup(interaction, f"Looking for models matching '{model_name}'... this might take a moment.")
         
         # Connect directly to the database
-        from database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
+        from bot_database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
         import psycopg2
         import psycopg2.extras
         
@@ -701,7 +701,7 @@ async def find_model_endpoints(
         await safe_followup(interaction, f"Searching for endpoints with model '{model_name}'... this might take a moment.")
         
         # Connect directly to the database to avoid the tuple index error
-        from database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
+        from bot_database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
         import psycopg2
         import psycopg2.extras
         
@@ -875,7 +875,7 @@ async def allmodels(
         await safe_followup(interaction, f"Fetching all models sorted by {sort_by}... this might take a moment.")
         
         # Connect directly to the database
-        from database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
+        from bot_database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
         import psycopg2
         import psycopg2.extras
         
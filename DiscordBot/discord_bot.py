@@ -3,9 +3,11 @@
 Discord Bot for interacting with Ollama Models.
 """
 
+# Imported first so the "imports" phase covers everything below
+from startup_timing import startup_timer
+
 import os
 import json
-import requests
 import discord
 import logging
 import aiohttp
@@ -15,8 +17,6 @@ from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 from typing import Optional
-from functools import partial
-from concurrent.futures import ThreadPoolExecutor
 from ollama_models import (
     setup_database, 
     get_models, 
@@ -27,58 +27,133 @@ from ollama_models import (
     get_servers
 )
 import sys
-import subprocess
 from pathlib import Path
-import sqlite3
 import time
-import commands_for_syncing  # Import the new module
+from query_cache import query_cache
+from database.catalog import invalidate_catalog_digest
+from paginated_view import KeysetPager, PaginatedView
+from chat_history import start_retention, chat_writer
+from command_registry import CommandRegistry, format_sync_results
+from bot_helpers import run_in_thread, safe_defer, safe_followup, followup_from_cache, safe_response
 
 # Added by migration script
-from database import Database, init_database, DATABASE_TYPE, get_db_manager
+from bot_database import Database, init_database, DATABASE_TYPE, get_db_manager
 
-# Thread pool for running sync functions in async context
-_thread_pool = ThreadPoolExecutor(max_workers=10)
+startup_timer.mark("imports")
 
-async def run_in_thread(func, *args, **kwargs):
-    """
-    Compatibility wrapper for asyncio.to_thread() (Python 3.9+)
-    Works on all Python versions by using ThreadPoolExecutor
-    """
-    loop = asyncio.get_event_loop()
-    pfunc = partial(func, *args, **kwargs)
-    return await loop.run_in_executor(_thread_pool, pfunc)
-
-# Set up logging
+# Set up logging; file handlers open their files on first write
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s [%(levelname)s] %(message)s',
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler("discord_bot.log")
+        logging.FileHandler("discord_bot.log", delay=True)
     ]
 )
 logger = logging.getLogger('ollama_bot')
 
 # Create specialized loggers
 honeypot_logger = logging.getLogger('honeypot')
-honeypot_handler = logging.FileHandler("honeypot_detection.log")
+honeypot_handler = logging.FileHandler("honeypot_detection.log", delay=True)
 honeypot_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 honeypot_logger.addHandler(honeypot_handler)
 honeypot_logger.setLevel(logging.INFO)
 
 security_logger = logging.getLogger('security')
-security_handler = logging.FileHandler("security.log")
+security_handler = logging.FileHandler("security.log", delay=True)
 security_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - [%(funcName)s] %(message)s'))
 security_logger.addHandler(security_handler)
 security_logger.setLevel(logging.INFO)
 
 # Load environment variables from .env file
 load_dotenv()
+
+startup_timer.mark("logging_and_env")
+
+# Extensions loaded from setup_hook rather than at import
+BOT_EXTENSIONS = ["cogs.admin"]
+
+
+def warm_up_database():
+    """Initialize the schema and connection pool (runs in a worker thread)"""
+    init_database()
+    Database.ensure_pool_initialized()
+    result = Database.fetch_one("SELECT version()")
+    if result:
+        logger.info(f"Connected to database: {result[0]}")
+    else:
+        logger.warning("Database connection test returned no result")
+
+
+class OllamaBot(commands.Bot):
+    """Bot whose database warm-up overlaps the gateway connection"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Hash-gated command sync shared by on_ready and the admin refresh commands
+        self.command_registry = CommandRegistry(self.tree)
+        self.db_warmup = None
+    
+    async def setup_hook(self):
+        """Runs after login, before the gateway connects"""
+        startup_timer.mark("login")
+        self.db_warmup = asyncio.ensure_future(self._warm_up_database())
+        
+        with startup_timer.phase("load_extensions"):
+            for extension in BOT_EXTENSIONS:
+                try:
+                    await self.load_extension(extension)
+                except Exception as e:
+                    logger.error(f"Failed to load extension {extension}: {str(e)}")
+    
+    async def _warm_up_database(self):
+        try:
+            with startup_timer.phase("db_warmup"):
+                await run_in_thread(warm_up_database)
+            return True
+        except Exception as e:
+            logger.error(f"Error warming up database: {str(e)}")
+            logger.error("Bot will start, but database operations may fail")
+            return False
+    
+    async def wait_for_database(self, timeout=30):
+        """Wait for the start-up warm-up to finish; returns True if the database is usable"""
+        if self.db_warmup is None:
+            return False
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.db_warmup), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Database warm-up still running after {timeout}s")
+            return False
     
+    async def close(self):
+        """Shut down; queued chat history is written while the loop and pool are still up"""
+        try:
+            await chat_writer.close()
+        except Exception as e:
+            logger.error(f"Error draining chat history writer: {str(e)}")
+        
+        await super().close()
+        
+        # Close aiohttp session when bot closes
+        if session:
+            await session.close()
+            logger.info("Closed aiohttp session")
+        
+        # Close database connections cleanly
+        try:
+            logger.info("Closing database connections...")
+            Database.close()
+            logger.info("Database connections closed")
+        except Exception as e:
+            logger.error(f"Error closing database connections: {str(e)}")
+
+
 # Initialize bot
 intents = discord.Intents.default()
 intents.message_content = True  # Enable message content intent
-bot = commands.Bot(command_prefix='!', intents=intents)
+bot = OllamaBot(command_prefix='!', intents=intents)
+command_registry = bot.command_registry
 
 # Define database file location for SQLite only
 DB_FILE = "ollama_instances.db"
@@ -322,18 +397,13 @@ async def on_ready():
         # Start a keep-alive task for preventing disconnections
         bot.loop.create_task(keep_alive())
         
-        # Ensure database connection is properly initialized before registering commands
-        try:
-            logger.info("Initializing database connection pool...")
-            Database.ensure_pool_initialized()
-            # Test the connection to make sure it's working
-            result = Database.fetch_one("SELECT NOW()")
-            if result:
-                logger.info(f"Database connection verified at: {result[0]}")
-            else:
-                logger.warning("Database connection test returned no result")
-        except Exception as e:
-            logger.error(f"Error initializing database: {str(e)}")
+        # Archive chat history past the retention window
+        start_retention(bot)
+        
+        # The pool was warmed up concurrently with the gateway connection
+        if not startup_timer.reported:
+            startup_timer.mark("gateway_connect")
+        await bot.wait_for_database()
         
         # The explicitly approved commands for the streamlined bot
         approved_commands = [
@@ -352,95 +422,26 @@ async def on_ready():
             "all_models",
             "server_info",
             "models_with_servers",
-            "cleanup"
+            "cleanup",
+            "cache_stats",
+            "chat_log_stats",
+            "db_profile"
         ]
         
-        # Get all currently registered commands
-        try:
-            # First check if commands are already registered properly
-            current_commands = await bot.tree.fetch_commands()
-            current_command_names = [cmd.name for cmd in current_commands]
-            logger.info(f"Current commands: {', '.join(current_command_names) if current_command_names else 'None'}")
-            
-            # Check if our commands list matches what's already registered
-            missing_commands = [cmd for cmd in approved_commands if cmd not in current_command_names]
-            extra_commands = [cmd for cmd in current_command_names if cmd not in approved_commands]
-            
-            if not missing_commands and not extra_commands:
-                logger.info("Command registration is up to date - skipping sync to avoid rate limits")
-                
-                # Set bot status
-                activity = discord.Activity(type=discord.ActivityType.watching, name="Ollama instances")
-                await bot.change_presence(activity=activity)
-                
-                logger.info("Bot is ready!")
-                print(f"Bot is ready! Logged in as {bot.user} (ID: {bot.user.id})")
-                return
-            else:
-                logger.info(f"Command list needs updating - missing: {missing_commands}, extra: {extra_commands}")
-                
-                # Check if we've synced recently - to avoid rate limits, skip sync if it hasn't been long enough
-                last_sync_time = getattr(bot, '_last_sync_time', 0)
-                current_time = time.time()
-                if current_time - last_sync_time < 3600:  # Less than 1 hour since last sync
-                    logger.warning("Skipping command sync due to recent sync - avoiding rate limits")
-                    
-                    # Set bot status anyway
-                    activity = discord.Activity(type=discord.ActivityType.watching, name="Ollama instances")
-                    await bot.change_presence(activity=activity)
-                    
-                    logger.info("Bot is ready (with outdated commands)!")
-                    print(f"Bot is ready! Logged in as {bot.user} (ID: {bot.user.id})")
-                    return
-        except discord.errors.HTTPException as e:
-            if e.status == 429:  # Rate limited
-                logger.warning(f"Rate limited when fetching commands - waiting {e.retry_after} seconds")
-                
-                # Set bot status anyway
-                activity = discord.Activity(type=discord.ActivityType.watching, name="Ollama instances")
-                await bot.change_presence(activity=activity)
-                
-                logger.info("Bot is ready (with existing commands due to rate limit)!")
-                print(f"Bot is ready! Logged in as {bot.user} (ID: {bot.user.id})")
-                return
-            else:
-                logger.error(f"HTTP error when fetching commands: {e}")
+        # Make sure ONLY the commands we want are in the command tree
+        for cmd_name in [command.name for command in bot.tree.get_commands()]:
+            if cmd_name not in approved_commands:
+                logger.info(f"Removing unauthorized command: {cmd_name}")
+                bot.tree.remove_command(cmd_name)
         
+        # Only scopes whose command schema changed since the last sync hit the API
         try:
-            # We need to update commands - only do this if absolutely necessary due to rate limits
-            # Make sure ONLY the commands we want are in the command tree
-            all_commands = {}
-            for command in bot.tree.get_commands():
-                all_commands[command.name] = command
-                
-            for cmd_name in list(all_commands.keys()):
-                if cmd_name not in approved_commands:
-                    logger.info(f"Removing unauthorized command: {cmd_name}")
-                    bot.tree.remove_command(cmd_name)
-            
-            # Sync the commands - this will update Discord with our command list
-            # Note: This is where rate limits often occur, so we limit how often we do this
-            await bot.tree.sync()
-            setattr(bot, '_last_sync_time', time.time())  # Record when we synced
-            
-            # Register with each guild for immediate availability
-            guilds_updated = 0
-            for guild in bot.guilds:
-                try:
-                    # Only sync with a few guilds to avoid rate limits
-                    if guilds_updated < 2:  # Limit to 2 guilds max per startup
-                        await bot.tree.sync(guild=guild)
-                        logger.info(f"Synced commands with guild: {guild.name} (ID: {guild.id})")
-                        guilds_updated += 1
-                    else:
-                        logger.info(f"Skipped syncing with guild {guild.name} to avoid rate limits")
-                except Exception as e:
-                    logger.error(f"Error syncing commands with guild {guild.name}: {e}")
-        except discord.errors.HTTPException as e:
-            if e.status == 429:  # Rate limited
-                logger.warning(f"Rate limited when syncing commands - waiting {e.retry_after} seconds")
-            else:
-                logger.error(f"HTTP error when syncing commands: {e}")
+            results = await command_registry.sync(guilds=bot.guilds, max_guild_syncs=2)
+            logger.info("Command sync results:\n" + format_sync_results(results))
+        except Exception as e:
+            logger.error(f"Error syncing commands: {e}")
+        if not startup_timer.reported:
+            startup_timer.mark("command_sync")
         
         # Set bot status
         activity = discord.Activity(type=discord.ActivityType.watching, name="Ollama instances")
@@ -449,6 +450,9 @@ async def on_ready():
         logger.info("Bot is ready!")
         print(f"Bot is ready! Logged in as {bot.user} (ID: {bot.user.id})")
         
+        # Per-phase start-up report (first connect only)
+        startup_timer.report()
+        
     except Exception as e:
         logger.error(f"Error in on_ready: {str(e)}")
         print(f"Error in on_ready: {str(e)}")
@@ -519,265 +523,6 @@ async def keep_alive():
             logger.error(f"Error in connection maintenance: {str(e)}")
             await asyncio.sleep(60)  # Wait a minute and try again
 
-@bot.event
-async def on_close():
-    # Close aiohttp session when bot closes
-    if session:
-        await session.close()
-        logger.info("Closed aiohttp session")
-    
-    # Close database connections cleanly
-    try:
-        logger.info("Closing database connections...")
-        Database.close()
-        logger.info("Database connections closed")
-    except Exception as e:
-        logger.error(f"Error closing database connections: {str(e)}")
-
-async def safe_defer(interaction):
-    """Safely defer an interaction with error handling for expired interactions"""
-    try:
-        # Check if the interaction is already responded to
-        if interaction.response.is_done():
-            logger.debug(f"Interaction {interaction.id} has already been responded to")
-            return True
-        
-        # Set a shorter timeout for deferring to avoid common timeouts
-        logger.debug(f"Deferring interaction {interaction.id}")
-        
-        # Use a timeout to ensure defer doesn't hang
-        try:
-            # Give a reasonable timeout for the defer operation
-            await asyncio.wait_for(
-                interaction.response.defer(thinking=True, ephemeral=False),
-                timeout=2.0
-            )
-            logger.debug(f"Successfully deferred interaction {interaction.id}")
-            return True
-        except asyncio.TimeoutError:
-            logger.warning(f"Defer operation timed out for interaction {interaction.id}")
-            # Try to proceed anyway
-            return True
-            
-    except discord.errors.NotFound as e:
-        if e.code == 10062:  # Unknown interaction error code
-            logger.warning(f"Interaction {interaction.id} expired before deferring")
-            return False
-        else:
-            logger.error(f"Unidentified NotFound error in defer operation: {e}")
-            raise
-    except Exception as e:
-        logger.error(f"Error during defer operation: {str(e)}")
-        logger.error(f"Exception type: {type(e).__name__}")
-        return False
-
-async def safe_followup(interaction, content, ephemeral=False):
-    """Safely send a followup message with error handling"""
-    try:
-        # For embeds, just send directly with length check
-        if isinstance(content, discord.Embed):
-            return await interaction.followup.send(content, ephemeral=ephemeral)
-        
-        # Check if content contains code blocks that might need to be preserved
-        contains_codeblock = "```" in content
-        
-        # If content is too long and contains codeblocks, handle special splitting
-        if len(content) > 2000 and contains_codeblock:
-            # Find all code blocks in the content
-            import re
-            # Regex to find code blocks with or without language specification
-            code_block_pattern = r'```(?:\w+)?\n([\s\S]*?)```'
-            
-            # Split the content around code blocks
-            parts = re.split(code_block_pattern, content)
-            
-            # Extract the code blocks themselves
-            code_blocks = re.findall(code_block_pattern, content)
-            
-            # Initialize variables for reconstructing the message
-            messages = []
-            current_message = ""
-            
-            # If the content starts with text before a code block
-            if not content.startswith("```"):
-                current_message = parts[0]
-                parts = parts[1:]
-            
-            # Process each code block and the text after it
-            for i, code_block in enumerate(code_blocks):
-                # Determine the language if specified
-                # Look for the language specifier in the original content
-                content_before_this_block = content[:content.find(code_block)]
-                last_code_marker = content_before_this_block.rfind("```")
-                if last_code_marker >= 0:
-                    # Extract the text between ``` and the newline
-                    lang_line = content_before_this_block[last_code_marker+3:].split("\n")[0].strip()
-                    lang_spec = lang_line if lang_line else ""
-                else:
-                    lang_spec = ""
-                
-                # Format the code block with language specifier
-                if lang_spec:
-                    formatted_block = f"```{lang_spec}\n{code_block}```"
-                else:
-                    formatted_block = f"```\n{code_block}```"
-                
-                # Check if adding this block would exceed Discord's limit
-                if len(current_message) + len(formatted_block) > 1950:
-                    # Send the current message before it gets too long
-                    if current_message:
-                        messages.append(current_message)
-                    current_message = formatted_block
-                else:
-                    current_message += formatted_block
-                
-                # Add any text that follows this code block (if any)
-                if i < len(parts) - 1:
-                    text_after = parts[i + 1]
-                    if len(current_message) + len(text_after) > 1950:
-                        messages.append(current_message)
-                        current_message = text_after
-                    else:
-                        current_message += text_after
-            
-            # Add any remaining content
-            if current_message:
-                messages.append(current_message)
-            
-            # Send all the message parts
-            responses = []
-            for i, msg in enumerate(messages):
-                if i == 0:
-                    responses.append(await interaction.followup.send(msg, ephemeral=ephemeral))
-                else:
-                    responses.append(await interaction.channel.send(msg))
-            return responses
-        
-        # For simple content without code blocks or short enough content
-        elif len(content) > 2000:
-            # Split into multiple messages of 2000 characters or less
-            messages = []
-            for i in range(0, len(content), 1900):
-                chunk = content[i:i+1900]
-                
-                # Add indicators for continuation
-                if i > 0:
-                    chunk = "... " + chunk
-                if i + 1900 < len(content):
-                    chunk = chunk + " ..."
-                
-                # Wrap non-embed content in code blocks to prevent message splitting
-                # But preserve content that contains Discord markdown formatting
-                if not (
-                    "**" in chunk or  # Bold
-                    "*" in chunk or   # Italic
-                    "~~" in chunk or  # Strikethrough
-                    "`" in chunk or   # Inline code
-                    "```" in chunk or # Code block
-                    ">" in chunk or   # Quote
-                    "||" in chunk     # Spoiler
-                ):
-                    chunk = f"```\n{chunk}\n```"
-                
-                if i == 0:
-                    messages.append(await interaction.followup.send(chunk, ephemeral=ephemeral))
-                else:
-                    messages.append(await interaction.channel.send(chunk))
-            
-            return messages
-        else:
-            # Standard handling for content within Discord's limits
-            # Wrap non-embed content in code blocks to prevent message splitting
-            # But preserve content that contains Discord markdown formatting
-            if not (
-                "**" in content or  # Bold
-                "*" in content or   # Italic
-                "~~" in content or  # Strikethrough
-                "`" in content or   # Inline code
-                "```" in content or # Code block
-                ">" in content or   # Quote
-                "||" in content     # Spoiler
-            ):
-                content = f"```\n{content}\n```"
-                
-            return await interaction.followup.send(content, ephemeral=ephemeral)
-    except discord.errors.NotFound:
-        logger.warning(f"Interaction {interaction.id} expired before followup could be sent")
-        return None
-    except discord.errors.HTTPException as e:
-        logger.error(f"HTTP error sending followup: {str(e)}")
-        # Try to send a simpler message if possible
-        try:
-            return await interaction.followup.send("```\nError sending response. Message may exceed length limitations.\n```", ephemeral=True)
-        except:
-            return None
-    except Exception as e:
-        logger.error(f"Error sending followup message: {str(e)}")
-        return None
-
-async def safe_response(interaction, content, ephemeral=False):
-    """Safely send a direct response message with error handling"""
-    try:
-        # For embeds, just send directly with length check
-        if isinstance(content, discord.Embed):
-            return await interaction.response.send_message(content, ephemeral=ephemeral)
-        
-        # Check if content contains code blocks that might need to be preserved
-        contains_codeblock = "```" in content
-        
-        # If content is too long and contains codeblocks, handle special splitting
-        if len(content) > 2000 and contains_codeblock:
-            # Need to defer first to enable followup messages
-            try:
-                if not interaction.response.is_done():
-                    await interaction.response.defer(ephemeral=ephemeral)
-            except:
-                pass  # Already responded or deferred
-                
-            # Use safe_followup since we're sending multiple messages
-            return await safe_followup(interaction, content, ephemeral=ephemeral)
-        
-        # For simple content without code blocks or short enough content
-        elif len(content) > 2000:
-            # Need to use followup for multiple messages
-            try:
-                if not interaction.response.is_done():
-                    await interaction.response.defer(ephemeral=ephemeral)
-            except:
-                pass  # Already responded or deferred
-                
-            # Use safe_followup for sending multiple messages
-            return await safe_followup(interaction, content, ephemeral=ephemeral)
-        else:
-            # Standard handling for content within Discord's limits
-            # Wrap non-embed content in code blocks to prevent message splitting
-            # But preserve content that contains Discord markdown formatting
-            if not (
-                "**" in content or  # Bold
-                "*" in content or   # Italic
-                "~~" in content or  # Strikethrough
-                "`" in content or   # Inline code
-                "```" in content or # Code block
-                ">" in content or   # Quote
-                "||" in content     # Spoiler
-            ):
-                content = f"```\n{content}\n```"
-                
-            return await interaction.response.send_message(content, ephemeral=ephemeral)
-    except discord.errors.NotFound:
-        logger.warning(f"Interaction {interaction.id} expired before response could be sent")
-        return None
-    except discord.errors.HTTPException as e:
-        logger.error(f"HTTP error sending response: {str(e)}")
-        # Try to send a simpler message if possible
-        try:
-            return await interaction.response.send_message("```\nError sending response. Message may exceed length limitations.\n```", ephemeral=True)
-        except:
-            return None
-    except Exception as e:
-        logger.error(f"Error sending response message: {str(e)}")
-        return None
-
 @bot.tree.command(name="listmodels", description="List all available Ollama models")
 async def list_models(interaction: discord.Interaction):
     if not await safe_defer(interaction):
@@ -959,6 +704,7 @@ async def add_model_command(
                 
                 # Model pull started successfully - add to database
                 model_id = add_model(clean_ip, port, name, info)
+                query_cache.invalidate()
                 status_message = await safe_followup(
                     interaction, 
                     f"✅ Pull request initiated for model `{name}` on {clean_ip}:{port}.\n"
@@ -1135,6 +881,7 @@ async def delete_model_command(interaction: discord.Interaction, model_id: int):
                 
                 # If API call was successful, remove from our database
                 delete_model(model_id)
+                query_cache.invalidate()
                 await safe_followup(interaction, f"Model {name} deleted successfully from server {ip}:{port} and database.")
         except asyncio.TimeoutError:
             await safe_followup(interaction, f"Connection timed out when attempting to reach {ip}:{port}")
@@ -1282,6 +1029,8 @@ async def help_command(interaction: discord.Interaction):
                 value=(
                     "`/addmodel <ip> <port> <name>` - Add a new model to the database\n"
                     "`/syncserver <ip> <port>` - Sync server models with database\n"
+                    "`/cache_stats` - Show listing cache hit rates\n"
+                    "`/chat_log_stats` - Show chat history writer queue depth and drops\n"
                     "`/checkserver <ip> <port>` - Check available models on server\n"
                     "`/cleanup` - Clean up duplicate database entries\n"
                     "`/offline_endpoints` - View and manage offline endpoints\n"
@@ -1380,6 +1129,7 @@ async def sync_server(interaction: discord.Interaction, ip: str, port: int):
         try:
             # Call the sync function
             added, updated, removed = sync_models_with_server(clean_ip, port)
+            query_cache.invalidate()
             
             # Create a structured report
             message = f"Database synchronization with {clean_ip}:{port} complete:\n"
@@ -1474,7 +1224,7 @@ async def benchmark_model(
             
             # Call the benchmark script with the model details
             benchmark_path = Path(__file__).parent.parent / "ollama_benchmark.py"
-            cmd = [sys.executable, str(benchmark_path), "run", "--server", ip, "--port", str(port), "--model-name", name]
+            cmd = [sys.executable, str(benchmark_path), "run", "--server", ip, "--port", str(port), "--model-name", name, "--skip-context"]
             
         # If direct server/model info is provided
         elif server_ip and model_name:
@@ -1483,7 +1233,7 @@ async def benchmark_model(
             
             # Call the benchmark script with the provided details
             benchmark_path = Path(__file__).parent.parent / "ollama_benchmark.py"
-            cmd = [sys.executable, str(benchmark_path), "run", "--server", server_ip, "--port", str(port), "--model-name", model_name]
+            cmd = [sys.executable, str(benchmark_path), "run", "--server", server_ip, "--port", str(port), "--model-name", model_name, "--skip-context"]
             
         else:
             await safe_followup(interaction, "Please provide either a model_id or both server_ip and model_name parameters.")
@@ -1575,7 +1325,10 @@ async def sync_models_with_server_async(ip, port):
     # Create a task in the default thread pool to run the sync function
     # This allows the blocking database operations to run without blocking the main thread
     loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, lambda: sync_models_with_server(ip, port))
+    try:
+        return await loop.run_in_executor(None, lambda: sync_models_with_server(ip, port))
+    finally:
+        query_cache.invalidate()
 
 @bot.tree.command(name="searchmodels", description="Search for models by name with sorting options")
 @app_commands.describe(
@@ -1841,93 +1594,83 @@ async def all_models(
         return
     
     try:
-        # Default sorting
-        orderby = "server_count DESC"
-        
-        # Apply sorting options if provided
-        if sort_by:
-            if sort_by == "name":
-                orderby = "name " + ("DESC" if descending else "ASC")
-            elif sort_by == "params":
-                orderby = f"""
-                CASE 
-                    WHEN parameter_size LIKE '%B' THEN 
-                        CAST(REPLACE(REPLACE(parameter_size, 'B', ''), '.', '') AS REAL)
-                    ELSE 0
-                END {("DESC" if descending else "ASC")}"""
-            elif sort_by == "quant":
-                orderby = "quantization_level " + ("DESC" if descending else "ASC")
-            elif sort_by == "count":
-                orderby = "server_count " + ("DESC" if descending else "ASC")
+        # Sort keys must be non-null for keyset pagination
+        sort_fields = {
+            "name": "g.name",
+            "params": param_size_sort_key("g.parameter_size"),
+            "quant": "COALESCE(g.quantization_level, '')",
+            "count": "g.server_count"
+        }
+        if sort_by not in sort_fields:
+            # Default sorting: most widely served first
+            sort_by, descending = "count", True
         
         # Safety check for limit parameter
         safe_limit = max(1, min(500, limit))  # Ensure limit is between 1 and 500
         
-        # Query for all models with pagination - using PostgreSQL placeholder syntax
-        query = f"""
-            SELECT 
-                name, 
-                parameter_size, 
-                quantization_level, 
-                COUNT(*) as server_count
-            FROM models
-            GROUP BY name, parameter_size, quantization_level
-            ORDER BY {orderby}
-            LIMIT %s
-        """
-        
-        # Execute and fetch results
-        results = Database.fetch_all(query, (safe_limit,))
-        
-        if not results or len(results) == 0:
-            await safe_followup(interaction, "No models found in the database.")
-            return
+        # One row per unique model; MIN(id) gives each group a unique cursor key
+        pager = KeysetPager(
+            columns="g.name, g.parameter_size, g.quantization_level, g.server_count",
+            body="""
+                FROM (
+                    SELECT name, parameter_size, quantization_level,
+                           COUNT(*) AS server_count, MIN(id) AS group_id
+                    FROM models
+                    GROUP BY name, parameter_size, quantization_level
+                ) g
+                WHERE TRUE
+            """,
+            params=(),
+            sort_expr=sort_fields[sort_by],
+            id_expr="g.group_id",
+            descending=descending,
+            max_rows=safe_limit,
+            cache_command="allmodels",
+            cache_args={"sort_by": sort_by, "descending": descending}
+        )
         
-        # Format the results
-        message = f"**All Models**\nShowing {len(results)} unique models (limit: {safe_limit})\n\n"
-        message += "Model Name | Parameters | Quantization | Count | Example Servers\n"
-        message += "-" * 90 + "\n"
+        servers_query = f"""
+            SELECT m.id, e.ip, e.port
+            FROM models m
+            JOIN endpoints e ON m.endpoint_id = e.id
+            WHERE m.name = %s 
+              AND (m.parameter_size = %s OR (m.parameter_size IS NULL AND %s IS NULL))
+              AND (m.quantization_level = %s OR (m.quantization_level IS NULL AND %s IS NULL))
+              AND e.verified = {get_db_boolean(True, as_string=True, for_verified=True)}
+            LIMIT 3
+        """
         
-        for model in results:
-            name, params, quant, count = model
-            
-            # Get example endpoints with model IDs for this model
-            servers_query = """
-                SELECT m.id, e.ip, e.port
-                FROM models m
-                JOIN endpoints e ON m.endpoint_id = e.id
-                WHERE m.name = %s 
-                  AND (m.parameter_size = %s OR (m.parameter_size IS NULL AND %s IS NULL))
-                  AND (m.quantization_level = %s OR (m.quantization_level IS NULL AND %s IS NULL))
-                  AND e.verified = {get_db_boolean(True)}
-                LIMIT 3
-            """
-            servers_params = (name, params, params, quant, quant)
-            servers = Database.fetch_all(servers_query, servers_params) or []
+        async def render_page(page_results, page_number):
+            message = ""
+            if page_number == 1:
+                message += f"**All Models**\nUnique models (limit: {safe_limit})\n\n"
+            message += "Model Name | Parameters | Quantization | Count | Example Servers\n"
+            message += "-" * 90 + "\n"
             
-            servers_text = ", ".join([f"ID:{s[0]}:{s[1]}:{s[2]}" for s in servers]) if servers else "None"
-            
-            if count > 3:
-                servers_text += f" (+{count-3} more)"
-            
-            # Trim long model names
-            display_name = name
-            if len(display_name) > 20:
-                display_name = name[:17] + "..."
+            for name, params, quant, count in page_results:
+                # Get example endpoints with model IDs for the visible models only
+                servers = await run_in_thread(Database.fetch_all, servers_query,
+                                              (name, params, params, quant, quant)) or []
                 
-            # Add this model to the message
-            message += f"{display_name} | {params or 'N/A'} | {quant or 'N/A'} | {count} | {servers_text}\n"
+                servers_text = ", ".join([f"ID:{s[0]}:{s[1]}:{s[2]}" for s in servers]) if servers else "None"
+                
+                if count > 3:
+                    servers_text += f" (+{count-3} more)"
+                
+                # Trim long model names
+                display_name = name
+                if len(display_name) > 20:
+                    display_name = name[:17] + "..."
+                    
+                # Add this model to the message
+                message += f"{display_name} | {params or 'N/A'} | {quant or 'N/A'} | {count} | {servers_text}\n"
+            return message
         
-        # Check if message is too long and truncate if needed
-        if len(message) > 1900:
-            # Truncate and indicate there's more
-            message = message[:1850] + "\n... (additional models truncated) ..."
-            
-        # Don't wrap in code blocks here as safe_followup will do it
-        await safe_followup(interaction, message)
+        view = PaginatedView(pager, render_page, owner_id=interaction.user.id)
+        await view.send(interaction, empty_message="No models found in the database.")
         
     except Exception as e:
-        logger.error(f"Error in all_models: {str(e)}\nQuery: {query if 'query' in locals() else 'unknown'}")
+        logger.error(f"Error in all_models: {str(e)}")
         await safe_followup(interaction, f"Error retrieving models: {str(e)}")
 
 @bot.tree.command(name="serverinfo", description="Show detailed info about a specific server")
@@ -1957,6 +1700,10 @@ async def server_info(
         # Clean IP address
         clean_ip = ip.strip(":")
         
+        cache_key = query_cache.make_key("serverinfo", ip=clean_ip, port=port, sort_by=sort_by, descending=descending)
+        if await followup_from_cache(interaction, cache_key):
+            return
+        
         # Look for endpoint(s) by IP and optional port
         if port is not None:
             query_endpoints = """
@@ -2009,6 +1756,7 @@ async def server_info(
                 orderby = "ip " + ("DESC" if descending else "ASC")
         
         # Process each endpoint
+        messages = []
         for endpoint in endpoints:
             if port is not None:
                 endpoint_id, scan_date = endpoint
@@ -2061,8 +1809,11 @@ async def server_info(
             if len(message) > 1900:
                 message = message[:1850] + "\n... (additional models truncated) ..."
             
+            messages.append(message)
             await safe_followup(interaction, message)
         
+        query_cache.set(cache_key, messages)
+        
     except Exception as e:
         logger.error(f"Error in server_info: {str(e)}")
         await safe_followup(interaction, f"Error retrieving server info: {str(e)}")
@@ -2090,121 +1841,46 @@ async def models_with_servers(
         return
     
     try:
-        # Default sorting
-        orderby = "name ASC"
-        
-        # Apply sorting options if provided
-        if sort_by:
-            if sort_by == "name":
-                orderby = "name " + ("DESC" if descending else "ASC")
-            elif sort_by == "params":
-                orderby = """
-                    CASE 
-                        WHEN parameter_size IS NULL THEN 0
-                        WHEN parameter_size = '' THEN 0
-                        WHEN parameter_size LIKE '%B' THEN 
-                            CASE 
-                                WHEN CAST(REPLACE(REPLACE(REPLACE(parameter_size, 'B', ''), '.', ''), ' ', '') AS TEXT) ~ '^[0-9]+$' THEN
-                                    CAST(REPLACE(REPLACE(REPLACE(parameter_size, 'B', ''), '.', ''), ' ', '') AS REAL) 
-                                ELSE 0 
-                            END
-                        ELSE 0
-                    END """ + ("DESC" if descending else "ASC")
-            elif sort_by == "quant":
-                orderby = "quant " + ("DESC" if descending else "ASC")
-            elif sort_by == "size":
-                orderby = "size_mb " + ("DESC" if descending else "ASC")
-            elif sort_by == "ip":
-                orderby = "ip " + ("DESC" if descending else "ASC")
-        
-        # Get all models with their endpoint information
-        query = f"""
-            SELECT 
-                m.id, 
-                m.name, 
-                COALESCE(m.parameter_size, '') as parameter_size, 
-                COALESCE(m.quantization_level, '') as quant, 
-                COALESCE(m.size_mb, 0) as size_mb, 
-                e.id as endpoint_id, 
-                e.ip, 
-                e.port
-            FROM models m
-            JOIN endpoints e ON m.endpoint_id = e.id
-            WHERE e.verified = {get_db_boolean(True, as_string=True, for_verified=True)}
-            ORDER BY {orderby if sort_by != "params" else "m.name ASC"}
-            LIMIT ?
-        """
+        # Sort keys must be non-null for keyset pagination
+        sort_fields = {
+            "name": "m.name",
+            "params": param_size_sort_key("m.parameter_size"),
+            "quant": "COALESCE(m.quantization_level, '')",
+            "size": "COALESCE(m.size_mb, 0)",
+            "ip": "e.ip"
+        }
+        if sort_by not in sort_fields:
+            # Default sorting: by name, A to Z
+            sort_by, descending = "name", False
         
-        results = Database.fetch_all(query, (limit,))
+        safe_limit = max(1, min(500, limit))
         
-        if not results:
-            await safe_followup(interaction, "No models found in the database.")
-            return
+        # Models with their endpoint information, one page at a time
+        pager = KeysetPager(
+            columns="""m.id, m.name, COALESCE(m.parameter_size, ''), COALESCE(m.quantization_level, ''),
+                       COALESCE(m.size_mb, 0), e.id, e.ip, e.port""",
+            body=f"""
+                FROM models m
+                JOIN endpoints e ON m.endpoint_id = e.id
+                WHERE e.verified = {get_db_boolean(True, as_string=True, for_verified=True)}
+            """,
+            params=(),
+            sort_expr=sort_fields[sort_by],
+            id_expr="m.id",
+            descending=descending,
+            max_rows=safe_limit,
+            cache_command="models_with_servers",
+            cache_args={"sort_by": sort_by, "descending": descending}
+        )
         
-        # Add detailed logging about the results
-        logger.info(f"models_with_servers received {len(results)} results")
-        logger.info(f"Result type: {type(results)}")
-        if results:
-            logger.info(f"First result type: {type(results[0])}")
-            logger.info(f"First result: {results[0]}")
-            if isinstance(results[0], dict):
-                logger.info(f"Dictionary keys: {results[0].keys()}")
-        
-        # If sorting by parameter size, handle it in Python code
-        if sort_by == "params":
-            # Convert results to list if it's not already
-            results = list(results)
+        def render_page(page_results, page_number):
+            message = ""
+            if page_number == 1:
+                message += f"**All Models with Server Information**\nModel instances (limit: {safe_limit})\n\n"
+            message += "Model ID | Model Name | Parameters | Quantization | Size (MB) | Endpoint ID | Server IP:Port\n"
+            message += "-" * 100 + "\n"
             
-            # Define a key function to extract parameter size as a numeric value
-            def extract_param_size(model):
-                # Handle both dict and tuple access
-                if isinstance(model, dict):
-                    param_str = model.get('parameter_size', '0')
-                else:
-                    # Assume tuple with parameter_size at index 2
-                    param_str = model[2] if len(model) > 2 else '0'
-                
-                # Strip 'B' or 'b' suffix and convert to number
-                param_str = param_str.strip()
-                if param_str.endswith(('B', 'b')):
-                    param_str = param_str[:-1].strip()
-                
-                # Try to convert to float
-                try:
-                    return float(param_str)
-                except (ValueError, TypeError):
-                    return 0
-            
-            # Sort the results
-            results.sort(key=extract_param_size, reverse=descending)
-            
-        # Format the results
-        message = f"**All Models with Server Information**\nShowing {len(results)} model instances (limit: {limit})\n\n"
-        message += "Model ID | Model Name | Parameters | Quantization | Size (MB) | Endpoint ID | Server IP:Port\n"
-        message += "-" * 100 + "\n"
-        
-        for model in results:
-            try:
-                # Handle both tuple and dictionary results
-                if isinstance(model, dict):
-                    # Dictionary access (DictCursor result)
-                    model_id = model.get('id', 0)
-                    name = model.get('name', 'Unknown')
-                    params = model.get('parameter_size', '')
-                    quant = model.get('quant', '')
-                    size = model.get('size_mb', 0)
-                    endpoint_id = model.get('endpoint_id', 0)
-                    ip = model.get('ip', 'Unknown')
-                    port = model.get('port', 0)
-                elif isinstance(model, (list, tuple)) and len(model) >= 8:
-                    # Tuple access (regular cursor result)
-                    model_id, name, params, quant, size, endpoint_id, ip, port = model
-                else:
-                    # Invalid data format
-                    logger.warning(f"Model result has unexpected format: {model}")
-                    message += f"Error with model data: Unexpected format {type(model)}\n"
-                    continue
-                
+            for model_id, name, params, quant, size, endpoint_id, ip, port in page_results:
                 # Trim long model names
                 display_name = name
                 if len(display_name) > 15:
@@ -2214,16 +1890,10 @@ async def models_with_servers(
                 size_str = f"{size:.2f}" if size else "N/A"
                 
                 message += f"{model_id} | {display_name} | {params or 'N/A'} | {quant or 'N/A'} | {size_str} | {endpoint_id} | {ip}:{port}\n"
-            except Exception as e:
-                logger.error(f"Error processing model result: {str(e)}, Model data: {model}")
-                message += f"Error processing model data: {str(e)}\n"
+            return message
         
-        # Check if message is too long and truncate if needed
-        if len(message) > 1900:
-            # Truncate and indicate there's more
-            message = message[:1850] + "\n... (additional models truncated) ..."
-            
-        await safe_followup(interaction, message)
+        view = PaginatedView(pager, render_page, owner_id=interaction.user.id)
+        await view.send(interaction, empty_message="No models found in the database.")
         
     except Exception as e:
         logger.error(f"Error in models_with_servers: {str(e)}")
@@ -2270,6 +1940,7 @@ async def cleanup_database(interaction: discord.Interaction):
                         "UPDATE models SET endpoint_id = ? WHERE endpoint_id = ?", 
                         (keep_id, remove_id)
                     )
+                    invalidate_catalog_digest(keep_id)
                     
                     # Update the verification status if needed
                     Database.execute(
@@ -2323,189 +1994,20 @@ async def cleanup_database(interaction: discord.Interaction):
                         "DELETE FROM models WHERE id = ?", 
                         (remove_id,)
                     )
+                invalidate_catalog_digest(endpoint_id)
         
         # Prepare final summary
         summary = "**Database Cleanup Results**\n\n"
         summary += f"**Endpoint Cleanup:**\n{endpoint_msg}\n\n"
         summary += f"**Model Cleanup:**\n{model_msg}"
         
+        query_cache.invalidate()
         await safe_followup(interaction, summary)
         
     except Exception as e:
         logger.error(f"Error in cleanup_database: {str(e)}")
         await safe_followup(interaction, f"Error cleaning up database: {str(e)}")
 
-@bot.tree.command(name="refreshcommands", description="Force refresh of bot commands (admin only)")
-async def refresh_commands(interaction: discord.Interaction):
-    if not await safe_defer(interaction):
-        return
-    
-    try:
-        # Check if user has admin permissions
-        if not interaction.user.guild_permissions.administrator:
-            await safe_followup(interaction, "This command requires administrator permissions.")
-            return
-        
-        # Get current commands
-        before_count = len(await bot.tree.fetch_commands())
-        before_commands = await bot.tree.fetch_commands()
-        
-        await safe_followup(interaction, "Refreshing commands. This may take up to a minute...")
-        
-        # Log the current commands
-        logger.info(f"Current commands before refresh: {', '.join([cmd.name for cmd in before_commands])}")
-        
-        # Clear command cache in current guild
-        bot.tree.clear_commands(guild=interaction.guild)
-        
-        # Sync globally first
-        await bot.tree.sync()
-        
-        # Then sync to the current guild to ensure immediate visibility
-        await bot.tree.sync(guild=interaction.guild)
-        
-        # Get the updated commands
-        after_commands = await bot.tree.fetch_commands()
-        
-        # Send detailed results
-        command_list = [f"- {cmd.name}" for cmd in after_commands]
-        
-        message = f"**Command Refresh Complete**\n"
-        message += f"- Commands before: {before_count}\n"
-        message += f"- Commands after: {len(after_commands)}\n\n"
-        message += "**Available Commands:**\n" + "\n".join(command_list)
-        
-        await safe_followup(interaction, message)
-        
-        logger.info(f"Commands refreshed by user {interaction.user.name} in guild {interaction.guild.name}")
-        logger.info(f"Refreshed from {before_count} to {len(after_commands)} commands")
-        logger.info(f"Updated commands: {', '.join([cmd.name for cmd in after_commands])}")
-        
-    except Exception as e:
-        logger.error(f"Error in refresh_commands: {str(e)}")
-        logger.error(f"Exception type: {type(e).__name__}")
-        await safe_followup(interaction, f"Error refreshing commands: {str(e)}")
-
-@bot.tree.command(name="guild_sync", description="Force sync commands to this guild (admin only)")
-async def guild_sync_command(interaction: discord.Interaction):
-    if not await safe_defer(interaction):
-        return
-    
-    try:
-        # Check if user has admin permissions
-        if not interaction.user.guild_permissions.administrator:
-            await safe_followup(interaction, "This command requires administrator permissions.")
-            return
-        
-        await safe_followup(interaction, "Syncing commands to this guild. This may take a moment...")
-        
-        # Get current guild command count
-        try:
-            before_commands = await bot.tree.fetch_commands(guild=interaction.guild)
-            before_count = len(before_commands)
-        except:
-            before_count = 0
-        
-        # Do NOT clear commands first - this was causing problems
-        # Just sync directly to the guild
-        
-        # Sync to the current guild
-        synced = await bot.tree.sync(guild=interaction.guild)
-        
-        # Get the guild ID for logging
-        guild_id = interaction.guild.id
-        
-        # Log the sync operation
-        logger.info(f"Guild commands synced by {interaction.user.name} in guild {interaction.guild.name}")
-        logger.info(f"Synced {len(synced)} commands to guild ID {guild_id}")
-        
-        # List all command names for verification
-        command_list = [f"- {cmd.name}" for cmd in synced]
-        
-        message = f"**Command Sync Complete**\n"
-        message += f"- Commands before: {before_count}\n"
-        message += f"- Commands after: {len(synced)}\n\n"
-        
-        # Verify quickprompt is included
-        quickprompt_included = any(cmd.name == "quickprompt" for cmd in synced)
-        if quickprompt_included:
-            message += "✅ quickprompt command successfully registered\n\n"
-        else:
-            message += "❌ quickprompt command NOT registered! Please contact the developer.\n\n"
-            
-        message += "**Synced Commands:**\n" + "\n".join(command_list)
-        
-        await safe_followup(interaction, message)
-        
-    except Exception as e:
-        logger.error(f"Error in guild_sync: {str(e)}")
-        logger.error(f"Exception type: {type(e).__name__}")
-        await safe_followup(interaction, f"Error syncing commands to guild: {str(e)}")
-
-@bot.tree.command(name="refreshcommandsv2", description="Force complete refresh of all bot commands (admin only)")
-async def refresh_commands_v2(interaction: discord.Interaction):
-    if not await safe_defer(interaction):
-        return
-    
-    try:
-        # Check if user has admin permissions
-        if not interaction.user.guild_permissions.administrator:
-            await safe_followup(interaction, "This command requires administrator permissions.")
-            return
-        
-        # Get current commands
-        before_count = len(await bot.tree.fetch_commands())
-        before_commands = await bot.tree.fetch_commands()
-        
-        await safe_followup(interaction, "Refreshing all commands with a complete reset. This may take a minute...")
-        
-        # Log the current commands
-        logger.info(f"Current commands before refresh: {', '.join([cmd.name for cmd in before_commands])}")
-        
-        try:
-            # First sync to the guild to ensure immediate visibility
-            # Doing this BEFORE clearing commands to avoid having a period with no commands
-            guild_commands = await bot.tree.sync(guild=interaction.guild)
-            logger.info(f"First step: Synced {len(guild_commands)} commands to guild")
-            
-            # Then sync globally
-            global_commands = await bot.tree.sync()
-            logger.info(f"Second step: Synced {len(global_commands)} commands globally")
-            
-            # Get the updated commands
-            after_commands = await bot.tree.fetch_commands()
-            
-            # Send detailed results
-            command_list = [f"- {cmd.name}" for cmd in after_commands]
-            
-            message = f"**Command Refresh Complete**\n"
-            message += f"- Commands before: {before_count}\n"
-            message += f"- Commands after: {len(after_commands)}\n\n"
-            
-            # Verify quickprompt is included
-            quickprompt_included = any(cmd.name == "quickprompt" for cmd in after_commands)
-            if quickprompt_included:
-                message += "✅ quickprompt command successfully registered\n\n"
-            else:
-                message += "❌ quickprompt command NOT registered! Please contact the developer.\n\n"
-                
-            message += "**Available Commands:**\n" + "\n".join(command_list)
-            
-            await safe_followup(interaction, message)
-            
-            logger.info(f"Commands refreshed by user {interaction.user.name} in guild {interaction.guild.name}")
-            logger.info(f"Refreshed from {before_count} to {len(after_commands)} commands")
-            logger.info(f"Updated commands: {', '.join([cmd.name for cmd in after_commands])}")
-            
-        except Exception as e:
-            logger.error(f"Error during command sync: {str(e)}")
-            await safe_followup(interaction, f"Error during command sync: {str(e)}")
-            
-    except Exception as e:
-        logger.error(f"Error in refresh_commands_v2: {str(e)}")
-        logger.error(f"Exception type: {type(e).__name__}")
-        await safe_followup(interaction, f"Error refreshing commands: {str(e)}")
-
 @bot.tree.command(name="manage_models", description="Add or delete models from an Ollama server")
 @app_commands.describe(
     action="Action to perform (add or delete)",
@@ -2795,6 +2297,8 @@ async def manage_models(
                     Database.execute("DELETE FROM models WHERE id = ?", (model_id,))
                     # Commit handled by Database methods
                     conn.close()
+                    invalidate_catalog_digest(server_id)
+                    query_cache.invalidate()
                     
                     await safe_followup(interaction, f"✅ Model `{name}` deleted from server {clean_ip}:{port} and removed from database.")
                 else:
@@ -2973,33 +2477,20 @@ async def list_models(
         return
     
     try:
-        # Default sorting - by server count in descending order
-        orderby = "server_count DESC"
+        # Sort keys must be non-null for keyset pagination
+        sort_fields = {
+            "name": "g.name",
+            "params": param_size_sort_key("g.parameter_size"),
+            "quant": "COALESCE(g.quantization_level, '')",
+            "count": "g.server_count"
+        }
+        if sort_by not in sort_fields:
+            # Default sorting - by server count in descending order
+            sort_by, descending = "count", True
         
-        # Apply sorting options if provided
-        if sort_by:
-            if sort_by == "name":
-                if descending:
-                    orderby = "name DESC"
-                else:
-                    orderby = "name ASC"
-            elif sort_by == "params":
-                if descending:
-                    orderby = "CASE WHEN parameter_size LIKE '%B' THEN CAST(REPLACE(REPLACE(parameter_size, 'B', ''), '.', '') AS REAL) ELSE 0 END DESC"
-                else:
-                    orderby = "CASE WHEN parameter_size LIKE '%B' THEN CAST(REPLACE(REPLACE(parameter_size, 'B', ''), '.', '') AS REAL) ELSE 0 END ASC"
-            elif sort_by == "quant":
-                if descending:
-                    orderby = "quantization_level DESC"
-                else:
-                    orderby = "quantization_level ASC"
-            elif sort_by == "count":
-                if descending:
-                    orderby = "server_count DESC"
-                else:
-                    orderby = "server_count ASC"
+        safe_limit = max(1, min(500, limit))
         
-        # Build base query
+        # Build the grouped query; its rows are paged from the outside
         base_query = """
             SELECT 
                 m.id,
@@ -3011,8 +2502,6 @@ async def list_models(
             JOIN endpoints s ON m.endpoint_id = s.id
             WHERE 1=1
         """
-        
-        # We'll handle server list display separately without string_agg which might cause issues
         parameters = []
         
         # Add search filters
@@ -3028,25 +2517,22 @@ async def list_models(
             base_query += " AND m.parameter_size LIKE %s"
             parameters.append(f"%{param_size}%")
             
-        # Complete the query with GROUP BY and ORDER BY
-        query = base_query + f"""
-            GROUP BY m.id, m.name, m.parameter_size, m.quantization_level
-            ORDER BY {orderby}
-            LIMIT %s
-        """
-        parameters.append(limit)
-        
-        # Execute query with properly formatted parameters
-        results = Database.fetch_all(query.strip(), tuple(parameters))
-        
-        if not results:
-            await safe_followup(interaction, "No models found matching your criteria.")
-            return
-            
-        # Format the results with proper Discord markdown
-        formatted_response = "# Model Search Results\n\n"
+        base_query += " GROUP BY m.id, m.name, m.parameter_size, m.quantization_level"
+        
+        pager = KeysetPager(
+            columns="g.id, g.name, g.parameter_size, g.quantization_level, g.server_count",
+            body=f"FROM ({base_query}) g WHERE TRUE",
+            params=parameters,
+            sort_expr=sort_fields[sort_by],
+            id_expr="g.id",
+            descending=descending,
+            max_rows=safe_limit,
+            cache_command="list_models",
+            cache_args={"search_term": search_term, "quant_level": quant_level, "param_size": param_size,
+                        "sort_by": sort_by, "descending": descending}
+        )
         
-        # Add search criteria if any were used
+        # Search criteria shown above the first page
         filters_used = []
         if search_term:
             filters_used.append(f"Name: '{search_term}'")
@@ -3055,53 +2541,50 @@ async def list_models(
         if quant_level:
             filters_used.append(f"Quantization: '{quant_level}'")
         
+        header = "# Model Search Results\n\n"
         if filters_used:
-            formatted_response += "## Search Filters\n"
-            formatted_response += "```\n"
+            header += "## Search Filters\n"
+            header += "```\n"
             for filter_desc in filters_used:
-                formatted_response += f"• {filter_desc}\n"
-            formatted_response += "```\n\n"
+                header += f"• {filter_desc}\n"
+            header += "```\n\n"
+        header += f"Sorted by: {sort_by} ({'descending' if descending else 'ascending'}), limit {safe_limit}\n\n"
         
-        # Add result count and sorting info
-        formatted_response += f"## Found {len(results)} Models\n"
-        formatted_response += f"Sorted by: {sort_by or 'server count'} ({'descending' if descending else 'ascending'})\n\n"
-        
-        # Create the main results table
-        formatted_response += "```\n"
-        formatted_response += "ID     | Model Name                | Parameters | Quantization | Servers\n"
-        formatted_response += "-------|---------------------------|------------|--------------|--------\n"
-        
-        for result in results:
-            id, name, params, quant, count = result
-            
-            # Format each field with proper padding
-            id_str = str(id).ljust(6)
-            
-            # Truncate long model names
-            if len(name) > 25:
-                name_str = name[:22] + "..."
-            else:
-                name_str = name.ljust(25)
-            
-            # Format parameters and quantization
-            params_str = (params or "N/A").ljust(10)
-            quant_str = (quant or "N/A").ljust(12)
+        def render_page(page_results, page_number):
+            # Create the results table for the visible page
+            formatted_response = header if page_number == 1 else ""
+            formatted_response += "```\n"
+            formatted_response += "ID     | Model Name                | Parameters | Quantization | Servers\n"
+            formatted_response += "-------|---------------------------|------------|--------------|--------\n"
             
-            # Format the count
-            count_str = str(count).rjust(7)
+            for id, name, params, quant, count in page_results:
+                # Format each field with proper padding
+                id_str = str(id).ljust(6)
+                
+                # Truncate long model names
+                if len(name) > 25:
+                    name_str = name[:22] + "..."
+                else:
+                    name_str = name.ljust(25)
+                
+                # Format parameters and quantization
+                params_str = (params or "N/A").ljust(10)
+                quant_str = (quant or "N/A").ljust(12)
+                
+                # Format the count
+                count_str = str(count).rjust(7)
+                
+                # Add the line to the table
+                formatted_response += f"{id_str} | {name_str} | {params_str} | {quant_str} | {count_str}\n"
             
-            # Add the line to the table
-            formatted_response += f"{id_str} | {name_str} | {params_str} | {quant_str} | {count_str}\n"
+            formatted_response += "```\n"
+            if page_number == 1:
+                formatted_response += ("**Usage Tips:** `/chat <model_id> <prompt>` to chat • `/benchmark <model_id>` "
+                                       "to test performance • `/find_model_endpoints <model_name>` for all endpoints")
+            return formatted_response
         
-        formatted_response += "```\n\n"
-        
-        # Add usage tips
-        formatted_response += "## Usage Tips\n"
-        formatted_response += "• Use `/chat <model_id> <prompt>` to chat with any model\n"
-        formatted_response += "• Use `/benchmark <model_id>` to test model performance\n"
-        formatted_response += "• Use `/find_model_endpoints <model_name>` to see all endpoints for a model\n"
-        
-        await safe_followup(interaction, formatted_response)
+        view = PaginatedView(pager, render_page, owner_id=interaction.user.id)
+        await view.send(interaction, empty_message="No models found matching your criteria.")
         
     except Exception as e:
         logger.error(f"Error in list_models: {str(e)}")
@@ -3114,7 +2597,7 @@ async def db_info(interaction: discord.Interaction):
     
     try:
         # Get database connection parameters
-        from database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
+        from bot_database import PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT
         
         # Connect directly to the database using psycopg2
         import psycopg2
@@ -3940,11 +3423,10 @@ async def find_model_endpoints(
         logger.info(f"Finding model endpoints for '{model_name}' (param_size={param_size}, quant_level={quant_level})")
         
         # Build the base query with explicit honeypot filtering
-        query = f"""
-        SELECT DISTINCT m.id, e.ip, e.port, m.name, m.parameter_size, m.quantization_level, m.size_mb, e.verification_date
+        body = f"""
         FROM endpoints e
         JOIN models m ON e.id = m.endpoint_id
-        WHERE m.name LIKE ?
+        WHERE m.name LIKE %s
         AND e.verified = {get_db_boolean(True, as_string=True, for_verified=True)}
         AND e.is_active = {get_db_boolean(True)}
         AND e.is_honeypot = {get_db_boolean(False)}
@@ -3953,39 +3435,33 @@ async def find_model_endpoints(
         
         # Add filters if provided
         if param_size:
-            query += " AND m.parameter_size = ?"
+            body += " AND m.parameter_size = %s"
             params.append(param_size)
         if quant_level:
-            query += " AND m.quantization_level = ?"
+            body += " AND m.quantization_level = %s"
             params.append(quant_level)
         
-        # Add sorting
+        # Sort keys must be non-null for keyset pagination
         valid_sort_fields = {
             "name": "m.name",
-            "verification_date": "e.verification_date",
-            "size_mb": "m.size_mb"
+            "verification_date": "COALESCE(e.verification_date, TIMESTAMP '1970-01-01')",
+            "size_mb": "COALESCE(m.size_mb, 0)"
         }
-        sort_field = valid_sort_fields.get(sort_by.lower(), "e.verification_date")
-        query += f" ORDER BY {sort_field} {'DESC' if descending else 'ASC'}"
-        
-        # Add limit
-        query += " LIMIT ?"
-        params.append(limit)
-        
-        # Execute query
-        results = Database.fetch_all(query, params)
-        
-        # Log query info and results count
-        logger.info(f"Model endpoint search query completed for '{model_name}': {len(results)} results found")
-        logger.debug(f"Used query: {query} with params {params}")
-        
-        if not results:
-            await interaction.followup.send(f"No endpoints found hosting model '{model_name}'")
-            return
-        
-        # Format the results into pages
-        results_per_page = 10
-        total_pages = (len(results) + results_per_page - 1) // results_per_page
+        sort_key = sort_by.lower() if sort_by.lower() in valid_sort_fields else "verification_date"
+        
+        # Pages are fetched on demand; pages are cached per cursor, connectivity checks stay live
+        pager = KeysetPager(
+            columns="m.id, e.ip, e.port, m.name, m.parameter_size, m.quantization_level, m.size_mb, e.verification_date",
+            body=body,
+            params=params,
+            sort_expr=valid_sort_fields[sort_key],
+            id_expr="m.id",
+            descending=descending,
+            max_rows=limit,
+            cache_command="find_model_endpoints",
+            cache_args={"model_name": model_name, "param_size": param_size, "quant_level": quant_level,
+                        "sort_by": sort_key, "descending": descending}
+        )
         
         # Create the initial response with search criteria
         search_criteria = f"""
@@ -3993,33 +3469,28 @@ async def find_model_endpoints(
 Model Name:     {model_name}
 Parameter Size: {param_size if param_size else 'Any'}
 Quant Level:    {quant_level if quant_level else 'Any'}
-Sort By:        {sort_by} ({'descending' if descending else 'ascending'})
+Sort By:        {sort_key} ({'descending' if descending else 'ascending'})
 
 **⚠️ IMPORTANT: Only verified, non-honeypot, active endpoints are shown in results**
 """
         
-        # Send the search criteria first
-        await interaction.followup.send(search_criteria)
-        
-        # Process and send results in pages
-        for page in range(total_pages):
-            start_idx = page * results_per_page
-            end_idx = min(start_idx + results_per_page, len(results))
-            page_results = results[start_idx:end_idx]
-            
-            # Format the results table for this page
-            table = "```\n"
+        async def render_page(page_results, page_number):
+            # Format the results table for the visible page only
+            table = search_criteria if page_number == 1 else ""
+            table += "```\n"
             table += f"{'ID':<6} {'Endpoint':<25} {'Parameters':<8} {'Quant':<10} {'Size':<8} {'Last Verified':<20} {'Status':<8}\n"
             table += "-" * 85 + "\n"
             
             for result in page_results:
-                model_id, ip, port, name, param_size, quant_level, size_mb, verification_date = result
+                model_id, ip, port, name, row_param_size, row_quant_level, size_mb, verification_date = result
                 
                 # Format size in MB with 1 decimal place
                 size_str = f"{size_mb:.1f}MB" if size_mb else "N/A"
                 
                 # Format verification date
-                if verification_date:
+                if isinstance(verification_date, datetime):
+                    date_str = verification_date.strftime('%Y-%m-%d %H:%M')
+                elif verification_date:
                     try:
                         date_obj = datetime.strptime(verification_date, '%Y-%m-%d %H:%M:%S')
                         date_str = date_obj.strftime('%Y-%m-%d %H:%M')
@@ -4029,7 +3500,7 @@ Sort By:        {sort_by} ({'descending' if descending else 'ascending'})
                     date_str = "Never"
                 
                 # Test connectivity if requested
-                status = "Testing..." if test_connectivity else "Unknown"
+                status = "Unknown"
                 if test_connectivity:
                     try:
                         url = f"http://{ip}:{port}/api/tags"
@@ -4043,24 +3514,16 @@ Sort By:        {sort_by} ({'descending' if descending else 'ascending'})
                         status = "Offline"
                 
                 # Add row to table
-                table += f"{model_id:<6} {ip}:{port:<17} {param_size:<8} {quant_level:<10} {size_str:<8} {date_str:<20} {status:<8}\n"
+                table += f"{model_id:<6} {ip}:{port:<17} {row_param_size or 'N/A':<8} {row_quant_level or 'N/A':<10} {size_str:<8} {date_str:<20} {status:<8}\n"
             
             table += "```"
-            
-            # Add page information
-            page_info = f"\nPage {page + 1} of {total_pages}"
-            
-            # Send the page
-            await interaction.followup.send(table + page_info)
-        
-        # Send usage tips
-        tips = """
-**Usage Tips:**
-• Use `/chat` with an endpoint ID to interact with the model
-• Use `/list_models` to see all available models
-• Use `/db_info` to see database statistics
-"""
-        await interaction.followup.send(tips)
+            if page_number == 1:
+                table += "\n**Usage Tips:** `/chat` with an ID to use a model • `/list_models` for all models • `/db_info` for statistics"
+            return table
+        
+        view = PaginatedView(pager, render_page, owner_id=interaction.user.id)
+        await view.send(interaction, empty_message=f"No endpoints found hosting model '{model_name}'")
+        logger.info(f"Model endpoint search for '{model_name}' completed")
         
     except Exception as e:
         logger.error(f"Error in find_model_endpoints: {str(e)}")
@@ -4282,9 +3745,15 @@ def get_db_boolean(value, as_string=True, for_verified=False):
         # PostgreSQL boolean format for regular boolean columns
         return "TRUE" if value else "FALSE" if as_string else True if value else False
 
-async def find_model(model_name=None, param_size=None, quant_level=None):
+def param_size_sort_key(column):
+    """Non-null numeric sort expression for a parameter size column such as '7B' or '0.5B'"""
+    # No '?' in the pattern: Database rewrites it as a placeholder
+    return (f"CASE WHEN {column} ~ '^[0-9]*[.]{{0,1}}[0-9]+B$' "
+            f"THEN CAST(REPLACE({column}, 'B', '') AS DOUBLE PRECISION) ELSE 0 END")
+
+async def find_model(model_name=None, param_size=None, quant_level=None, after=None, limit=50):
     """
-    Find model records in the database.
+    Find model records in the database, one keyset page at a time.
     
     This function explicitly filters out:
     - Unverified endpoints (verified = 0)
@@ -4295,13 +3764,14 @@ async def find_model(model_name=None, param_size=None, quant_level=None):
         model_name: Optional filter for model name
         param_size: Optional parameter size filter (e.g., "7B")
         quant_level: Optional quantization filter (e.g., "Q4_K_M")
+        after: Optional (name, id) of the last row of the previous page
+        limit: Maximum number of rows to return (default 50)
     """
     try:
         security_logger.info(f"Searching for models: name='{model_name}', param_size='{param_size}', quant='{quant_level}'")
         
         # Build the base query
-        query = f"""
-            SELECT m.id, m.name, e.ip, e.port, m.parameter_size, m.quantization_level
+        body = f"""
             FROM models m
             JOIN endpoints e ON m.endpoint_id = e.id
             WHERE e.verified = {get_db_boolean(True, as_string=True, for_verified=True)} 
@@ -4313,35 +3783,37 @@ async def find_model(model_name=None, param_size=None, quant_level=None):
         # Apply filters if provided
         if model_name:
             params.append(f"%{model_name}%")
-            query += " AND LOWER(m.name) LIKE LOWER(%s)"
+            body += " AND LOWER(m.name) LIKE LOWER(%s)"
 
         if param_size:
             params.append(f"%{param_size}%")
-            query += " AND m.parameter_size LIKE %s"
+            body += " AND m.parameter_size LIKE %s"
 
         if quant_level:
             params.append(f"%{quant_level}%")
-            query += " AND m.quantization_level LIKE %s"
-
-        # Order by name
-        query += " ORDER BY m.name, m.parameter_size"
+            body += " AND m.quantization_level LIKE %s"
+
+        # Order by name with the id as tie-breaker so pages never overlap
+        pager = KeysetPager(
+            columns="m.id, m.name, e.ip, e.port, m.parameter_size, m.quantization_level",
+            body=body,
+            params=params,
+            sort_expr="m.name",
+            id_expr="m.id",
+            page_size=max(1, min(limit, 100))
+        )
         
         # Log the query for security audit
-        security_logger.debug(f"Model search query: {query} with params: {params}")
+        security_logger.debug(f"Model search body: {body} with params: {params}, after: {after}")
         
-        results = Database.fetch_all(query, tuple(params))
+        results, _, has_more = await run_in_thread(pager.fetch_page, after)
         
         if not results:
             security_logger.info(f"No models found matching criteria: name='{model_name}', param_size='{param_size}', quant='{quant_level}'")
             return None
 
         # Log found models count
-        security_logger.info(f"Found {len(results)} models matching criteria")
-        
-        # For very large result sets, limit the return size
-        if len(results) > 50:
-            security_logger.info(f"Limiting results from {len(results)} to 50 for display")
-            results = results[:50]
+        security_logger.info(f"Found {len(results)} models matching criteria{' (more available)' if has_more else ''}")
 
         return results
     except Exception as e:
@@ -4511,22 +3983,7 @@ def main():
         else:
             logger.warning(f".env file not found at {dotenv_path}")
         
-        # Set up the database - make sure it's initialized before the bot starts
-        logger.info("Initializing database connection...")
-        init_database()
-        
-        # Test database connection
-        try:
-            # Explicitly initialize the connection pool
-            Database.ensure_pool_initialized()
-            result = Database.fetch_one("SELECT version()")
-            if result:
-                logger.info(f"Connected to database: {result[0]}")
-            else:
-                logger.warning("Database connection test returned no result")
-        except Exception as e:
-            logger.error(f"Error testing database connection: {str(e)}")
-            logger.error("Bot will start, but database operations may fail")
+        # Database initialization runs in setup_hook, concurrently with the gateway connection
         
         # Run the bot with token
         # Load token directly from .env file to avoid environment variable conflicts
@@ -4562,6 +4019,7 @@ def main():
         token_prefix = token[:5] if len(token) >= 5 else token
         logger.info(f"Token loaded (first 5 chars: {token_prefix}...)")
         
+        startup_timer.mark("config")
         logger.info("Starting bot...")
         bot.run(token, log_handler=None)
     except KeyboardInterrupt:
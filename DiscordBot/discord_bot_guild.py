@@ -20,10 +20,14 @@ from dotenv import load_dotenv
 from datetime import datetime
 
 # Import database abstraction layer
-from database import Database, init_database
+from bot_database import Database, init_database
+
+# Shared model catalog sync
+import ollama_models
 
 # Import unified commands registration
 from unified_commands import register_unified_commands
+from command_registry import CommandRegistry, format_sync_results
 
 # Set up logging
 logging.basicConfig(
@@ -40,6 +44,7 @@ logger = logging.getLogger('ollama_bot')
 intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix="/", intents=intents)
+command_registry = CommandRegistry(bot.tree)
 
 # Global aiohttp session for API requests
 session = None
@@ -129,9 +134,10 @@ async def on_ready():
             
             # GUILD SPECIFIC SYNC: Only sync with the specific guild
             # This has a much higher rate limit than global commands
+            # Skipped without any API call when the schema matches the last sync
             logger.info(f"Syncing commands with guild ID: {PRIMARY_GUILD_ID}")
-            await bot.tree.sync(guild=guild)
-            logger.info(f"Command sync with guild complete - commands are now available")
+            results = await command_registry.sync(guilds=[guild], include_global=False)
+            logger.info(f"Command sync with guild complete - commands are now available\n{format_sync_results(results)}")
             
         except discord.errors.HTTPException as e:
             if e.status == 429:  # Rate limited
@@ -206,87 +212,18 @@ async def check_server_connectivity(ip, port):
         return False, str(e)
 
 def sync_models_with_server(ip, port):
-    """Sync models with a server"""
-    try:
-        import requests
-        response = requests.get(f"http://{ip}:{port}/api/tags", timeout=5)
-        
-        if response.status_code != 200:
-            logger.error(f"Failed to get models from {ip}:{port}: HTTP {response.status_code}")
-            return [], [], []
-            
-        server_models = response.json().get("models", [])
-        
-        # Get server ID
-        conn = Database()
-        server_query = "SELECT id FROM servers WHERE ip = %s AND port = %s"
-        server_result = Database.fetch_one(server_query, (ip, port))
+    """
+    Sync models with a server
+    
+    Args:
+        ip: Server IP
+        port: Server port
         
-        if not server_result:
-            logger.error(f"Server {ip}:{port} not found in database")
-            return [], [], []
-            
-        server_id = server_result[0]
-        
-        # Get existing models for this server
-        models_query = "SELECT id, name FROM models WHERE server_id = %s"
-        existing_models = {model[1]: model[0] for model in Database.fetch_all(models_query, (server_id,))}
-        
-        added_models = []
-        updated_models = []
-        
-        # Process each model from the server
-        for model_info in server_models:
-            model_name = model_info.get("name")
-            
-            if not model_name:
-                continue
-                
-            # Parse model details (simplified example)
-            param_size = "Unknown"
-            quant_level = "Unknown"
-            
-            # Extract parameter size (e.g., "7B", "13B")
-            import re
-            param_match = re.search(r'(\d+)[bB]', model_name)
-            if param_match:
-                param_size = f"{param_match.group(1)}B"
-                
-            # Extract quantization (e.g., "Q4_0", "Q8_0")
-            quant_match = re.search(r'[qQ](\d+(?:_\d+)?(?:_[kK])?(?:_[mM])?)', model_name)
-            if quant_match:
-                quant_level = f"Q{quant_match.group(1).upper()}"
-            
-            if model_name in existing_models:
-                # Model exists, update it
-                update_query = """
-                    UPDATE models 
-                    SET parameter_size = %s, quantization_level = %s, last_updated = NOW()
-                    WHERE id = %s
-                """
-                Database.execute(update_query, (param_size, quant_level, existing_models[model_name]))
-                updated_models.append(model_name)
-            else:
-                # New model, add it
-                insert_query = """
-                    INSERT INTO models (name, parameter_size, quantization_level, server_id, created_date)
-                    VALUES (%s, %s, %s, %s, NOW())
-                    RETURNING id
-                """
-                result = Database.fetch_one(insert_query, (model_name, param_size, quant_level, server_id))
-                if result:
-                    added_models.append(model_name)
-        
-        # Check for models that need to be removed
-        server_model_names = [m.get("name") for m in server_models if m.get("name")]
-        models_to_remove = [model_id for model_name, model_id in existing_models.items() 
-                           if model_name not in server_model_names]
-        
-        # Removed models (placeholder - in production you'd handle this carefully)
-        removed_models = []
-        
-        conn.close()
-        return added_models, updated_models, removed_models
+    Returns:
+        tuple: (added_models, updated_models, removed_models)
+    """
+    try:
+        return ollama_models.sync_models_with_server(ip, port)
     except Exception as e:
         logger.error(f"Error syncing models with server {ip}:{port}: {str(e)}")
         return [], [], []
@@ -34,9 +34,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the unified commands registration function
 from unified_commands import register_unified_commands
+from command_registry import CommandRegistry, format_sync_results
 
 # Import database abstraction
-from database import Database, init_database, get_db_manager
+from bot_database import Database, init_database, get_db_manager
+
+# Shared model catalog sync
+import ollama_models
 
 # Load environment variables
 load_dotenv()
@@ -107,85 +111,7 @@ def sync_models_with_server(ip, port):
         tuple: (added_models, updated_models, removed_models)
     """
     try:
-        import requests
-        response = requests.get(f"http://{ip}:{port}/api/tags", timeout=5)
-        
-        if response.status_code != 200:
-            logger.error(f"Failed to get models from {ip}:{port}: HTTP {response.status_code}")
-            return [], [], []
-            
-        server_models = response.json().get("models", [])
-        
-        # Get server ID
-        conn = Database()
-        server_query = "SELECT id FROM servers WHERE ip = %s AND port = %s"
-        server_result = Database.fetch_one(server_query, (ip, port))
-        
-        if not server_result:
-            logger.error(f"Server {ip}:{port} not found in database")
-            return [], [], []
-            
-        server_id = server_result[0]
-        
-        # Get existing models for this server
-        models_query = "SELECT id, name FROM models WHERE server_id = %s"
-        existing_models = {model[1]: model[0] for model in Database.fetch_all(models_query, (server_id,))}
-        
-        added_models = []
-        updated_models = []
-        
-        # Process each model from the server
-        for model_info in server_models:
-            model_name = model_info.get("name")
-            
-            if not model_name:
-                continue
-                
-            # Parse model details (simplified example)
-            param_size = "Unknown"
-            quant_level = "Unknown"
-            
-            # Extract parameter size (e.g., "7B", "13B")
-            import re
-            param_match = re.search(r'(\d+)[bB]', model_name)
-            if param_match:
-                param_size = f"{param_match.group(1)}B"
-                
-            # Extract quantization (e.g., "Q4_0", "Q8_0")
-            quant_match = re.search(r'[qQ](\d+(?:_\d+)?(?:_[kK])?(?:_[mM])?)', model_name)
-            if quant_match:
-                quant_level = f"Q{quant_match.group(1).upper()}"
-            
-            if model_name in existing_models:
-                # Model exists, update it
-                update_query = """
-                    UPDATE models 
-                    SET parameter_size = %s, quantization_level = %s, last_updated = NOW()
-                    WHERE id = %s
-                """
-                Database.execute(update_query, (param_size, quant_level, existing_models[model_name]))
-                updated_models.append(model_name)
-            else:
-                # New model, add it
-                insert_query = """
-                    INSERT INTO models (name, parameter_size, quantization_level, server_id, created_date)
-                    VALUES (%s, %s, %s, %s, NOW())
-                    RETURNING id
-                """
-                result = Database.fetch_one(insert_query, (model_name, param_size, quant_level, server_id))
-                if result:
-                    added_models.append(model_name)
-        
-        # Check for models that need to be removed
-        server_model_names = [m.get("name") for m in server_models if m.get("name")]
-        models_to_remove = [model_id for model_name, model_id in existing_models.items() 
-                           if model_name not in server_model_names]
-        
-        # Removed models (placeholder - in production you'd handle this carefully)
-        removed_models = []
-        
-        conn.close()
-        return added_models, updated_models, removed_models
+        return ollama_models.sync_models_with_server(ip, port)
     except Exception as e:
         logger.error(f"Error syncing models with server {ip}:{port}: {str(e)}")
         return [], [], []
@@ -270,7 +196,9 @@ class GuildUnifiedBot(commands.Bot):
         # Sync commands to the guild
         try:
             logger.info(f"Syncing {len(self.tree.get_commands(guild=self.guild_object))} commands to guild {self.guild_id}")
-            await self.tree.sync(guild=self.guild_object)
+            registry = CommandRegistry(self.tree)
+            results = await registry.sync(guilds=[self.guild_object], include_global=False)
+            logger.info(f"Guild command sync:\n{format_sync_results(results)}")
         except discord.errors.Forbidden as e:
             if e.code == 50001:  # Missing Access
                 logger.error("MISSING ACCESS ERROR: Bot doesn't have permission to register commands.")
@@ -18,7 +18,7 @@ from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
 # Added by migration script
-from database import Database, init_database
+from bot_database import Database, init_database
 
 # Setup logging
 logging.basicConfig(
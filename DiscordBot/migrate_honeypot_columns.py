@@ -31,7 +31,7 @@ sys.path.insert(0, str(project_root))
 
 # Import database module
 try:
-    from database import Database, init_database, DATABASE_TYPE
+    from bot_database import Database, init_database, DATABASE_TYPE
 except ImportError:
     logger.error("Failed to import database module. Make sure you're running this script from the project root.")
     sys.exit(1)
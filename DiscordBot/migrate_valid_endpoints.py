@@ -22,7 +22,7 @@ from datetime import datetime
 from tqdm import tqdm
 
 # Added by migration script
-from database import Database, init_database
+from bot_database import Database, init_database
 
 # Default database paths
 # TODO: Replace SQLite-specific code: # TODO: Replace SQLite-specific code: DEFAULT_DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ollama_instances.db")
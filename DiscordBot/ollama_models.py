@@ -12,7 +12,8 @@ import time
 from datetime import datetime
 
 # Added by migration script
-from database import Database, init_database, DATABASE_TYPE
+from bot_database import Database, init_database, DATABASE_TYPE
+from database.catalog import sync_endpoint_catalog, invalidate_catalog_digest
 
 # Define database file location (used only for SQLite)
 DB_FILE = "ollama_instances.db"
@@ -140,6 +141,7 @@ def add_model(ip, port, name, info="{}"):
         VALUES (?, ?, ?, ?, ?)
     """
     result = Database.execute(query, (server_id, name, parameter_size, quantization_level, size_mb))
+    invalidate_catalog_digest(server_id)
     
     # Get the model ID based on database type
     if DATABASE_TYPE == "postgres":
@@ -169,6 +171,7 @@ def delete_model(model_id):
         
         # Delete the model
         Database.execute("DELETE FROM models WHERE id = ?", (model_id,))
+        invalidate_catalog_digest(server_id)
         
         # Check if there are any other models for this server
         query = "SELECT COUNT(*) FROM models WHERE endpoint_id = ?"
@@ -290,89 +293,9 @@ def sync_models_with_server(ip, port):
         
         server_id = server_result[0] if server_result else None
         
-        # Get existing models for this server
-        existing_models_query = "SELECT id, name, parameter_size, quantization_level, size_mb FROM models WHERE endpoint_id = ?"
-        existing_models = Database.fetch_all(existing_models_query, (server_id,))
-        
-        # Create a dictionary for easier lookup
-        db_models = {row[1]: {"id": row[0], "parameter_size": row[2], 
-                            "quantization_level": row[3], "size_mb": row[4]} 
-                    for row in existing_models}
-        
-        # Process models from server
-        for model in server_models:
-            name = model.get("name", "")
-            if not name:
-                continue  # Skip models without a name
-            
-            # Extract model details
-            model_size = model.get("size", 0)
-            # Ensure we're working with float type
-            if isinstance(model_size, (int, float, str)):
-                model_size = float(model_size)
-            else:
-                # Handle potential decimal type or other types
-                model_size = float(str(model_size))
-                
-            model_size_mb = model_size / (1024 * 1024)  # Convert to MB
-            
-            parameter_size = ""
-            quantization_level = ""
-            
-            # Get detailed info if available
-            if "details" in model:
-                parameter_size = model["details"].get("parameter_size", "")
-                quantization_level = model["details"].get("quantization_level", "")
-            
-            # Check if model exists in database
-            if name in db_models:
-                # Update model if details have changed
-                existing = db_models[name]
-                
-                # Convert both values to float before comparison to avoid type errors
-                existing_size = float(existing["size_mb"]) if existing["size_mb"] is not None else 0.0
-                new_size = float(model_size_mb)
-                
-                if (existing["parameter_size"] != parameter_size or 
-                    existing["quantization_level"] != quantization_level or 
-                    abs(existing_size - new_size) > 0.1):  # Allow small size differences
-                    
-                    Database.execute("""
-                        UPDATE models SET 
-                        parameter_size = ?, 
-                        quantization_level = ?, 
-                        size_mb = ? 
-                        WHERE id = ?
-                    """, (parameter_size, quantization_level, model_size_mb, existing["id"]))
-                    updated_models.append(name)
-                
-                # Remove from db_models to track which are no longer on server
-                del db_models[name]
-            else:
-                # Add new model
-                try:
-                    Database.execute("""
-                        INSERT INTO models (endpoint_id, name, parameter_size, quantization_level, size_mb)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (server_id, name, parameter_size, quantization_level, model_size_mb))
-                    added_models.append(name)
-                except sqlite3.IntegrityError:
-                    # Handle potential race condition if the model was added in parallel
-                    print(f"Model {name} already exists in the database. Skipping.")
-        
-        # Delete models that are no longer on the server
-        for name, model_info in db_models.items():
-            Database.execute("DELETE FROM models WHERE id = ?", (model_info["id"],))
-            deleted_models.append(name)
-        
-        # Update scan_date in endpoints table directly (instead of servers view)
-        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        if DATABASE_TYPE == "postgres":
-            # For PostgreSQL, update the underlying table, not the view
-            Database.execute("UPDATE endpoints SET scan_date = %s WHERE id = %s", (now, server_id))
-        else:
-            # For SQLite, the original approach works fine
-            Database.execute("UPDATE servers SET scan_date = ? WHERE id = ?", (now, server_id))
+        # Diff and apply the listing in one transaction; unchanged catalogs are skipped
+        diff = sync_endpoint_catalog(server_id, server_models)
+        added_models, updated_models, deleted_models = diff.added, diff.updated, diff.deleted
         
     except Exception as e:
         print(f"Error syncing models: {str(e)}")
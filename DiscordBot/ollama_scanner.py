@@ -18,7 +18,8 @@ import shodan
 from queue import Queue
 
 # Database abstraction
-from database import Database, init_database
+from bot_database import Database, init_database
+from database.catalog import sync_endpoint_catalog, invalidate_catalog_digest
 
 # Load environment variables from .env file if it exists
 load_dotenv()
@@ -143,45 +144,7 @@ def saveStuffToDb(ip, p, modelData):
         
         # Process models
         if modelData != None and "models" in modelData:
-            for m in modelData["models"]:
-                name = m.get("name", "Unknown")
-                
-                # Check if this model already exists on this server
-                model_exists = Database.fetch_one(
-                    'SELECT id FROM models WHERE endpoint_id = %s AND name = %s', 
-                    (serverId, name)
-                ) is not None
-                
-                size = m.get("size", 0)
-                if size:
-                    sizeMb = size / (1024 * 1024)
-                else:
-                    sizeMb = 0
-                
-                details = m.get("details", {})
-                if "parameter_size" in details:
-                    paramSize = details["parameter_size"]
-                else:
-                    paramSize = "Unknown"
-                    
-                if "quantization_level" in details:
-                    quantLevel = details["quantization_level"]
-                else:
-                    quantLevel = "Unknown"
-                
-                if model_exists:
-                    # Update existing model
-                    conn.execute('''
-                    UPDATE models 
-                    SET parameter_size = %s, quantization_level = %s, size_mb = %s
-                    WHERE endpoint_id = %s AND name = %s
-                    ''', (paramSize, quantLevel, sizeMb, serverId, name))
-                else:
-                    # Insert new model
-                    conn.execute('''
-                    INSERT INTO models (endpoint_id, name, parameter_size, quantization_level, size_mb)
-                    VALUES (%s, %s, %s, %s, %s)
-                    ''', (serverId, name, paramSize, quantLevel, sizeMb))
+            sync_endpoint_catalog(serverId, modelData["models"])
         
         Database.close()
         
@@ -223,6 +186,7 @@ def removeDuplicates():
                     SET endpoint_id = %s
                     WHERE endpoint_id = %s
                 """, (keep_id, remove_id))
+                invalidate_catalog_digest(keep_id)
                 
                 # Update verified_endpoints to point to the ID we're keeping
                 conn.execute("""
@@ -270,6 +234,7 @@ def removeDuplicates():
             # Delete the duplicate models
             for remove_id in remove_ids:
                 Database.execute("DELETE FROM models WHERE id = %s", (remove_id,))
+            invalidate_catalog_digest(endpoint_id)
     
     Database.close()
 
@@ -875,40 +840,8 @@ def add_server_to_db(ip, models_data, ps_data, db_path):
                 (now, endpoint_id)
             )
         
-        # Process models
-        for model in models_data:
-            name = model.get("name", "Unknown")
-            
-            # Check if model exists for this endpoint
-            model_exists = Database.fetch_one(
-                'SELECT id FROM models WHERE endpoint_id = %s AND name = %s',
-                (endpoint_id, name)
-            ) is not None
-            
-            # Process model details
-            size = model.get("size", 0)
-            size_mb = size / (1024 * 1024) if size else 0
-            
-            details = model.get("details", {})
-            param_size = details.get("parameter_size", "Unknown")
-            quant_level = details.get("quantization_level", "Unknown")
-            
-            if model_exists:
-                # Update existing model
-                Database.execute(
-                    '''UPDATE models 
-                    SET parameter_size = %s, quantization_level = %s, size_mb = %s
-                    WHERE endpoint_id = %s AND name = %s''',
-                    (param_size, quant_level, size_mb, endpoint_id, name)
-                )
-            else:
-                # Insert new model
-                Database.execute(
-                    '''INSERT INTO models 
-                    (endpoint_id, name, parameter_size, quantization_level, size_mb)
-                    VALUES (%s, %s, %s, %s, %s)''',
-                    (endpoint_id, name, param_size, quant_level, size_mb)
-                )
+        # Mirror the listing into the models table
+        sync_endpoint_catalog(endpoint_id, models_data)
         
         return True
     except Exception as e:
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Paginated result views for Discord bot listings
+
+Listings are fetched one page at a time with keyset queries: each page is
+ordered by a sort expression plus a unique id, and the next page starts after
+the last (sort key, id) pair seen. The pager keeps only the page start keys
+it has visited, so memory and database work per click are bounded by the page
+size rather than the size of the result set. Cursors live on the bot side,
+expire after PAGINATION_TIMEOUT seconds and only the invoking user can move
+them.
+"""
+
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+
+import discord
+
+from bot_database import Database
+from query_cache import query_cache
+
+logger = logging.getLogger('paginated_view')
+
+# Pagination configuration
+PAGINATION_PAGE_SIZE = int(os.getenv("PAGINATION_PAGE_SIZE", "10"))
+PAGINATION_TIMEOUT = float(os.getenv("PAGINATION_TIMEOUT", "300"))
+PAGINATION_MAX_CURSORS = int(os.getenv("PAGINATION_MAX_CURSORS", "100"))
+
+# Discord's hard message length limit, with room for the page footer
+MAX_PAGE_CHARS = 1900
+
+# Open cursors by interaction id, oldest first
+_active_views = OrderedDict()
+
+
+class KeysetPager:
+    """
+    Fetches pages of a listing query with keyset (seek) pagination
+
+    The query must be built from a SELECT column list, a FROM/WHERE body and
+    its parameters. The sort expression and id expression are appended to the
+    selected columns, so each fetched row ends with its own cursor key.
+    """
+
+    def __init__(self, columns, body, params, sort_expr, id_expr, descending=False,
+                 page_size=PAGINATION_PAGE_SIZE, max_rows=None, distinct=False, cache_command=None,
+                 cache_args=None):
+        """
+        Args:
+            columns: SELECT column list shown to the renderer
+            body: FROM/JOIN/WHERE clause (must contain a WHERE)
+            params: Parameters for the placeholders in body
+            sort_expr: Non-null SQL expression to order by (wrap nullable columns in COALESCE)
+            id_expr: Unique column used as tie-breaker, e.g. "m.id"
+            descending: Sort direction
+            page_size: Rows per page
+            max_rows: Optional cap on the total number of rows that can be paged through
+            distinct: Use SELECT DISTINCT
+            cache_command: Optional query_cache command name; pages are cached per cursor
+            cache_args: Arguments that identify the listing in the cache key
+        """
+        self.columns = columns
+        self.body = body
+        self.params = tuple(params or ())
+        self.sort_expr = sort_expr
+        self.id_expr = id_expr
+        self.descending = descending
+        self.page_size = max(1, page_size)
+        self.max_rows = max_rows
+        self.distinct = distinct
+        self.cache_command = cache_command
+        self.cache_args = cache_args or {}
+
+    def _build_query(self, after, limit):
+        direction = "DESC" if self.descending else "ASC"
+        query = (f"SELECT {'DISTINCT ' if self.distinct else ''}{self.columns}, "
+                 f"{self.sort_expr} AS page_sort_key, {self.id_expr} AS page_id_key "
+                 f"{self.body}")
+        params = list(self.params)
+        if after is not None:
+            query += f" AND ({self.sort_expr}, {self.id_expr}) {'<' if self.descending else '>'} (%s, %s)"
+            params.extend(after)
+        query += f" ORDER BY page_sort_key {direction}, page_id_key {direction} LIMIT %s"
+        # One extra row tells us whether a next page exists without counting
+        params.append(limit + 1)
+        return query, tuple(params)
+
+    def fetch_page(self, after=None, offset=0):
+        """
+        Fetch the page starting after a cursor key
+
+        Args:
+            after: (sort key, id) of the last row of the previous page, or None
+            offset: Number of rows already shown before this page (for max_rows)
+
+        Returns:
+            tuple: (rows without cursor columns, cursor of the last row, has_more)
+        """
+        limit = self.page_size
+        if self.max_rows is not None:
+            limit = max(0, min(limit, self.max_rows - offset))
+        if limit == 0:
+            return [], after, False
+
+        def load():
+            query, params = self._build_query(after, limit)
+            return list(Database.fetch_all(query, params) or [])
+
+        if self.cache_command:
+            key = query_cache.make_key(self.cache_command, after=after, limit=limit, **self.cache_args)
+            rows = query_cache.get_or_load(key, load)
+        else:
+            rows = load()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if self.max_rows is not None and offset + len(rows) >= self.max_rows:
+            has_more = False
+        last = (rows[-1][-2], rows[-1][-1]) if rows else after
+        return [row[:-2] for row in rows], last, has_more
+
+
+class PaginatedView(discord.ui.View):
+    """Prev/next buttons over a KeysetPager, rendering only the visible page"""
+
+    def __init__(self, pager, render_page, owner_id, timeout=PAGINATION_TIMEOUT):
+        """
+        Args:
+            pager: KeysetPager for the listing
+            render_page: Callable(rows, page_number) -> str for one page; it may be
+                a coroutine function if rendering needs I/O
+            owner_id: Discord user id allowed to page
+            timeout: Seconds of inactivity before the cursor is released
+        """
+        super().__init__(timeout=timeout)
+        self.pager = pager
+        self.render_page = render_page
+        self.owner_id = owner_id
+        self.message = None
+        self.interaction_id = None
+        # Cursor key that each visited page starts after; page 0 starts at the top
+        self._page_starts = [None]
+        self._page = 0
+        self._rows = []
+        self._has_more = False
+
+    async def _load(self, page):
+        after = self._page_starts[page]
+        offset = page * self.pager.page_size
+        rows, last, has_more = await asyncio.get_event_loop().run_in_executor(
+            None, self.pager.fetch_page, after, offset
+        )
+        self._page = page
+        self._rows = rows
+        self._has_more = has_more
+        if has_more and len(self._page_starts) == page + 1:
+            self._page_starts.append(last)
+        self.prev_button.disabled = page == 0
+        self.next_button.disabled = not has_more
+
+    async def _render(self):
+        content = self.render_page(self._rows, self._page + 1)
+        if asyncio.iscoroutine(content):
+            content = await content
+        footer = f"\nPage {self._page + 1}{' (more available)' if self._has_more else ' (end)'}"
+        if len(content) + len(footer) > MAX_PAGE_CHARS:
+            content = content[:MAX_PAGE_CHARS - len(footer) - 20] + "\n... (truncated)"
+            if content.count("```") % 2:
+                content += "\n```"
+        return content + footer
+
+    async def send(self, interaction, empty_message="No results found."):
+        """Load the first page and send it as a followup with the buttons attached"""
+        await self._load(0)
+        if not self._rows:
+            await interaction.followup.send(empty_message)
+            return None
+        self.interaction_id = interaction.id
+        content = await self._render()
+        if not self._has_more:
+            # Single page: no cursor to keep
+            self.stop()
+            self.message = await interaction.followup.send(content)
+            return self.message
+        self.message = await interaction.followup.send(content, view=self)
+        _register(self)
+        return self.message
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message(
+                "Only the user who ran this command can change pages. Run it yourself to browse.",
+                ephemeral=True
+            )
+            return False
+        return True
+
+    async def _show(self, interaction, page):
+        try:
+            await self._load(page)
+            await interaction.response.edit_message(content=await self._render(), view=self)
+        except Exception as e:
+            logger.error(f"Error loading page {page + 1}: {str(e)}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message(f"Error loading page: {str(e)}", ephemeral=True)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary, disabled=True)
+    async def prev_button(self, interaction, button):
+        await self._show(interaction, max(0, self._page - 1))
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.primary)
+    async def next_button(self, interaction, button):
+        await self._show(interaction, self._page + 1)
+
+    async def on_timeout(self):
+        _unregister(self)
+        await self.close()
+
+    async def close(self):
+        """Disable the buttons and release the cursor"""
+        self.stop()
+        for item in self.children:
+            item.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+
+def _register(view):
+    """Track an open cursor, closing the oldest ones past PAGINATION_MAX_CURSORS"""
+    _active_views[view.interaction_id] = view
+    while len(_active_views) > PAGINATION_MAX_CURSORS:
+        _, oldest = _active_views.popitem(last=False)
+        asyncio.ensure_future(oldest.close())
+
+
+def _unregister(view):
+    _active_views.pop(view.interaction_id, None)
+
+
+def active_cursor_count():
+    """Number of listings that can still be paged"""
+    return len(_active_views)
@@ -5,6 +5,7 @@
 CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
 
 -- Drop existing tables if they exist (for clean initialization)
+DROP TABLE IF EXISTS model_catalog_digests CASCADE;
 DROP TABLE IF EXISTS models CASCADE;
 DROP TABLE IF EXISTS verified_endpoints CASCADE;
 DROP TABLE IF EXISTS endpoints CASCADE;
@@ -63,6 +64,14 @@ CREATE TABLE models (
 CREATE INDEX models_endpoint_id_idx ON models(endpoint_id);
 CREATE INDEX models_name_idx ON models(name);
 
+-- Digest of the last /api/tags listing applied per endpoint (see database/catalog.py)
+CREATE TABLE model_catalog_digests (
+    endpoint_id INTEGER PRIMARY KEY REFERENCES endpoints (id) ON DELETE CASCADE,
+    digest TEXT NOT NULL,
+    model_count INTEGER DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create benchmark_results table
 CREATE TABLE benchmark_results (
     id SERIAL PRIMARY KEY,
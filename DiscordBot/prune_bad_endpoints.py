@@ -20,7 +20,7 @@ from datetime import datetime, timedelta
 import threading
 
 # Added by migration script
-from database import Database, init_database, get_db_manager
+from bot_database import Database, init_database, get_db_manager
 
 # Configure logging
 logging.basicConfig(
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Read-through query cache for Discord bot listing commands
+
+Entries are keyed by command name plus normalized arguments and bounded by
+both a TTL and an LRU size limit. Writers inside the bot call invalidate();
+writers in other processes (pruner, catalog sync) bump a version stamp in the
+metadata table which the cache polls at most every few seconds.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from bot_database import Database
+# The version stamp is shared with writers outside the bot (scanners, pruner)
+from database.catalog import CACHE_VERSION_KEY, BUMP_CACHE_VERSION_SQL, bump_cache_version
+
+logger = logging.getLogger('query_cache')
+
+# Cache configuration
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+QUERY_CACHE_VERSION_CHECK_INTERVAL = float(os.getenv("QUERY_CACHE_VERSION_CHECK_INTERVAL", "10"))
+
+_MISSING = object()
+
+
+def _normalize(value):
+    """Normalize an argument so equivalent invocations share a cache entry"""
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+class QueryCache:
+    """Thread-safe TTL + LRU cache with hit/miss accounting"""
+
+    def __init__(self, ttl=QUERY_CACHE_TTL, max_entries=QUERY_CACHE_MAX_ENTRIES,
+                 version_check_interval=QUERY_CACHE_VERSION_CHECK_INTERVAL):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.version_check_interval = version_check_interval
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked = 0.0
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(command, **kwargs):
+        """Build a cache key from a command name and its arguments"""
+        return (command,) + tuple(sorted((k, _normalize(v)) for k, v in kwargs.items()))
+
+    def _check_version(self):
+        """Drop everything if another process bumped the metadata version stamp"""
+        now = time.monotonic()
+        if now - self._version_checked < self.version_check_interval:
+            return
+        self._version_checked = now
+        try:
+            row = Database.fetch_one("SELECT value FROM metadata WHERE key = %s", (CACHE_VERSION_KEY,))
+        except Exception as e:
+            logger.debug(f"Could not read cache version stamp: {e}")
+            return
+        version = row[0] if row else None
+        if self._version is not None and version != self._version:
+            logger.info(f"Query cache version changed ({self._version} -> {version}), invalidating")
+            self.invalidate()
+        self._version = version
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        self._check_version()
+        command = key[0]
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits[command] = self.hits.get(command, 0) + 1
+                    return value
+                del self._entries[key]
+            self.misses[command] = self.misses.get(command, 0) + 1
+            return None
+
+    def set(self, key, value):
+        """Store a value, evicting least recently used entries past the size bound"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader):
+        """Read-through lookup: return the cached value or call loader() and cache it"""
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, command=None):
+        """Drop all entries, or only those for one command"""
+        with self._lock:
+            if command is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == command]:
+                    del self._entries[key]
+            self.invalidations += 1
+
+    def stats(self):
+        """Per-command hit/miss counts plus overall totals"""
+        with self._lock:
+            commands = sorted(set(self.hits) | set(self.misses))
+            per_command = {
+                name: {"hits": self.hits.get(name, 0), "misses": self.misses.get(name, 0)}
+                for name in commands
+            }
+            total_hits = sum(self.hits.values())
+            total_misses = sum(self.misses.values())
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": total_hits,
+                "misses": total_misses,
+                "hit_rate": total_hits / (total_hits + total_misses) if total_hits + total_misses else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "commands": per_command,
+            }
+
+
+# Process-wide cache shared by all bot commands
+query_cache = QueryCache()
@@ -20,9 +20,10 @@ from typing import Dict, List, Any, Optional
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from DiscordBot.unified_commands import register_unified_commands
+from DiscordBot.command_registry import CommandRegistry, format_sync_results
 
 # Added by migration script
-from database import Database, init_database
+from bot_database import Database, init_database
 
 logger = logging.getLogger("discord_bot")
 
@@ -91,9 +92,12 @@ def setup_unified_commands(bot, DB_FILE, session, logger):
         Returns:
             tuple: (added_models, updated_models, removed_models)
         """
-        # Simplified placeholder for actual implementation
-        # Real implementation would call to your existing code
-        return ([], [], [])
+        from ollama_models import sync_models_with_server as sync_catalog
+        try:
+            return sync_catalog(ip, port)
+        except Exception as e:
+            logger.error(f"Error syncing models with server {ip}:{port}: {str(e)}")
+            return ([], [], [])
         
     # Function to get servers
     def get_servers():
@@ -244,15 +248,15 @@ async def register_commands(bot: commands.Bot, guild_ids: Optional[List[int]] =
     try:
         logger.info("Registering unified commands...")
         
+        registry = CommandRegistry(bot.tree)
         if guild_ids:
-            for guild_id in guild_ids:
-                guild = discord.Object(id=guild_id)
+            guilds = [discord.Object(id=guild_id) for guild_id in guild_ids]
+            for guild in guilds:
                 bot.tree.copy_global_to(guild=guild)
-                await bot.tree.sync(guild=guild)
-                logger.info(f"Synchronized commands to guild {guild_id}")
+            results = await registry.sync(guilds=guilds, include_global=False)
         else:
-            await bot.tree.sync()
-            logger.info("Synchronized commands globally")
+            results = await registry.sync()
+        logger.info(f"Command sync results:\n{format_sync_results(results)}")
             
         logger.info("Unified command registration complete")
     except Exception as e:
@@ -6,7 +6,7 @@ Quick script to add the setup_database function to discord_bot.py
 import re
 
 # Added by migration script
-from database import Database, init_database
+from bot_database import Database, init_database
 
 def insert_setup_database():
     # Read the discord_bot.py file
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Start-up timing for the Discord bot
+
+Records how long each start-up phase takes (imports, logging, database
+warm-up, gateway login, command sync, ...) and logs a per-phase report once
+the bot is ready. Reports are also appended as JSON lines to
+STARTUP_TIMING_LOG so regressions show up across restarts.
+"""
+
+import os
+import json
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+logger = logging.getLogger('startup_timing')
+
+# Where per-start reports are appended (empty to disable)
+STARTUP_TIMING_LOG = os.getenv("STARTUP_TIMING_LOG", "startup_timing.jsonl")
+
+
+class StartupTimer:
+    """Collects phase durations in milliseconds relative to process start-up"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = []
+        self.reported = False
+
+    def mark(self, phase):
+        """Close a sequential phase that started at the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000.0))
+        self._last = now
+
+    def record(self, phase, elapsed_ms):
+        """Record a phase measured elsewhere (e.g. one running concurrently)"""
+        self.phases.append((phase, elapsed_ms))
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block that may overlap other phases"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0)
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def report(self):
+        """Log the per-phase report once and append it to STARTUP_TIMING_LOG"""
+        if self.reported:
+            return
+        self.reported = True
+        total = self.total_ms()
+        lines = [f"{name:<24} {ms:>9.1f} ms" for name, ms in self.phases]
+        logger.info("Start-up timing:\n" + "\n".join(lines) + f"\n{'total (to ready)':<24} {total:>9.1f} ms")
+
+        if not STARTUP_TIMING_LOG:
+            return
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "total_ms": round(total, 1),
+            "phases": {name: round(ms, 1) for name, ms in self.phases},
+        }
+        try:
+            with open(STARTUP_TIMING_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write start-up timing log: {e}")
+
+
+# Created on first import so "imports" measures everything imported after it
+startup_timer = StartupTimer()
@@ -12,7 +12,7 @@ import sys
 from datetime import datetime
 
 # Added by migration script
-from database import Database, init_database
+from bot_database import Database, init_database
 
 # Configure logging
 logging.basicConfig(
@@ -18,7 +18,12 @@ import os
 from typing import Optional, List, Dict, Any, Union, Tuple
 
 # Added by migration script
-from database import Database, init_database
+from bot_database import Database, init_database
+from query_cache import query_cache
+from database.catalog import invalidate_catalog_digest
+from chat_history import (ensure_schema as ensure_chat_history_schema, search_history, start_retention,
+                          chat_writer, format_writer_stats)
+from command_registry import CommandRegistry, format_sync_results
 
 def setup_additional_tables(db_file):
     """
@@ -41,27 +46,8 @@ def setup_additional_tables(db_file):
         )
         ''')
         
-        # Create table for storing chat history - using SERIAL for PostgreSQL compatibility
-        Database.execute('''
-        CREATE TABLE IF NOT EXISTS chat_history (
-            id SERIAL PRIMARY KEY,
-            user_id TEXT,
-            model_id INTEGER,
-            prompt TEXT,
-            system_prompt TEXT,
-            response TEXT,
-            temperature REAL,
-            max_tokens INTEGER,
-            timestamp TEXT,
-            eval_count INTEGER,
-            eval_duration REAL,
-            FOREIGN KEY (model_id) REFERENCES models (id)
-        )
-        ''')
-        
-        # Create index on user_id for faster lookups
-        Database.execute('CREATE INDEX IF NOT EXISTS idx_chat_history_user_id ON chat_history (user_id)')
-        Database.execute('CREATE INDEX IF NOT EXISTS idx_chat_history_model_id ON chat_history (model_id)')
+        # Chat history schema, indexes and migrations are owned by chat_history.py
+        ensure_chat_history_schema()
         
         # Commit handled by Database methods
         conn.close()
@@ -89,6 +75,9 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
     # Initialize additional database tables for chat and model selection
     setup_additional_tables(DB_FILE)
     
+    # Archive chat history past the retention window in the background
+    start_retention(bot)
+    
     # Helper function to get a user's selected model
     async def get_user_selected_model(user_id):
         """Get the currently selected model for a user"""
@@ -137,26 +126,10 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
     
     # Helper function to save chat history
     async def save_chat_history(user_id, model_id, prompt, system_prompt, response, temperature, max_tokens, eval_count, eval_duration):
-        """Save a chat interaction to history"""
+        """Queue a chat interaction for the background history writer"""
         try:
-            conn = Database()
-            # Using Database methods instead of cursor
-            
-            # Save the chat history
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            query = '''
-                INSERT INTO chat_history 
-                (user_id, model_id, prompt, system_prompt, response, temperature, max_tokens, timestamp, eval_count, eval_duration)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
-            Database.execute(query, (
-                str(user_id), model_id, prompt, system_prompt, response, 
-                temperature, max_tokens, now, eval_count, eval_duration
-            ))
-            
-            # Commit handled by Database methods
-            conn.close()
-            return True
+            return chat_writer.enqueue(user_id, model_id, prompt, system_prompt, response,
+                                       temperature, max_tokens, eval_count, eval_duration)
         except Exception as e:
             logger.error(f"Error saving chat history: {e}")
             return False
@@ -207,8 +180,12 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
             return
             
         try:
-            conn = Database()
-            # Using Database methods instead of cursor
+            cache_key = query_cache.make_key("unified_search", search_type=search_type, query=query, sort_by=sort_by,
+                                             descending=descending, limit=limit, show_endpoints=show_endpoints)
+            cached = query_cache.get(cache_key)
+            if cached is not None:
+                await safe_followup(interaction, cached)
+                return
             
             # Default sorting - by server count in descending order
             orderby = "server_count DESC"
@@ -267,7 +244,7 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                     ORDER BY {orderby}
                     LIMIT ?
                 """
-                Database.execute(query_sql, (search, limit))
+                query_params = (search, limit)
                 title = f"Models containing '{query}'"
                 
             elif search_type == "params" and query:
@@ -285,7 +262,7 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                     ORDER BY {orderby}
                     LIMIT ?
                 """
-                Database.execute(query_sql, (search, limit))
+                query_params = (search, limit)
                 title = f"Models with parameter size '{query}'"
                 
             elif search_type == "all":
@@ -301,7 +278,7 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                     ORDER BY {orderby}
                     LIMIT ?
                 """
-                Database.execute(query_sql, (limit,))
+                query_params = (limit,)
                 title = "All models"
                 
             elif search_type == "with_servers":
@@ -318,22 +295,20 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                     ORDER BY {orderby}
                     LIMIT ?
                 """
-                Database.execute(query_sql, (limit,))
+                query_params = (limit,)
                 title = "Models with their servers"
                 
             else:
                 await safe_followup(interaction, f"Invalid search type: {search_type}")
-                conn.close()
                 return
                 
-            results = Database.fetch_all(query, params)
+            results = Database.fetch_all(query_sql, query_params)
             
             if not results:
                 if query:
                     await safe_followup(interaction, f"No models found matching the criteria: '{query}'")
                 else:
                     await safe_followup(interaction, "No models found.")
-                conn.close()
                 return
                 
             # Format the results
@@ -346,29 +321,12 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                 
                 # Get servers for this model if showing endpoints
                 if show_endpoints:
-                    if search_type == "name" and query:
-                        Database.execute("""
-                            SELECT m.id, s.ip, s.port
-                            FROM models m
-                            JOIN endpoints s ON m.endpoint_id = s.id
-                            WHERE m.name = ? AND m.parameter_size = ? AND m.quantization_level = ?
-                        """, (name, params, quant))
-                    elif search_type == "params" and query:
-                        Database.execute("""
-                            SELECT m.id, s.ip, s.port
-                            FROM models m
-                            JOIN endpoints s ON m.endpoint_id = s.id
-                            WHERE m.name = ? AND m.parameter_size = ? AND m.quantization_level = ?
-                        """, (name, params, quant))
-                    elif search_type == "all" or search_type == "with_servers":
-                        Database.execute("""
-                            SELECT m.id, s.ip, s.port
-                            FROM models m
-                            JOIN endpoints s ON m.endpoint_id = s.id
-                            WHERE m.name = ? AND m.parameter_size = ? AND m.quantization_level = ?
-                        """, (name, params, quant))
-                    
-                    servers = Database.fetch_all(query, params)
+                    servers = Database.fetch_all("""
+                        SELECT m.id, s.ip, s.port
+                        FROM models m
+                        JOIN endpoints s ON m.endpoint_id = s.id
+                        WHERE m.name = ? AND m.parameter_size = ? AND m.quantization_level = ?
+                    """, (name, params, quant))
                 else:
                     servers = []
                 
@@ -399,11 +357,11 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                 # Truncate and indicate there's more
                 message = message[:1850] + "\n... (additional content truncated) ..."
                 
+            query_cache.set(cache_key, message)
+            
             # Send the response
             await safe_followup(interaction, message)
             
-            conn.close()
-            
         except Exception as e:
             logger.error(f"Error in unified_search: {str(e)}")
             await safe_followup(interaction, f"Error searching models: {str(e)}")
@@ -561,6 +519,7 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                 try:
                     # Call the sync function
                     added, updated, removed = sync_models_with_server(clean_ip, port)
+                    query_cache.invalidate()
                     
                     # Create a structured report
                     message = f"Database synchronization with {clean_ip}:{port} complete:\n"
@@ -782,8 +741,11 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                     for server_id, ip, port, error in batch_unreachable:
                         Database.execute("DELETE FROM models WHERE endpoint_id = ?", (server_id,))
                         Database.execute("DELETE FROM servers WHERE id = ?", (server_id,))
+                        invalidate_catalog_digest(server_id)
                         removed += 1
                         unreachable.append((ip, port, error))
+                    if batch_unreachable:
+                        query_cache.invalidate()
                     
                     # Commit handled by Database methods
                     
@@ -836,7 +798,8 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
         app_commands.Choice(name="Sync to Guild", value="guild_sync"),
         app_commands.Choice(name="Full Refresh", value="full_refresh"),
         app_commands.Choice(name="Clean Database", value="cleanup"),
-        app_commands.Choice(name="Update All Models", value="update_models")
+        app_commands.Choice(name="Update All Models", value="update_models"),
+        app_commands.Choice(name="Chat Log Stats", value="chat_log_stats")
     ])
     @app_commands.choices(scope=[
         app_commands.Choice(name="Global", value="global"),
@@ -864,6 +827,10 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
             return
             
         try:
+            if action == "chat_log_stats":
+                await safe_followup(interaction, format_writer_stats(chat_writer.stats()))
+                return
+            
             # Define a placeholder for additional implementations
             await safe_followup(interaction, f"Admin command {action} with scope {scope} is being processed...")
             
@@ -1067,6 +1034,8 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                     )
                     model_id = Database.lastrowid
                     message = f"Added model **{model_name}** to server {ip}:{port}"
+                invalidate_catalog_digest(server_id)
+                query_cache.invalidate()
                 
                 # Commit handled by Database methods
                 await safe_followup(interaction, message)
@@ -1094,12 +1063,15 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                     return
                 
                 model_id, name, ip, port = model_result
+                server_id = Database.fetch_one("SELECT endpoint_id FROM models WHERE id = ?", (model_id,))[0]
                 
                 # Delete the model
                 Database.execute("DELETE FROM models WHERE id = ?", (model_id,))
+                invalidate_catalog_digest(server_id)
                 
                 # Also delete from user_selected_models if it was someone's default
                 Database.execute("DELETE FROM user_selected_models WHERE model_id = ?", (model_id,))
+                query_cache.invalidate()
                 
                 # Commit handled by Database methods
                 
@@ -1365,19 +1337,6 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                         eval_count = result.get("eval_count", 0)
                         eval_duration = result.get("eval_duration", 0)
                         
-                        # Save to chat history
-                        await save_chat_history(
-                            interaction.user.id, 
-                            model_id, 
-                            prompt, 
-                            system_prompt, 
-                            response_text, 
-                            temperature, 
-                            max_tokens, 
-                            eval_count, 
-                            eval_duration / 1000000 if eval_duration else 0
-                        )
-                        
                         # Add some stats to the response
                         stats = f"\n\n---\nTokens: {eval_count} | Time: {eval_duration/1000000:.2f}s"
                         if eval_duration > 0 and eval_count > 0:
@@ -1411,6 +1370,19 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                         formatted_response = f"**Response from {name}:**\n{response_text}"
                             
                         await safe_followup(interaction, formatted_response)
+                        
+                        # Log to chat history after replying; the write happens in the background
+                        await save_chat_history(
+                            interaction.user.id, 
+                            model_id, 
+                            prompt, 
+                            system_prompt, 
+                            result.get("response", ""), 
+                            temperature, 
+                            max_tokens, 
+                            eval_count, 
+                            eval_duration / 1000000000 if eval_duration else 0
+                        )
                     else:
                         response_text = await response.text()
                         
@@ -1551,10 +1523,6 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                 
                 duration = (datetime.now() - start_time).total_seconds()
                 
-                # Save chat history
-                await save_chat_history(str(interaction.user.id), model_id, prompt, system_prompt, 
-                                      response_text, temperature, max_tokens, eval_count, eval_duration)
-                
                 # Format and send the response
                 embed = discord.Embed(
                     title=f"Chat with {name}",
@@ -1589,6 +1557,10 @@ def register_unified_commands(bot, DB_FILE, safe_defer, safe_followup, session,
                 
                 await safe_followup(interaction, "", file=None, ephemeral=False)
                 await interaction.channel.send(embed=embed)
+                
+                # Log to chat history after replying; the write happens in the background
+                await save_chat_history(str(interaction.user.id), model_id, prompt, system_prompt, 
+                                      response_text, temperature, max_tokens, eval_count, eval_duration)
             
             elif action == "search":
                 # Implement other actions
@@ -1703,50 +1675,15 @@ For any questions or issues, please contact the bot administrator.
             return
         
         try:
-            conn = Database()
-            # Using Database methods instead of cursor
-            
-            # Build query based on filters
-            query_parts = ["ch.user_id = %s"]
-            query_params = [str(interaction.user.id)]
-            
-            if model_id:
-                query_parts.append("ch.model_id = %s")
-                query_params.append(model_id)
-                
-            if search_term:
-                query_parts.append("(ch.prompt LIKE %s OR ch.response LIKE %s)")
-                search = f"%{search_term}%"
-                query_params.extend([search, search])
-                
             # Cap the limit to a reasonable number
             if limit > 20:
                 limit = 20
                 
-            # Build the final query
-            query = f"""
-                SELECT 
-                    ch.id,
-                    ch.model_id,
-                    m.name,
-                    ch.prompt,
-                    ch.response,
-                    ch.system_prompt,
-                    ch.temperature,
-                    ch.max_tokens,
-                    ch.timestamp,
-                    ch.eval_count,
-                    ch.eval_duration
-                FROM chat_history ch
-                JOIN models m ON ch.model_id = m.id
-                WHERE {" AND ".join(query_parts)}
-                ORDER BY ch.timestamp DESC
-                LIMIT %s
-            """
-            query_params.append(limit)
-            
-            results = Database.fetch_all(query, query_params)
-            conn.close()
+            # Indexed lookup: (user_id, timestamp) plus full-text index for search_term
+            results = await asyncio.get_event_loop().run_in_executor(
+                None, lambda: search_history(interaction.user.id, model_id=model_id,
+                                             search_term=search_term, limit=limit)
+            )
             
             if not results:
                 filters = []
@@ -1769,6 +1706,8 @@ For any questions or issues, please contact the bot administrator.
                 prompt_display = prompt[:100] + "..." if len(prompt) > 100 else prompt
                 response_display = response[:200] + "..." if len(response) > 200 else response
                 
+                if isinstance(timestamp, datetime):
+                    timestamp = timestamp.strftime('%Y-%m-%d %H:%M')
                 message += f"**ID: {chat_id} | {timestamp}**\n"
                 message += f"**Model**: {model_name}\n"
                 message += f"**Prompt**: {prompt_display}\n"
@@ -1789,7 +1728,8 @@ For any questions or issues, please contact the bot administrator.
 
     @bot.tree.command(name="resync", description="Force a resync of all slash commands")
     @app_commands.describe(
-        scope="Sync scope: 'guild' for current server only, 'global' for all servers"
+        scope="Sync scope: 'guild' for current server only, 'global' for all servers",
+        force="Push commands even if their schema hasn't changed since the last sync"
     )
     @app_commands.choices(scope=[
         app_commands.Choice(name="Current Guild", value="guild"),
@@ -1797,7 +1737,8 @@ For any questions or issues, please contact the bot administrator.
     ])
     async def resync_commands(
         interaction,
-        scope: str = "guild"
+        scope: str = "guild",
+        force: bool = False
     ):
         """
         Force a resync of all slash commands
@@ -1805,6 +1746,7 @@ For any questions or issues, please contact the bot administrator.
         Args:
             interaction: Discord interaction
             scope: Scope of the sync (guild or global)
+            force: Sync even if the command schema hash is unchanged
         """
         # Check if user has admin rights
         if not interaction.user.guild_permissions.administrator:
@@ -1814,16 +1756,18 @@ For any questions or issues, please contact the bot administrator.
         await interaction.response.defer(ephemeral=True)
         
         try:
+            registry = CommandRegistry(bot.tree)
             if scope == "guild":
                 # Sync to current guild
-                await bot.tree.sync(guild=interaction.guild)
-                await interaction.followup.send(f"Successfully resynced commands to this guild.", ephemeral=True)
+                results = await registry.sync(guilds=[interaction.guild], include_global=False, force=force)
+                await interaction.followup.send(f"Guild command sync finished:\n{format_sync_results(results)}", ephemeral=True)
             else:
                 # Global sync
-                await bot.tree.sync()
-                await interaction.followup.send(f"Successfully resynced commands globally. This may take up to an hour to propagate to all servers.", ephemeral=True)
+                results = await registry.sync(force=force)
+                await interaction.followup.send(f"Global command sync finished:\n{format_sync_results(results)}\n"
+                                                f"Changes may take up to an hour to propagate to all servers.", ephemeral=True)
                 
-            logger.info(f"Commands resynced by {interaction.user.name} with scope: {scope}")
+            logger.info(f"Commands resynced by {interaction.user.name} with scope: {scope} (force={force})")
             
         except Exception as e:
             logger.error(f"Error in resync_commands: {str(e)}")
@@ -26,7 +26,8 @@ from datetime import datetime
 from ollama_models import DB_FILE
 
 # Added by migration script
-from database import Database, init_database
+from bot_database import Database, init_database
+from database.catalog import sync_endpoint_catalog
 
 # Configure logging
 logging.basicConfig(
@@ -43,41 +44,11 @@ def get_all_servers():
     """
     Get all servers from the database
     """
-    conn = Database()
-    cursor = # Using Database methods instead of cursor
-    cursor.execute('''
+    return Database.fetch_all('''
         SELECT id, ip, port, scan_date
         FROM servers
         ORDER BY scan_date DESC
     ''')
-    servers = Database.fetch_all(query, params)
-    conn.close()
-    return servers
-
-def get_server_models(server_id):
-    """
-    Get all models for a specific server from the database
-    
-    Args:
-        server_id: The ID of the server
-        
-    Returns:
-        list: List of model dictionaries
-    """
-    conn = Database()
-    conn.row_factory = sqlite3.Row
-    cursor = # Using Database methods instead of cursor
-    
-    cursor.execute('''
-        SELECT id, name, parameter_size, quantization_level, size_mb
-        FROM models
-        WHERE server_id = ?
-    ''', (server_id,))
-    
-    models = [dict(row) for row in Database.fetch_all(query, params)]
-    conn.close()
-    
-    return models
 
 def is_valid_response(text):
     """
@@ -317,98 +288,16 @@ def update_models_in_db(server_id, ip, port, api_models):
     Returns:
         tuple: Lists of (added, updated, deleted) model names
     """
-    # Lists to track changes
-    added_models = []
-    updated_models = []
-    deleted_models = []
-    
     try:
-        # Get existing models from database
-        db_models = get_server_models(server_id)
-        logger.info(f"Current DB models for {ip}:{port}: {json.dumps(db_models, indent=2)}")
-        
-        # Create dictionary of existing models for easier lookup
-        db_models_dict = {model["name"]: model for model in db_models}
-        
-        # Connect to database for updates
-        conn = Database()
-        cursor = # Using Database methods instead of cursor
-        
-        # Process models from API
-        for model in api_models:
-            name = model.get("name", "")
-            if not name:
-                continue  # Skip models without a name
-            
-            # Extract model details
-            model_size_mb = model.get("size", 0) / (1024 * 1024)  # Convert to MB
-            
-            parameter_size = ""
-            quantization_level = ""
-            
-            # Get detailed info if available
-            if "details" in model:
-                parameter_size = model["details"].get("parameter_size", "")
-                quantization_level = model["details"].get("quantization_level", "")
-            
-            logger.info(f"API Model: {name}, Size: {model_size_mb} MB, Params: {parameter_size}, Quant: {quantization_level}")
-            
-            # Check if model exists in database
-            if name in db_models_dict:
-                # Get existing model
-                existing = db_models_dict[name]
-                logger.info(f"Existing model: {name}, Size: {existing['size_mb']} MB, Params: {existing['parameter_size']}, Quant: {existing['quantization_level']}")
-                
-                # Update model if details have changed
-                if (existing["parameter_size"] != parameter_size or 
-                    existing["quantization_level"] != quantization_level or 
-                    abs(existing["size_mb"] - model_size_mb) > 0.1):  # Allow small size differences
-                    
-                    logger.info(f"Updating model {name} - API: {parameter_size}/{quantization_level}/{model_size_mb} DB: {existing['parameter_size']}/{existing['quantization_level']}/{existing['size_mb']}")
-                    
-                    cursor.execute("""
-                        UPDATE models SET 
-                        parameter_size = ?, 
-                        quantization_level = ?, 
-                        size_mb = ? 
-                        WHERE id = ?
-                    """, (parameter_size, quantization_level, model_size_mb, existing["id"]))
-                    updated_models.append(name)
-                else:
-                    logger.info(f"No changes for model {name}")
-                
-                # Remove from db_models_dict to track which are no longer on server
-                del db_models_dict[name]
-            else:
-                # Add new model
-                logger.info(f"Adding new model: {name}, Size: {model_size_mb} MB, Params: {parameter_size}, Quant: {quantization_level}")
-                try:
-                    cursor.execute("""
-                        INSERT INTO models (server_id, name, parameter_size, quantization_level, size_mb)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (server_id, name, parameter_size, quantization_level, model_size_mb))
-                    added_models.append(name)
-                except sqlite3.IntegrityError:
-                    # Handle potential race condition if the model was added in parallel
-                    logger.warning(f"Model {name} already exists in the database. Skipping.")
-        
-        # Delete models that are no longer on the server
-        for name, model_info in db_models_dict.items():
-            logger.info(f"Removing model no longer on server: {name}")
-            Database.execute("DELETE FROM models WHERE id = ?", (model_info["id"],))
-            deleted_models.append(name)
-        
-        # Update server scan date
-        Database.execute("UPDATE servers SET scan_date = datetime('now') WHERE id = ?", (server_id,))
-        
-        # Commit handled by Database methods
-        conn.close()
-        
+        diff = sync_endpoint_catalog(server_id, api_models)
     except Exception as e:
         logger.error(f"Error updating models in database: {str(e)}")
         raise
     
-    return (added_models, updated_models, deleted_models)
+    if diff.unchanged:
+        logger.info(f"Model catalog for {ip}:{port} unchanged since last sync")
+    
+    return (diff.added, diff.updated, diff.deleted)
 
 def update_server_models(server):
     """
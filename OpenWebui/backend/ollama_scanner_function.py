@@ -10,13 +10,15 @@ import os
 import json
 import time
 import sqlite3
+import hashlib
+import threading
 import requests
 from datetime import datetime
 import logging
-from typing import Dict, List, Any, Tuple, Optional, Union
+from typing import Dict, List, Any, Tuple, Optional, Union, Callable
 
 # Added by migration script
-from database import Database, init_database
+from database import Database, init_database, DATABASE_TYPE
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +31,7 @@ logger = logging.getLogger("ollama_scanner_function")
 DEFAULT_TIMEOUT = 5  # seconds
 DEFAULT_MAX_RESULTS = 100  # max number of Shodan results to process
 DATA_DIR = "/app/backend/data"  # OpenWebUI's persistent data directory
+STATS_REFRESH_SECONDS = int(os.getenv("OLLAMA_SCANNER_STATS_REFRESH", "60"))  # max age of cached dashboard stats
 # TODO: Replace SQLite-specific code: DB_FILE = os.path.join(DATA_DIR, "ollama_scanner_results.db")
 
 
@@ -168,6 +171,7 @@ def save_to_database(conn: sqlite3.Connection, server_info: Dict, model_data: Di
                 ''', (server_id, model_name, param_size, quant_level, model_size_mb))
         
         # Commit handled by Database methods
+        bump_stats_version()
         return server_id
     except sqlite3.Error as e:
         logger.error(f"Database error when saving data: {str(e)}")
@@ -364,6 +368,12 @@ def search_scanned_instances(search_params: Dict) -> Dict:
     """
     Search function to query the database of scanned instances.
     
+    A single query returns the page of servers with their models aggregated
+    into a JSON array per server ordered by name, and the total number of
+    matching servers from a window COUNT(*) OVER () evaluated before
+    LIMIT/OFFSET. A page past the end has no rows to carry that count, so it
+    is counted separately.
+    
     Args:
         search_params (Dict): Search parameters including:
             - model_name (str, optional): Filter by model name
@@ -379,9 +389,6 @@ def search_scanned_instances(search_params: Dict) -> Dict:
         Dict: Search results including servers and their models
     """
     try:
-        conn = Database()
-        cursor = # Using Database methods instead of cursor
-        
         # Extract search parameters
         model_name = search_params.get('model_name', '')
         parameter_size = search_params.get('parameter_size', '')
@@ -396,22 +403,30 @@ def search_scanned_instances(search_params: Dict) -> Dict:
         if sort_order not in ['ASC', 'DESC']:
             sort_order = 'DESC'
         
-        # Build query conditions
+        # Build query conditions; model filters pick servers through EXISTS
+        # so each server appears once without grouping the joined rows
         conditions = []
+        model_conditions = []
         params = []
         
         if model_name:
-            conditions.append("m.name LIKE ?")
+            model_conditions.append("m.name LIKE ?")
             params.append(f"%{model_name}%")
         
         if parameter_size:
-            conditions.append("m.parameter_size LIKE ?")
+            model_conditions.append("m.parameter_size LIKE ?")
             params.append(f"%{parameter_size}%")
         
         if quantization:
-            conditions.append("m.quantization_level LIKE ?")
+            model_conditions.append("m.quantization_level LIKE ?")
             params.append(f"%{quantization}%")
         
+        if model_conditions:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM models m WHERE m.server_id = s.id AND "
+                + " AND ".join(model_conditions) + ")"
+            )
+        
         if country:
             conditions.append("s.country_name LIKE ?")
             params.append(f"%{country}%")
@@ -421,7 +436,8 @@ def search_scanned_instances(search_params: Dict) -> Dict:
         if where_clause:
             where_clause = "WHERE " + where_clause
         
-        # Validate sort_by field to prevent SQL injection
+        # Validate sort_by field to prevent SQL injection; model-level sorts
+        # use the server's first model so each server still has one sort key
         valid_sort_fields = {
             'ip': 's.ip',
             'port': 's.port',
@@ -429,66 +445,75 @@ def search_scanned_instances(search_params: Dict) -> Dict:
             'country': 's.country_name',
             'city': 's.city',
             'organization': 's.organization',
-            'model_count': 'model_count',
-            'model_name': 'm.name',
-            'parameter_size': 'm.parameter_size',
-            'quantization': 'm.quantization_level'
+            'model_count': '(SELECT COUNT(*) FROM models ms WHERE ms.server_id = s.id)',
+            'model_name': '(SELECT MIN(ms.name) FROM models ms WHERE ms.server_id = s.id)',
+            'parameter_size': '(SELECT MIN(ms.parameter_size) FROM models ms WHERE ms.server_id = s.id)',
+            'quantization': '(SELECT MIN(ms.quantization_level) FROM models ms WHERE ms.server_id = s.id)'
         }
         
         sort_field = valid_sort_fields.get(sort_by, 's.scan_date')
         
-        # Query to get servers with their models
+        if DATABASE_TYPE == "postgres":
+            models_agg = """json_agg(json_build_object(
+                       'name', m.name, 'parameter_size', m.parameter_size,
+                       'quantization', m.quantization_level, 'size_mb', m.size_mb
+                   ) ORDER BY m.name, m.id)"""
+        else:
+            models_agg = """json_group_array(json_object(
+                       'name', m.name, 'parameter_size', m.parameter_size,
+                       'quantization', m.quantization_level, 'size_mb', m.size_mb
+                   ))"""
+        
+        # Query to get one page of servers with their models and the total count
         query = f"""
-        SELECT s.id, s.ip, s.port, s.scan_date, s.country_code, s.country_name, 
-               s.city, s.organization, s.asn, COUNT(m.id) as model_count
-        FROM servers s
-        LEFT JOIN models m ON s.id = m.server_id
-        {where_clause}
-        GROUP BY s.id
-        ORDER BY {sort_field} {sort_order}
-        LIMIT ? OFFSET ?
+        WITH page AS (
+            SELECT s.id, s.ip, s.port, s.scan_date, s.country_code, s.country_name, 
+                   s.city, s.organization, s.asn, {sort_field} AS sort_key,
+                   COUNT(*) OVER () AS total_count
+            FROM servers s
+            {where_clause}
+            ORDER BY sort_key {sort_order}, s.id {sort_order}
+            LIMIT ? OFFSET ?
+        ),
+        page_models AS (
+            SELECT m.server_id, COUNT(*) AS model_count, {models_agg} AS models
+            FROM (
+                -- SQLite before 3.44 has no ORDER BY inside aggregates; it
+                -- aggregates in the order of this subquery
+                SELECT * FROM models
+                WHERE server_id IN (SELECT id FROM page)
+                ORDER BY server_id, name, id
+            ) m
+            GROUP BY m.server_id
+        )
+        SELECT page.id, page.ip, page.port, page.scan_date, page.country_code, page.country_name,
+               page.city, page.organization, page.asn, COALESCE(page_models.model_count, 0),
+               page_models.models, page.total_count
+        FROM page
+        LEFT JOIN page_models ON page_models.server_id = page.id
+        ORDER BY page.sort_key {sort_order}, page.id {sort_order}
         """
         
         params.extend([limit, offset])
-        Database.execute(query, params)
-        servers = Database.fetch_all(query, params)
-        
-        # Query to get total count for pagination
-        count_query = f"""
-        SELECT COUNT(DISTINCT s.id)
-        FROM servers s
-        LEFT JOIN models m ON s.id = m.server_id
-        {where_clause}
-        """
-        
-        count_params = params[:-2]  # Remove limit and offset
-        Database.execute(count_query, count_params)
-        total_count = Database.fetch_one(query, params)[0]
+        servers = Database.fetch_all(query, params) or []
+        
+        # Every row carries the window count; a page past the end has none
+        if servers:
+            total_count = servers[0][11]
+        elif offset > 0:
+            count_row = Database.fetch_one(f"SELECT COUNT(*) FROM servers s {where_clause}", params[:-2])
+            total_count = count_row[0] if count_row else 0
+        else:
+            total_count = 0
         
         # Format the results
         results = []
         for server in servers:
-            server_id, ip, port, scan_date, country_code, country_name, city, org, asn, model_count = server
+            server_id, ip, port, scan_date, country_code, country_name, city, org, asn, model_count, models, _ = server
             
-            # Get models for this server
-            model_query = """
-            SELECT name, parameter_size, quantization_level, size_mb
-            FROM models
-            WHERE server_id = ?
-            """
-            
-            Database.execute(model_query, (server_id,))
-            models = Database.fetch_all(query, params)
-            
-            formatted_models = []
-            for model in models:
-                name, params, quant, size = model
-                formatted_models.append({
-                    'name': name,
-                    'parameter_size': params,
-                    'quantization': quant,
-                    'size_mb': size
-                })
+            # Postgres decodes json_agg itself, SQLite hands back the JSON text
+            if isinstance(models, str):
+                models = json.loads(models)
             
             results.append({
                 'server_id': server_id,
@@ -501,11 +526,9 @@ def search_scanned_instances(search_params: Dict) -> Dict:
                 'organization': org,
                 'asn': asn,
                 'model_count': model_count,
-                'models': formatted_models
+                'models': models or []
             })
         
-        conn.close()
-        
         return {
             'success': True,
             'total': total_count,
@@ -623,38 +646,147 @@ def add_to_openwebui_endpoints(selected_instances: List[Dict], api_base_url: str
         }
 
 
-def get_available_countries() -> Dict:
+class StatsSnapshot:
     """
-    Get a list of countries that have Ollama instances in the database.
+    In-memory snapshot of an aggregate result, served with an ETag.
     
-    Returns:
-        Dict: Dictionary with success status and list of countries
+    The aggregate is recomputed at most once per max_age seconds, or sooner
+    when a writer bumps the data version. Callers that send the ETag they
+    already hold get a tiny "not modified" reply instead of the payload.
     """
-    try:
-        conn = Database()
-        cursor = # Using Database methods instead of cursor
-        
-        query = """
-        SELECT DISTINCT country_code, country_name
-        FROM servers
-        WHERE country_code != '' AND country_name != ''
-        ORDER BY country_name
+    
+    def __init__(self, name: str, compute: Callable[[], Dict], max_age: int = STATS_REFRESH_SECONDS):
+        self.name = name
+        self._compute = compute
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._payload = None
+        self._etag = None
+        self._computed_at = 0.0
+        self._computed_version = -1
+        self.version = 0
+    
+    def bump(self) -> None:
+        """Mark the snapshot stale after a write"""
+        with self._lock:
+            self.version += 1
+    
+    def _is_stale(self) -> bool:
+        return (self._payload is None
+                or self._computed_version != self.version
+                or time.time() - self._computed_at >= self.max_age)
+    
+    def get(self, if_none_match: Optional[str] = None) -> Dict:
         """
+        Return the current snapshot, recomputing it first if it is stale.
         
-        Database.execute(query)
-        countries = Database.fetch_all(query, params)
+        Args:
+            if_none_match (str, optional): ETag the caller already has
         
-        conn.close()
-        
-        formatted_countries = [
-            {'code': code, 'name': name}
-            for code, name in countries
-        ]
-        
-        return {
-            'success': True,
-            'countries': formatted_countries
-        }
+        Returns:
+            Dict: The payload with its 'etag', or {'success': True,
+            'not_modified': True, 'etag': ...} if the caller's copy is current
+        """
+        # Holding the lock while computing means concurrent pollers share one query
+        with self._lock:
+            if self._is_stale():
+                version = self.version
+                try:
+                    payload = self._compute()
+                except Exception as e:
+                    if self._payload is None:
+                        raise
+                    # Keep serving the last good snapshot until the next refresh
+                    logger.warning(f"Error refreshing {self.name} snapshot, serving cached copy: {str(e)}")
+                    self._computed_at = time.time()
+                else:
+                    body = json.dumps(payload, sort_keys=True, default=str)
+                    self._etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+                    self._payload = payload
+                    self._computed_at = time.time()
+                    self._computed_version = version
+            payload, etag = self._payload, self._etag
+        
+        if if_none_match and if_none_match == etag:
+            return {'success': True, 'not_modified': True, 'etag': etag}
+        return dict(payload, success=True, etag=etag)
+
+
+def _compute_available_countries() -> Dict:
+    """Aggregate the countries that have Ollama instances in the database."""
+    query = """
+    SELECT DISTINCT country_code, country_name
+    FROM servers
+    WHERE country_code != '' AND country_name != ''
+    ORDER BY country_name
+    """
+    countries = Database.fetch_all(query) or []
+    return {
+        'countries': [{'code': row[0], 'name': row[1]} for row in countries]
+    }
+
+
+def _compute_dashboard_stats() -> Dict:
+    """Aggregate the dashboard statistics over servers and models."""
+    totals = Database.fetch_one("""
+    SELECT (SELECT COUNT(*) FROM servers),
+           (SELECT MAX(scan_date) FROM servers),
+           (SELECT COUNT(*) FROM models),
+           (SELECT COUNT(DISTINCT name) FROM models),
+           (SELECT COUNT(DISTINCT country_code) FROM servers WHERE country_code != '')
+    """)
+    server_count, last_scan, model_count, unique_model_count, country_count = totals
+    
+    top_models = Database.fetch_all("""
+    SELECT name, COUNT(*) as count
+    FROM models
+    GROUP BY name
+    ORDER BY count DESC
+    LIMIT 5
+    """) or []
+    
+    top_countries = Database.fetch_all("""
+    SELECT country_name, COUNT(*) as count
+    FROM servers
+    WHERE country_name != ''
+    GROUP BY country_name
+    ORDER BY count DESC
+    LIMIT 5
+    """) or []
+    
+    return {
+        'server_count': server_count,
+        'model_count': model_count,
+        'unique_model_count': unique_model_count,
+        'country_count': country_count,
+        'last_scan': last_scan,
+        'top_models': [{'name': row[0], 'count': row[1]} for row in top_models],
+        'top_countries': [{'name': row[0], 'count': row[1]} for row in top_countries]
+    }
+
+
+countries_snapshot = StatsSnapshot('countries', _compute_available_countries)
+dashboard_snapshot = StatsSnapshot('dashboard', _compute_dashboard_stats)
+
+
+def bump_stats_version() -> None:
+    """Invalidate the cached stats after servers or models were written."""
+    countries_snapshot.bump()
+    dashboard_snapshot.bump()
+
+
+def get_available_countries(if_none_match: Optional[str] = None) -> Dict:
+    """
+    Get a list of countries that have Ollama instances in the database.
+    
+    Args:
+        if_none_match (str, optional): ETag from a previous response
+    
+    Returns:
+        Dict: Dictionary with success status, ETag and list of countries
+    """
+    try:
+        return countries_snapshot.get(if_none_match)
     
     except sqlite3.Error as e:
         logger.error(f"Database error when getting countries: {str(e)}")
@@ -672,70 +804,21 @@ def get_available_countries() -> Dict:
         }
 
 
-def get_dashboard_stats() -> Dict:
+def get_dashboard_stats(if_none_match: Optional[str] = None) -> Dict:
     """
     Get statistics for the dashboard display.
     
+    Stats are served from an in-memory snapshot refreshed every
+    STATS_REFRESH_SECONDS or after a scan writes new data.
+    
+    Args:
+        if_none_match (str, optional): ETag from a previous response
+    
     Returns:
         Dict: Statistics about scanned Ollama instances
     """
     try:
-        conn = Database()
-        cursor = # Using Database methods instead of cursor
-        
-        # Get server count
-        Database.execute("SELECT COUNT(*) FROM servers")
-        server_count = Database.fetch_one(query, params)[0]
-        
-        # Get most recent scan date
-        Database.execute("SELECT MAX(scan_date) FROM servers")
-        last_scan = Database.fetch_one(query, params)[0]
-        
-        # Get model count
-        Database.execute("SELECT COUNT(*) FROM models")
-        model_count = Database.fetch_one(query, params)[0]
-        
-        # Get unique model count
-        Database.execute("SELECT COUNT(DISTINCT name) FROM models")
-        unique_model_count = Database.fetch_one(query, params)[0]
-        
-        # Get country count
-        Database.execute("SELECT COUNT(DISTINCT country_code) FROM servers WHERE country_code != ''")
-        country_count = Database.fetch_one(query, params)[0]
-        
-        # Get top models
-        cursor.execute("""
-        SELECT name, COUNT(*) as count
-        FROM models
-        GROUP BY name
-        ORDER BY count DESC
-        LIMIT 5
-        """)
-        top_models = [{'name': name, 'count': count} for name, count in Database.fetch_all(query, params)]
-        
-        # Get top countries
-        cursor.execute("""
-        SELECT country_name, COUNT(*) as count
-        FROM servers
-        WHERE country_name != ''
-        GROUP BY country_name
-        ORDER BY count DESC
-        LIMIT 5
-        """)
-        top_countries = [{'name': name, 'count': count} for name, count in Database.fetch_all(query, params)]
-        
-        conn.close()
-        
-        return {
-            'success': True,
-            'server_count': server_count,
-            'model_count': model_count,
-            'unique_model_count': unique_model_count,
-            'country_count': country_count,
-            'last_scan': last_scan,
-            'top_models': top_models,
-            'top_countries': top_countries
-        }
+        return dashboard_snapshot.get(if_none_match)
     
     except sqlite3.Error as e:
         logger.error(f"Database error when getting stats: {str(e)}")
@@ -785,10 +868,10 @@ def handle_ollama_scanner(action, params):
             )
         
         elif action == "get_countries":
-            return get_available_countries()
+            return get_available_countries(params.get('if_none_match'))
         
         elif action == "get_stats":
-            return get_dashboard_stats()
+            return get_dashboard_stats(params.get('if_none_match'))
         
         else:
             return {
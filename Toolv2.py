@@ -17,6 +17,7 @@ from concurrent.futures import ThreadPoolExecutor
 
 # Added by migration script
 from database import Database, init_database
+from db_export import export_parquet
 
 class Tools:
     """
@@ -1768,13 +1769,23 @@ class Tools:
         Export the database to a specific format.
         
         Args:
-            format: Export format (json, csv)
+            format: Export format (json, csv, parquet)
             include_sensitive: Whether to include potentially sensitive data like IP addresses
             
         Returns:
-            Dictionary with export data
+            Dictionary with export data (for parquet, the path and manifest of the written files)
         """
         try:
+            if format.lower() == "parquet":
+                # Streamed to partitioned files by db_export, never held in memory
+                manifest = export_parquet(include_sensitive=include_sensitive)
+                return {
+                    "success": True,
+                    "format": "parquet",
+                    "path": manifest["path"],
+                    "manifest": manifest
+                }
+            
             conn = Database()
             conn.row_factory = sqlite3.Row
             cursor = # Using Database methods instead of cursor
@@ -1873,7 +1884,7 @@ class Tools:
             else:
                 return {
                     "success": False,
-                    "error": f"Unsupported export format: {format}. Supported formats: json, csv"
+                    "error": f"Unsupported export format: {format}. Supported formats: json, csv, parquet"
                 }
         except sqlite3.Error as e:
             self.logger.error(f"SQLite error exporting database: {str(e)}")
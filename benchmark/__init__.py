@@ -0,0 +1,31 @@
+"""
+Ollama benchmark package
+
+    engine   - streamed single-request measurements and summaries
+    load     - open-loop rate and concurrency-ramp load tests
+    suite    - the standard test suite run against one server/model
+    store    - run manifests and long-format metrics in the database
+    compare  - diff two stored runs and flag regressions
+    cli      - the command line (python3 -m benchmark, ollama_benchmark.py)
+"""
+
+# Recorded in each run's manifest as the client version
+BENCHMARK_VERSION = "2.0"
+
+from .engine import BenchmarkEngine, GenerationSample, summarize, summarize_samples, run_measurement
+from .load import LoadGenerator, LatencyHistogram, parse_targets
+from .compare import compare_metrics, metric_direction
+
+__all__ = [
+    "BENCHMARK_VERSION",
+    "BenchmarkEngine",
+    "GenerationSample",
+    "summarize",
+    "summarize_samples",
+    "run_measurement",
+    "LoadGenerator",
+    "LatencyHistogram",
+    "parse_targets",
+    "compare_metrics",
+    "metric_direction",
+]
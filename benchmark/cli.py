@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Benchmark command line
+
+    python3 -m benchmark run [--model M] [--count N] [--server IP --port P --model-name NAME]
+    python3 -m benchmark load --server IP --model-name NAME --load-rates 0.5:8:2
+    python3 -m benchmark context --server IP --model-name NAME [--context-sweep 1024:32768:2]
+    python3 -m benchmark query [--model M]
+    python3 -m benchmark compare BASELINE CANDIDATE
+
+ollama_benchmark.py and ollama_benchmark_db.py are thin wrappers around this.
+"""
+
+import sys
+import argparse
+
+from .suite import test_server, run_load_only, run_context_only, format_benchmark_results, BENCH_HOST_LABEL
+from .load import parse_targets, LOAD_STEP_SECONDS, LOAD_TTFT_THRESHOLD_MS
+from .context import context_targets, BENCH_CONTEXT_SWEEP
+from .store import (ensure_schema, get_model_server_pairs, save_benchmark_results, list_runs, get_run,
+                    metrics_for_run)
+from .compare import compare_metrics, format_comparison, BENCH_NOISE_THRESHOLD
+from .scheduler import (Campaign, CampaignScheduler, BenchmarkJob, load_host_allowlist, host_allowed, discover_jobs,
+                        BENCH_PARALLEL_HOSTS, BENCH_KEEP_ALIVE, BENCH_CHECKPOINT)
+
+
+def _print_results(results):
+    print("\n=================================================")
+    print("  BENCHMARK RESULTS")
+    print("=================================================")
+    print(format_benchmark_results(results))
+
+def run_benchmarks(model_filter=None, max_count=None, server_ip=None, server_port=None, model_name=None, load=None,
+                   host_label=BENCH_HOST_LABEL, tags=None, save=True, context=None, campaign_settings=None):
+    """
+    Run benchmarks on one server/model, or on model/server pairs as a campaign
+
+    campaign_settings holds the scheduler options (hosts_file, discover,
+    parallel, checkpoint, resume, keep_alive, preload); see add_campaign_arguments
+    """
+    # Initialize the database
+    if not ensure_schema():
+        return
+
+    # If specific server/model provided, benchmark just that
+    if server_ip and model_name:
+        port = int(server_port) if server_port else 11434
+        server_address = f"{server_ip}:{port}"
+        print(f"Running benchmark for model {model_name} on server {server_address}")
+
+        results = test_server(server_address, model_name, load, host_label, context)
+        if save:
+            save_benchmark_results(results, tags)
+        _print_results(results)
+        return
+
+    # Otherwise, schedule model/server pairs across hosts
+    campaign_settings = campaign_settings or {}
+    allowlist = load_host_allowlist(campaign_settings["hosts_file"]) if campaign_settings.get("hosts_file") else set()
+
+    if campaign_settings.get("discover"):
+        if not allowlist:
+            print("--discover-models needs a host allow-list (--hosts FILE)")
+            return
+        jobs = discover_jobs(allowlist, model_filter=model_filter)
+    else:
+        pairs = get_model_server_pairs(model_filter, server_ip)
+        jobs = [BenchmarkJob(ip, port, name, endpoint_id, model_id)
+                for model_id, endpoint_id, name, param_size, quant_level, size_mb, ip, port in pairs
+                if host_allowed(allowlist, ip, port)]
+    jobs = jobs[:max_count] if max_count else jobs
+
+    campaign = Campaign.resume_or_create(jobs, campaign_settings.get("checkpoint", BENCH_CHECKPOINT),
+                                         campaign_settings.get("resume", False))
+    if not campaign.jobs:
+        print("No model/server pairs found to benchmark.")
+        if model_filter:
+            print(f"No models match the filter: {model_filter}")
+        return
+
+    print(f"Found {len(campaign.jobs)} model/server pairs to benchmark (campaign {campaign.campaign_id})")
+
+    def benchmark(job, preload_ms):
+        results = test_server(job.server, job.model, load, host_label, context)
+        # Add IDs for database saving
+        results["server_id"] = job.endpoint_id
+        results["model_id"] = job.model_id
+        if preload_ms is not None:
+            # The pre-load paid the cold start, so the warm-up saw a loaded model
+            results["cold_load_time"] = preload_ms / 1000.0
+        _print_results(results)
+        return results
+
+    def save_job(job, results):
+        if not save:
+            return None
+        save_benchmark_results(results, dict(tags or {}, campaign=campaign.campaign_id))
+        return results.get("run_key")
+
+    scheduler = CampaignScheduler(
+        campaign, benchmark, save_job,
+        succeeded=lambda results: results.get("simple_success_rate", 0) > 0,
+        parallel_hosts=campaign_settings.get("parallel", BENCH_PARALLEL_HOSTS),
+        keep_alive=campaign_settings.get("keep_alive", BENCH_KEEP_ALIVE),
+        preload=campaign_settings.get("preload", True),
+        unload=campaign_settings.get("preload", True)
+    )
+    all_results = scheduler.run()
+
+    # Print summary
+    print("\n=================================================")
+    print("  BENCHMARK SUMMARY")
+    print("=================================================")
+    print(f"Total benchmarks run: {len(all_results)}")
+    print(f"Successful benchmarks: {sum(1 for r in all_results if r['simple_success_rate'] > 0)}")
+    print(f"Failed benchmarks: {sum(1 for r in all_results if r['simple_success_rate'] == 0)}")
+
+    # Get top performers in different categories
+    successful = [r for r in all_results if r["simple_success_rate"] > 0]
+
+    if successful:
+        # Sort by speed
+        fastest = max(successful, key=lambda x: x.get("simple_tokens_per_sec", 0))
+        print(f"\nFastest model/server: {fastest['model']} on {fastest['server']}")
+        print(f"  Tokens per second: {round(fastest['simple_tokens_per_sec'], 1)}")
+
+        # Sort by latency
+        by_latency = [r for r in successful if r.get("first_token_latency", float('inf')) < float('inf')]
+        if by_latency:
+            lowest_latency = min(by_latency, key=lambda x: x["first_token_latency"])
+            print(f"\nLowest latency model/server: {lowest_latency['model']} on {lowest_latency['server']}")
+            print(f"  First token latency: {round(lowest_latency['first_token_latency'], 3)} seconds")
+
+        # Sort by throughput
+        by_throughput = [r for r in successful if r.get("throughput_success", False)]
+        if by_throughput:
+            highest_throughput = max(by_throughput, key=lambda x: x["throughput_tokens_per_sec"])
+            print(f"\nHighest throughput model/server: {highest_throughput['model']} on {highest_throughput['server']}")
+            print(f"  Throughput: {round(highest_throughput['throughput_tokens_per_sec'], 1)} tokens/sec")
+
+def run_load_test(server_ip, server_port, model_name, load, save=False, host_label=BENCH_HOST_LABEL, tags=None):
+    """Load test a single server/model and optionally store the run"""
+    results = run_load_only(f"{server_ip}:{server_port}", model_name, load, host_label)
+
+    if save and ensure_schema():
+        save_benchmark_results(results, tags)
+    return results
+
+def run_context_test(server_ip, server_port, model_name, context, save=False, host_label=BENCH_HOST_LABEL, tags=None):
+    """Context length sweep on a single server/model, optionally storing the run"""
+    results = run_context_only(f"{server_ip}:{server_port}", model_name, context, host_label)
+    _print_results(results)
+
+    if save and ensure_schema():
+        save_benchmark_results(results, tags)
+    return results
+
+def query_benchmark_results(model_filter=None, limit=10, server_filter=None):
+    """List stored runs with their headline numbers"""
+    if not ensure_schema():
+        return
+
+    runs = list_runs(model_filter, server_filter, limit)
+    if not runs:
+        print("No benchmark runs found.")
+        if model_filter:
+            print(f"No runs match the filter: {model_filter}")
+        return
+
+    print("\n=================================================")
+    print("  BENCHMARK RUNS")
+    print("=================================================")
+    print(f"Model Filter: {model_filter if model_filter else 'All'}")
+    print(f"Showing {len(runs)} most recent runs")
+    print("\nRun                    | Model                 | Server                | TTFT p50 | Tok/s p50 | Host")
+    print("-" * 105)
+
+    for run in runs:
+        metrics = metrics_for_run(run["id"])
+        ttft = metrics.get(("simple.ttft_ms", 50, "{}"))
+        tps = metrics.get(("simple.decode_tps", 50, "{}"))
+        model_name = run["model"] if len(run["model"]) <= 20 else run["model"][:17] + "..."
+        server = run["server"] if len(run["server"]) <= 20 else run["server"][:17] + "..."
+        ttft_str = f"{ttft:.0f} ms" if ttft is not None else "N/A"
+        tps_str = f"{tps:.1f}" if tps is not None else "N/A"
+        print(f"{run['run_key']:<22} | {model_name.ljust(21)} | {server.ljust(21)} | {ttft_str.ljust(8)} | "
+              f"{tps_str.ljust(9)} | {run['host_label'] or '-'}")
+
+def compare_runs(baseline_ref=None, candidate_ref=None, model_filter=None, server_filter=None,
+                 threshold=BENCH_NOISE_THRESHOLD, show_all=False):
+    """
+    Compare two runs (ids or run keys); without refs, the two latest runs
+    matching the model/server filters
+
+    Returns:
+        int: process exit code, 1 when a regression was flagged
+    """
+    if not ensure_schema():
+        return 2
+
+    if baseline_ref and candidate_ref:
+        baseline, candidate = get_run(baseline_ref), get_run(candidate_ref)
+    else:
+        latest = list_runs(model_filter, server_filter, 2)
+        if len(latest) < 2:
+            print("Need two stored runs to compare.")
+            return 2
+        candidate, baseline = latest
+
+    if baseline is None or candidate is None:
+        print(f"Run not found: {baseline_ref if baseline is None else candidate_ref}")
+        return 2
+
+    diffs = compare_metrics(metrics_for_run(baseline["id"]), metrics_for_run(candidate["id"]), threshold)
+    print(format_comparison(baseline, candidate, diffs, show_all))
+    return 1 if any(d["status"] == "regression" for d in diffs) else 0
+
+def add_load_arguments(parser):
+    """Load test options shared by the run and load commands"""
+    parser.add_argument("--load-rates", help="Open-loop request rates in req/s: '0.5,1,2' or geometric 'start:stop:factor'")
+    parser.add_argument("--load-concurrency", help="Closed-loop concurrency steps: '1,2,4,8' or 'start:stop:factor'")
+    parser.add_argument("--load-step-seconds", type=float, default=LOAD_STEP_SECONDS, help="Duration of each load step")
+    parser.add_argument("--ttft-threshold-ms", type=float, default=LOAD_TTFT_THRESHOLD_MS,
+                        help="p99 TTFT that marks the saturation point")
+
+def add_context_arguments(parser, opt_in=True):
+    """Context sweep options shared by the run and context commands"""
+    if opt_in:
+        # Large prompts allocate a big KV cache on the server, so run only sweeps when asked
+        parser.add_argument("--context-sweep",
+                            help="Also run the context sweep at these prompt sizes in tokens: "
+                                 "'1024,4096' or geometric 'start:stop:factor'")
+        parser.add_argument("--skip-context", action="store_true",
+                            help="Skip the context length sweep even if --context-sweep is given")
+    else:
+        parser.add_argument("--context-sweep", default=BENCH_CONTEXT_SWEEP,
+                            help="Prompt sizes in tokens: '1024,4096' or geometric 'start:stop:factor' (default %(default)s)")
+    parser.add_argument("--context-default-num-ctx", action="store_true",
+                        help="Don't size num_ctx to each prompt; find where the server's default window truncates")
+
+def context_settings(args):
+    """Context sweep settings from parsed arguments, or False when the sweep is skipped"""
+    if getattr(args, "skip_context", False) or not args.context_sweep:
+        return False
+    return {
+        "targets": context_targets(args.context_sweep),
+        "set_num_ctx": not args.context_default_num_ctx
+    }
+
+def add_campaign_arguments(parser):
+    """Scheduler options for benchmarking many model/server pairs"""
+    parser.add_argument("--hosts", metavar="FILE",
+                        help="Host allow-list: one host or host:port per line; other hosts are skipped")
+    parser.add_argument("--discover-models", action="store_true",
+                        help="Benchmark every model the allow-listed hosts serve instead of database pairs")
+    parser.add_argument("--parallel", type=int, default=BENCH_PARALLEL_HOSTS,
+                        help="Hosts benchmarked at once; never more than one job per host (default %(default)s)")
+    parser.add_argument("--checkpoint", default=BENCH_CHECKPOINT, help="Campaign checkpoint file (default %(default)s)")
+    parser.add_argument("--resume", action="store_true", help="Continue the campaign in the checkpoint file")
+    parser.add_argument("--keep-alive", default=BENCH_KEEP_ALIVE,
+                        help="keep_alive used to pre-load each model before measuring (default %(default)s)")
+    parser.add_argument("--no-preload", action="store_true", help="Don't pre-load and unload models around each job")
+
+def campaign_settings_from(args):
+    return {
+        "hosts_file": args.hosts,
+        "discover": args.discover_models,
+        "parallel": args.parallel,
+        "checkpoint": args.checkpoint,
+        "resume": args.resume,
+        "keep_alive": args.keep_alive,
+        "preload": not args.no_preload
+    }
+
+def add_run_tag_arguments(parser):
+    """Manifest options shared by the commands that store runs"""
+    parser.add_argument("--host-label", default=BENCH_HOST_LABEL,
+                        help="Label for the server's hardware (e.g. 'rtx4090'), stored in the run manifest")
+    parser.add_argument("--tag", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra tag stored with the run (repeatable)")
+
+def load_settings(args):
+    """Load test settings from parsed arguments, or None when no load steps were requested"""
+    if args.load_rates:
+        mode, targets = "rate", parse_targets(args.load_rates)
+    elif args.load_concurrency:
+        mode, targets = "concurrency", [int(t) for t in parse_targets(args.load_concurrency)]
+    else:
+        return None
+    return {
+        "mode": mode,
+        "targets": targets,
+        "step_seconds": args.load_step_seconds,
+        "ttft_threshold_ms": args.ttft_threshold_ms
+    }
+
+def run_tags(args):
+    tags = {}
+    for item in args.tag:
+        key, _, value = item.partition("=")
+        tags[key.strip()] = value.strip()
+    return tags
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Ollama Benchmark Tool")
+
+    # Create subparsers for different commands
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+
+    # Run benchmarks command
+    run_parser = subparsers.add_parser("run", help="Run benchmarks on model/server pairs")
+    run_parser.add_argument("--model", help="Filter models by name (e.g., 'llama' for all llama models)")
+    run_parser.add_argument("--count", type=int, help="Maximum number of model/server pairs to benchmark")
+    run_parser.add_argument("--server", help="Specific server IP to benchmark")
+    run_parser.add_argument("--port", type=int, help="Specific server port to benchmark")
+    run_parser.add_argument("--model-name", help="Specific model name to test")
+    run_parser.add_argument("--no-save", action="store_true", help="Don't store the run")
+    add_load_arguments(run_parser)
+    add_context_arguments(run_parser)
+    add_campaign_arguments(run_parser)
+    add_run_tag_arguments(run_parser)
+
+    # Load test command - ramp one server/model without the other tests
+    load_parser = subparsers.add_parser("load", help="Load test one server/model (open-loop rate or concurrency ramp)")
+    load_parser.add_argument("--server", required=True, help="Server IP (or host) to load")
+    load_parser.add_argument("--port", type=int, default=11434, help="Server port")
+    load_parser.add_argument("--model-name", required=True, help="Model to load")
+    load_parser.add_argument("--save", action="store_true", help="Store the run and its steps")
+    add_load_arguments(load_parser)
+    add_run_tag_arguments(load_parser)
+
+    # Context sweep command - find the usable context window of one server/model
+    context_parser = subparsers.add_parser("context", help="Context length sweep on one server/model")
+    context_parser.add_argument("--server", required=True, help="Server IP (or host)")
+    context_parser.add_argument("--port", type=int, default=11434, help="Server port")
+    context_parser.add_argument("--model-name", required=True, help="Model to test")
+    context_parser.add_argument("--save", action="store_true", help="Store the run")
+    add_context_arguments(context_parser, opt_in=False)
+    add_run_tag_arguments(context_parser)
+
+    # Query results command
+    query_parser = subparsers.add_parser("query", help="List stored benchmark runs")
+    query_parser.add_argument("--model", help="Filter runs by model name")
+    query_parser.add_argument("--server", help="Filter runs by server (IP or IP:port)")
+    query_parser.add_argument("--limit", type=int, default=10, help="Maximum number of runs to show")
+
+    # Compare command
+    compare_parser = subparsers.add_parser("compare", help="Diff two runs and flag regressions")
+    compare_parser.add_argument("baseline", nargs="?", help="Baseline run id or key (default: second latest)")
+    compare_parser.add_argument("candidate", nargs="?", help="Candidate run id or key (default: latest)")
+    compare_parser.add_argument("--model", help="Pick the two latest runs of this model")
+    compare_parser.add_argument("--server", help="Pick the two latest runs on this server")
+    compare_parser.add_argument("--threshold", type=float, default=BENCH_NOISE_THRESHOLD,
+                                help="Relative change treated as noise (default 0.05 = 5%%)")
+    compare_parser.add_argument("--all", action="store_true", help="Show unchanged metrics too")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Check command and run appropriate function
+    if args.command == "run":
+        run_benchmarks(args.model, args.count, args.server, args.port, args.model_name, load_settings(args),
+                       args.host_label, run_tags(args), not args.no_save, context_settings(args),
+                       campaign_settings_from(args))
+    elif args.command == "load":
+        load = load_settings(args) or {"mode": "rate", "targets": parse_targets("0.5:8:2"),
+                                       "step_seconds": args.load_step_seconds,
+                                       "ttft_threshold_ms": args.ttft_threshold_ms}
+        run_load_test(args.server, args.port, args.model_name, load, args.save, args.host_label, run_tags(args))
+    elif args.command == "context":
+        run_context_test(args.server, args.port, args.model_name, context_settings(args), args.save,
+                         args.host_label, run_tags(args))
+    elif args.command == "query":
+        query_benchmark_results(args.model, args.limit, args.server)
+    elif args.command == "compare":
+        return compare_runs(args.baseline, args.candidate, args.model, args.server, args.threshold, args.all)
+    else:
+        parser.print_help()
+    return 0
+
+def entry_point():
+    """Console entry used by python -m benchmark and the root wrapper scripts"""
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\nBenchmark interrupted by user. Exiting...")
+        sys.exit(130)
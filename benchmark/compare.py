@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark Run Comparison
+
+Diffs the long-format metrics of two stored runs. Each metric knows whether
+higher or lower is better; a change in the wrong direction is a regression
+only when it is larger than the noise threshold, widened to twice the
+baseline's coefficient of variation where the run recorded a stdev, so a
+jittery server doesn't flag every run.
+"""
+
+import os
+import json
+
+# Relative change below which differences are treated as noise
+BENCH_NOISE_THRESHOLD = float(os.getenv("BENCH_NOISE_THRESHOLD", "0.05"))
+
+# Manifest fields that should match for a like-for-like comparison
+MANIFEST_FIELDS = ("model", "model_digest", "quantization", "parameter_size", "server_version", "host_label", "client_version")
+
+HIGHER_IS_BETTER = ("_tps", "success_rate", "achieved_rps", "tokens_per_sec", "load.sustainable", "load.saturation",
+                    "max_tokens")
+LOWER_IS_BETTER = ("_ms", "error_rate")
+
+
+def metric_direction(metric):
+    """1 when higher is better, -1 when lower is better, 0 for informational metrics"""
+    if metric.endswith(".stdev"):
+        return 0
+    base = metric[:-len(".mean")] if metric.endswith(".mean") else metric
+    if base.endswith(HIGHER_IS_BETTER):
+        return 1
+    if base.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+def _noise(metric, pct, tags, metrics, threshold):
+    """Noise band for one metric: the threshold, or 2x the baseline's CV when that is wider"""
+    base = metric[:-len(".mean")] if metric.endswith(".mean") else metric
+    mean = metrics.get((f"{base}.mean", None, tags))
+    stdev = metrics.get((f"{base}.stdev", None, tags))
+    if mean and stdev is not None:
+        return max(threshold, 2.0 * stdev / abs(mean))
+    return threshold
+
+def compare_metrics(baseline, candidate, threshold=BENCH_NOISE_THRESHOLD):
+    """
+    Diff two {(metric, percentile, tags_json): value} maps
+
+    Returns:
+        list: dicts with metric, percentile, tags, baseline, candidate, change
+        (relative, candidate vs baseline), noise and status - one of
+        "regression", "improvement", "ok", "info", "new" or "missing"
+    """
+    diffs = []
+    for key in sorted(set(baseline) | set(candidate), key=lambda k: (k[0], k[2], k[1] or 0)):
+        metric, pct, tags = key
+        before, after = baseline.get(key), candidate.get(key)
+        diff = {
+            "metric": metric,
+            "percentile": pct,
+            "tags": json.loads(tags) if tags else {},
+            "baseline": before,
+            "candidate": after,
+            "change": None,
+            "noise": None,
+        }
+        if before is None:
+            diff["status"] = "new"
+        elif after is None:
+            diff["status"] = "missing"
+        else:
+            direction = metric_direction(metric)
+            if before:
+                diff["change"] = (after - before) / abs(before)
+            elif after:
+                diff["change"] = float("inf") if after > 0 else float("-inf")
+            else:
+                diff["change"] = 0.0
+            diff["noise"] = _noise(metric, pct, tags, baseline, threshold)
+
+            if direction == 0:
+                diff["status"] = "info"
+            elif abs(diff["change"]) <= diff["noise"]:
+                diff["status"] = "ok"
+            elif diff["change"] * direction < 0:
+                diff["status"] = "regression"
+            else:
+                diff["status"] = "improvement"
+        diffs.append(diff)
+    return diffs
+
+def manifest_differences(baseline_run, candidate_run):
+    """Manifest fields that differ between two runs, as (field, baseline, candidate)"""
+    return [(field, baseline_run.get(field), candidate_run.get(field)) for field in MANIFEST_FIELDS
+            if baseline_run.get(field) != candidate_run.get(field)]
+
+def _label(diff):
+    label = diff["metric"]
+    if diff["percentile"] is not None:
+        label += f" p{diff['percentile']:g}"
+    if diff["tags"]:
+        label += " [" + ",".join(f"{k}={v}" for k, v in sorted(diff["tags"].items())) + "]"
+    return label
+
+def _value(value):
+    return "-" if value is None else f"{value:.4g}"
+
+def format_comparison(baseline_run, candidate_run, diffs, show_all=False):
+    """Render a comparison; unchanged and informational metrics only with show_all"""
+    lines = [
+        f"BASELINE:  {baseline_run['run_key']} ({baseline_run['model']} on {baseline_run['server']}, {baseline_run['started_at']})",
+        f"CANDIDATE: {candidate_run['run_key']} ({candidate_run['model']} on {candidate_run['server']}, {candidate_run['started_at']})",
+    ]
+    for field, before, after in manifest_differences(baseline_run, candidate_run):
+        lines.append(f"  NOTE: {field} differs: {before} -> {after}")
+    lines.append("")
+
+    shown = [d for d in diffs if show_all or d["status"] in ("regression", "improvement")]
+    if shown:
+        lines.append(f"{'Metric':<52} {'Baseline':>10} {'Candidate':>10} {'Change':>8} {'Noise':>6}  Status")
+        lines.append("-" * 100)
+    for diff in shown:
+        change = "-" if diff["change"] is None else f"{diff['change'] * 100:+.1f}%"
+        noise = "-" if diff["noise"] is None else f"{diff['noise'] * 100:.0f}%"
+        lines.append(f"{_label(diff)[:52]:<52} {_value(diff['baseline']):>10} {_value(diff['candidate']):>10} "
+                     f"{change:>8} {noise:>6}  {diff['status'].upper()}")
+
+    counts = {}
+    for diff in diffs:
+        counts[diff["status"]] = counts.get(diff["status"], 0) + 1
+    lines.append("")
+    lines.append("Summary: " + ", ".join(f"{counts[s]} {s}" for s in
+                                         ("regression", "improvement", "ok", "info", "new", "missing") if s in counts))
+    return "\n".join(lines)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Context Length Sweep
+
+Sends prompts at target token counts (1k, 2k, 4k ... 128k by default) and
+records prefill throughput (prompt_eval_count / prompt_eval_duration) and
+decode throughput separately at each size. Prompt sizes come from a length
+model fitted to the server's own prompt_eval_count, so they match the
+model's tokenizer rather than a words-per-token guess.
+
+Each prompt starts with a unique nonce (so Ollama can't reuse a cached
+prefix) and a code word the model is asked to repeat. When the server
+evaluates far fewer tokens than were sent the prompt was truncated, and the
+sweep stops there and reports the largest size that was fully processed -
+the num_ctx to configure for deployments. Whether the model still recalled
+the code word is reported per size.
+"""
+
+import os
+import uuid
+import random
+import logging
+
+from .load import parse_targets
+
+logger = logging.getLogger('benchmark.context')
+
+# Geometric token targets ("start:stop:factor" or a comma list)
+BENCH_CONTEXT_SWEEP = os.getenv("BENCH_CONTEXT_SWEEP", "1024:131072:2")
+# Long prompts take a while to prefill on small GPUs
+BENCH_CONTEXT_TIMEOUT = float(os.getenv("BENCH_CONTEXT_TIMEOUT", "600"))
+# Evaluated tokens this far below the expected count mean the prompt was truncated
+BENCH_CONTEXT_TOLERANCE = float(os.getenv("BENCH_CONTEXT_TOLERANCE", "0.1"))
+
+# Tokens generated per step to measure decode speed at that depth
+CONTEXT_DECODE_TOKENS = 32
+# num_ctx slack above the target for the template and the answer
+CONTEXT_HEADROOM = 256
+# Filler sizes (words) used to fit the length model
+CALIBRATION_WORDS = (64, 400)
+# Used when the server reports no prompt_eval_count
+DEFAULT_TOKENS_PER_WORD = 1.4
+DEFAULT_OVERHEAD_TOKENS = 32
+
+FILLER_WORDS = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit",
+                "sed", "do", "eiusmod", "tempor", "incididunt", "ut", "labore", "et", "dolore",
+                "magna", "aliqua", "enim", "ad", "minim", "veniam", "quis", "nostrud", "exercitation",
+                "ullamco", "laboris", "nisi", "aliquip", "ex", "ea", "commodo", "consequat",
+                "duis", "aute", "irure", "in", "reprehenderit", "voluptate", "velit",
+                "esse", "cillum", "eu", "fugiat", "nulla", "pariatur", "excepteur", "sint",
+                "occaecat", "cupidatat", "non", "proident", "sunt", "culpa", "qui", "officia",
+                "deserunt", "mollit", "anim", "id", "est", "laborum"]
+
+# Deterministic filler, grown on demand and shared by every sweep
+_filler = []
+_filler_random = random.Random(0)
+
+
+def filler_text(words):
+    """The first `words` words of a fixed pseudo-random document"""
+    while len(_filler) < words:
+        sentence = [_filler_random.choice(FILLER_WORDS) for _ in range(_filler_random.randint(5, 15))]
+        sentence[0] = sentence[0].capitalize()
+        sentence[-1] += "."
+        _filler.extend(sentence)
+    return " ".join(_filler[:words])
+
+def build_prompt(words, needle, nonce=None):
+    """A prompt with `words` filler words between a code word and the question about it"""
+    nonce = nonce or uuid.uuid4().hex[:12]
+    return (f"Document {nonce}. The code word is {needle}.\n\n"
+            f"{filler_text(words)}\n\n"
+            "What is the code word given at the start of the document? Reply with the code word only.")
+
+
+class TokenEstimator:
+    """
+    Prompt length model per (server, model): tokens = overhead + per_word * words
+
+    Fitted once from the server's prompt_eval_count for two probe prompts and
+    cached, so every later length estimate uses the model's real tokenizer.
+    """
+
+    def __init__(self):
+        self._fits = {}
+
+    def get(self, key):
+        return self._fits.get(key)
+
+    def fit(self, key, observations):
+        """Fit from [(words, tokens), ...]; falls back to defaults with fewer than two points"""
+        points = sorted(set(observations))
+        if len(points) >= 2 and points[-1][0] != points[0][0]:
+            (w1, t1), (w2, t2) = points[0], points[-1]
+            per_word = (t2 - t1) / (w2 - w1)
+            overhead = max(0.0, t1 - per_word * w1)
+            estimated = False
+        else:
+            per_word, overhead, estimated = DEFAULT_TOKENS_PER_WORD, DEFAULT_OVERHEAD_TOKENS, True
+        self._fits[key] = {"per_word": per_word, "overhead": overhead, "estimated": estimated}
+        return self._fits[key]
+
+    def words_for(self, key, tokens):
+        fit = self._fits[key]
+        return max(1, int((tokens - fit["overhead"]) / fit["per_word"]))
+
+    def expected_tokens(self, key, words):
+        fit = self._fits[key]
+        return int(fit["overhead"] + fit["per_word"] * words)
+
+
+token_estimator = TokenEstimator()
+
+
+async def calibrate(engine, estimator=token_estimator):
+    """Fit (or reuse) the length model for the engine's server and model"""
+    key = (engine.server_address, engine.model)
+    if estimator.get(key):
+        return estimator.get(key)
+
+    observations = []
+    for words in CALIBRATION_WORDS:
+        sample = await engine.generate(build_prompt(words, "probe"), options={"num_predict": 1})
+        if sample.ok and sample.prompt_eval_count:
+            observations.append((words, sample.prompt_eval_count))
+        else:
+            logger.warning(f"Length calibration on {engine.server_address} got no prompt_eval_count "
+                           f"({sample.error or 'not reported'})")
+    fit = estimator.fit(key, observations)
+    logger.info(f"Length model for {engine.model} on {engine.server_address}: "
+                f"{fit['per_word']:.2f} tokens/word + {fit['overhead']:.0f}"
+                f"{' (defaults)' if fit['estimated'] else ''}")
+    return fit
+
+async def model_context_length(engine):
+    """The model's trained context window from /api/show, or None"""
+    show = await engine.get_json("/api/show", {"model": engine.model})
+    for name, value in ((show or {}).get("model_info") or {}).items():
+        if name.endswith(".context_length") and isinstance(value, int):
+            return value
+    return None
+
+def context_targets(value=BENCH_CONTEXT_SWEEP):
+    """Token targets from a sweep spec like "1024:131072:2" """
+    return sorted({int(t) for t in parse_targets(value)})
+
+async def run_context_sweep(engine, targets=None, set_num_ctx=True, stop_on_limit=True,
+                            estimator=token_estimator):
+    """
+    Run one request per target size until the server truncates or fails
+
+    Args:
+        set_num_ctx: Ask for num_ctx sized to each prompt (False measures the server's default window)
+        stop_on_limit: Skip the remaining sizes after the first truncation or failure
+
+    Returns:
+        dict: {"steps": [...], "max_context_tokens", "limit_tokens", "limit_reason",
+        "model_context_length", "length_model"}
+    """
+    targets = targets or context_targets()
+    key = (engine.server_address, engine.model)
+    fit = await calibrate(engine, estimator)
+    trained = await model_context_length(engine)
+
+    result = {
+        "steps": [],
+        "targets": list(targets),
+        "set_num_ctx": set_num_ctx,
+        "max_context_tokens": None,
+        "limit_tokens": None,
+        "limit_reason": None,
+        "model_context_length": trained,
+        "length_model": dict(fit),
+    }
+
+    for target in targets:
+        if trained and target > trained:
+            result["limit_tokens"], result["limit_reason"] = target, "model_context_length"
+            break
+
+        words = estimator.words_for(key, target)
+        expected = estimator.expected_tokens(key, words)
+        needle = f"{random.choice(FILLER_WORDS)}-{random.randint(100, 999)}"
+        options = {"num_predict": CONTEXT_DECODE_TOKENS, "temperature": 0}
+        if set_num_ctx:
+            options["num_ctx"] = target + CONTEXT_HEADROOM
+
+        print(f"    {target} tokens ({words} words)...", end=" ", flush=True)
+        sample = await engine.generate(build_prompt(words, needle), options=options, keep_text=True,
+                                       timeout=BENCH_CONTEXT_TIMEOUT)
+        step = sample.to_dict()
+        step.update({
+            "target_tokens": target,
+            "expected_tokens": expected,
+            "success": sample.ok,
+            "truncated": bool(sample.ok and sample.prompt_eval_count
+                              and sample.prompt_eval_count < expected * (1 - BENCH_CONTEXT_TOLERANCE)),
+            "recall": needle.lower() in sample.text.lower() if sample.ok else None,
+        })
+        result["steps"].append(step)
+        print(format_context_step(step))
+
+        if not sample.ok or step["truncated"]:
+            result["limit_tokens"] = target
+            result["limit_reason"] = "truncated" if sample.ok else (sample.error or "error")
+            if stop_on_limit:
+                break
+        elif result["limit_tokens"] is None:
+            result["max_context_tokens"] = sample.prompt_eval_count or expected
+
+    return result
+
+def _num(value, fmt):
+    return "n/a" if value is None else format(value, fmt)
+
+def format_context_step(step):
+    if not step["success"]:
+        return f"failed: {step['error']}"
+    return (f"{_num(step['prompt_tokens'], 'd')} evaluated"
+            f"{' TRUNCATED' if step['truncated'] else ''} | prefill {_num(step['prefill_tps'], '.0f')} tok/s"
+            f" | decode {_num(step['decode_tps'], '.1f')} tok/s | TTFT {_num(step['ttft_ms'], '.0f')} ms"
+            f" | recall {'yes' if step['recall'] else 'no'}")
+
+def format_context_sweep(result):
+    lines = ["CONTEXT SWEEP:" + ("" if result.get("set_num_ctx", True) else " (server default num_ctx)")]
+    for step in result["steps"]:
+        lines.append(f"  {step['target_tokens']:>7} tokens: {format_context_step(step)}")
+    if result["max_context_tokens"]:
+        lines.append(f"  Largest fully processed prompt: {result['max_context_tokens']} tokens")
+    if result["limit_tokens"]:
+        lines.append(f"  Limit at {result['limit_tokens']} tokens: {result['limit_reason']}")
+    if result["model_context_length"]:
+        lines.append(f"  Model context length: {result['model_context_length']}")
+    return "\n".join(lines)
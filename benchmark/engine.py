@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Benchmark Engine for Ollama Endpoints
+Async, streaming-accurate measurements of a single model on a single server.
+
+Every request is streamed and timed with perf_counter_ns: time to first token
+is taken from the first chunk carrying text, and the arrival time of every
+following chunk gives per-token inter-arrival times. Token counts and server
+side timings come from Ollama's own eval_count / eval_duration /
+prompt_eval_count / prompt_eval_duration fields in the final chunk, so decode
+and prefill throughput are real tokens per second rather than words per
+wall-clock second.
+
+Runs start with warm-up requests (discarded, they absorb model loading) and
+summaries drop outliers with Tukey fences instead of spacing runs out with
+fixed sleeps.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import statistics
+
+import aiohttp
+
+logger = logging.getLogger('benchmark_engine')
+
+# Engine defaults
+BENCH_RUNS = int(os.getenv("BENCH_RUNS", "5"))
+BENCH_WARMUP_RUNS = int(os.getenv("BENCH_WARMUP_RUNS", "1"))
+BENCH_TIMEOUT = float(os.getenv("BENCH_TIMEOUT", "120"))
+BENCH_OUTLIER_K = float(os.getenv("BENCH_OUTLIER_K", "1.5"))
+
+# Percentiles reported for every latency metric
+PERCENTILES = (50, 90, 99)
+
+NS_PER_MS = 1_000_000
+NS_PER_S = 1_000_000_000
+
+
+class GenerationSample:
+    """Timings and server counters for one streamed generation"""
+
+    def __init__(self):
+        self.ok = False
+        self.error = None
+        self.status = None
+        self.started_ns = 0
+        self.ttft_ns = None
+        self.total_ns = None
+        self.inter_token_ns = []
+        self.chunks = 0
+        self.chars = 0
+        self.text = ""
+        self.done_reason = None
+        self.eval_count = None
+        self.eval_duration_ns = None
+        self.prompt_eval_count = None
+        self.prompt_eval_duration_ns = None
+        self.load_duration_ns = None
+        self.total_duration_ns = None
+
+    @property
+    def decode_tps(self):
+        """Server-reported decode throughput (tokens/s)"""
+        if self.eval_count and self.eval_duration_ns:
+            return self.eval_count * NS_PER_S / self.eval_duration_ns
+        return None
+
+    @property
+    def prefill_tps(self):
+        """Server-reported prompt processing throughput (tokens/s)"""
+        if self.prompt_eval_count and self.prompt_eval_duration_ns:
+            return self.prompt_eval_count * NS_PER_S / self.prompt_eval_duration_ns
+        return None
+
+    @property
+    def client_decode_tps(self):
+        """Decode throughput seen by the client, from first to last token arrival"""
+        if len(self.inter_token_ns) >= 1:
+            span = sum(self.inter_token_ns)
+            if span > 0:
+                return len(self.inter_token_ns) * NS_PER_S / span
+        return None
+
+    @property
+    def tokens(self):
+        """Generated tokens, falling back to streamed chunks if the server sent no eval_count"""
+        return self.eval_count if self.eval_count is not None else self.chunks
+
+    def to_dict(self):
+        return {
+            "ok": self.ok,
+            "error": self.error,
+            "status": self.status,
+            "ttft_ms": self.ttft_ns / NS_PER_MS if self.ttft_ns is not None else None,
+            "total_ms": self.total_ns / NS_PER_MS if self.total_ns is not None else None,
+            "tokens": self.tokens,
+            "prompt_tokens": self.prompt_eval_count,
+            "decode_tps": self.decode_tps,
+            "prefill_tps": self.prefill_tps,
+            "client_decode_tps": self.client_decode_tps,
+            "load_ms": self.load_duration_ns / NS_PER_MS if self.load_duration_ns else None,
+            "done_reason": self.done_reason,
+        }
+
+
+def _apply_final_chunk(sample, chunk):
+    sample.done_reason = chunk.get("done_reason")
+    sample.eval_count = chunk.get("eval_count")
+    sample.eval_duration_ns = chunk.get("eval_duration")
+    sample.prompt_eval_count = chunk.get("prompt_eval_count")
+    sample.prompt_eval_duration_ns = chunk.get("prompt_eval_duration")
+    sample.load_duration_ns = chunk.get("load_duration")
+    sample.total_duration_ns = chunk.get("total_duration")
+
+
+async def stream_generation(session, server_address, model, prompt=None, messages=None, options=None,
+                            timeout=BENCH_TIMEOUT, keep_text=False):
+    """
+    Run one streamed /api/generate (or /api/chat when messages are given) request
+
+    Args:
+        session: aiohttp.ClientSession
+        server_address: "ip:port"
+        model: Model name
+        prompt: Prompt for /api/generate
+        messages: Chat messages for /api/chat
+        options: Ollama options (num_predict, num_ctx, temperature, ...)
+        timeout: Total seconds allowed for the request
+        keep_text: Keep the generated text on the sample
+
+    Returns:
+        GenerationSample: Never raises for HTTP or network errors; check .ok
+    """
+    chat = messages is not None
+    url = f"http://{server_address}/api/{'chat' if chat else 'generate'}"
+    payload = {"model": model, "stream": True}
+    if chat:
+        payload["messages"] = messages
+    else:
+        payload["prompt"] = prompt or ""
+    if options:
+        payload["options"] = options
+
+    sample = GenerationSample()
+    pieces = []
+    last_token_ns = None
+    sample.started_ns = time.perf_counter_ns()
+    try:
+        async with session.post(url, json=payload,
+                                timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            sample.status = response.status
+            if response.status != 200:
+                body = await response.text()
+                sample.error = f"HTTP {response.status}: {body[:200]}"
+                return sample
+
+            async for line in response.content:
+                now = time.perf_counter_ns()
+                line = line.strip()
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    sample.error = str(chunk["error"])[:200]
+                    return sample
+
+                piece = chunk["message"].get("content", "") if chat and chunk.get("message") else chunk.get("response", "")
+                if piece:
+                    if last_token_ns is None:
+                        sample.ttft_ns = now - sample.started_ns
+                    else:
+                        sample.inter_token_ns.append(now - last_token_ns)
+                    last_token_ns = now
+                    sample.chunks += 1
+                    sample.chars += len(piece)
+                    if keep_text:
+                        pieces.append(piece)
+
+                if chunk.get("done"):
+                    sample.total_ns = now - sample.started_ns
+                    _apply_final_chunk(sample, chunk)
+                    sample.ok = True
+                    break
+
+            if not sample.ok:
+                sample.error = "Stream ended without a final chunk"
+    except asyncio.TimeoutError:
+        sample.error = f"Timed out after {timeout}s"
+    except (aiohttp.ClientError, ValueError) as e:
+        sample.error = f"{type(e).__name__}: {str(e)[:200]}"
+
+    if keep_text:
+        sample.text = "".join(pieces)
+    return sample
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def reject_outliers(values, k=BENCH_OUTLIER_K):
+    """
+    Split values into (kept, rejected) with Tukey fences at k * IQR
+
+    Fewer than four values are all kept; there is not enough data to call
+    anything an outlier.
+    """
+    if len(values) < 4 or k <= 0:
+        return list(values), []
+    q1, q3 = percentile(values, 25), percentile(values, 75)
+    spread = q3 - q1
+    low, high = q1 - k * spread, q3 + k * spread
+    kept = [v for v in values if low <= v <= high]
+    rejected = [v for v in values if v < low or v > high]
+    return kept, rejected
+
+
+def summarize(values, k=BENCH_OUTLIER_K):
+    """Count, mean, stdev and percentiles of values after outlier rejection"""
+    values = [v for v in values if v is not None]
+    kept, rejected = reject_outliers(values, k)
+    if not kept:
+        return {"count": 0, "outliers": len(rejected)}
+    summary = {
+        "count": len(kept),
+        "outliers": len(rejected),
+        "mean": statistics.fmean(kept),
+        "stdev": statistics.stdev(kept) if len(kept) > 1 else 0.0,
+        "min": min(kept),
+        "max": max(kept),
+    }
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = percentile(kept, pct)
+    return summary
+
+
+def summarize_samples(samples, k=BENCH_OUTLIER_K):
+    """
+    Aggregate a list of GenerationSamples
+
+    Returns:
+        dict: success counts plus summaries for ttft_ms, total_ms, decode_tps,
+        prefill_tps, client_decode_tps, inter_token_ms and tokens
+    """
+    ok = [s for s in samples if s.ok]
+    inter_token_ms = [ns / NS_PER_MS for s in ok for ns in s.inter_token_ns]
+    return {
+        "runs": len(samples),
+        "successes": len(ok),
+        "success_rate": len(ok) / len(samples) if samples else 0.0,
+        "errors": [s.error for s in samples if not s.ok][:5],
+        "ttft_ms": summarize([s.ttft_ns / NS_PER_MS for s in ok if s.ttft_ns is not None], k),
+        "total_ms": summarize([s.total_ns / NS_PER_MS for s in ok if s.total_ns is not None], k),
+        "decode_tps": summarize([s.decode_tps for s in ok], k),
+        "prefill_tps": summarize([s.prefill_tps for s in ok], k),
+        "client_decode_tps": summarize([s.client_decode_tps for s in ok], k),
+        "inter_token_ms": summarize(inter_token_ms, k),
+        "tokens": summarize([s.tokens for s in ok], 0),
+    }
+
+
+class BenchmarkEngine:
+    """
+    Runs repeated streamed generations against one server and model
+
+        async with BenchmarkEngine("10.0.0.5:11434", "qwen2.5:7b") as engine:
+            result = await engine.measure("Explain quantum computing in 50 words")
+            print(format_summary(result["summary"]))
+    """
+
+    def __init__(self, server_address, model, runs=BENCH_RUNS, warmup_runs=BENCH_WARMUP_RUNS,
+                 timeout=BENCH_TIMEOUT, outlier_k=BENCH_OUTLIER_K, session=None):
+        self.server_address = server_address
+        self.model = model
+        self.runs = runs
+        self.warmup_runs = warmup_runs
+        self.timeout = timeout
+        self.outlier_k = outlier_k
+        self._session = session
+        self._owns_session = session is None
+        self.warmed_up = False
+        self.cold_load_ms = None
+
+    async def __aenter__(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_json(self, path, payload=None):
+        """
+        Fetch a small JSON document (e.g. /api/tags) from the server, or None on error
+
+        A payload makes it a POST (e.g. /api/show).
+        """
+        if self._session is None:
+            await self.__aenter__()
+        method = "POST" if payload is not None else "GET"
+        try:
+            async with self._session.request(method, f"http://{self.server_address}{path}", json=payload,
+                                             timeout=aiohttp.ClientTimeout(total=min(self.timeout, 15))) as response:
+                if response.status != 200:
+                    return None
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.debug(f"{method} {path} on {self.server_address} failed: {e}")
+            return None
+
+    async def generate(self, prompt=None, messages=None, options=None, keep_text=False, timeout=None):
+        """One streamed request with the engine's session and (unless given) timeout"""
+        if self._session is None:
+            await self.__aenter__()
+        return await stream_generation(self._session, self.server_address, self.model, prompt=prompt,
+                                       messages=messages, options=options, timeout=timeout or self.timeout,
+                                       keep_text=keep_text)
+
+    async def warm_up(self, prompt="Hi", options=None):
+        """Load the model with throwaway requests; keeps the first load time"""
+        for _ in range(self.warmup_runs):
+            sample = await self.generate(prompt, options=dict(options or {}, num_predict=8))
+            if sample.ok and self.cold_load_ms is None and sample.load_duration_ns:
+                self.cold_load_ms = sample.load_duration_ns / NS_PER_MS
+            if not sample.ok:
+                logger.warning(f"Warm-up request to {self.server_address} failed: {sample.error}")
+        self.warmed_up = True
+
+    async def measure(self, prompt=None, messages=None, options=None, runs=None, concurrency=1):
+        """
+        Warm up (once per engine), then run the prompt runs times
+
+        Args:
+            concurrency: Requests kept in flight at once; 1 measures an idle server
+
+        Returns:
+            dict: {"samples": [sample dicts], "summary": summarize_samples(...)}
+        """
+        if not self.warmed_up:
+            await self.warm_up(options=options)
+
+        runs = runs or self.runs
+        samples = []
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def one():
+            async with semaphore:
+                samples.append(await self.generate(prompt, messages=messages, options=options))
+
+        await asyncio.gather(*(one() for _ in range(runs)))
+        return {
+            "samples": [s.to_dict() for s in samples],
+            "summary": summarize_samples(samples, self.outlier_k),
+        }
+
+
+def _fmt(summary, key, digits=1):
+    value = summary.get(key) if summary else None
+    return "n/a" if value is None else f"{value:.{digits}f}"
+
+
+def format_summary(summary):
+    """Render a summarize_samples() result as a few aligned lines"""
+    lines = [f"  Runs: {summary['successes']}/{summary['runs']} ok"]
+    for key, label, digits in (("ttft_ms", "TTFT (ms)", 1), ("total_ms", "Total (ms)", 1),
+                               ("inter_token_ms", "Inter-token (ms)", 2), ("decode_tps", "Decode tok/s", 1),
+                               ("prefill_tps", "Prefill tok/s", 1)):
+        stats = summary.get(key) or {}
+        if not stats.get("count"):
+            continue
+        outliers = f"  ({stats['outliers']} outliers dropped)" if stats.get("outliers") else ""
+        lines.append(f"  {label:<17} p50 {_fmt(stats, 'p50', digits):>9}  p90 {_fmt(stats, 'p90', digits):>9}"
+                     f"  p99 {_fmt(stats, 'p99', digits):>9}  mean {_fmt(stats, 'mean', digits):>9}{outliers}")
+    if summary.get("errors"):
+        lines.append(f"  Errors: {'; '.join(summary['errors'])}")
+    return "\n".join(lines)
+
+
+def run_measurement(server_address, model, prompt=None, messages=None, options=None, runs=BENCH_RUNS,
+                    warmup_runs=BENCH_WARMUP_RUNS, timeout=BENCH_TIMEOUT, concurrency=1):
+    """Synchronous wrapper around BenchmarkEngine.measure for the CLI scripts"""
+    async def _run():
+        async with BenchmarkEngine(server_address, model, runs=runs, warmup_runs=warmup_runs,
+                                   timeout=timeout) as engine:
+            result = await engine.measure(prompt, messages=messages, options=options, concurrency=concurrency)
+            result["cold_load_ms"] = engine.cold_load_ms
+            return result
+
+    return asyncio.run(_run())
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Load Generator for Ollama Endpoints
+Drives one model on one server through a series of load steps and records
+how latency degrades:
+
+- rate mode (open loop): requests arrive as a Poisson process at a target
+  rate, independent of how fast the server answers, so queueing shows up as
+  latency instead of silently lowering the offered load
+- concurrency mode (closed loop): N workers each keep one request in flight
+
+Each step keeps HDR-style log-linear histograms of TTFT and total latency.
+The saturation point is the first step whose p99 TTFT crosses the threshold
+(or whose error rate gets too high).
+"""
+
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+
+import aiohttp
+
+from .engine import stream_generation, NS_PER_MS
+
+logger = logging.getLogger('load_generator')
+
+# Load test defaults
+LOAD_STEP_SECONDS = float(os.getenv("LOAD_STEP_SECONDS", "30"))
+LOAD_TTFT_THRESHOLD_MS = float(os.getenv("LOAD_TTFT_THRESHOLD_MS", "2000"))
+LOAD_MAX_ERROR_RATE = float(os.getenv("LOAD_MAX_ERROR_RATE", "0.05"))
+LOAD_MAX_INFLIGHT = int(os.getenv("LOAD_MAX_INFLIGHT", "256"))
+LOAD_TIMEOUT = float(os.getenv("LOAD_TIMEOUT", "120"))
+LOAD_PROMPT = "Explain quantum computing in 50 words"
+
+# Histogram resolution: 2^(SUB_BUCKET_BITS-1) linear sub-buckets per power of two (~1.6% error)
+SUB_BUCKET_BITS = 7
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_HALF_SUB_BUCKETS = _SUB_BUCKETS >> 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram in microseconds (HDR histogram layout)
+
+    Values below 128us are counted exactly; above that every power-of-two
+    range is split into 64 equal buckets, so the relative error stays
+    under 1/64 at any magnitude while memory stays a few hundred counters.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.min_us = None
+        self.max_us = None
+
+    @staticmethod
+    def _index(value_us):
+        if value_us < _SUB_BUCKETS:
+            return value_us
+        shift = value_us.bit_length() - SUB_BUCKET_BITS
+        return (shift * _HALF_SUB_BUCKETS) + (value_us >> shift)
+
+    @staticmethod
+    def _value(index):
+        """Midpoint of a bucket"""
+        if index < _SUB_BUCKETS:
+            return index
+        shift = index // _HALF_SUB_BUCKETS - 1
+        low = (index - shift * _HALF_SUB_BUCKETS) << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, value_ms):
+        value_us = max(0, int(value_ms * 1000))
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = value_us if self.max_us is None else max(self.max_us, value_us)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        for attr, pick in (("min_us", min), ("max_us", max)):
+            theirs = getattr(other, attr)
+            if theirs is not None:
+                mine = getattr(self, attr)
+                setattr(self, attr, theirs if mine is None else pick(mine, theirs))
+
+    def percentile(self, pct):
+        """Value in milliseconds at a percentile (None if empty)"""
+        if not self.total:
+            return None
+        if pct >= 100:
+            return self.max_us / 1000.0
+        target = max(1, math.ceil(self.total * pct / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                value = min(max(self._value(index), self.min_us), self.max_us)
+                return value / 1000.0
+        return self.max_us / 1000.0
+
+    def to_dict(self):
+        """Sparse representation for storage: bucket index -> count"""
+        return {
+            "unit": "us",
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "min": self.min_us,
+            "max": self.max_us,
+            "counts": {str(index): count for index, count in sorted(self.counts.items())},
+        }
+
+
+class LoadStep:
+    """Results of one load step"""
+
+    def __init__(self, mode, target, duration):
+        self.mode = mode
+        self.target = target
+        self.duration = duration
+        self.elapsed = 0.0
+        self.requests = 0
+        self.successes = 0
+        self.errors = 0
+        self.shed = 0
+        self.tokens = 0
+        self.error_samples = []
+        self.ttft = LatencyHistogram()
+        self.latency = LatencyHistogram()
+        self.saturated = False
+
+    def add(self, sample):
+        self.requests += 1
+        if not sample.ok:
+            self.errors += 1
+            if len(self.error_samples) < 3:
+                self.error_samples.append(sample.error)
+            return
+        self.successes += 1
+        self.tokens += sample.tokens or 0
+        if sample.ttft_ns is not None:
+            self.ttft.record(sample.ttft_ns / NS_PER_MS)
+        if sample.total_ns is not None:
+            self.latency.record(sample.total_ns / NS_PER_MS)
+
+    @property
+    def error_rate(self):
+        attempted = self.requests + self.shed
+        return (self.errors + self.shed) / attempted if attempted else 0.0
+
+    @property
+    def achieved_rps(self):
+        return self.successes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def tokens_per_sec(self):
+        return self.tokens / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        return {
+            "mode": self.mode,
+            "target": self.target,
+            "duration": self.duration,
+            "elapsed": self.elapsed,
+            "requests": self.requests,
+            "successes": self.successes,
+            "errors": self.errors,
+            "shed": self.shed,
+            "achieved_rps": self.achieved_rps,
+            "tokens_per_sec": self.tokens_per_sec,
+            "ttft_p50": self.ttft.percentile(50),
+            "ttft_p90": self.ttft.percentile(90),
+            "ttft_p99": self.ttft.percentile(99),
+            "latency_p50": self.latency.percentile(50),
+            "latency_p90": self.latency.percentile(90),
+            "latency_p99": self.latency.percentile(99),
+            "saturated": self.saturated,
+            "errors_sample": self.error_samples,
+        }
+
+
+class LoadGenerator:
+    """Runs rate or concurrency steps against one server/model"""
+
+    def __init__(self, server_address, model, prompt=LOAD_PROMPT, options=None, timeout=LOAD_TIMEOUT,
+                 max_inflight=LOAD_MAX_INFLIGHT, seed=None):
+        self.server_address = server_address
+        self.model = model
+        self.prompt = prompt
+        self.options = options
+        self.timeout = timeout
+        self.max_inflight = max_inflight
+        self.random = random.Random(seed)
+
+    async def _one(self, session, step):
+        sample = await stream_generation(session, self.server_address, self.model, prompt=self.prompt,
+                                         options=self.options, timeout=self.timeout)
+        step.add(sample)
+
+    async def run_rate_step(self, session, rate, duration):
+        """Open loop: Poisson arrivals at rate req/s for duration seconds"""
+        step = LoadStep("rate", rate, duration)
+        inflight = set()
+        started = time.perf_counter()
+        next_arrival = started
+        deadline = started + duration
+
+        while True:
+            next_arrival += self.random.expovariate(rate)
+            if next_arrival >= deadline:
+                break
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(inflight) >= self.max_inflight:
+                # The client is the bottleneck now; count the arrival as lost load
+                step.shed += 1
+                continue
+            task = asyncio.ensure_future(self._one(session, step))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+
+        if inflight:
+            await asyncio.gather(*inflight, return_exceptions=True)
+        step.elapsed = time.perf_counter() - started
+        return step
+
+    async def run_concurrency_step(self, session, concurrency, duration):
+        """Closed loop: concurrency workers issuing back-to-back requests for duration seconds"""
+        step = LoadStep("concurrency", concurrency, duration)
+        started = time.perf_counter()
+        deadline = started + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self._one(session, step)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        step.elapsed = time.perf_counter() - started
+        return step
+
+    async def run(self, mode, targets, step_seconds=LOAD_STEP_SECONDS, ttft_threshold_ms=LOAD_TTFT_THRESHOLD_MS,
+                  max_error_rate=LOAD_MAX_ERROR_RATE, stop_at_saturation=True):
+        """
+        Run the steps in order
+
+        Args:
+            mode: "rate" (targets are req/s) or "concurrency" (targets are worker counts)
+            targets: Increasing list of step targets
+            stop_at_saturation: Skip the remaining steps once one saturates
+
+        Returns:
+            dict: {"steps": [LoadStep], "saturation": target or None, "sustainable": target or None}
+        """
+        connector = aiohttp.TCPConnector(limit=0)
+        steps = []
+        saturation = None
+        sustainable = None
+        async with aiohttp.ClientSession(connector=connector) as session:
+            for target in targets:
+                logger.info(f"Load step {mode}={target} for {step_seconds}s on {self.server_address} ({self.model})")
+                if mode == "rate":
+                    step = await self.run_rate_step(session, float(target), step_seconds)
+                else:
+                    step = await self.run_concurrency_step(session, int(target), step_seconds)
+
+                p99 = step.ttft.percentile(99)
+                step.saturated = (step.successes == 0 or step.error_rate > max_error_rate
+                                  or (p99 is not None and p99 > ttft_threshold_ms))
+                steps.append(step)
+                logger.info(format_step(step))
+
+                if step.saturated:
+                    saturation = target
+                    if stop_at_saturation:
+                        break
+                elif saturation is None:
+                    sustainable = target
+
+        return {"steps": steps, "saturation": saturation, "sustainable": sustainable}
+
+
+def parse_targets(value):
+    """Parse "1,2,4" or a geometric "start:stop:factor" range like "0.5:8:2" """
+    if ":" in value:
+        start, stop, factor = (float(part) for part in value.split(":"))
+        targets = []
+        current = start
+        while current <= stop * 1.0001:
+            targets.append(round(current, 3))
+            current *= factor
+        return targets
+    return [float(part) for part in value.split(",") if part.strip()]
+
+
+def _ms(value):
+    return "n/a" if value is None else f"{value:.0f}"
+
+
+def format_step(step):
+    """One line per step"""
+    return (f"  {step.mode}={step.target:<6g} ok {step.successes:>5} err {step.errors:>4} shed {step.shed:>4} "
+            f"| {step.achieved_rps:6.2f} req/s {step.tokens_per_sec:7.1f} tok/s "
+            f"| TTFT p50/p90/p99 {_ms(step.ttft.percentile(50))}/{_ms(step.ttft.percentile(90))}/"
+            f"{_ms(step.ttft.percentile(99))} ms "
+            f"| latency p99 {_ms(step.latency.percentile(99))} ms{'  SATURATED' if step.saturated else ''}")
+
+
+def format_load_results(result, ttft_threshold_ms=LOAD_TTFT_THRESHOLD_MS):
+    lines = ["LOAD TEST:"]
+    lines.extend(format_step(step) for step in result["steps"])
+    if result["saturation"] is not None:
+        lines.append(f"  Saturation: p99 TTFT above {ttft_threshold_ms:.0f} ms (or errors) at "
+                     f"{result['steps'][0].mode}={result['saturation']:g}")
+    else:
+        lines.append("  Saturation: not reached")
+    if result["sustainable"] is not None:
+        lines.append(f"  Highest sustainable step: {result['sustainable']:g}")
+    return "\n".join(lines)
+
+
+def histogram_json(histogram):
+    return json.dumps(histogram.to_dict(), separators=(",", ":"))
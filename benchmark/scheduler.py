@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Benchmark Campaign Scheduler
+
+Runs a list of (server, model) benchmark jobs concurrently across hosts but
+strictly one at a time per host, so two measurements never share a GPU.
+Each host gets its own worker thread that, per model, pre-loads the model
+with a long keep_alive, runs the benchmark, then unloads it so the next
+model starts from a clean card.
+
+Progress is checkpointed to a JSON file after every job; running again with
+resume picks up the campaign where it stopped, skipping finished jobs.
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import aiohttp
+
+logger = logging.getLogger('benchmark.scheduler')
+
+# Hosts benchmarked at the same time (each host still runs one job at a time)
+BENCH_PARALLEL_HOSTS = int(os.getenv("BENCH_PARALLEL_HOSTS", "4"))
+# keep_alive used to pre-load a model before it is measured
+BENCH_KEEP_ALIVE = os.getenv("BENCH_KEEP_ALIVE", "30m")
+# Campaign checkpoint file
+BENCH_CHECKPOINT = os.getenv("BENCH_CHECKPOINT", "benchmark_campaign.json")
+# Attempts per job before a resumed campaign stops retrying it
+BENCH_MAX_ATTEMPTS = int(os.getenv("BENCH_MAX_ATTEMPTS", "2"))
+
+# Loading a large model from disk can take minutes
+PRELOAD_TIMEOUT = 600
+
+JOB_PENDING = "pending"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def load_host_allowlist(path):
+    """
+    Read a host allow-list: one "host" or "host:port" per line, # comments allowed
+
+    Returns:
+        set: entries as written ("10.0.0.5" allows every port, "10.0.0.5:11434" only that one)
+    """
+    entries = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                entries.add(line)
+    return entries
+
+def host_allowed(allowlist, ip, port):
+    """True when there is no allow-list, or it lists the host or host:port"""
+    return not allowlist or ip in allowlist or f"{ip}:{port}" in allowlist
+
+
+class BenchmarkJob:
+    """One model on one server, plus its progress in the campaign"""
+
+    def __init__(self, ip, port, model, endpoint_id=None, model_id=None, status=JOB_PENDING,
+                 attempts=0, run_key=None, error=None, finished_at=None):
+        self.ip = ip
+        self.port = int(port)
+        self.model = model
+        self.endpoint_id = endpoint_id
+        self.model_id = model_id
+        self.status = status
+        self.attempts = attempts
+        self.run_key = run_key
+        self.error = error
+        self.finished_at = finished_at
+
+    @property
+    def server(self):
+        return f"{self.ip}:{self.port}"
+
+    @property
+    def key(self):
+        return f"{self.server}/{self.model}"
+
+    def to_dict(self):
+        return {
+            "ip": self.ip,
+            "port": self.port,
+            "model": self.model,
+            "endpoint_id": self.endpoint_id,
+            "model_id": self.model_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "run_key": self.run_key,
+            "error": self.error,
+            "finished_at": self.finished_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class Campaign:
+    """A set of jobs and where they stand, persisted to a checkpoint file"""
+
+    def __init__(self, jobs, path=BENCH_CHECKPOINT, campaign_id=None, created_at=None):
+        self.jobs = {job.key: job for job in jobs}
+        self.path = path
+        self.campaign_id = campaign_id or f"{datetime.now():%Y%m%d-%H%M}-{uuid.uuid4().hex[:4]}"
+        self.created_at = created_at or datetime.now().isoformat(timespec="seconds")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls([BenchmarkJob.from_dict(job) for job in data["jobs"]], path,
+                   data["campaign_id"], data.get("created_at"))
+
+    @classmethod
+    def resume_or_create(cls, jobs, path=BENCH_CHECKPOINT, resume=False):
+        """
+        Start a campaign for jobs, or with resume carry over progress from the
+        checkpoint; jobs that are only in the checkpoint are kept as they were
+        """
+        if not resume or not os.path.exists(path):
+            return cls(jobs, path)
+        campaign = cls.load(path)
+        for job in jobs:
+            campaign.jobs.setdefault(job.key, job)
+        done = sum(1 for job in campaign.jobs.values() if job.status == JOB_DONE)
+        logger.info(f"Resuming campaign {campaign.campaign_id}: {done}/{len(campaign.jobs)} jobs already done")
+        return campaign
+
+    def save(self):
+        """Write the checkpoint atomically"""
+        payload = {
+            "campaign_id": self.campaign_id,
+            "created_at": self.created_at,
+            "jobs": [job.to_dict() for job in self.jobs.values()],
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def record(self, job, status, run_key=None, error=None):
+        """Update one job and checkpoint; called from host worker threads"""
+        with self._lock:
+            job.status = status
+            job.run_key = run_key or job.run_key
+            job.error = error
+            job.finished_at = datetime.now().isoformat(timespec="seconds")
+            self.save()
+
+    def runnable(self, max_attempts=BENCH_MAX_ATTEMPTS):
+        """Jobs still to run: pending, or failed with attempts left"""
+        return [job for job in self.jobs.values()
+                if job.status == JOB_PENDING or (job.status == JOB_FAILED and job.attempts < max_attempts)]
+
+    def counts(self):
+        counts = {JOB_PENDING: 0, JOB_DONE: 0, JOB_FAILED: 0}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return counts
+
+
+async def _post_generate(server, payload, timeout):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(f"http://{server}/api/generate", json=dict(payload, stream=False),
+                                timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            body = await response.json(content_type=None)
+            if response.status != 200:
+                raise RuntimeError(body.get("error") if isinstance(body, dict) else f"HTTP {response.status}")
+            return body
+
+def preload_model(server, model, keep_alive=BENCH_KEEP_ALIVE):
+    """Load a model without generating and keep it resident; returns load time in ms (None if unknown)"""
+    started = time.perf_counter()
+    body = asyncio.run(_post_generate(server, {"model": model, "keep_alive": keep_alive}, PRELOAD_TIMEOUT))
+    if body.get("load_duration"):
+        return body["load_duration"] / 1_000_000
+    return (time.perf_counter() - started) * 1000.0
+
+def unload_model(server, model):
+    """Ask the server to drop a model from memory; failures are only logged"""
+    try:
+        asyncio.run(_post_generate(server, {"model": model, "keep_alive": 0}, 60))
+    except Exception as e:
+        logger.warning(f"Could not unload {model} on {server}: {e}")
+
+async def _list_models(server):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"http://{server}/api/tags", timeout=aiohttp.ClientTimeout(total=15)) as response:
+            response.raise_for_status()
+            body = await response.json(content_type=None)
+            return [model["name"] for model in body.get("models", [])]
+
+def discover_jobs(allowlist, default_port=11434, model_filter=None):
+    """Jobs for every model an allow-listed host serves (hosts without a port use default_port)"""
+    jobs = []
+    for entry in sorted(allowlist):
+        ip, _, port = entry.partition(":")
+        server = f"{ip}:{port or default_port}"
+        try:
+            models = asyncio.run(_list_models(server))
+        except Exception as e:
+            logger.warning(f"Could not list models on {server}: {e}")
+            continue
+        jobs.extend(BenchmarkJob(ip, port or default_port, model) for model in models
+                    if not model_filter or model_filter in model)
+    return jobs
+
+
+class CampaignScheduler:
+    """
+    Runs a campaign's jobs: hosts in parallel, jobs on one host in sequence
+
+    Args:
+        benchmark: callable(job, preload_ms) -> results dict; runs in a host worker thread
+        save: callable(job, results) -> run key or None; called under the campaign lock
+        succeeded: callable(results) -> bool deciding whether a job is done
+    """
+
+    def __init__(self, campaign, benchmark, save=None, succeeded=None, parallel_hosts=BENCH_PARALLEL_HOSTS,
+                 keep_alive=BENCH_KEEP_ALIVE, preload=True, unload=True, max_attempts=BENCH_MAX_ATTEMPTS):
+        self.campaign = campaign
+        self.benchmark = benchmark
+        self.save = save
+        self.succeeded = succeeded or (lambda results: True)
+        self.parallel_hosts = max(1, parallel_hosts)
+        self.keep_alive = keep_alive
+        self.preload = preload
+        self.unload = unload
+        self.max_attempts = max_attempts
+        self._save_lock = threading.Lock()
+
+    def _by_host(self):
+        hosts = {}
+        for job in self.campaign.runnable(self.max_attempts):
+            hosts.setdefault(job.ip, []).append(job)
+        return hosts
+
+    def _run_job(self, job):
+        job.attempts += 1
+        preload_ms = None
+        if self.preload:
+            try:
+                preload_ms = preload_model(job.server, job.model, self.keep_alive)
+                logger.info(f"Pre-loaded {job.model} on {job.server} in {preload_ms:.0f} ms")
+            except Exception as e:
+                self.campaign.record(job, JOB_FAILED, error=f"preload failed: {e}")
+                logger.warning(f"Skipping {job.key}: preload failed: {e}")
+                return None
+
+        try:
+            results = self.benchmark(job, preload_ms)
+            if not self.succeeded(results):
+                self.campaign.record(job, JOB_FAILED, error="benchmark failed")
+                return results
+            run_key = None
+            if self.save:
+                with self._save_lock:
+                    run_key = self.save(job, results)
+            self.campaign.record(job, JOB_DONE, run_key=run_key)
+            return results
+        except Exception as e:
+            logger.error(f"Benchmark of {job.key} failed: {e}")
+            self.campaign.record(job, JOB_FAILED, error=str(e))
+            return None
+        finally:
+            if self.unload:
+                unload_model(job.server, job.model)
+
+    def _run_host(self, ip, jobs):
+        results = []
+        for job in jobs:
+            logger.info(f"[{ip}] {job.model} ({len(results) + 1}/{len(jobs)})")
+            result = self._run_job(job)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def run(self):
+        """Run every runnable job; returns the results dicts of the jobs that ran"""
+        hosts = self._by_host()
+        self.campaign.save()
+        if not hosts:
+            logger.info(f"Campaign {self.campaign.campaign_id} has nothing left to run")
+            return []
+
+        jobs = sum(len(host_jobs) for host_jobs in hosts.values())
+        logger.info(f"Campaign {self.campaign.campaign_id}: {jobs} jobs on {len(hosts)} hosts, "
+                    f"{min(self.parallel_hosts, len(hosts))} hosts at a time")
+
+        all_results = []
+        with ThreadPoolExecutor(max_workers=self.parallel_hosts, thread_name_prefix="bench-host") as executor:
+            futures = {executor.submit(self._run_host, ip, host_jobs): ip for ip, host_jobs in hosts.items()}
+            for future in as_completed(futures):
+                ip = futures[future]
+                try:
+                    all_results.extend(future.result())
+                except Exception as e:
+                    logger.error(f"Host worker for {ip} failed: {e}")
+
+        counts = self.campaign.counts()
+        logger.info(f"Campaign {self.campaign.campaign_id}: {counts[JOB_DONE]} done, "
+                    f"{counts[JOB_FAILED]} failed, {counts[JOB_PENDING]} pending")
+        return all_results
@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+Benchmark Results Store
+
+Every benchmark run gets one row in benchmark_runs with a manifest that
+says what was measured (model digest, quantization, server version, host
+label, client version), and its numbers go to benchmark_metrics in long
+format - one row per (metric, percentile, tags) - so new metrics never need
+a schema change and two runs can be diffed metric by metric.
+
+The wide benchmark_results row and the per-step benchmark_load_steps rows
+are still written for the tools that read them.
+"""
+
+import os
+import json
+import uuid
+import math
+from datetime import datetime
+
+from database import Database, init_database, DATABASE_TYPE
+from .engine import PERCENTILES
+from .load import histogram_json
+
+# Database configuration
+if DATABASE_TYPE == "sqlite":
+    DB_FILE = os.getenv("SQLITE_DB_PATH", "ollama_instances.db")
+else:
+    # For PostgreSQL, we don't need a DB_FILE
+    DB_FILE = None
+
+# Sample summary fields stored for each test phase (simple, throughput, concurrency)
+SUMMARY_FIELDS = ("ttft_ms", "total_ms", "decode_tps", "prefill_tps", "client_decode_tps", "inter_token_ms", "tokens")
+
+
+def _table_exists(name):
+    if DATABASE_TYPE == "sqlite":
+        query = "SELECT COUNT(*) FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?"
+    else:
+        query = """
+            SELECT COUNT(*) FROM information_schema.tables
+            WHERE table_schema = 'public' AND table_name = ?
+        """
+    return Database.fetch_one(query, (name,))[0] > 0
+
+def _column_exists(table, column):
+    if DATABASE_TYPE == "sqlite":
+        return any(row[1] == column for row in Database.fetch_all(f"PRAGMA table_info({table})"))
+    row = Database.fetch_one("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_name = ? AND column_name = ?
+    """, (table, column))
+    return row[0] > 0
+
+def ensure_schema():
+    """Initialize the database and create the benchmark tables if they don't exist"""
+    # For SQLite, check if database file exists
+    if DATABASE_TYPE == "sqlite" and DB_FILE is not None:
+        if not os.path.exists(DB_FILE):
+            print(f"ERROR: Database file {DB_FILE} not found!")
+            print("Run ollama_scanner.py first to collect data.")
+            return False
+
+    # Initialize database connection
+    init_database()
+
+    if not _table_exists("endpoints"):
+        print("ERROR: Database does not contain the required tables.")
+        print("Run ollama_scanner.py first to collect data.")
+        return False
+
+    if DATABASE_TYPE == "sqlite":
+        queries = [
+            '''
+            CREATE TABLE IF NOT EXISTS benchmark_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                endpoint_id INTEGER NOT NULL,
+                model_id INTEGER,
+                test_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                avg_response_time REAL,
+                tokens_per_second REAL,
+                first_token_latency REAL,
+                throughput_tokens REAL,
+                throughput_time REAL,
+                context_500_tps REAL,
+                context_1000_tps REAL,
+                context_2000_tps REAL,
+                max_concurrent_requests INTEGER,
+                concurrency_success_rate REAL,
+                concurrency_avg_time REAL,
+                success_rate REAL,
+                FOREIGN KEY (endpoint_id) REFERENCES endpoints (id) ON DELETE CASCADE,
+                FOREIGN KEY (model_id) REFERENCES models (id) ON DELETE SET NULL
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS benchmark_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_key TEXT NOT NULL UNIQUE,
+                started_at TEXT NOT NULL,
+                server TEXT NOT NULL,
+                model TEXT NOT NULL,
+                endpoint_id INTEGER,
+                model_id INTEGER,
+                model_digest TEXT,
+                quantization TEXT,
+                parameter_size TEXT,
+                server_version TEXT,
+                host_label TEXT,
+                client_version TEXT,
+                client_host TEXT,
+                tags TEXT
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS benchmark_metrics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id INTEGER NOT NULL,
+                metric TEXT NOT NULL,
+                value REAL NOT NULL,
+                percentile REAL,
+                tags TEXT NOT NULL DEFAULT '{}',
+                FOREIGN KEY (run_id) REFERENCES benchmark_runs (id) ON DELETE CASCADE
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS benchmark_load_steps (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                benchmark_id INTEGER,
+                run_id INTEGER,
+                server TEXT NOT NULL,
+                model TEXT NOT NULL,
+                test_date TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                step_index INTEGER NOT NULL,
+                target REAL NOT NULL,
+                duration REAL,
+                requests INTEGER,
+                successes INTEGER,
+                errors INTEGER,
+                shed INTEGER,
+                achieved_rps REAL,
+                tokens_per_sec REAL,
+                ttft_p50 REAL,
+                ttft_p90 REAL,
+                ttft_p99 REAL,
+                latency_p50 REAL,
+                latency_p90 REAL,
+                latency_p99 REAL,
+                ttft_threshold_ms REAL,
+                saturated INTEGER DEFAULT 0,
+                ttft_histogram TEXT,
+                latency_histogram TEXT,
+                FOREIGN KEY (benchmark_id) REFERENCES benchmark_results(id),
+                FOREIGN KEY (run_id) REFERENCES benchmark_runs(id) ON DELETE CASCADE
+            )
+            ''',
+        ]
+    else:
+        # PostgreSQL
+        queries = [
+            '''
+            CREATE TABLE IF NOT EXISTS benchmark_results (
+                id SERIAL PRIMARY KEY,
+                endpoint_id INTEGER NOT NULL REFERENCES endpoints(id) ON DELETE CASCADE,
+                model_id INTEGER REFERENCES models(id) ON DELETE SET NULL,
+                test_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                avg_response_time NUMERIC(10, 4),
+                tokens_per_second NUMERIC(10, 4),
+                first_token_latency NUMERIC(10, 4),
+                throughput_tokens NUMERIC(10, 4),
+                throughput_time NUMERIC(10, 4),
+                context_500_tps NUMERIC(10, 4),
+                context_1000_tps NUMERIC(10, 4),
+                context_2000_tps NUMERIC(10, 4),
+                max_concurrent_requests INTEGER,
+                concurrency_success_rate NUMERIC(5, 4),
+                concurrency_avg_time NUMERIC(10, 4),
+                success_rate NUMERIC(5, 4)
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS benchmark_runs (
+                id SERIAL PRIMARY KEY,
+                run_key TEXT NOT NULL UNIQUE,
+                started_at TIMESTAMP NOT NULL,
+                server TEXT NOT NULL,
+                model TEXT NOT NULL,
+                endpoint_id INTEGER REFERENCES endpoints(id) ON DELETE SET NULL,
+                model_id INTEGER REFERENCES models(id) ON DELETE SET NULL,
+                model_digest TEXT,
+                quantization TEXT,
+                parameter_size TEXT,
+                server_version TEXT,
+                host_label TEXT,
+                client_version TEXT,
+                client_host TEXT,
+                tags JSONB
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS benchmark_metrics (
+                id BIGSERIAL PRIMARY KEY,
+                run_id INTEGER NOT NULL REFERENCES benchmark_runs(id) ON DELETE CASCADE,
+                metric TEXT NOT NULL,
+                value DOUBLE PRECISION NOT NULL,
+                percentile REAL,
+                tags TEXT NOT NULL DEFAULT '{}'
+            )
+            ''',
+            '''
+            CREATE TABLE IF NOT EXISTS benchmark_load_steps (
+                id SERIAL PRIMARY KEY,
+                benchmark_id INTEGER REFERENCES benchmark_results(id) ON DELETE CASCADE,
+                run_id INTEGER REFERENCES benchmark_runs(id) ON DELETE CASCADE,
+                server TEXT NOT NULL,
+                model TEXT NOT NULL,
+                test_date TIMESTAMP NOT NULL,
+                mode TEXT NOT NULL,
+                step_index INTEGER NOT NULL,
+                target REAL NOT NULL,
+                duration REAL,
+                requests INTEGER,
+                successes INTEGER,
+                errors INTEGER,
+                shed INTEGER,
+                achieved_rps REAL,
+                tokens_per_sec REAL,
+                ttft_p50 REAL,
+                ttft_p90 REAL,
+                ttft_p99 REAL,
+                latency_p50 REAL,
+                latency_p90 REAL,
+                latency_p99 REAL,
+                ttft_threshold_ms REAL,
+                saturated BOOLEAN DEFAULT FALSE,
+                ttft_histogram TEXT,
+                latency_histogram TEXT
+            )
+            ''',
+        ]
+
+    for query in queries:
+        Database.execute(query)
+
+    # benchmark_load_steps tables created before runs existed have no run_id
+    if not _column_exists("benchmark_load_steps", "run_id"):
+        Database.execute("ALTER TABLE benchmark_load_steps ADD COLUMN run_id INTEGER")
+
+    Database.execute("CREATE INDEX IF NOT EXISTS idx_benchmark_load_steps_benchmark ON benchmark_load_steps(benchmark_id)")
+    Database.execute("CREATE INDEX IF NOT EXISTS idx_benchmark_load_steps_run ON benchmark_load_steps(run_id)")
+    Database.execute("CREATE INDEX IF NOT EXISTS idx_benchmark_metrics_run ON benchmark_metrics(run_id, metric)")
+    Database.execute("CREATE INDEX IF NOT EXISTS idx_benchmark_runs_model ON benchmark_runs(model, server, started_at)")
+    return True
+
+def get_model_server_pairs(model_filter=None, server_filter=None, limit=None):
+    """Get (model_id, endpoint_id, model_name, parameter_size, quantization_level, size_mb, ip, port) rows"""
+    query = """
+    SELECT
+        m.id as model_id,
+        e.id as endpoint_id,
+        m.name as model_name,
+        m.parameter_size,
+        m.quantization_level,
+        m.size_mb,
+        e.ip,
+        e.port
+    FROM models m
+    JOIN endpoints e ON m.endpoint_id = e.id
+    WHERE e.verified = 1
+    """
+    params = []
+
+    # Add model filter if specified
+    if model_filter:
+        query += " AND m.name LIKE ?"
+        params.append(f"%{model_filter}%")
+
+    # Add server filter if specified
+    if server_filter:
+        query += " AND e.ip = ?"
+        params.append(server_filter)
+
+    # Order by model name and server
+    query += " ORDER BY m.name, e.ip, e.port"
+
+    # Add limit if specified
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    return Database.fetch_all(query, params)
+
+def _finite(value):
+    """None for missing or infinite values (failed tests report inf)"""
+    if value is None or isinstance(value, bool):
+        return value
+    return value if math.isfinite(value) else None
+
+def _tags_json(tags):
+    # Sorted keys so equal tags compare equal as strings
+    return json.dumps(tags or {}, sort_keys=True, separators=(",", ":"))
+
+def flatten_results(results):
+    """
+    Turn a results dict from the suite into long-format metric rows
+
+    Returns:
+        list: (metric, value, percentile, tags) tuples, e.g.
+        ("simple.ttft_ms", 81.2, 99, {}) or ("load.ttft_ms", 640.0, 99, {"mode": "rate", "target": 2})
+    """
+    rows = []
+
+    def add(metric, value, pct=None, tags=None):
+        value = _finite(value)
+        if value is not None:
+            rows.append((metric, float(value), pct, tags or {}))
+
+    for phase, summary in (results.get("summaries") or {}).items():
+        add(f"{phase}.success_rate", summary.get("success_rate"))
+        for field in SUMMARY_FIELDS:
+            stats = summary.get(field) or {}
+            if not stats.get("count"):
+                continue
+            add(f"{phase}.{field}.mean", stats["mean"])
+            add(f"{phase}.{field}.stdev", stats["stdev"])
+            for pct in PERCENTILES:
+                add(f"{phase}.{field}", stats[f"p{pct}"], pct)
+
+    if results.get("cold_load_time") is not None:
+        add("cold_load_ms", results["cold_load_time"] * 1000.0)
+
+    sweep = results.get("context_sweep")
+    if sweep:
+        for step in sweep["steps"]:
+            tags = {"context_tokens": step["target_tokens"]}
+            add("context.success_rate", 1.0 if step["success"] and not step["truncated"] else 0.0, tags=tags)
+            if step["success"]:
+                add("context.prompt_tokens", step["prompt_tokens"], tags=tags)
+                add("context.prefill_tps", step["prefill_tps"], tags=tags)
+                add("context.decode_tps", step["decode_tps"], tags=tags)
+                add("context.ttft_ms", step["ttft_ms"], tags=tags)
+                add("context.total_ms", step["total_ms"], tags=tags)
+        # Only comparable between sweeps that went up to the same size
+        add("context.max_tokens", sweep["max_context_tokens"],
+            tags={"num_ctx": "set" if sweep["set_num_ctx"] else "default", "up_to": sweep["targets"][-1]})
+
+    load = results.get("load_test")
+    if load:
+        for step in load["steps"]:
+            row = step.to_dict()
+            tags = {"mode": row["mode"], "target": row["target"]}
+            add("load.achieved_rps", row["achieved_rps"], tags=tags)
+            add("load.tokens_per_sec", row["tokens_per_sec"], tags=tags)
+            add("load.error_rate", step.error_rate, tags=tags)
+            for pct in PERCENTILES:
+                add("load.ttft_ms", row[f"ttft_p{pct}"], pct, tags)
+                add("load.latency_ms", row[f"latency_p{pct}"], pct, tags)
+        mode = load["steps"][0].mode if load["steps"] else None
+        add("load.sustainable", load.get("sustainable"), tags={"mode": mode})
+        add("load.saturation", load.get("saturation"), tags={"mode": mode})
+
+    return rows
+
+def _lookup_endpoint_id(server):
+    ip, _, port = server.rpartition(":")
+    row = Database.fetch_one("SELECT id FROM endpoints WHERE ip = ? AND port = ?", (ip, int(port)))
+    return row[0] if row else None
+
+def create_run(results, tags=None):
+    """Insert the benchmark_runs row for a results dict and return its id"""
+    manifest = results.get("manifest") or {}
+    run_key = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+    endpoint_id = results.get("server_id")
+    if endpoint_id is None:
+        endpoint_id = _lookup_endpoint_id(results["server"])
+
+    Database.execute('''
+    INSERT INTO benchmark_runs (
+        run_key, started_at, server, model, endpoint_id, model_id, model_digest, quantization,
+        parameter_size, server_version, host_label, client_version, client_host, tags
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        run_key, results["test_date"], results["server"], results["model"], endpoint_id,
+        results.get("model_id"), manifest.get("model_digest"), manifest.get("quantization"),
+        manifest.get("parameter_size"), manifest.get("server_version"), manifest.get("host_label"),
+        manifest.get("client_version"), manifest.get("client_host"), _tags_json(tags)
+    ))
+    row = Database.fetch_one("SELECT id FROM benchmark_runs WHERE run_key = ?", (run_key,))
+    results["run_key"] = run_key
+    return row[0]
+
+def record_metrics(run_id, rows):
+    """Insert (metric, value, percentile, tags) rows for a run in one transaction"""
+    if rows:
+        Database.transaction([(
+            "INSERT INTO benchmark_metrics (run_id, metric, value, percentile, tags) VALUES (?, ?, ?, ?, ?)",
+            (run_id, metric, value, pct, _tags_json(tags))
+        ) for metric, value, pct, tags in rows])
+
+def save_legacy_results(results):
+    """
+    Write the wide benchmark_results row (needs a known endpoint) and return its id
+
+    The context_*_tps columns were word-count based; the token sweep lives in
+    benchmark_metrics, so they are written as NULL (not measured) rather than 0 tok/s.
+    """
+    endpoint_id = results.get("server_id")
+    if endpoint_id is None or "simple_success_rate" not in results:
+        return None
+
+    Database.execute('''
+    INSERT INTO benchmark_results (
+        endpoint_id, model_id, test_date, avg_response_time, tokens_per_second,
+        first_token_latency, throughput_tokens, throughput_time,
+        context_500_tps, context_1000_tps, context_2000_tps, max_concurrent_requests,
+        concurrency_success_rate, concurrency_avg_time, success_rate
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        endpoint_id, results.get("model_id"), results["test_date"],
+        _finite(results.get("simple_avg_time")), results.get("simple_tokens_per_sec", 0),
+        _finite(results.get("first_token_latency")), results.get("throughput_tokens", 0),
+        results.get("throughput_time", 0), None, None, None,
+        results.get("max_concurrent_requests"), results.get("concurrency_success_rate", 0),
+        _finite(results.get("concurrency_avg_time")), results.get("simple_success_rate", 0)
+    ))
+
+    # Look the row up again so load steps can reference it on both database types
+    row = Database.fetch_one(
+        "SELECT MAX(id) FROM benchmark_results WHERE endpoint_id = ? AND test_date = ?",
+        (endpoint_id, results["test_date"])
+    )
+    return row[0] if row else None
+
+def save_load_results(results, run_id=None, benchmark_id=None):
+    """Save each load test step, linked to its run (and benchmark_results row when there is one)"""
+    load = results["load_test"]
+    threshold = load.get("ttft_threshold_ms")
+
+    queries = []
+    for index, step in enumerate(load["steps"]):
+        row = step.to_dict()
+        saturated = bool(row["saturated"]) if DATABASE_TYPE == "postgres" else int(row["saturated"])
+        queries.append(('''
+        INSERT INTO benchmark_load_steps (
+            benchmark_id, run_id, server, model, test_date, mode, step_index, target, duration,
+            requests, successes, errors, shed, achieved_rps, tokens_per_sec,
+            ttft_p50, ttft_p90, ttft_p99, latency_p50, latency_p90, latency_p99,
+            ttft_threshold_ms, saturated, ttft_histogram, latency_histogram
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            benchmark_id, run_id, results["server"], results["model"], results["test_date"], row["mode"], index,
+            row["target"], row["elapsed"], row["requests"], row["successes"], row["errors"], row["shed"],
+            row["achieved_rps"], row["tokens_per_sec"], row["ttft_p50"], row["ttft_p90"], row["ttft_p99"],
+            row["latency_p50"], row["latency_p90"], row["latency_p99"], threshold, saturated,
+            histogram_json(step.ttft), histogram_json(step.latency)
+        )))
+
+    if queries:
+        Database.transaction(queries)
+
+def save_benchmark_results(results, tags=None):
+    """
+    Store a suite results dict: run manifest, long-format metrics, the legacy
+    benchmark_results row and any load steps
+
+    Returns:
+        int: benchmark_runs id
+    """
+    run_id = create_run(results, tags)
+    rows = flatten_results(results)
+    record_metrics(run_id, rows)
+    benchmark_id = save_legacy_results(results)
+    if results.get("load_test"):
+        save_load_results(results, run_id, benchmark_id)
+
+    print(f"Benchmark run {results['run_key']} saved ({len(rows)} metrics) for {results['model']} on {results['server']}")
+    return run_id
+
+def _run_from_row(row):
+    keys = ("id", "run_key", "started_at", "server", "model", "model_digest", "quantization",
+            "parameter_size", "server_version", "host_label", "client_version", "tags")
+    run = dict(zip(keys, row))
+    run["tags"] = json.loads(run["tags"]) if isinstance(run["tags"], str) else (run["tags"] or {})
+    return run
+
+_RUN_COLUMNS = """id, run_key, started_at, server, model, model_digest, quantization,
+                  parameter_size, server_version, host_label, client_version, tags"""
+
+def list_runs(model_filter=None, server_filter=None, limit=10):
+    """Most recent runs first, optionally filtered by model name and server"""
+    query = f"SELECT {_RUN_COLUMNS} FROM benchmark_runs WHERE 1 = 1"
+    params = []
+    if model_filter:
+        query += " AND model LIKE ?"
+        params.append(f"%{model_filter}%")
+    if server_filter:
+        query += " AND server LIKE ?"
+        params.append(f"{server_filter}%")
+    query += " ORDER BY started_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    return [_run_from_row(row) for row in Database.fetch_all(query, params)]
+
+def get_run(ref):
+    """A run by numeric id or run_key, or None"""
+    if str(ref).isdigit():
+        row = Database.fetch_one(f"SELECT {_RUN_COLUMNS} FROM benchmark_runs WHERE id = ?", (int(ref),))
+    else:
+        row = Database.fetch_one(f"SELECT {_RUN_COLUMNS} FROM benchmark_runs WHERE run_key = ?", (ref,))
+    return _run_from_row(row) if row else None
+
+def metrics_for_run(run_id):
+    """{(metric, percentile, tags_json): value} for one run"""
+    rows = Database.fetch_all(
+        "SELECT metric, percentile, tags, value FROM benchmark_metrics WHERE run_id = ?", (run_id,)
+    )
+    return {(metric, pct, tags): value for metric, pct, tags, value in rows}
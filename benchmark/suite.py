@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+The standard set of tests run against one model on one server: basic
+generation, first token latency, throughput, context handling, a concurrency
+burst and an optional load ramp. Everything runs on one BenchmarkEngine so
+the model is warmed up once.
+"""
+
+import os
+import socket
+import asyncio
+import platform
+from datetime import datetime
+
+import aiohttp
+
+from . import BENCHMARK_VERSION
+from .engine import BenchmarkEngine, format_summary
+from .load import LoadGenerator, format_load_results, LOAD_TTFT_THRESHOLD_MS
+from .context import run_context_sweep, format_context_sweep
+
+# Base prompt for simple testing
+TEST_PROMPT = "Explain quantum computing in 50 words"
+
+# Longer prompt for throughput testing
+LONG_PROMPT = "Write a detailed essay about artificial intelligence, its history, current applications, and future potential. Include examples and discuss ethical considerations."
+
+# How many times to run each test (after warm-up, outliers are dropped from summaries)
+REPEAT_TESTS = int(os.getenv("BENCH_RUNS", "5"))
+
+# Warm-up requests per model/server before measuring (absorb model loading)
+WARMUP_RUNS = int(os.getenv("BENCH_WARMUP_RUNS", "1"))
+
+# Timeout in seconds
+TIMEOUT = 120  # Whole streamed request, including long generations
+
+# Concurrency test settings
+CONCURRENCY_TEST_COUNT = 5  # Number of concurrent requests to test
+
+# Label for the machine behind the server (GPU model, host name, ...) stored in the run manifest
+BENCH_HOST_LABEL = os.getenv("BENCH_HOST_LABEL", "")
+
+# Model name to use when none is given
+MODEL = "qwen2.5:14b"
+
+
+def _seconds(stats, key):
+    """Millisecond summary value converted to seconds (inf when missing)"""
+    value = stats.get(key) if stats else None
+    return value / 1000.0 if value is not None else float('inf')
+
+async def collect_manifest(engine, host_label=BENCH_HOST_LABEL):
+    """Describe what is being measured: model build, server version and client"""
+    manifest = {
+        "server": engine.server_address,
+        "model": engine.model,
+        "host_label": host_label or None,
+        "client_version": (f"benchmark/{BENCHMARK_VERSION} python/{platform.python_version()} "
+                           f"aiohttp/{aiohttp.__version__}"),
+        "client_host": socket.gethostname(),
+        "server_version": None,
+        "model_digest": None,
+        "quantization": None,
+        "parameter_size": None,
+    }
+    version = await engine.get_json("/api/version")
+    if version:
+        manifest["server_version"] = version.get("version")
+    tags = await engine.get_json("/api/tags")
+    for model in (tags or {}).get("models", []):
+        if model.get("name") == engine.model or model.get("model") == engine.model:
+            details = model.get("details") or {}
+            manifest["model_digest"] = model.get("digest")
+            manifest["quantization"] = details.get("quantization_level")
+            manifest["parameter_size"] = details.get("parameter_size")
+            break
+    return manifest
+
+async def test_simple_generation(engine):
+    print("  Running basic generation test...")
+
+    measurement = await engine.measure(TEST_PROMPT, runs=REPEAT_TESTS)
+    summary = measurement["summary"]
+    print(format_summary(summary))
+
+    if summary["successes"] == 0:
+        # All tests failed
+        return {
+            "simple_avg_time": float('inf'),
+            "simple_avg_tokens": 0,
+            "simple_tokens_per_sec": 0,
+            "simple_success_rate": 0,
+            "simple_errors": summary["runs"]
+        }, summary
+
+    return {
+        "simple_avg_time": _seconds(summary["total_ms"], "mean"),
+        "simple_avg_tokens": summary["tokens"].get("mean", 0),
+        "simple_tokens_per_sec": summary["decode_tps"].get("p50") or summary["client_decode_tps"].get("p50") or 0,
+        "simple_prefill_tokens_per_sec": summary["prefill_tps"].get("p50") or 0,
+        "simple_latency_p50": _seconds(summary["total_ms"], "p50"),
+        "simple_latency_p90": _seconds(summary["total_ms"], "p90"),
+        "simple_latency_p99": _seconds(summary["total_ms"], "p99"),
+        "simple_success_rate": summary["success_rate"],
+        "simple_errors": summary["runs"] - summary["successes"]
+    }, summary
+
+async def test_throughput(engine):
+    print("  Running throughput test...")
+
+    measurement = await engine.measure(LONG_PROMPT, runs=1)
+    summary = measurement["summary"]
+    print(format_summary(summary))
+
+    if summary["successes"] == 0:
+        # Return failure data
+        return {
+            "throughput_time": 0,
+            "throughput_tokens": 0,
+            "throughput_tokens_per_sec": 0,
+            "throughput_success": False
+        }, summary
+
+    return {
+        "throughput_time": _seconds(summary["total_ms"], "mean"),
+        "throughput_tokens": summary["tokens"]["mean"],
+        "throughput_tokens_per_sec": summary["decode_tps"].get("mean") or summary["client_decode_tps"].get("mean") or 0,
+        "throughput_inter_token_p99_ms": summary["inter_token_ms"].get("p99"),
+        "throughput_success": True
+    }, summary
+
+async def test_context_handling(engine, context=None):
+    """Context length sweep: prefill and decode speed per prompt size, and where the server truncates"""
+    context = context or {}
+    print("  Running context length sweep...")
+    result = await run_context_sweep(engine, context.get("targets"), context.get("set_num_ctx", True))
+    if result["max_context_tokens"]:
+        print(f"    Largest fully processed prompt: {result['max_context_tokens']} tokens")
+    if result["limit_tokens"]:
+        print(f"    Limit at {result['limit_tokens']} tokens: {result['limit_reason']}")
+    return result
+
+def test_first_token_latency(summary):
+    """First token latency from an already streamed measurement's summary"""
+    print("  Testing first token latency...")
+
+    ttft = summary["ttft_ms"]
+    if not ttft.get("count"):
+        return {
+            "first_token_latency": float('inf'),
+            "first_token_success_rate": 0
+        }
+
+    print(f"      TTFT p50 {ttft['p50']:.1f} ms, p90 {ttft['p90']:.1f} ms, p99 {ttft['p99']:.1f} ms")
+    return {
+        "first_token_latency": _seconds(ttft, "p50"),
+        "first_token_latency_p90": _seconds(ttft, "p90"),
+        "first_token_latency_p99": _seconds(ttft, "p99"),
+        "first_token_success_rate": summary["success_rate"]
+    }
+
+async def test_concurrency(engine):
+    """Test how well the server handles concurrent requests."""
+    print("  Testing concurrency handling...")
+
+    num_concurrent = CONCURRENCY_TEST_COUNT  # Number of concurrent requests
+    measurement = await engine.measure(TEST_PROMPT, runs=num_concurrent, concurrency=num_concurrent)
+    summary = measurement["summary"]
+
+    print(f"    Concurrent request success rate: {int(summary['success_rate'] * 100)}%")
+
+    return {
+        "max_concurrent_requests": num_concurrent,
+        "concurrency_success_rate": summary["success_rate"],
+        "concurrency_avg_time": _seconds(summary["total_ms"], "mean"),
+        "concurrency_ttft_p99": _seconds(summary["ttft_ms"], "p99")
+    }, summary
+
+async def test_load(server_address, model_name, load):
+    """Step through increasing load and find where p99 TTFT crosses the threshold"""
+    print(f"  Running load test ({load['mode']} steps {load['targets']})...")
+
+    generator = LoadGenerator(server_address, model_name, timeout=TIMEOUT)
+    result = await generator.run(load["mode"], load["targets"], step_seconds=load["step_seconds"],
+                                 ttft_threshold_ms=load["ttft_threshold_ms"])
+    print(format_load_results(result, load["ttft_threshold_ms"]))
+    result["ttft_threshold_ms"] = load["ttft_threshold_ms"]
+    return result
+
+async def run_engine_tests(server_address, model_name, results, load=None, host_label=BENCH_HOST_LABEL, context=None):
+    """
+    Run the streamed engine tests on one engine, so the model is warmed up once
+
+    context holds context sweep settings ({"targets", "set_num_ctx"}); False skips the sweep
+    """
+    summaries = results.setdefault("summaries", {})
+
+    async with BenchmarkEngine(server_address, model_name, runs=REPEAT_TESTS,
+                               warmup_runs=WARMUP_RUNS, timeout=TIMEOUT) as engine:
+        results["manifest"] = await collect_manifest(engine, host_label)
+
+        # 1. Simple generation test (warms the model up first)
+        simple_results, summaries["simple"] = await test_simple_generation(engine)
+        results.update(simple_results)
+        if engine.cold_load_ms is not None:
+            results["cold_load_time"] = engine.cold_load_ms / 1000.0
+
+        # If simple test failed, skip advanced tests
+        if results.get("simple_success_rate", 0) == 0:
+            print("  Basic tests failed. Skipping advanced tests.")
+            return results
+
+        # 2. First token latency, from the basic test's streamed samples
+        results.update(test_first_token_latency(summaries["simple"]))
+
+        # 3. Throughput test (longer generation)
+        try:
+            throughput_results, summaries["throughput"] = await test_throughput(engine)
+            results.update(throughput_results)
+        except Exception as e:
+            print(f"  Throughput test error: {str(e)}")
+            results["throughput_success"] = False
+
+        # 4. Context length sweep (opt-in: settings from context_settings())
+        if context:
+            try:
+                results["context_sweep"] = await test_context_handling(engine, context)
+            except Exception as e:
+                print(f"  Context sweep error: {str(e)}")
+
+        # 5. Concurrency test
+        try:
+            concurrency_results, summaries["concurrency"] = await test_concurrency(engine)
+            results.update(concurrency_results)
+        except Exception as e:
+            print(f"  Concurrency test error: {str(e)}")
+            results["concurrency_success_rate"] = 0
+
+    # 6. Optional load test, after the engine's session is closed
+    if load:
+        try:
+            results["load_test"] = await test_load(server_address, model_name, load)
+        except Exception as e:
+            print(f"  Load test error: {str(e)}")
+
+    return results
+
+def test_server(server_address, model_name=None, load=None, host_label=BENCH_HOST_LABEL, context=None):
+    """Run comprehensive tests on a server and model (plus a load test if load settings are given)"""
+    # Use provided model name or default
+    test_model = model_name if model_name else MODEL
+
+    # Initialize results
+    results = {
+        "server": server_address,
+        "model": test_model,
+        "test_date": datetime.now().isoformat()
+    }
+
+    print("\n-------------------------------------------------")
+    print(f"TESTING MODEL: {test_model}")
+    print(f"SERVER: {server_address}")
+    print("-------------------------------------------------")
+
+    asyncio.run(run_engine_tests(server_address, test_model, results, load, host_label, context))
+
+    return results
+
+def run_load_only(server_address, model_name, load, host_label=BENCH_HOST_LABEL):
+    """Load test a single server/model without the other tests"""
+    results = {
+        "server": server_address,
+        "model": model_name,
+        "test_date": datetime.now().isoformat()
+    }
+
+    async def _run():
+        async with BenchmarkEngine(server_address, model_name, warmup_runs=0, timeout=TIMEOUT) as engine:
+            results["manifest"] = await collect_manifest(engine, host_label)
+        results["load_test"] = await test_load(server_address, model_name, load)
+
+    asyncio.run(_run())
+    return results
+
+def run_context_only(server_address, model_name, context=None, host_label=BENCH_HOST_LABEL):
+    """Context length sweep on a single server/model without the other tests"""
+    results = {
+        "server": server_address,
+        "model": model_name,
+        "test_date": datetime.now().isoformat()
+    }
+
+    async def _run():
+        async with BenchmarkEngine(server_address, model_name, warmup_runs=0, timeout=TIMEOUT) as engine:
+            results["manifest"] = await collect_manifest(engine, host_label)
+            results["context_sweep"] = await test_context_handling(engine, context)
+
+    asyncio.run(_run())
+    return results
+
+def format_benchmark_results(results):
+    """Format benchmark results for display"""
+    output = [
+        f"MODEL: {results['model']}",
+        f"SERVER: {results['server']}",
+        f"TEST DATE: {results['test_date']}",
+        ""
+    ]
+
+    # Basic results (absent for load-only runs)
+    if "simple_success_rate" not in results:
+        pass
+    elif results["simple_success_rate"] > 0:
+        output.extend([
+            "BASIC SPEED TEST:",
+            f"  Average response time: {round(results['simple_avg_time'], 2)} seconds",
+            f"  Latency p50/p90/p99: {round(results.get('simple_latency_p50', float('inf')), 2)} / "
+            f"{round(results.get('simple_latency_p90', float('inf')), 2)} / "
+            f"{round(results.get('simple_latency_p99', float('inf')), 2)} seconds",
+            f"  Decode tokens per second: {round(results['simple_tokens_per_sec'], 1)}",
+            f"  Prefill tokens per second: {round(results.get('simple_prefill_tokens_per_sec', 0), 1)}",
+            f"  Success rate: {int(results['simple_success_rate'] * 100)}%",
+            ""
+        ])
+        if results.get("cold_load_time") is not None:
+            output.insert(-1, f"  Cold model load: {round(results['cold_load_time'], 2)} seconds")
+    else:
+        output.extend([
+            "BASIC SPEED TEST: Failed",
+            ""
+        ])
+
+    # Add throughput results if available
+    if results.get("throughput_success", False):
+        output.extend([
+            "THROUGHPUT TEST:",
+            f"  Tokens generated: {results['throughput_tokens']}",
+            f"  Generation time: {round(results['throughput_time'], 2)} seconds",
+            f"  Tokens per second: {round(results['throughput_tokens_per_sec'], 1)}",
+            ""
+        ])
+
+    # Add first token latency if available
+    if "first_token_latency" in results and results["first_token_latency"] < float('inf'):
+        output.extend([
+            "FIRST TOKEN LATENCY:",
+            f"  Median latency: {round(results['first_token_latency'], 3)} seconds",
+            f"  p90/p99: {round(results.get('first_token_latency_p90', float('inf')), 3)} / "
+            f"{round(results.get('first_token_latency_p99', float('inf')), 3)} seconds",
+            f"  Success rate: {int(results['first_token_success_rate'] * 100)}%",
+            ""
+        ])
+
+    # Add the context sweep if it ran
+    if results.get("context_sweep"):
+        output.extend([
+            format_context_sweep(results["context_sweep"]),
+            ""
+        ])
+
+    # Add concurrency results if available
+    if "concurrency_success_rate" in results:
+        output.extend([
+            "CONCURRENCY TEST:",
+            f"  Success rate: {int(results['concurrency_success_rate'] * 100)}%",
+            f"  Average response time: {round(results.get('concurrency_avg_time', float('inf')), 2)} seconds",
+            ""
+        ])
+
+    # Add load test steps if a load test ran
+    if results.get("load_test"):
+        output.extend([
+            format_load_results(results["load_test"], results["load_test"].get("ttft_threshold_ms", LOAD_TTFT_THRESHOLD_MS)),
+            ""
+        ])
+
+    return "\n".join(output)
@@ -370,7 +370,8 @@ class SchemaChecker:
             # Expected indexes (excluding primary keys and unique constraints which already have indexes)
             expected_indexes = {
                 'endpoints': [('ip',), ('verified',), ('is_honeypot',), ('is_active',), 
-                             ('verified', 'is_honeypot'), ('verified', 'is_active')],
+                             ('verified', 'is_honeypot'), ('verified', 'is_active'),
+                             ('scan_date',), ('verification_date',)],
                 'verified_endpoints': [('endpoint_id',)],
                 'models': [('endpoint_id',), ('name',)],
                 'benchmark_results': [('endpoint_id',), ('model_id',), ('test_date',)],
@@ -386,7 +387,9 @@ class SchemaChecker:
                             'description': f"Missing index on {table}({', '.join(columns)})",
                             'impact': 'Medium',
                             'recommendation': f"CREATE INDEX idx_{table}_{'_'.join(columns)} " +
-                                             f"ON {table}({', '.join(columns)})"
+                                             f"ON {table}({', '.join(columns)})",
+                            'table': table,
+                            'columns': list(columns)
                         })
                 else:
                     table_indexes = index_dict[table]
@@ -403,7 +406,9 @@ class SchemaChecker:
                                 'description': f"Missing index on {table}({', '.join(columns)})",
                                 'impact': 'Medium',
                                 'recommendation': f"CREATE INDEX idx_{table}_{'_'.join(columns)} " +
-                                                 f"ON {table}({', '.join(columns)})"
+                                                 f"ON {table}({', '.join(columns)})",
+                                'table': table,
+                                'columns': list(columns)
                             })
             
             # Check for redundant indexes
@@ -627,7 +632,10 @@ class SchemaChecker:
                         'type': 'Table Bloat',
                         'description': f"Table {table['relname']} has {table['n_dead_tup']} dead tuples ({table['dead_ratio'] * 100:.1f}% of total)",
                         'impact': 'Medium',
-                        'recommendation': f"VACUUM ANALYZE {table['relname']}"
+                        'recommendation': f"VACUUM ANALYZE {table['relname']}",
+                        'table': table['relname'],
+                        'dead_tuples': table['n_dead_tup'],
+                        'dead_ratio': float(table['dead_ratio'])
                     })
                 
         except Exception as e:
@@ -670,7 +678,9 @@ class SchemaChecker:
                     'type': 'Unused Index',
                     'description': f"Index {idx['index_name']} on {idx['table_name']} (size: {idx['index_size']}) has never been used",
                     'impact': 'Low',
-                    'recommendation': f"Consider dropping: DROP INDEX {idx['index_name']}"
+                    'recommendation': f"Consider dropping: DROP INDEX {idx['index_name']}",
+                    'table': idx['table_name'],
+                    'index': idx['index_name']
                 })
                 
         except Exception as e:
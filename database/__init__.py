@@ -0,0 +1,28 @@
+"""
+Database Package for Ollama Scanner
+
+One interface for SQLite and PostgreSQL (DATABASE_TYPE) shared by the scanner,
+the tools and the Discord bot, so each process holds a single connection pool:
+
+    from database import Database, init_database, DATABASE_TYPE
+
+- config: .env loading and connection settings
+- sqlite / postgres: the per-backend managers (get_db_manager())
+- pool: the blocking PostgreSQL connection pool
+- core: Database (queries, reconnect, keep_alive, health), DatabaseConnection
+  and init_database
+- catalog: per-endpoint model catalog sync with digests, and the metadata
+  version stamp that invalidates bot listing caches (PostgreSQL only; import
+  it as database.catalog)
+"""
+
+from query_profile import query_profiler
+from .config import (DATABASE_TYPE, SQLITE_DB_PATH, PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD,
+                     PG_DB_HOST, PG_DB_PORT, MIN_CONNECTIONS, MAX_CONNECTIONS)
+from .core import Database, DatabaseConnection, get_db_manager, init_database
+
+__all__ = [
+    "Database", "DatabaseConnection", "get_db_manager", "init_database", "query_profiler",
+    "DATABASE_TYPE", "SQLITE_DB_PATH", "PG_DB_NAME", "PG_DB_USER", "PG_DB_PASSWORD",
+    "PG_DB_HOST", "PG_DB_PORT", "MIN_CONNECTIONS", "MAX_CONNECTIONS",
+]
@@ -0,0 +1,31 @@
+"""
+Test the database connection: python -m database
+"""
+
+import sys
+
+from . import Database, init_database, DATABASE_TYPE
+
+db_type = "SQLite" if DATABASE_TYPE == "sqlite" else "PostgreSQL"
+print(f"Testing {db_type} database connection...")
+
+try:
+    # Initialize database
+    init_database()
+
+    if DATABASE_TYPE == "sqlite":
+        result = Database.fetch_one("SELECT sqlite_version();")
+        print(f"SQLite version: {result[0]}")
+    else:
+        result = Database.fetch_one("SELECT version();")
+        print(f"PostgreSQL version: {result[0]}")
+
+    status = Database.health()
+    if not status["ok"]:
+        raise RuntimeError(status["error"])
+    print(f"Round trip: {status['latency_ms']} ms")
+    print("Database connection test successful!")
+
+except Exception as e:
+    print(f"Database connection test failed: {e}")
+    sys.exit(1)
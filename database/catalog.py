@@ -0,0 +1,217 @@
+"""
+Model catalog sync (PostgreSQL only)
+
+Shared by every path that mirrors an endpoint's /api/tags listing into the
+models table - the scanners, the pruner and the Discord bot. A digest of the
+last applied listing is kept per endpoint so unchanged catalogs cost a single
+lookup, and changed ones are applied as one batched transaction. Changes bump
+the metadata version stamp that the bot's query cache polls.
+
+    from database.catalog import sync_endpoint_catalog, invalidate_catalog_digest
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+
+from .core import Database
+
+logger = logging.getLogger('catalog_sync')
+
+# Metadata key holding the cross-process invalidation stamp for bot listing caches
+CACHE_VERSION_KEY = "query_cache_version"
+
+# SQL other writers can add to their transactions to invalidate bot caches
+BUMP_CACHE_VERSION_SQL = """
+    INSERT INTO metadata (key, value, updated_at)
+    VALUES ('query_cache_version', '1', NOW())
+    ON CONFLICT (key) DO UPDATE SET
+        value = (COALESCE(NULLIF(metadata.value, ''), '0')::BIGINT + 1)::TEXT,
+        updated_at = NOW()
+"""
+
+# Size differences below this (in MB) are not treated as a model update
+SIZE_TOLERANCE_MB = 0.1
+
+CatalogDiff = namedtuple("CatalogDiff", ["added", "updated", "deleted", "unchanged"])
+
+_table_ready = False
+_table_lock = threading.Lock()
+
+
+def bump_cache_version():
+    """Invalidate bot caches in every process by bumping the metadata version stamp"""
+    try:
+        Database.execute(BUMP_CACHE_VERSION_SQL)
+    except Exception as e:
+        logger.warning(f"Could not bump query cache version: {e}")
+
+
+def ensure_digest_table():
+    """Create the digest table on first use"""
+    global _table_ready
+    if _table_ready:
+        return
+    with _table_lock:
+        if _table_ready:
+            return
+        Database.execute("""
+            CREATE TABLE IF NOT EXISTS model_catalog_digests (
+                endpoint_id INTEGER PRIMARY KEY REFERENCES endpoints (id) ON DELETE CASCADE,
+                digest TEXT NOT NULL,
+                model_count INTEGER DEFAULT 0,
+                updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        _table_ready = True
+
+
+def normalize_models(api_models):
+    """
+    Reduce an /api/tags model list to the columns we store
+
+    Returns:
+        dict: model name -> (parameter_size, quantization_level, size_mb)
+    """
+    catalog = {}
+    for model in api_models or []:
+        name = model.get("name", "")
+        if not name:
+            continue  # Skip models without a name
+
+        try:
+            size_mb = float(model.get("size", 0) or 0) / (1024 * 1024)
+        except (TypeError, ValueError):
+            size_mb = 0.0
+
+        details = model.get("details") or {}
+        catalog[name] = (
+            details.get("parameter_size", "") or "",
+            details.get("quantization_level", "") or "",
+            round(size_mb, 2),
+        )
+    return catalog
+
+
+def catalog_digest(catalog):
+    """Stable digest of a normalized catalog, independent of listing order"""
+    canonical = json.dumps(sorted([name, *values] for name, values in catalog.items()),
+                           separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def invalidate_catalog_digest(endpoint_id):
+    """
+    Forget the stored digest for an endpoint.
+    Call this after changing an endpoint's models outside sync_endpoint_catalog.
+    """
+    try:
+        ensure_digest_table()
+        Database.execute("DELETE FROM model_catalog_digests WHERE endpoint_id = %s", (endpoint_id,))
+    except Exception as e:
+        logger.warning(f"Could not invalidate catalog digest for endpoint {endpoint_id}: {e}")
+
+
+def diff_catalog(catalog, db_rows):
+    """
+    Compute the set difference between the API catalog and stored models
+
+    Args:
+        catalog: Normalized catalog from normalize_models()
+        db_rows: Rows of (id, name, parameter_size, quantization_level, size_mb)
+
+    Returns:
+        tuple: (added, updated, deleted) lists of model names
+    """
+    stored = {}
+    for row in db_rows:
+        size_mb = float(row[4]) if row[4] is not None else 0.0
+        stored[row[1]] = (row[2] or "", row[3] or "", size_mb)
+
+    added = sorted(set(catalog) - set(stored))
+    deleted = sorted(set(stored) - set(catalog))
+    updated = []
+    for name in sorted(set(catalog) & set(stored)):
+        new_params, new_quant, new_size = catalog[name]
+        old_params, old_quant, old_size = stored[name]
+        if (new_params != old_params or new_quant != old_quant
+                or abs(new_size - old_size) > SIZE_TOLERANCE_MB):
+            updated.append(name)
+    return added, updated, deleted
+
+
+def sync_endpoint_catalog(endpoint_id, api_models, force=False):
+    """
+    Mirror an endpoint's /api/tags model list into the models table
+
+    Args:
+        endpoint_id: ID of the endpoint in the endpoints table
+        api_models: The "models" list from /api/tags
+        force: Apply the diff even if the digest is unchanged
+
+    Returns:
+        CatalogDiff: added, updated and deleted model names, and whether
+        the catalog was unchanged since the last sync
+    """
+    ensure_digest_table()
+
+    catalog = normalize_models(api_models)
+    digest = catalog_digest(catalog)
+
+    if not force:
+        stored = Database.fetch_one(
+            "SELECT digest FROM model_catalog_digests WHERE endpoint_id = %s",
+            (endpoint_id,)
+        )
+        if stored and stored[0] == digest:
+            logger.debug(f"Catalog for endpoint {endpoint_id} unchanged, skipping sync")
+            return CatalogDiff([], [], [], True)
+
+    db_rows = Database.fetch_all(
+        "SELECT id, name, parameter_size, quantization_level, size_mb FROM models WHERE endpoint_id = %s",
+        (endpoint_id,)
+    )
+    added, updated, deleted = diff_catalog(catalog, db_rows)
+
+    queries = []
+    if deleted:
+        queries.append((
+            "DELETE FROM models WHERE endpoint_id = %s AND name = ANY(%s)",
+            (endpoint_id, deleted)
+        ))
+
+    upserts = added + updated
+    if upserts:
+        values = ", ".join(["(%s, %s, %s, %s, %s)"] * len(upserts))
+        params = []
+        for name in upserts:
+            params.extend((endpoint_id, name, *catalog[name]))
+        queries.append((f"""
+            INSERT INTO models (endpoint_id, name, parameter_size, quantization_level, size_mb)
+            VALUES {values}
+            ON CONFLICT (endpoint_id, name) DO UPDATE SET
+                parameter_size = EXCLUDED.parameter_size,
+                quantization_level = EXCLUDED.quantization_level,
+                size_mb = EXCLUDED.size_mb
+        """, tuple(params)))
+
+    queries.append(("""
+        INSERT INTO model_catalog_digests (endpoint_id, digest, model_count, updated_at)
+        VALUES (%s, %s, %s, NOW())
+        ON CONFLICT (endpoint_id) DO UPDATE SET
+            digest = EXCLUDED.digest,
+            model_count = EXCLUDED.model_count,
+            updated_at = EXCLUDED.updated_at
+    """, (endpoint_id, digest, len(catalog))))
+    queries.append(("UPDATE endpoints SET scan_date = NOW() WHERE id = %s", (endpoint_id,)))
+    if added or updated or deleted:
+        # Let bot listing caches in other processes know the catalog moved
+        queries.append((BUMP_CACHE_VERSION_SQL, None))
+
+    Database.transaction(queries)
+
+    logger.info(f"Catalog sync for endpoint {endpoint_id}: "
+                f"{len(added)} added, {len(updated)} updated, {len(deleted)} deleted")
+    return CatalogDiff(added, updated, deleted, False)
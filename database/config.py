@@ -0,0 +1,52 @@
+"""
+Database configuration: logging, .env loading and connection settings
+"""
+
+import os
+import sys
+import logging
+from dotenv import load_dotenv
+
+from query_profile import query_profiler
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler("database.log")
+    ]
+)
+logger = logging.getLogger('database')
+
+# `kill -USR1 <pid>` logs this process's hottest queries
+query_profiler.install_signal_handler()
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Load environment variables: the entry script's own .env first (DiscordBot/.env
+# for the bot), then the project's; values already set are never overridden
+_main_file = getattr(sys.modules.get("__main__"), "__file__", None)
+if _main_file:
+    load_dotenv(os.path.join(os.path.dirname(os.path.abspath(_main_file)), ".env"))
+load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+
+# Database configuration
+DATABASE_TYPE = os.getenv("DATABASE_TYPE", "sqlite").lower()
+SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", "ollama_instances.db")
+
+# PostgreSQL connection details
+PG_DB_NAME = os.getenv("POSTGRES_DB", "ollama_scanner")
+PG_DB_USER = os.getenv("POSTGRES_USER", "ollama")
+PG_DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "ollama_scanner_password")
+PG_DB_HOST = os.getenv("POSTGRES_HOST", "localhost")
+PG_DB_PORT = os.getenv("POSTGRES_PORT", "5432")
+
+# Connection pool configuration
+MIN_CONNECTIONS = int(os.getenv("DB_MIN_CONNECTIONS", "5"))
+MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "50"))
+# Seconds to wait when opening a new PostgreSQL connection
+DB_CONNECTION_TIMEOUT = int(os.getenv("DB_CONNECTION_TIMEOUT", "5"))
+# Server-side statement limit in milliseconds, set once per connection (0 = server default)
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))
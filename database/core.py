@@ -0,0 +1,316 @@
+"""
+High-level database interface shared by the scanner, tools and the Discord bot
+"""
+
+import json
+import time
+import sqlite3
+
+from query_profile import query_profiler
+from .config import logger, DATABASE_TYPE
+from .sqlite import SQLiteManager
+
+# PostgreSQL package is only imported if we're using PostgreSQL
+if DATABASE_TYPE == "postgres":
+    from .postgres import PostgreSQLManager, DictCursor
+
+
+# Factory function to get the appropriate database manager
+def get_db_manager():
+    """Get the database manager based on configuration"""
+    if DATABASE_TYPE == "postgres":
+        return PostgreSQLManager()
+    else:
+        return SQLiteManager()
+
+
+# Simplified interface for database operations
+class Database:
+    """High-level database abstraction for application code"""
+
+    @staticmethod
+    def execute(query, params=None):
+        """Execute a query and return cursor"""
+        db_manager = get_db_manager()
+        # Convert dict parameters to JSON strings if using PostgreSQL
+        if DATABASE_TYPE == "postgres" and params:
+            params = Database._process_params(params)
+        with query_profiler.track("execute", query) as call:
+            cursor = db_manager.execute(query, params)
+            call.rows = cursor.rowcount
+        return cursor
+
+    @staticmethod
+    def execute_many(query, params_list):
+        """Execute many operations with the same query"""
+        db_manager = get_db_manager()
+        # Convert dict parameters to JSON strings if using PostgreSQL
+        if DATABASE_TYPE == "postgres" and params_list:
+            processed_params = []
+            for params in params_list:
+                processed_params.append(Database._process_params(params))
+            params_list = processed_params
+        with query_profiler.track("execute_many", query) as call:
+            cursor = db_manager.execute_many(query, params_list)
+            call.rows = len(params_list)
+        return cursor
+
+    @staticmethod
+    def fetch_one(query, params=None):
+        """Execute a query and fetch one result"""
+        db_manager = get_db_manager()
+        # Convert dict parameters to JSON strings if using PostgreSQL
+        if DATABASE_TYPE == "postgres" and params:
+            params = Database._process_params(params)
+        with query_profiler.track("fetch_one", query) as call:
+            row = db_manager.fetch_one(query, params)
+            call.rows = 0 if row is None else 1
+        return row
+
+    @staticmethod
+    def fetch_all(query, params=None):
+        """Execute a query and fetch all results"""
+        db_manager = get_db_manager()
+        # Convert dict parameters to JSON strings if using PostgreSQL
+        if DATABASE_TYPE == "postgres" and params:
+            params = Database._process_params(params)
+        with query_profiler.track("fetch_all", query) as call:
+            rows = db_manager.fetch_all(query, params)
+            call.rows = len(rows)
+        return rows
+
+    @staticmethod
+    def transaction(queries_params):
+        """Execute multiple queries in a transaction"""
+        db_manager = get_db_manager()
+        # Convert dict parameters to JSON strings if using PostgreSQL
+        if DATABASE_TYPE == "postgres":
+            processed_queries_params = []
+            for query, params in queries_params:
+                if params:
+                    params = Database._process_params(params)
+                processed_queries_params.append((query, params))
+            queries_params = processed_queries_params
+        with query_profiler.track("transaction", "; ".join(query for query, _ in queries_params)):
+            return db_manager.transaction(queries_params)
+
+    @staticmethod
+    def _process_params(params):
+        """Process parameters for PostgreSQL compatibility
+        Convert dictionaries to JSON strings"""
+        if isinstance(params, dict):
+            # Convert entire dict to JSON string
+            return json.dumps(params)
+        elif isinstance(params, (list, tuple)):
+            # Process each item in the sequence
+            processed = []
+            for item in params:
+                if isinstance(item, dict):
+                    processed.append(json.dumps(item))
+                else:
+                    processed.append(item)
+            return tuple(processed)
+        return params
+
+    @staticmethod
+    def ensure_pool_initialized():
+        """True while the PostgreSQL connection pool is open (it is created on first use).
+        Always True for SQLite, which opens a connection per call"""
+        if DATABASE_TYPE == "postgres":
+            return get_db_manager()._is_initialized
+        return True
+
+    @staticmethod
+    def reconnect():
+        """Replace the PostgreSQL connection pool with a fresh one; returns False if that fails"""
+        if DATABASE_TYPE != "postgres":
+            return True
+        try:
+            logger.info("Attempting to reconnect to database...")
+            return get_db_manager().reinitialize()
+        except Exception as e:
+            logger.error(f"Error reconnecting to database: {str(e)}")
+            return False
+
+    @staticmethod
+    def close():
+        """Close the PostgreSQL connection pool; it reopens on the next query"""
+        if DATABASE_TYPE == "postgres":
+            get_db_manager().close_all()
+
+    @staticmethod
+    def health():
+        """Round-trip a trivial query and report latency (and pool counters on PostgreSQL)"""
+        status = {"ok": False, "database": DATABASE_TYPE, "latency_ms": None, "error": None, "pool": None}
+        started = time.perf_counter()
+        try:
+            # Straight to the manager so health checks stay out of the query profile
+            db_manager = get_db_manager()
+            row = db_manager.fetch_one("SELECT 1")
+            status["ok"] = row is not None and row[0] == 1
+            status["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            if DATABASE_TYPE == "postgres":
+                status["pool"] = db_manager.pool_stats()
+        except Exception as e:
+            status["error"] = str(e)
+        return status
+
+    @staticmethod
+    def keep_alive():
+        """Check the database connection and reconnect if it fails"""
+        status = Database.health()
+        if status["ok"]:
+            logger.debug(f"Database connection is healthy ({status['latency_ms']} ms)")
+            return True
+        logger.warning(f"Database keep_alive check failed: {status['error']}")
+        if Database.reconnect():
+            logger.info("Database reconnection successful")
+            return True
+        logger.error("Database reconnection failed")
+        return False
+
+
+class DatabaseConnection:
+    """Cursor over a pooled connection; commits on success and rolls back on error
+
+        with DatabaseConnection(dict_cursor=True) as cursor:
+            cursor.execute("SELECT ...")
+    """
+
+    def __init__(self, dict_cursor=False):
+        self.manager = get_db_manager()
+        self.dict_cursor = dict_cursor
+        self.conn = None
+        self.cursor = None
+
+    def __enter__(self):
+        self.conn = self.manager.get_connection()
+        if self.dict_cursor and DATABASE_TYPE == "postgres":
+            self.cursor = self.conn.cursor(cursor_factory=DictCursor)
+        else:
+            # SQLite rows are sqlite3.Row, which already allows access by name
+            self.cursor = self.conn.cursor()
+        return self.cursor
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is not None:
+                logger.error(f"Database operation failed: {exc_val}")
+                self.conn.rollback()
+            else:
+                self.conn.commit()
+            self.cursor.close()
+        finally:
+            if DATABASE_TYPE == "postgres":
+                self.manager.return_connection(self.conn)
+            else:
+                self.conn.close()
+
+
+# Initialize database schema if needed
+def init_database():
+    """Initialize the database schema based on the configured database type"""
+    db_manager = get_db_manager()
+
+    if DATABASE_TYPE == "sqlite":
+        # SQLite schema initialization
+        queries = [
+            # Create endpoints table
+            ("""
+            CREATE TABLE IF NOT EXISTS endpoints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ip TEXT NOT NULL,
+                port INTEGER NOT NULL,
+                scan_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                verified INTEGER DEFAULT 0,
+                verification_date TIMESTAMP,
+                is_honeypot INTEGER DEFAULT 0,
+                honeypot_reason TEXT,
+                is_active INTEGER DEFAULT 1,
+                inactive_reason TEXT,
+                last_check_date TIMESTAMP,
+                UNIQUE(ip, port)
+            );
+            """, None),
+            
+            # Create verified_endpoints table
+            ("""
+            CREATE TABLE IF NOT EXISTS verified_endpoints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                endpoint_id INTEGER NOT NULL,
+                verification_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (endpoint_id) REFERENCES endpoints (id) ON DELETE CASCADE,
+                UNIQUE(endpoint_id)
+            );
+            """, None),
+            
+            # Create models table
+            ("""
+            CREATE TABLE IF NOT EXISTS models (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                endpoint_id INTEGER NOT NULL,
+                name TEXT NOT NULL,
+                parameter_size TEXT,
+                quantization_level TEXT,
+                size_mb REAL,
+                FOREIGN KEY (endpoint_id) REFERENCES endpoints (id) ON DELETE CASCADE,
+                UNIQUE(endpoint_id, name)
+            );
+            """, None),
+            
+            # Create benchmark_results table
+            ("""
+            CREATE TABLE IF NOT EXISTS benchmark_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                endpoint_id INTEGER NOT NULL,
+                model_id INTEGER,
+                test_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                avg_response_time REAL,
+                tokens_per_second REAL,
+                first_token_latency REAL,
+                throughput_tokens REAL,
+                throughput_time REAL,
+                context_500_tps REAL,
+                context_1000_tps REAL,
+                context_2000_tps REAL,
+                max_concurrent_requests INTEGER,
+                concurrency_success_rate REAL,
+                concurrency_avg_time REAL,
+                success_rate REAL,
+                FOREIGN KEY (endpoint_id) REFERENCES endpoints (id) ON DELETE CASCADE,
+                FOREIGN KEY (model_id) REFERENCES models (id) ON DELETE SET NULL
+            );
+            """, None),
+            
+            # Create a servers view for backward compatibility
+            ("""
+            CREATE VIEW IF NOT EXISTS servers AS
+            SELECT 
+                e.id, 
+                e.ip, 
+                e.port, 
+                e.scan_date
+            FROM 
+                endpoints e
+            JOIN
+                verified_endpoints ve ON e.id = ve.endpoint_id;
+            """, None)
+        ]
+        
+        # Execute all schema queries
+        for query, params in queries:
+            try:
+                db_manager.execute(query, params)
+            except sqlite3.Error as e:
+                logger.error(f"Error initializing SQLite schema: {e}")
+                logger.error(f"Query: {query}")
+    
+    elif DATABASE_TYPE == "postgres":
+        # PostgreSQL - schema is initialized via postgres_init.sql in Docker
+        # This just tests the connection
+        try:
+            version = db_manager.fetch_one("SELECT version();")
+            logger.info(f"PostgreSQL schema already initialized: {version[0]}")
+        except Exception as e:
+            if DATABASE_TYPE == "postgres":
+                logger.error(f"Error connecting to PostgreSQL: {e}")
@@ -0,0 +1,332 @@
+"""
+Shared PostgreSQL Connection Pool
+
+Used by database.PostgreSQLManager (scanner, pruner, tools and the Discord
+bot) in place of psycopg2's ThreadedConnectionPool, which raises PoolError as
+soon as maxconn connections are out and left callers to sleep and retry.
+
+- getconn() blocks on a condition variable until a connection is returned or
+  DB_POOL_TIMEOUT passes, then raises PoolTimeout (a psycopg2 PoolError).
+- Connections are opened on demand up to maxconn. Every DB_POOL_RESIZE_INTERVAL
+  seconds the pool sets its target size from the peak number of connections in
+  use since the last check (times DB_POOL_HEADROOM, at least minconn) and closes
+  idle connections above the target that have not been used for
+  DB_POOL_IDLE_SECONDS.
+- Wait time, checkout duration and connections held longer than
+  DB_POOL_LEAK_SECONDS (leaks) are counted; see stats().
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+import traceback
+
+import psycopg2
+import psycopg2.pool
+import psycopg2.extensions
+
+logger = logging.getLogger('db_pool')
+
+# Seconds getconn() waits for a free connection before raising PoolTimeout
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections checked out longer than this are reported as leaked
+DB_POOL_LEAK_SECONDS = float(os.getenv("DB_POOL_LEAK_SECONDS", "300"))
+# Idle connections above the target size are closed after this long unused
+DB_POOL_IDLE_SECONDS = float(os.getenv("DB_POOL_IDLE_SECONDS", "300"))
+# How often the target size and leaks are re-evaluated
+DB_POOL_RESIZE_INTERVAL = float(os.getenv("DB_POOL_RESIZE_INTERVAL", "60"))
+# Target size is the recent peak in use times this
+DB_POOL_HEADROOM = float(os.getenv("DB_POOL_HEADROOM", "1.25"))
+# Record the caller's stack at checkout so leak warnings say where the connection was taken
+DB_POOL_TRACE_CHECKOUTS = os.getenv("DB_POOL_TRACE_CHECKOUTS", "false").lower() in ("1", "true", "yes")
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """No connection became free within the timeout"""
+
+
+class _Checkout:
+    __slots__ = ("conn", "since", "thread", "stack", "reported")
+
+    def __init__(self, conn, since, thread, stack):
+        self.conn = conn
+        self.since = since
+        self.thread = thread
+        self.stack = stack
+        self.reported = False
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool with blocking checkout and demand-based sizing"""
+
+    def __init__(self, minconn, maxconn, timeout=DB_POOL_TIMEOUT, leak_seconds=DB_POOL_LEAK_SECONDS,
+                 idle_seconds=DB_POOL_IDLE_SECONDS, resize_interval=DB_POOL_RESIZE_INTERVAL,
+                 headroom=DB_POOL_HEADROOM, trace_checkouts=DB_POOL_TRACE_CHECKOUTS, **connect_kwargs):
+        if maxconn < 1 or minconn > maxconn:
+            raise psycopg2.pool.PoolError(f"invalid pool size min={minconn} max={maxconn}")
+        self.minconn = max(0, minconn)
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.leak_seconds = leak_seconds
+        self.idle_seconds = idle_seconds
+        self.resize_interval = resize_interval
+        self.headroom = headroom
+        self.trace_checkouts = trace_checkouts
+        self._connect_kwargs = connect_kwargs
+
+        self._cond = threading.Condition()
+        self._idle = []          # (conn, returned_at); most recently returned last
+        self._checked_out = {}   # id(conn) -> _Checkout
+        self._opening = 0
+        self._waiting = 0
+        self._closed = False
+        self.target = self.minconn
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._held_total = 0.0
+        self._held_max = 0.0
+        self._returned = 0
+        self._leaks = 0
+        self._opened = 0
+        self._discarded = 0
+        self._peak_in_use = 0
+        self._window_peak = 0
+        self._window_waits = 0
+        self._last_maintenance = time.monotonic()
+
+        # Open minconn up front so a bad DSN fails here rather than on first use
+        conns = []
+        try:
+            for _ in range(self.minconn):
+                conns.append(self._connect())
+        except Exception:
+            for conn in conns:
+                conn.close()
+            raise
+        now = time.monotonic()
+        self._idle = [(conn, now) for conn in conns]
+        self._opened = len(conns)
+
+    def _connect(self):
+        return psycopg2.connect(**self._connect_kwargs)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def _size(self):
+        return len(self._idle) + len(self._checked_out) + self._opening
+
+    def getconn(self, timeout=None):
+        """Check out a connection, waiting up to timeout (default DB_POOL_TIMEOUT) seconds for one"""
+        started = time.monotonic()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        stack = traceback.format_stack(limit=8)[:-1] if self.trace_checkouts else None
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+                # Callers already waiting go first; a new caller only takes a spare idle connection
+                if self._idle and (waited or len(self._idle) > self._waiting):
+                    conn, _ = self._idle.pop()
+                    if conn.closed:
+                        self._discarded += 1
+                        continue
+                    return self._check_out(conn, started, waited, stack)
+                if self._size() < self.maxconn:
+                    # Reserve the slot, then connect without holding the lock
+                    self._opening += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._window_waits += 1
+                    raise PoolTimeout(f"no connection free after {time.monotonic() - started:.1f}s "
+                                      f"({len(self._checked_out)} in use, max {self.maxconn})")
+                waited = True
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._opening -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._opening -= 1
+            self._opened += 1
+            if self._closed:
+                self._close_quietly([conn])
+                raise psycopg2.pool.PoolError("connection pool is closed")
+            return self._check_out(conn, started, waited, stack)
+
+    def _check_out(self, conn, started, waited, stack):
+        """Record a checkout; call with the lock held"""
+        now = time.monotonic()
+        wait = now - started
+        self._checked_out[id(conn)] = _Checkout(conn, now, threading.current_thread().name, stack)
+        self._checkouts += 1
+        self._wait_total += wait
+        if wait > self._wait_max:
+            self._wait_max = wait
+        if waited:
+            self._waits += 1
+            self._window_waits += 1
+        in_use = len(self._checked_out)
+        if in_use > self._peak_in_use:
+            self._peak_in_use = in_use
+        if in_use > self._window_peak:
+            self._window_peak = in_use
+        if now - self._last_maintenance >= self.resize_interval:
+            # Closing is quick; idle connections past the target are not in use by anyone
+            self._close_quietly(self._maintain(now))
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection; open transactions are rolled back, broken connections are dropped"""
+        with self._cond:
+            known = id(conn) in self._checked_out
+            closed = self._closed
+        if not known:
+            if not closed:
+                logger.warning("Connection returned that was not checked out from this pool; closing it")
+            # After closeall() the connection was already closed with the pool
+            self._close_quietly([conn])
+            return
+
+        # Still counted as checked out while rolling back, so the pool can't overshoot maxconn
+        if not close and not conn.closed:
+            try:
+                if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                close = True
+
+        to_close = []
+        with self._cond:
+            checkout = self._checked_out.pop(id(conn), None)
+            if checkout is None:
+                # closeall() ran meanwhile
+                to_close.append(conn)
+            else:
+                now = time.monotonic()
+                held = now - checkout.since
+                self._returned += 1
+                self._held_total += held
+                if held > self._held_max:
+                    self._held_max = held
+                if checkout.reported:
+                    logger.info(f"Leaked connection from thread {checkout.thread} returned after {held:.0f}s")
+                if self._closed or close or conn.closed:
+                    self._discarded += 1
+                    to_close.append(conn)
+                else:
+                    self._idle.append((conn, now))
+                self._cond.notify()
+                if now - self._last_maintenance >= self.resize_interval:
+                    to_close.extend(self._maintain(now))
+        self._close_quietly(to_close)
+
+    def _maintain(self, now):
+        """Report leaks and shrink towards the target size; call with the lock held, returns connections to close"""
+        self._last_maintenance = now
+        for checkout in self._checked_out.values():
+            if not checkout.reported and now - checkout.since > self.leak_seconds:
+                checkout.reported = True
+                self._leaks += 1
+                where = "".join(checkout.stack).rstrip() if checkout.stack else "(set DB_POOL_TRACE_CHECKOUTS=true for the stack)"
+                logger.warning(f"Connection held by thread {checkout.thread} for {now - checkout.since:.0f}s "
+                               f"(leak threshold {self.leak_seconds:.0f}s), checked out at:\n{where}")
+
+        target = max(self.minconn, min(self.maxconn, math.ceil(self._window_peak * self.headroom)))
+        if self._window_waits:
+            # Callers queued in this window: keep everything that is open
+            target = max(target, self._size())
+        if target != self.target:
+            logger.info(f"Pool target size {self.target} -> {target} (peak in use {self._window_peak}, "
+                        f"waits {self._window_waits}, open {self._size()})")
+            self.target = target
+        self._window_peak = len(self._checked_out)
+        self._window_waits = 0
+
+        to_close = []
+        while self._idle and self._size() > self.target and now - self._idle[0][1] > self.idle_seconds:
+            conn, _ = self._idle.pop(0)
+            to_close.append(conn)
+        return to_close
+
+    def _close_quietly(self, conns):
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled connection: {e}")
+
+    def leaked(self):
+        """Checkouts currently held longer than the leak threshold, as (thread, seconds, stack)"""
+        now = time.monotonic()
+        with self._cond:
+            return [(c.thread, now - c.since, c.stack) for c in self._checked_out.values()
+                    if now - c.since > self.leak_seconds]
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            return {
+                "min": self.minconn,
+                "max": self.maxconn,
+                "target": self.target,
+                "open": self._size(),
+                "idle": len(self._idle),
+                "in_use": len(self._checked_out),
+                "waiting": self._waiting,
+                "peak_in_use": self._peak_in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "wait_mean_ms": self._wait_total / self._checkouts * 1000 if self._checkouts else 0.0,
+                "wait_max_ms": self._wait_max * 1000,
+                "held_mean_ms": self._held_total / self._returned * 1000 if self._returned else 0.0,
+                "held_max_ms": self._held_max * 1000,
+                "leaks": self._leaks,
+                "leaked_now": sum(1 for c in self._checked_out.values() if now - c.since > self.leak_seconds),
+                "opened": self._opened,
+                "discarded": self._discarded,
+            }
+
+    def closeall(self):
+        """Close every connection, including ones still checked out, and wake any waiters"""
+        with self._cond:
+            self._closed = True
+            conns = [conn for conn, _ in self._idle]
+            self._idle = []
+            in_use = len(self._checked_out)
+            conns.extend(checkout.conn for checkout in self._checked_out.values())
+            self._checked_out.clear()
+            self._cond.notify_all()
+        if in_use:
+            logger.warning(f"Closing pool with {in_use} connections still checked out")
+        self._close_quietly(conns)
+
+
+def format_pool_stats(stats):
+    """One-paragraph summary of ConnectionPool.stats() for logs and admin commands"""
+    return (f"Pool: {stats['in_use']} in use, {stats['idle']} idle, {stats['open']} open "
+            f"(target {stats['target']}, min {stats['min']}, max {stats['max']}, peak {stats['peak_in_use']})\n"
+            f"Checkouts: {stats['checkouts']} | waited: {stats['waits']} | timeouts: {stats['timeouts']} | "
+            f"wait mean/max: {stats['wait_mean_ms']:.1f}/{stats['wait_max_ms']:.0f} ms\n"
+            f"Held mean/max: {stats['held_mean_ms']:.1f}/{stats['held_max_ms']:.0f} ms | "
+            f"leaks: {stats['leaks']} ({stats['leaked_now']} still out) | "
+            f"opened: {stats['opened']} | discarded: {stats['discarded']}")
@@ -0,0 +1,227 @@
+"""
+PostgreSQL database manager: one blocking connection pool per process
+"""
+
+import sys
+import time
+import threading
+
+from query_profile import query_profiler
+from .config import (logger, PG_DB_NAME, PG_DB_USER, PG_DB_PASSWORD, PG_DB_HOST, PG_DB_PORT,
+                     MIN_CONNECTIONS, MAX_CONNECTIONS, DB_CONNECTION_TIMEOUT, DB_STATEMENT_TIMEOUT)
+
+try:
+    import psycopg2
+    from psycopg2.extras import DictCursor, execute_values
+    from .pool import ConnectionPool, PoolTimeout
+except ImportError:
+    logger.error("psycopg2 package is required for PostgreSQL connectivity.")
+    logger.error("Install it using: pip install psycopg2-binary")
+    sys.exit(1)
+
+
+class PostgreSQLManager:
+    """PostgreSQL database manager with connection pooling for Ollama Scanner"""
+    _instance = None
+    _lock = threading.RLock()
+    _is_closing = False  # close_all() ran; the next get_connection() reopens the pool
+    _is_initialized = False  # The pool was created and answered a test query
+
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(PostgreSQLManager, cls).__new__(cls)
+                cls._instance._create_pool()
+            return cls._instance
+
+    def _connect_kwargs(self):
+        """psycopg2.connect() arguments for every pooled connection"""
+        kwargs = dict(
+            dbname=PG_DB_NAME,
+            user=PG_DB_USER,
+            password=PG_DB_PASSWORD,
+            host=PG_DB_HOST,
+            port=PG_DB_PORT,
+            connect_timeout=DB_CONNECTION_TIMEOUT,
+            keepalives=1,  # Enable TCP keepalives
+            keepalives_idle=60,  # Idle time after which to send keepalive (seconds)
+            keepalives_interval=10,  # Interval between keepalives (seconds)
+            keepalives_count=3  # Number of keepalives before considering connection dead
+        )
+        if DB_STATEMENT_TIMEOUT > 0:
+            # Applied at connect time instead of a SET round trip before every query
+            kwargs["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT}"
+        return kwargs
+
+    def _create_pool(self):
+        """Create the connection pool and check it with a test query"""
+        logger.info(f"Initializing PostgreSQL connection pool (min={MIN_CONNECTIONS}, max={MAX_CONNECTIONS})")
+        try:
+            self._pool = ConnectionPool(
+                minconn=MIN_CONNECTIONS,
+                maxconn=MAX_CONNECTIONS,
+                **self._connect_kwargs()
+            )
+            # Test the connection
+            conn = self._pool.getconn()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT version();")
+                    version = cursor.fetchone()[0]
+            finally:
+                self._pool.putconn(conn)
+            logger.info(f"Connected to PostgreSQL: {version}")
+            self._is_closing = False
+            self._is_initialized = True
+        except Exception as e:
+            self._is_initialized = False
+            logger.error(f"Failed to initialize PostgreSQL connection pool: {str(e)}")
+            raise
+
+    def reinitialize(self):
+        """Close the connection pool and open a new one; returns False if that fails"""
+        with self._lock:
+            logger.info("Reinitializing database connection pool")
+            pool = getattr(self, '_pool', None)
+            if pool is not None and not pool.closed:
+                # Closes checked-out connections too and wakes any waiting callers
+                pool.closeall()
+            try:
+                self._create_pool()
+            except Exception:
+                return False
+            logger.info("Database connection pool successfully reinitialized")
+            return True
+
+    def get_connection(self):
+        """Get a connection from the pool, waiting up to DB_POOL_TIMEOUT for one to be returned"""
+        # Reopen a pool closed by close_all() or a failed reinitialize()
+        if self._is_closing or not self._is_initialized:
+            with self._lock:
+                if self._is_closing or not self._is_initialized:
+                    logger.warning("Connection pool is closed. Attempting to reinitialize.")
+                    self.reinitialize()
+
+        started = time.perf_counter()
+        try:
+            connection = self._pool.getconn()
+        except PoolTimeout as e:
+            logger.error(f"Failed to get database connection: {e}")
+            raise
+        query_profiler.note_pool_wait(time.perf_counter() - started)
+        return connection
+
+    def return_connection(self, conn):
+        """Return a connection to the pool"""
+        if conn is None:
+            return
+        try:
+            # Connections from a pool that has since been replaced are closed
+            self._pool.putconn(conn)
+        except Exception as e:
+            logger.error(f"Error returning connection to pool: {e}")
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def execute(self, query, params=None):
+        """Execute a query with optional parameters and return cursor"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            # Replace SQLite parameter style with PostgreSQL
+            query = query.replace('?', '%s')
+            cursor.execute(query, params or ())
+            conn.commit()
+            return cursor
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.error(f"Error executing PostgreSQL query: {e}")
+            logger.debug(f"Query: {query}")
+            logger.debug(f"Params: {params}")
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def execute_many(self, query, params_list):
+        """Execute many operations with the same query but different parameters"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            # Replace SQLite parameter style with PostgreSQL
+            query = query.replace('?', '%s')
+            execute_values(cursor, query, params_list)
+            conn.commit()
+            return cursor
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.error(f"Error executing PostgreSQL batch query: {e}")
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def fetch_one(self, query, params=None):
+        """Execute a query and fetch one result"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor(cursor_factory=DictCursor)
+            # Replace SQLite parameter style with PostgreSQL
+            query = query.replace('?', '%s')
+            cursor.execute(query, params or ())
+            return cursor.fetchone()
+        except psycopg2.Error as e:
+            logger.error(f"Error fetching from PostgreSQL: {e}")
+            logger.debug(f"Query: {query}")
+            logger.debug(f"Params: {params}")
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def fetch_all(self, query, params=None):
+        """Execute a query and fetch all results"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor(cursor_factory=DictCursor)
+            # Replace SQLite parameter style with PostgreSQL
+            query = query.replace('?', '%s')
+            cursor.execute(query, params or ())
+            return cursor.fetchall()
+        except psycopg2.Error as e:
+            logger.error(f"Error fetching from PostgreSQL: {e}")
+            logger.debug(f"Query: {query}")
+            logger.debug(f"Params: {params}")
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def transaction(self, queries_params):
+        """Execute multiple queries in a transaction"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            for query, params in queries_params:
+                # Replace SQLite parameter style with PostgreSQL
+                query = query.replace('?', '%s')
+                cursor.execute(query, params or ())
+            conn.commit()
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.error(f"Error in PostgreSQL transaction: {e}")
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def pool_stats(self):
+        """Wait, checkout and leak counters of the connection pool"""
+        return self._pool.stats()
+
+    def close_all(self):
+        """Close all connections in the pool"""
+        with self._lock:
+            if hasattr(self, '_pool'):
+                self._is_closing = True
+                # Closes checked-out connections too and wakes any waiting callers
+                self._pool.closeall()
+                self._is_initialized = False
+                logger.info("Closed all PostgreSQL database connections")
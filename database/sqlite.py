@@ -0,0 +1,126 @@
+"""
+SQLite database manager: one short-lived connection per call
+"""
+
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+from query_profile import query_profiler
+from .config import logger, SQLITE_DB_PATH
+
+
+class SQLiteManager:
+    """SQLite database manager for Ollama Scanner"""
+    _instance = None
+    _lock = threading.Lock()
+    
+    def __new__(cls):
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = super(SQLiteManager, cls).__new__(cls)
+                cls._instance._initialize()
+            return cls._instance
+    
+    def _initialize(self):
+        """Initialize the SQLite connection"""
+        self.db_path = SQLITE_DB_PATH
+        logger.info(f"Initializing SQLite database: {self.db_path}")
+        
+        # Ensure the database file exists and has correct permissions
+        db_file = Path(self.db_path)
+        if not db_file.exists():
+            logger.warning(f"Database file not found: {self.db_path}")
+            # We'll create it when we connect
+        
+        # Check if database directory exists
+        db_dir = db_file.parent
+        if not db_dir.exists():
+            logger.info(f"Creating database directory: {db_dir}")
+            db_dir.mkdir(parents=True, exist_ok=True)
+    
+    def get_connection(self):
+        """Get a new SQLite connection"""
+        try:
+            started = time.perf_counter()
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row  # Allow dict-like access to rows
+            query_profiler.note_pool_wait(time.perf_counter() - started)
+            return conn
+        except sqlite3.Error as e:
+            logger.error(f"Error connecting to SQLite database: {e}")
+            raise
+    
+    def execute(self, query, params=None):
+        """Execute a query with optional parameters and return cursor"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params or ())
+            conn.commit()
+            return cursor
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Error executing SQLite query: {e}")
+            logger.debug(f"Query: {query}")
+            logger.debug(f"Params: {params}")
+            raise
+        finally:
+            conn.close()
+    
+    def execute_many(self, query, params_list):
+        """Execute many operations with the same query but different parameters"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.executemany(query, params_list)
+            conn.commit()
+            return cursor
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Error executing SQLite batch query: {e}")
+            raise
+        finally:
+            conn.close()
+    
+    def fetch_one(self, query, params=None):
+        """Execute a query and fetch one result"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params or ())
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching from SQLite: {e}")
+            raise
+        finally:
+            conn.close()
+    
+    def fetch_all(self, query, params=None):
+        """Execute a query and fetch all results"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(query, params or ())
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error fetching from SQLite: {e}")
+            raise
+        finally:
+            conn.close()
+    
+    def transaction(self, queries_params):
+        """Execute multiple queries in a transaction"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            for query, params in queries_params:
+                cursor.execute(query, params or ())
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Error in SQLite transaction: {e}")
+            raise
+        finally:
+            conn.close()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Snapshot Analytics for Ollama Scanner
+
+Answers analytical questions (model and quantization distribution, honeypot
+trends, churn of verified endpoints, growth) with DuckDB over the Parquet
+snapshots written by db_export.py, so heavy GROUP BYs run vectorized on any
+machine holding a copy of the export and never touch the live database.
+
+Usage:
+    python db_analytics.py summary                 # latest export in database_exports/parquet
+    python db_analytics.py churn --period week
+    python db_analytics.py --refresh honeypots     # take a fresh export first
+    python db_analytics.py sql "SELECT count(*) FROM models"
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+from datetime import datetime
+
+from tabulate import tabulate
+
+from db_export import DB_EXPORT_DIR, load_export
+
+try:
+    import duckdb
+    duckdb_available = True
+except ImportError:
+    duckdb_available = False
+
+logger = logging.getLogger('db_analytics')
+
+# A snapshot older than this (hours) gets a warning suggesting --refresh
+DB_ANALYTICS_MAX_AGE_HOURS = float(os.getenv("DB_ANALYTICS_MAX_AGE_HOURS", "24"))
+# DuckDB worker threads (0 lets DuckDB use every core)
+DB_ANALYTICS_THREADS = int(os.getenv("DB_ANALYTICS_THREADS", "0"))
+
+PERIODS = ("day", "week", "month")
+
+# Endpoints /db_info counts as serving: verified, not a honeypot, still active
+LIVE_ENDPOINT = "e.verified = 1 AND e.is_honeypot::BOOLEAN = false AND e.is_active::BOOLEAN = true"
+
+
+class SnapshotAnalytics:
+    """An in-memory DuckDB session with a view over each table of one export"""
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self.path = manifest["path"]
+        self.conn = duckdb.connect()
+        if DB_ANALYTICS_THREADS:
+            self.conn.execute(f"SET threads = {DB_ANALYTICS_THREADS}")
+        # Exports are partitioned on UTC dates; roll up on the same boundaries
+        self.conn.execute("SET TimeZone = 'UTC'")
+        self.tables = [table for table, entry in manifest["tables"].items() if entry["files"]]
+        for table in self.tables:
+            entry = manifest["tables"][table]
+            files = ", ".join("'" + os.path.join(self.path, name).replace("'", "''") + "'" for name in entry["files"])
+            # The Hive partition key is derived from a column already in the files
+            self.conn.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet([{files}], hive_partitioning = false)")
+
+    def query(self, sql, params=None):
+        """(headers, rows) for a query against the snapshot's views"""
+        result = self.conn.execute(sql, params or [])
+        return [column[0] for column in result.description], result.fetchall()
+
+    def _require(self, *tables):
+        missing = [table for table in tables if table not in self.tables]
+        if missing:
+            raise ValueError(f"Export {self.path} has no {', '.join(missing)} table")
+
+    def summary(self, limit=10, **_):
+        """The /db_info statistics"""
+        self._require("endpoints", "models")
+        live_models = f"FROM models m JOIN endpoints e ON m.endpoint_id = e.id WHERE {LIVE_ENDPOINT}"
+        _, [overview] = self.query(f"""
+            SELECT
+                (SELECT count(*) FROM endpoints),
+                (SELECT count(*) FROM endpoints WHERE verified = 1),
+                (SELECT count(*) FROM endpoints e WHERE {LIVE_ENDPOINT}),
+                (SELECT count(*) FROM endpoints WHERE is_honeypot::BOOLEAN),
+                (SELECT count(*) FROM endpoints WHERE NOT is_active::BOOLEAN),
+                (SELECT count(*) {live_models}),
+                (SELECT count(DISTINCT m.name) {live_models})
+        """)
+        total_models = overview[5]
+        labels = ["Endpoints", "Verified endpoints", "Live endpoints", "Honeypots", "Inactive",
+                  "Live model instances", "Unique live models"]
+        sections = [("Summary", ["Metric", "Value"], list(zip(labels, overview)))]
+
+        for title, column in (("Parameter Size Distribution", "parameter_size"),
+                              ("Quantization Level Distribution", "quantization_level"),
+                              ("Most Common Models", "name")):
+            headers, rows = self.query(f"""
+                SELECT m.{column} AS {column}, count(*) AS instances,
+                       round(100 * count(*) / greatest(?, 1), 1) AS percent
+                {live_models} AND m.{column} IS NOT NULL
+                GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT ?
+            """, [total_models, limit])
+            sections.append((title, headers, rows))
+        return sections
+
+    def models(self, limit=10, **_):
+        """Model popularity across live endpoints, with each model's quantizations, and family totals"""
+        self._require("endpoints", "models")
+        live_models = f"FROM models m JOIN endpoints e ON m.endpoint_id = e.id WHERE {LIVE_ENDPOINT}"
+        model_headers, model_rows = self.query(f"""
+            SELECT m.name AS model, count(*) AS instances, count(DISTINCT m.quantization_level) AS quantizations,
+                   mode(m.quantization_level) AS top_quantization, round(median(m.size_mb)) AS median_mb
+            {live_models}
+            GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT ?
+        """, [limit])
+        family_headers, family_rows = self.query(f"""
+            SELECT split_part(m.name, ':', 1) AS family, count(*) AS instances,
+                   count(DISTINCT m.endpoint_id) AS endpoints, count(DISTINCT m.name) AS variants
+            {live_models}
+            GROUP BY 1 ORDER BY 2 DESC, 1 LIMIT ?
+        """, [limit])
+        return [("Models", model_headers, model_rows), ("Model Families", family_headers, family_rows)]
+
+    def honeypots(self, period="month", limit=10, **_):
+        """Share of verifications flagged as honeypots per period, and the reasons recorded on endpoints"""
+        self._require("endpoints", "endpoint_verifications")
+        rate_headers, rate_rows = self.query(f"""
+            SELECT date_trunc('{period}', verification_date)::DATE AS {period},
+                   count(*) AS verifications,
+                   count(*) FILTER (WHERE is_honeypot::BOOLEAN) AS honeypot,
+                   round(100 * count(*) FILTER (WHERE is_honeypot::BOOLEAN) / count(*), 1) AS percent,
+                   count(DISTINCT endpoint_id) FILTER (WHERE is_honeypot::BOOLEAN) AS honeypot_endpoints
+            FROM endpoint_verifications
+            WHERE verification_date IS NOT NULL
+            GROUP BY 1 ORDER BY 1
+        """)
+        # Endpoints keep only their latest reason, dated by their last check
+        reason_headers, reason_rows = self.query(f"""
+            WITH flagged AS (
+                SELECT date_trunc('{period}', coalesce(last_check_date, verification_date, scan_date))::DATE AS {period},
+                       coalesce(honeypot_reason, 'Unknown') AS reason
+                FROM endpoints WHERE is_honeypot::BOOLEAN
+            ),
+            top_reasons AS (SELECT reason FROM flagged GROUP BY 1 ORDER BY count(*) DESC LIMIT ?)
+            SELECT {period}, CASE WHEN reason IN (SELECT reason FROM top_reasons) THEN reason ELSE 'Other' END AS reason,
+                   count(*) AS endpoints
+            FROM flagged GROUP BY 1, 2 ORDER BY 1, 3 DESC
+        """, [limit])
+        return [(f"Honeypot Verifications per {period.title()}", rate_headers, rate_rows),
+                ("Honeypot Reasons", reason_headers, reason_rows)]
+
+    def churn(self, period="month", **_):
+        """Endpoints passing verification each period: how many are new, kept and lost since the period before"""
+        self._require("endpoint_verifications")
+        headers, rows = self.query(f"""
+            WITH seen AS (
+                SELECT DISTINCT endpoint_id, date_trunc('{period}', verification_date)::DATE AS period
+                FROM endpoint_verifications
+                WHERE verification_date IS NOT NULL AND NOT is_honeypot::BOOLEAN
+            ),
+            periods AS (SELECT DISTINCT period FROM seen),
+            changes AS (
+                SELECT s.period,
+                       count(*) AS active,
+                       count(*) FILTER (WHERE p.endpoint_id IS NULL) AS new
+                FROM seen s
+                LEFT JOIN seen p ON p.endpoint_id = s.endpoint_id AND p.period = s.period - INTERVAL 1 {period}
+                GROUP BY 1
+            ),
+            lost AS (
+                SELECT (s.period + INTERVAL 1 {period})::DATE AS period, count(*) AS lost
+                FROM seen s
+                LEFT JOIN seen n ON n.endpoint_id = s.endpoint_id AND n.period = s.period + INTERVAL 1 {period}
+                WHERE n.endpoint_id IS NULL
+                GROUP BY 1
+            )
+            SELECT periods.period AS {period}, coalesce(c.active, 0) AS active, coalesce(c.new, 0) AS new,
+                   coalesce(c.active, 0) - coalesce(c.new, 0) AS kept, coalesce(l.lost, 0) AS lost,
+                   coalesce(c.new, 0) - coalesce(l.lost, 0) AS net
+            FROM periods
+            LEFT JOIN changes c ON c.period = periods.period
+            LEFT JOIN lost l ON l.period = periods.period
+            ORDER BY 1
+        """)
+        # The first period has nothing before it to compare with
+        return [(f"Verified Endpoint Churn per {period.title()}", headers, rows[1:] if len(rows) > 1 else rows)]
+
+    def growth(self, period="month", **_):
+        """Endpoints discovered and first verified per period, with running totals"""
+        self._require("endpoints")
+        headers, rows = self.query(f"""
+            WITH discovered AS (
+                SELECT date_trunc('{period}', scan_date)::DATE AS period, count(*) AS discovered
+                FROM endpoints WHERE scan_date IS NOT NULL GROUP BY 1
+            ),
+            verified AS (
+                SELECT date_trunc('{period}', verification_date)::DATE AS period, count(*) AS verified
+                FROM endpoints WHERE verified = 1 AND verification_date IS NOT NULL GROUP BY 1
+            )
+            SELECT period AS {period},
+                   coalesce(d.discovered, 0) AS discovered,
+                   sum(coalesce(d.discovered, 0)) OVER (ORDER BY period) AS total_discovered,
+                   coalesce(v.verified, 0) AS verified,
+                   sum(coalesce(v.verified, 0)) OVER (ORDER BY period) AS total_verified
+            FROM discovered d FULL OUTER JOIN verified v USING (period)
+            ORDER BY 1
+        """)
+        return [(f"Endpoint Growth per {period.title()}", headers, rows)]
+
+    def sql(self, query, **_):
+        """Any query against the snapshot's views"""
+        headers, rows = self.query(query)
+        return [("Query", headers, rows)]
+
+    def close(self):
+        self.conn.close()
+
+
+REPORTS = ["summary", "models", "honeypots", "churn", "growth", "sql"]
+
+
+def open_snapshot(path=None, output_dir=DB_EXPORT_DIR):
+    """SnapshotAnalytics over the export at path, or the newest one in output_dir"""
+    if not duckdb_available:
+        raise RuntimeError("duckdb is required for snapshot analytics; install it using: pip install duckdb")
+    manifest = load_export(path, output_dir)
+    if manifest is None:
+        raise RuntimeError(f"No exports found in {output_dir}; run db_export.py (or pass --refresh) first")
+    return SnapshotAnalytics(manifest)
+
+
+def snapshot_age_hours(manifest):
+    return (datetime.now() - datetime.fromisoformat(manifest["exported_at"])).total_seconds() / 3600
+
+
+def _json_value(value):
+    # Dates and timestamps
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def format_sections(sections, fmt="table"):
+    """Render report sections as tabulate grids or JSON"""
+    if fmt == "json":
+        return json.dumps([{"title": title,
+                            "rows": [dict(zip(headers, (_json_value(v) for v in row))) for row in rows]}
+                           for title, headers, rows in sections], indent=2)
+    output = []
+    for title, headers, rows in sections:
+        output.append(f"{title.upper()}:")
+        output.append(tabulate(rows, headers=headers, tablefmt="grid") if rows else "No rows.")
+        output.append("")
+    return "\n".join(output)
+
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+    parser = argparse.ArgumentParser(description="Analytics over Ollama Scanner Parquet exports (DuckDB)")
+    parser.add_argument("report", choices=REPORTS, help="Report to run")
+    parser.add_argument("query", nargs="?", help="SQL for the sql report")
+    parser.add_argument("--snapshot", help="Export directory to use (default: the newest)")
+    parser.add_argument("--dir", default=DB_EXPORT_DIR, help=f"Where exports live (default: {DB_EXPORT_DIR})")
+    parser.add_argument("--refresh", action="store_true", help="Take a fresh export from the database first")
+    parser.add_argument("--period", choices=PERIODS, default="month", help="Rollup period for time series")
+    parser.add_argument("--limit", type=int, default=10, help="Rows in top-N lists")
+    parser.add_argument("--format", choices=["table", "json"], default="table", help="Output format")
+    args = parser.parse_args(argv)
+
+    if args.report == "sql" and not args.query:
+        parser.error("the sql report needs a query")
+
+    snapshot = args.snapshot
+    if args.refresh:
+        from db_export import export_parquet
+        snapshot = export_parquet(args.dir)["path"]
+
+    try:
+        analytics = open_snapshot(snapshot, args.dir)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+
+    age = snapshot_age_hours(analytics.manifest)
+    if age > DB_ANALYTICS_MAX_AGE_HOURS:
+        logger.warning(f"Snapshot {analytics.path} is {age:.0f} hours old; pass --refresh for a new one")
+    if args.format == "table":
+        print(f"Snapshot: {analytics.path} (exported {analytics.manifest['exported_at'][:19]})\n")
+
+    try:
+        report = getattr(analytics, args.report)
+        sections = report(args.query) if args.report == "sql" else report(period=args.period, limit=args.limit)
+    except (ValueError, duckdb.Error) as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        analytics.close()
+
+    try:
+        print(format_sections(sections, args.format))
+    except BrokenPipeError:
+        # Output piped to a pager or head
+        sys.stderr.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,664 @@
+#!/usr/bin/env python3
+"""
+Incremental Database Backup for Ollama Scanner
+
+Each backup run writes, from one consistent snapshot of the PostgreSQL
+database:
+
+- a directory-format pg_dump (parallel with --jobs, zstd-compressed) of the
+  schema and every table except the data of the append-only history tables
+  (endpoint_verifications, chat_history, benchmark_results);
+- for each append-only table, one compressed COPY chunk holding only the rows
+  added since the previous run, found by the id high-water mark recorded in
+  the manifest.
+
+A restore loads the chosen run's dump with pg_restore --jobs, then replays the
+chunks of that run's chain, one table per worker. Applied chunks are recorded
+in the target database (backup_restore_log) so --resume only replays what is
+missing after an interrupted restore.
+
+Usage:
+    python db_backup.py backup [--full] [--jobs 8]
+    python db_backup.py restore [--run 20250101_020000] [--dbname ollama_restore] [--resume]
+    python db_backup.py list
+    python db_backup.py verify
+"""
+
+import os
+import sys
+import json
+import gzip
+import time
+import fcntl
+import shutil
+import hashlib
+import logging
+import argparse
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2 import sql
+from dotenv import load_dotenv
+from tabulate import tabulate
+
+try:
+    import zstandard
+    zstd_available = True
+except ImportError:
+    zstd_available = False
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]
+)
+logger = logging.getLogger('db_backup')
+
+# Load environment variables
+load_dotenv()
+
+# Database connection parameters
+PG_DB_NAME = os.getenv("POSTGRES_DB", "ollama_scanner")
+PG_DB_USER = os.getenv("POSTGRES_USER", "ollama")
+PG_DB_PASSWORD = os.getenv("POSTGRES_PASSWORD", "ollama_scanner_password")
+PG_DB_HOST = os.getenv("POSTGRES_HOST", "localhost")
+PG_DB_PORT = os.getenv("POSTGRES_PORT", "5432")
+
+# Backup configuration
+DB_BACKUP_DIR = os.getenv("DB_BACKUP_DIR", "backups")
+DB_BACKUP_JOBS = int(os.getenv("DB_BACKUP_JOBS", str(min(4, os.cpu_count() or 1))))
+# pg_dump --compress; builds without zstd fall back to gzip
+DB_BACKUP_COMPRESS = os.getenv("DB_BACKUP_COMPRESS", "zstd:3")
+# Runs whose dump is kept; chunks are kept as long as a kept run needs them
+DB_BACKUP_KEEP = int(os.getenv("DB_BACKUP_KEEP", "7"))
+# Rows just below the last high-water mark are exported again, in case they were
+# committed after the previous run even though their id was lower
+DB_BACKUP_OVERLAP_IDS = int(os.getenv("DB_BACKUP_OVERLAP_IDS", "100"))
+# Directory holding pg_dump/pg_restore if they are not on PATH
+PG_BIN_DIR = os.getenv("PG_BIN_DIR", "")
+# Tables that only grow at the top of their id range (old rows may be deleted)
+APPEND_ONLY_TABLES = [t.strip() for t in os.getenv(
+    "DB_BACKUP_APPEND_ONLY", "endpoint_verifications,chat_history,benchmark_results").split(",") if t.strip()]
+
+MANIFEST_NAME = "manifest.json"
+RESTORE_LOG_TABLE = "backup_restore_log"
+CHUNK_ZSTD_LEVEL = 3
+CHUNK_GZIP_LEVEL = 6
+FALLBACK_COMPRESS = "gzip:6"
+
+
+class BackupError(Exception):
+    """A backup or restore step failed"""
+
+
+def connect(dbname=None):
+    return psycopg2.connect(host=PG_DB_HOST, port=PG_DB_PORT, user=PG_DB_USER,
+                            password=PG_DB_PASSWORD, dbname=dbname or PG_DB_NAME)
+
+
+def _pg_tool(name):
+    return os.path.join(PG_BIN_DIR, name) if PG_BIN_DIR else name
+
+
+def _pg_env():
+    return dict(os.environ, PGPASSWORD=PG_DB_PASSWORD)
+
+
+def _connection_args(dbname):
+    return ["--host", PG_DB_HOST, "--port", str(PG_DB_PORT), "--username", PG_DB_USER, "--dbname", dbname]
+
+
+# --- Manifest ---
+
+def load_manifest(backup_dir):
+    path = os.path.join(backup_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": 1, "database": PG_DB_NAME, "runs": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(backup_dir, manifest):
+    path = os.path.join(backup_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _find_run(manifest, name=None):
+    """The named run, or the latest run that still has its dump"""
+    runs = [r for r in manifest["runs"] if r.get("snapshot")]
+    if name:
+        runs = [r for r in manifest["runs"] if r["name"] == name]
+        if not runs:
+            raise BackupError(f"No backup run named {name}")
+        if not runs[0].get("snapshot"):
+            raise BackupError(f"The dump of run {name} has been pruned")
+    if not runs:
+        raise BackupError("No restorable backup runs in the manifest")
+    return runs[-1]
+
+
+def _chain(manifest, run):
+    """Runs whose chunks a restore of run needs: from the last --full run up to run"""
+    runs = manifest["runs"][:manifest["runs"].index(run) + 1]
+    start = max((i for i, r in enumerate(runs) if r.get("base")), default=0)
+    return runs[start:]
+
+
+# --- Chunk files ---
+
+class _HashingFile:
+    """File wrapper that checksums and counts what is written through it"""
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self._file.write(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+class _ChunkWriter:
+    """Compressing writer for COPY ... TO STDOUT output; counts rows"""
+
+    codec = "zstd" if zstd_available else "gzip"
+    extension = ".zst" if zstd_available else ".gz"
+
+    def __init__(self, path):
+        self._raw = _HashingFile(path)
+        if zstd_available:
+            self._stream = zstandard.ZstdCompressor(level=CHUNK_ZSTD_LEVEL).stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=CHUNK_GZIP_LEVEL, mtime=0)
+        self.rows = 0
+
+    def write(self, data):
+        self.rows += data.count(b"\n")
+        return self._stream.write(data)
+
+    def close(self):
+        self._stream.close()
+        self._raw.close()
+
+
+def _open_chunk(path, codec):
+    if codec == "zstd":
+        if not zstd_available:
+            raise BackupError(f"{path} is zstd-compressed; install zstandard (pip install zstandard) to restore it")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return gzip.open(path, "rb")
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+# --- Backup ---
+
+def _table_columns(cursor, table):
+    cursor.execute("""
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+        ORDER BY attnum
+    """, (table,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _append_only_tables(cursor):
+    """Configured append-only tables that exist and have an id column"""
+    tables = []
+    for table in APPEND_ONLY_TABLES:
+        cursor.execute("SELECT to_regclass(%s)", (table,))
+        if cursor.fetchone()[0] is None:
+            continue
+        if "id" not in _table_columns(cursor, table):
+            logger.warning(f"{table} has no id column; backing it up in the dump instead")
+            continue
+        tables.append(table)
+    return tables
+
+
+def _start_pg_dump(snapshot_id, directory, jobs, compress, excluded_data):
+    cmd = [_pg_tool("pg_dump"), *_connection_args(PG_DB_NAME), "--format=directory", f"--jobs={jobs}",
+           f"--compress={compress}", f"--snapshot={snapshot_id}", f"--file={directory}",
+           f"--exclude-table={RESTORE_LOG_TABLE}"]
+    cmd += [f"--exclude-table-data={table}" for table in excluded_data]
+    return subprocess.Popen(cmd, env=_pg_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+
+def _pg_dump_version():
+    result = subprocess.run([_pg_tool("pg_dump"), "--version"], capture_output=True, text=True, check=True)
+    return result.stdout.strip().split()[-1]
+
+
+def _export_chunk(conn, backup_dir, run_name, table, after_id, to_id, columns):
+    relative = os.path.join("chunks", table, f"{table}_{run_name}_{after_id + 1}_{to_id}.copy{_ChunkWriter.extension}")
+    path = os.path.join(backup_dir, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    column_list = sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+    query = sql.SQL("COPY (SELECT {cols} FROM {table} WHERE id > {after} AND id <= {to} ORDER BY id) TO STDOUT").format(
+        cols=column_list, table=sql.Identifier(table), after=sql.Literal(after_id), to=sql.Literal(to_id))
+    writer = _ChunkWriter(path)
+    try:
+        conn.cursor().copy_expert(query.as_string(conn), writer)
+    finally:
+        writer.close()
+    return {
+        "table": table,
+        "run": run_name,
+        "file": relative,
+        "after_id": after_id,
+        "to_id": to_id,
+        "rows": writer.rows,
+        "bytes": writer._raw.bytes,
+        "sha256": writer._raw.sha256.hexdigest(),
+        "codec": writer.codec,
+        "columns": columns,
+    }
+
+
+def backup(backup_dir=DB_BACKUP_DIR, jobs=DB_BACKUP_JOBS, compress=DB_BACKUP_COMPRESS, full=False, keep=DB_BACKUP_KEEP):
+    """
+    Run one backup and add it to the manifest
+
+    Returns:
+        dict: The manifest entry for the run
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    lock = open(os.path.join(backup_dir, "backup.lock"), "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        raise BackupError(f"Another backup is running in {backup_dir}")
+
+    try:
+        manifest = load_manifest(backup_dir)
+        if manifest["database"] != PG_DB_NAME:
+            raise BackupError(f"{backup_dir} holds backups of {manifest['database']}, not {PG_DB_NAME}")
+        previous = manifest["runs"][-1] if manifest["runs"] else None
+        base = full or previous is None
+        name = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if previous and previous["name"] >= name:
+            raise BackupError(f"Run {previous['name']} is not older than {name}; check the clock")
+        started = time.monotonic()
+
+        # Everything below reads one snapshot; pg_dump attaches to it with --snapshot
+        conn = connect()
+        conn.set_session(isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+        snapshot_dir = os.path.join("snapshots", name)
+        os.makedirs(os.path.join(backup_dir, "snapshots"), exist_ok=True)
+        chunks = []
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_export_snapshot()")
+            snapshot_id = cursor.fetchone()[0]
+            tables = _append_only_tables(cursor)
+
+            logger.info(f"Starting {'full' if base else 'incremental'} backup {name} of {PG_DB_NAME} "
+                        f"({jobs} jobs, compression {compress})")
+            dump = _start_pg_dump(snapshot_id, os.path.join(backup_dir, snapshot_dir), jobs, compress, tables)
+
+            # Export the new rows of the append-only tables while pg_dump works on the rest
+            bounds = {}
+            for table in tables:
+                cursor.execute(sql.SQL("SELECT MIN(id), MAX(id) FROM {}").format(sql.Identifier(table)))
+                low, high = cursor.fetchone()
+                low, high = low or 0, high or 0
+                bounds[table] = {"low": low, "high": high}
+                last_high = 0 if base else previous["tables"].get(table, {}).get("high", 0)
+                after_id = max(0, min(last_high, high) - (0 if base else DB_BACKUP_OVERLAP_IDS))
+                if high > after_id:
+                    chunk = _export_chunk(conn, backup_dir, name, table, after_id, high, _table_columns(cursor, table))
+                    chunks.append(chunk)
+                    logger.info(f"{table}: {chunk['rows']} rows (ids {after_id + 1}-{high}), {chunk['bytes']} bytes")
+                else:
+                    logger.info(f"{table}: no new rows")
+
+            _, errors = dump.communicate()
+            if dump.returncode != 0 and "does not support compression" in errors:
+                logger.warning(f"pg_dump can't compress with {compress}; using {FALLBACK_COMPRESS}")
+                compress = FALLBACK_COMPRESS
+                shutil.rmtree(os.path.join(backup_dir, snapshot_dir), ignore_errors=True)
+                dump = _start_pg_dump(snapshot_id, os.path.join(backup_dir, snapshot_dir), jobs, compress, tables)
+                _, errors = dump.communicate()
+            if dump.returncode != 0:
+                raise BackupError(f"pg_dump failed: {errors.strip()}")
+        except Exception:
+            shutil.rmtree(os.path.join(backup_dir, snapshot_dir), ignore_errors=True)
+            for chunk in chunks:
+                _remove(os.path.join(backup_dir, chunk["file"]))
+            raise
+        finally:
+            conn.rollback()
+            conn.close()
+
+        run = {
+            "name": name,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "base": base,
+            "snapshot": snapshot_dir,
+            "snapshot_bytes": _dir_bytes(os.path.join(backup_dir, snapshot_dir)),
+            "compress": compress,
+            "pg_dump_version": _pg_dump_version(),
+            "duration_seconds": round(time.monotonic() - started, 1),
+            "tables": bounds,
+            "chunks": chunks,
+        }
+        manifest["runs"].append(run)
+        save_manifest(backup_dir, manifest)
+        logger.info(f"Backup {name} complete in {run['duration_seconds']}s: dump {run['snapshot_bytes']} bytes, "
+                    f"{sum(c['rows'] for c in chunks)} history rows in {len(chunks)} chunks")
+
+        if keep > 0:
+            prune(backup_dir, manifest, keep)
+        return run
+    finally:
+        lock.close()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def prune(backup_dir, manifest, keep):
+    """Delete dumps beyond the newest keep runs, and chunks no kept run needs"""
+    with_dump = [r for r in manifest["runs"] if r.get("snapshot")]
+    for run in with_dump[:-keep]:
+        shutil.rmtree(os.path.join(backup_dir, run["snapshot"]), ignore_errors=True)
+        run["snapshot"] = None
+        logger.info(f"Pruned dump of run {run['name']}")
+
+    oldest_kept = next((r for r in manifest["runs"] if r.get("snapshot")), None)
+    if oldest_kept is not None:
+        needed_from = manifest["runs"].index(_chain(manifest, oldest_kept)[0])
+        for run in manifest["runs"][:needed_from]:
+            for chunk in run["chunks"]:
+                _remove(os.path.join(backup_dir, chunk["file"]))
+            if run["chunks"]:
+                logger.info(f"Pruned {len(run['chunks'])} chunks of run {run['name']}")
+            run["chunks"] = []
+    save_manifest(backup_dir, manifest)
+
+
+# --- Restore ---
+
+def _foreign_keys(cursor, table):
+    """Single-column foreign keys of table as (column, parent table, parent column, on-delete action)"""
+    cursor.execute("""
+        SELECT a.attname, c.confrelid::regclass::text, af.attname, c.confdeltype
+        FROM pg_constraint c
+        JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+        JOIN pg_attribute af ON af.attrelid = c.confrelid AND af.attnum = c.confkey[1]
+        WHERE c.conrelid = %s::regclass AND c.contype = 'f' AND array_length(c.conkey, 1) = 1
+    """, (table,))
+    return cursor.fetchall()
+
+
+def _replay_chunk(conn, backup_dir, run, chunk):
+    """Load one chunk into its table in a single transaction; returns rows inserted"""
+    table = chunk["table"]
+    bounds = run["tables"][table]
+    cursor = conn.cursor()
+    target_columns = _table_columns(cursor, table)
+    columns = [c for c in chunk["columns"] if c in target_columns]
+
+    cursor.execute(sql.SQL("CREATE TEMP TABLE _restore_chunk (LIKE {}) ON COMMIT DROP").format(sql.Identifier(table)))
+    for column in chunk["columns"]:
+        if column not in target_columns:
+            # Dropped from the table since the chunk was written; load it and leave it out
+            cursor.execute(sql.SQL("ALTER TABLE _restore_chunk ADD COLUMN {} TEXT").format(sql.Identifier(column)))
+    copy = sql.SQL("COPY _restore_chunk ({}) FROM STDIN").format(
+        sql.SQL(", ").join(sql.Identifier(c) for c in chunk["columns"]))
+    with _open_chunk(os.path.join(backup_dir, chunk["file"]), chunk["codec"]) as f:
+        cursor.copy_expert(copy.as_string(conn), f)
+
+    # Rows whose parent was deleted before the dump went with it (ON DELETE CASCADE) or lost the reference (SET NULL)
+    select = {c: sql.SQL("s.{}").format(sql.Identifier(c)) for c in columns}
+    conditions = [sql.SQL("s.id >= {} AND s.id <= {}").format(sql.Literal(bounds["low"]), sql.Literal(bounds["high"]))]
+    for column, parent, parent_column, action in _foreign_keys(cursor, table):
+        if column not in select:
+            continue
+        exists = sql.SQL("EXISTS (SELECT 1 FROM {parent} p WHERE p.{pcol} = s.{col})").format(
+            parent=sql.SQL(parent), pcol=sql.Identifier(parent_column), col=sql.Identifier(column))
+        if action == "n":
+            select[column] = sql.SQL("CASE WHEN {} THEN s.{} END").format(exists, sql.Identifier(column))
+        else:
+            conditions.append(sql.SQL("(s.{} IS NULL OR {})").format(sql.Identifier(column), exists))
+
+    cursor.execute(sql.SQL("INSERT INTO {table} ({cols}) SELECT {exprs} FROM _restore_chunk s WHERE {where} "
+                           "ON CONFLICT DO NOTHING").format(
+        table=sql.Identifier(table),
+        cols=sql.SQL(", ").join(sql.Identifier(c) for c in columns),
+        exprs=sql.SQL(", ").join(select[c] for c in columns),
+        where=sql.SQL(" AND ").join(conditions)))
+    inserted = cursor.rowcount
+    cursor.execute(sql.SQL("INSERT INTO {} (chunk, run, rows) VALUES (%s, %s, %s)").format(
+        sql.Identifier(RESTORE_LOG_TABLE)), (chunk["file"], chunk["run"], inserted))
+    conn.commit()
+    return inserted
+
+
+def _replay_table(dbname, backup_dir, run, chunks):
+    conn = connect(dbname)
+    try:
+        total = 0
+        for chunk in chunks:
+            if _file_sha256(os.path.join(backup_dir, chunk["file"])) != chunk["sha256"]:
+                raise BackupError(f"Checksum mismatch for {chunk['file']}")
+            try:
+                inserted = _replay_chunk(conn, backup_dir, run, chunk)
+            except Exception:
+                conn.rollback()
+                raise
+            total += inserted
+            logger.info(f"{chunk['table']}: replayed {chunk['file']} ({inserted} of {chunk['rows']} rows)")
+        return total
+    finally:
+        conn.close()
+
+
+def restore(run_name=None, dbname=None, backup_dir=DB_BACKUP_DIR, jobs=DB_BACKUP_JOBS, resume=False):
+    """
+    Restore a run into dbname (default POSTGRES_DB), replacing its contents
+
+    With resume, pg_restore is skipped and only chunks not yet recorded in
+    backup_restore_log are replayed; the log must come from the same run.
+    """
+    dbname = dbname or PG_DB_NAME
+    manifest = load_manifest(backup_dir)
+    run = _find_run(manifest, run_name)
+    chunks = [c for r in _chain(manifest, run) for c in r["chunks"]]
+    started = time.monotonic()
+
+    if not resume:
+        logger.info(f"Restoring dump of run {run['name']} into {dbname} ({jobs} jobs)")
+        cmd = [_pg_tool("pg_restore"), *_connection_args(dbname), "--clean", "--if-exists", "--no-owner",
+               "--no-privileges", f"--jobs={jobs}", os.path.join(backup_dir, run["snapshot"])]
+        result = subprocess.run(cmd, env=_pg_env(), capture_output=True, text=True)
+        if result.returncode != 0:
+            raise BackupError(f"pg_restore failed: {result.stderr.strip()}")
+
+    conn = connect(dbname)
+    try:
+        cursor = conn.cursor()
+        if not resume:
+            cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(RESTORE_LOG_TABLE)))
+            cursor.execute(sql.SQL("""
+                CREATE TABLE {} (
+                    chunk TEXT PRIMARY KEY,
+                    run TEXT NOT NULL,
+                    rows BIGINT,
+                    applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                )
+            """).format(sql.Identifier(RESTORE_LOG_TABLE)))
+            cursor.execute(sql.SQL("INSERT INTO {} (chunk, run, rows) VALUES ('snapshot', %s, 0)").format(
+                sql.Identifier(RESTORE_LOG_TABLE)), (run["name"],))
+            conn.commit()
+        else:
+            cursor.execute("SELECT to_regclass(%s)", (RESTORE_LOG_TABLE,))
+            if cursor.fetchone()[0] is None:
+                raise BackupError(f"{dbname} has no {RESTORE_LOG_TABLE}; run a full restore first")
+            cursor.execute(sql.SQL("SELECT run FROM {} WHERE chunk = 'snapshot'").format(sql.Identifier(RESTORE_LOG_TABLE)))
+            row = cursor.fetchone()
+            if row is None or row[0] != run["name"]:
+                raise BackupError(f"{dbname} was restored from run {row[0] if row else 'unknown'}, not {run['name']}; "
+                                  "run a full restore instead of --resume")
+        cursor.execute(sql.SQL("SELECT chunk FROM {}").format(sql.Identifier(RESTORE_LOG_TABLE)))
+        applied = {row[0] for row in cursor.fetchall()}
+    finally:
+        conn.close()
+
+    pending = {}
+    for chunk in chunks:
+        # Tables dropped before this run's dump have nothing to restore into
+        if chunk["file"] not in applied and chunk["table"] in run["tables"]:
+            pending.setdefault(chunk["table"], []).append(chunk)
+    replaying = sum(len(c) for c in pending.values())
+    logger.info(f"Replaying {replaying} history chunks ({len(applied) - 1} already applied)")
+
+    inserted = 0
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(pending)))) as executor:
+            futures = [executor.submit(_replay_table, dbname, backup_dir, run, table_chunks)
+                       for table_chunks in pending.values()]
+            inserted = sum(future.result() for future in futures)
+
+    conn = connect(dbname)
+    try:
+        cursor = conn.cursor()
+        for table in run["tables"]:
+            # Sequences come from the dump; move them past any replayed ids
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (table,))
+            sequence = cursor.fetchone()[0]
+            if sequence:
+                cursor.execute(sql.SQL("SELECT setval(%s, GREATEST((SELECT COALESCE(MAX(id), 1) FROM {}), "
+                                       "(SELECT last_value FROM {})))").format(sql.Identifier(table), sql.SQL(sequence)),
+                               (sequence,))
+            cursor.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(table)))
+        conn.commit()
+    finally:
+        conn.close()
+
+    logger.info(f"Restore of run {run['name']} into {dbname} complete in {time.monotonic() - started:.1f}s "
+                f"({inserted} history rows replayed)")
+    return inserted
+
+
+# --- Inspection ---
+
+def verify(backup_dir=DB_BACKUP_DIR, run_name=None):
+    """Check chunk checksums and that each dump is readable by pg_restore; returns the problems found"""
+    manifest = load_manifest(backup_dir)
+    runs = [_find_run(manifest, run_name)] if run_name else manifest["runs"]
+    problems = []
+    for run in runs:
+        if run.get("snapshot"):
+            result = subprocess.run([_pg_tool("pg_restore"), "--list", os.path.join(backup_dir, run["snapshot"])],
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                problems.append(f"{run['name']}: dump unreadable: {result.stderr.strip()}")
+        for chunk in run["chunks"]:
+            path = os.path.join(backup_dir, chunk["file"])
+            if not os.path.exists(path):
+                problems.append(f"{run['name']}: missing {chunk['file']}")
+            elif _file_sha256(path) != chunk["sha256"]:
+                problems.append(f"{run['name']}: checksum mismatch for {chunk['file']}")
+    return problems
+
+
+def format_runs(manifest):
+    rows = []
+    for run in manifest["runs"]:
+        rows.append([
+            run["name"],
+            "full" if run["base"] else "incremental",
+            f"{run['snapshot_bytes'] / 1048576:.1f} MB" if run.get("snapshot") else "pruned",
+            sum(c["rows"] for c in run["chunks"]),
+            f"{sum(c['bytes'] for c in run['chunks']) / 1048576:.1f} MB",
+            run["compress"],
+            f"{run['duration_seconds']}s",
+        ])
+    return tabulate(rows, headers=["Run", "Type", "Dump", "History rows", "Chunks", "Compression", "Took"], tablefmt="grid")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental, parallel PostgreSQL backup for Ollama Scanner")
+    parser.add_argument("--dir", default=DB_BACKUP_DIR, help=f"Backup directory (default: {DB_BACKUP_DIR})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backup_parser = subparsers.add_parser("backup", help="Dump the database and export new history rows")
+    backup_parser.add_argument("--full", action="store_true", help="Re-export the history tables from scratch")
+    backup_parser.add_argument("--jobs", "-j", type=int, default=DB_BACKUP_JOBS, help="Parallel pg_dump jobs")
+    backup_parser.add_argument("--compress", default=DB_BACKUP_COMPRESS, help="pg_dump --compress setting")
+    backup_parser.add_argument("--keep", type=int, default=DB_BACKUP_KEEP, help="Dumps to keep (0 keeps all)")
+
+    restore_parser = subparsers.add_parser("restore", help="Restore a run into a database")
+    restore_parser.add_argument("--run", help="Run name (default: the latest with a dump)")
+    restore_parser.add_argument("--dbname", help=f"Target database (default: {PG_DB_NAME})")
+    restore_parser.add_argument("--jobs", "-j", type=int, default=DB_BACKUP_JOBS, help="Parallel restore jobs")
+    restore_parser.add_argument("--resume", action="store_true", help="Only replay chunks missing from the target")
+    restore_parser.add_argument("--yes", "-y", action="store_true", help="Don't ask for confirmation")
+
+    subparsers.add_parser("list", help="Show the runs in the manifest")
+    verify_parser = subparsers.add_parser("verify", help="Check chunk checksums and dump readability")
+    verify_parser.add_argument("--run", help="Only this run")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dir, exist_ok=True)
+    logging.getLogger().addHandler(logging.FileHandler(os.path.join(args.dir, "db_backup.log")))
+    try:
+        if args.command == "backup":
+            backup(args.dir, args.jobs, args.compress, args.full, args.keep)
+        elif args.command == "restore":
+            target = args.dbname or PG_DB_NAME
+            if not args.resume and not args.yes:
+                answer = input(f"This will replace the contents of database {target}. Continue? [y/N] ")
+                if answer.strip().lower() not in ("y", "yes"):
+                    print("Restore cancelled")
+                    return 0
+            restore(args.run, target, args.dir, args.jobs, args.resume)
+        elif args.command == "list":
+            print(format_runs(load_manifest(args.dir)))
+        elif args.command == "verify":
+            problems = verify(args.dir, args.run)
+            for problem in problems:
+                print(problem)
+            print("OK" if not problems else f"{len(problems)} problems")
+            return 1 if problems else 0
+    except (BackupError, psycopg2.Error, OSError) as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Columnar Database Export for Ollama Scanner
+
+Streams endpoints, models, verification history and benchmark results into
+Parquet files for offline analysis with pyarrow, pandas or DuckDB. Rows are
+read in batches (a server-side cursor on PostgreSQL) and each batch is
+written as a row group, so memory stays flat however large the tables are.
+
+Tables with a date column are partitioned Hive-style by month (or day), e.g.
+endpoints/month=2025-03/part-0.parquet. Model names, parameter sizes and
+quantization levels are dictionary-encoded. Every table is read from the same
+snapshot, and an export only appears under its final name once complete.
+
+Usage:
+    python db_export.py                        # database_exports/parquet/<timestamp>/
+    python db_export.py --partition day --tables endpoints models
+    python db_export.py --sqlite-path ollama_instances.db --include-sensitive
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    pyarrow_available = True
+except ImportError:
+    pyarrow_available = False
+
+logger = logging.getLogger('db_export')
+
+# Export configuration
+DB_EXPORT_DIR = os.getenv("DB_EXPORT_DIR", os.path.join("database_exports", "parquet"))
+# Rows fetched per batch; each batch becomes (at most) one row group per partition
+DB_EXPORT_BATCH_ROWS = int(os.getenv("DB_EXPORT_BATCH_ROWS", "50000"))
+# Partition granularity for tables with a date column: month, day or none
+DB_EXPORT_PARTITION = os.getenv("DB_EXPORT_PARTITION", "month")
+DB_EXPORT_COMPRESSION = os.getenv("DB_EXPORT_COMPRESSION", "zstd")
+
+# table -> (date column to partition by, columns stored as Arrow dictionaries)
+EXPORT_TABLES = {
+    "endpoints": ("scan_date", ["honeypot_reason", "inactive_reason"]),
+    "models": (None, ["name", "parameter_size", "quantization_level"]),
+    "endpoint_verifications": ("verification_date", []),
+    "benchmark_results": ("test_date", []),
+}
+
+PARTITION_FORMATS = {
+    "month": ("YYYY-MM", "%Y-%m"),
+    "day": ("YYYY-MM-DD", "%Y-%m-%d"),
+}
+# Directory name Hive readers map back to NULL
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+MANIFEST_NAME = "manifest.json"
+
+
+def _arrow_type(declared):
+    """Map a PostgreSQL data_type or SQLite declared type to an Arrow type"""
+    declared = (declared or "").lower()
+    if "bool" in declared:
+        return pa.bool_()
+    if "int" in declared:
+        return pa.int64()
+    if "timestamp" in declared:
+        return pa.timestamp("us", tz="UTC") if "with time zone" in declared else pa.timestamp("us")
+    if declared == "date":
+        return pa.date32()
+    if any(word in declared for word in ("numeric", "decimal", "real", "double", "float")):
+        return pa.float64()
+    # text, varchar, json/jsonb (selected as text)
+    return pa.string()
+
+
+def _select_expression(column, declared, is_postgres):
+    """Column expression for the export query; casts types psycopg2 returns as Python objects"""
+    declared = (declared or "").lower()
+    if is_postgres and declared in ("numeric", "decimal"):
+        return f"{column}::float8"
+    if is_postgres and declared in ("json", "jsonb"):
+        return f"{column}::text"
+    return column
+
+
+def _table_columns(cursor, table, is_postgres):
+    """[(column, declared type)] in table order, or [] if the table doesn't exist"""
+    if is_postgres:
+        cursor.execute("""
+            SELECT column_name, data_type FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = %s
+            ORDER BY ordinal_position
+        """, (table,))
+        return [(row[0], row[1]) for row in cursor.fetchall()]
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [(row[1], row[2]) for row in cursor.fetchall()]
+
+
+def _mask_ip(ip):
+    """Keep only the first octet, as Toolv2's export does"""
+    if ip is None:
+        return None
+    parts = ip.split(".")
+    return f"{parts[0]}.***.***" if len(parts) == 4 else "obscured"
+
+
+def _to_timestamp(value):
+    # SQLite stores timestamps as text
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _batch_to_table(rows, schema, converters):
+    columns = list(zip(*rows))
+    arrays = []
+    for values, field, convert in zip(columns, schema, converters):
+        if convert is not None:
+            values = [convert(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class _PartitionWriters:
+    """One ParquetWriter per partition directory, closed as soon as the rows move past it"""
+
+    def __init__(self, table_dir, schema, partition_key):
+        self.table_dir = table_dir
+        self.schema = schema
+        self.partition_key = partition_key
+        self.current = None
+        self.writer = None
+        self.files = []
+        self.parts = {}
+
+    def write(self, partition, table):
+        if self.writer is None or partition != self.current:
+            self.close()
+            directory = self.table_dir
+            if self.partition_key:
+                directory = os.path.join(directory, f"{self.partition_key}={partition or NULL_PARTITION}")
+            os.makedirs(directory, exist_ok=True)
+            # Rows arrive ordered by the partition column, so a partition seen again is rare
+            part = self.parts.get(partition, 0)
+            self.parts[partition] = part + 1
+            path = os.path.join(directory, f"part-{part}.parquet")
+            self.writer = pq.ParquetWriter(path, self.schema, compression=DB_EXPORT_COMPRESSION)
+            self.current = partition
+            self.files.append(path)
+        self.writer.write_table(table, row_group_size=max(table.num_rows, 1))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def _export_table(conn, is_postgres, export_dir, table, partition, batch_rows, include_sensitive):
+    """Stream one table into Parquet files; returns its manifest entry, or None if the table doesn't exist"""
+    date_column, dictionary_columns = EXPORT_TABLES[table]
+    cursor = conn.cursor()
+    columns = _table_columns(cursor, table, is_postgres)
+    cursor.close()
+    if not columns:
+        logger.info(f"Skipping {table}: table doesn't exist")
+        return None
+
+    names = [name for name, _ in columns]
+    if date_column not in names or partition == "none":
+        date_column = None
+
+    fields = []
+    converters = []
+    for name, declared in columns:
+        arrow_type = _arrow_type(declared)
+        if name in dictionary_columns and arrow_type == pa.string():
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        fields.append(pa.field(name, arrow_type))
+        if name == "ip" and not include_sensitive:
+            converters.append(_mask_ip)
+        elif not is_postgres and pa.types.is_timestamp(arrow_type):
+            converters.append(_to_timestamp)
+        else:
+            converters.append(None)
+    schema = pa.schema(fields)
+
+    select_list = [_select_expression(name, declared, is_postgres) for name, declared in columns]
+    if date_column:
+        pg_format, sqlite_format = PARTITION_FORMATS[partition]
+        select_list.append(f"to_char({date_column}, '{pg_format}')" if is_postgres
+                           else f"strftime('{sqlite_format}', {date_column})")
+        order_by = f"{date_column}, id"
+    else:
+        order_by = "id"
+    query = f"SELECT {', '.join(select_list)} FROM {table} ORDER BY {order_by}"
+
+    if is_postgres:
+        # Server-side cursor: only one batch is ever held client side
+        cursor = conn.cursor(name=f"db_export_{table}")
+        cursor.itersize = batch_rows
+    else:
+        cursor = conn.cursor()
+    cursor.execute(query)
+
+    writers = _PartitionWriters(os.path.join(export_dir, table), schema, partition if date_column else None)
+    row_count = 0
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_rows)
+            if not rows:
+                break
+            if date_column:
+                # Split the batch where the partition value changes
+                start = 0
+                for i in range(1, len(rows) + 1):
+                    if i == len(rows) or rows[i][-1] != rows[start][-1]:
+                        writers.write(rows[start][-1],
+                                      _batch_to_table([row[:-1] for row in rows[start:i]], schema, converters))
+                        start = i
+            else:
+                writers.write(None, _batch_to_table(rows, schema, converters))
+            row_count += len(rows)
+        if not writers.files:
+            # An empty file keeps readers' globs and the table's schema working
+            writers.write(None, schema.empty_table())
+    finally:
+        writers.close()
+        cursor.close()
+
+    files = [os.path.relpath(path, export_dir) for path in writers.files]
+    logger.info(f"Exported {row_count} {table} rows into {len(files)} files")
+    return {
+        "rows": row_count,
+        "partition_column": date_column,
+        "files": files,
+        "bytes": sum(os.path.getsize(path) for path in writers.files),
+        "columns": {field.name: str(field.type) for field in schema},
+    }
+
+
+def export_parquet(output_dir=DB_EXPORT_DIR, tables=None, partition=DB_EXPORT_PARTITION,
+                   batch_rows=DB_EXPORT_BATCH_ROWS, include_sensitive=False):
+    """
+    Export tables to a new timestamped directory of Parquet files
+
+    The database module binds its backend at import, so callers set
+    DATABASE_TYPE / SQLITE_DB_PATH / POSTGRES_DB before calling this.
+
+    Returns:
+        dict: the export's manifest, with its path under "path"
+    """
+    if not pyarrow_available:
+        raise RuntimeError("pyarrow is required for Parquet exports; install it using: pip install pyarrow")
+    if partition not in PARTITION_FORMATS and partition != "none":
+        raise ValueError(f"Unknown partition granularity: {partition} (use month, day or none)")
+    tables = tables or list(EXPORT_TABLES)
+    unknown = [table for table in tables if table not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Can't export {', '.join(unknown)}; exportable tables: {', '.join(EXPORT_TABLES)}")
+
+    from database import DATABASE_TYPE, get_db_manager
+    is_postgres = DATABASE_TYPE == "postgres"
+
+    name = datetime.now().strftime("%Y%m%d_%H%M%S")
+    final_dir = os.path.join(output_dir, name)
+    # Readers never see a half-written export
+    export_dir = final_dir + ".partial"
+    os.makedirs(export_dir)
+
+    manager = get_db_manager()
+    conn = manager.get_connection()
+    started = time.perf_counter()
+    manifest = {
+        "exported_at": datetime.now().isoformat(),
+        "database": DATABASE_TYPE,
+        "partition": partition,
+        "include_sensitive": include_sensitive,
+        "tables": {},
+    }
+    try:
+        cursor = conn.cursor()
+        if is_postgres:
+            # One snapshot for every table, and UTC partition boundaries
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            cursor.execute("SET LOCAL TIME ZONE 'UTC'")
+        else:
+            cursor.execute("BEGIN")
+        cursor.close()
+
+        for table in tables:
+            entry = _export_table(conn, is_postgres, export_dir, table, partition, batch_rows, include_sensitive)
+            if entry is not None:
+                manifest["tables"][table] = entry
+    except Exception:
+        shutil.rmtree(export_dir, ignore_errors=True)
+        raise
+    finally:
+        conn.rollback()
+        if is_postgres:
+            manager.return_connection(conn)
+        else:
+            conn.close()
+
+    manifest["duration_seconds"] = round(time.perf_counter() - started, 2)
+    tmp_path = os.path.join(export_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(export_dir, MANIFEST_NAME))
+    os.replace(export_dir, final_dir)
+
+    total_rows = sum(entry["rows"] for entry in manifest["tables"].values())
+    total_bytes = sum(entry["bytes"] for entry in manifest["tables"].values())
+    logger.info(f"Export {final_dir} complete in {manifest['duration_seconds']}s: "
+                f"{total_rows} rows, {total_bytes / (1024 * 1024):.1f} MB")
+    manifest["path"] = final_dir
+    return manifest
+
+
+def load_export(path=None, output_dir=DB_EXPORT_DIR):
+    """Manifest of the export at path, or of the newest complete one in output_dir (None if there isn't one)"""
+    if path is None:
+        if not os.path.isdir(output_dir):
+            return None
+        # Timestamped names sort chronologically
+        names = sorted((name for name in os.listdir(output_dir) if not name.endswith(".partial")
+                        and os.path.exists(os.path.join(output_dir, name, MANIFEST_NAME))), reverse=True)
+        if not names:
+            return None
+        path = os.path.join(output_dir, names[0])
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    manifest["path"] = path
+    return manifest
+
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler()]
+    )
+    parser = argparse.ArgumentParser(description="Export the Ollama Scanner database to Parquet")
+    parser.add_argument("--dir", default=DB_EXPORT_DIR, help=f"Export directory (default: {DB_EXPORT_DIR})")
+    parser.add_argument("--tables", nargs="+", choices=list(EXPORT_TABLES), help="Tables to export (default: all)")
+    parser.add_argument("--partition", choices=["month", "day", "none"], default=DB_EXPORT_PARTITION,
+                        help="Partition granularity for tables with a date column")
+    parser.add_argument("--batch-rows", type=int, default=DB_EXPORT_BATCH_ROWS, help="Rows fetched per batch")
+    parser.add_argument("--include-sensitive", action="store_true", help="Keep full IP addresses")
+    parser.add_argument("--sqlite-path", help="Export this SQLite file (overrides DATABASE_TYPE/SQLITE_DB_PATH)")
+    args = parser.parse_args(argv)
+
+    if args.sqlite_path:
+        os.environ["DATABASE_TYPE"] = "sqlite"
+        os.environ["SQLITE_DB_PATH"] = args.sqlite_path
+
+    try:
+        manifest = export_parquet(args.dir, args.tables, args.partition, args.batch_rows, args.include_sensitive)
+    except (RuntimeError, ValueError) as e:
+        logger.error(str(e))
+        return 1
+    print(manifest["path"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Database Maintenance Planner for Ollama Scanner
+
+Turns the findings of check_db_schema_issues.py into a maintenance plan and
+runs it inside configured maintenance windows:
+
+- VACUUM (ANALYZE) of tables whose dead tuples pass the bloat check;
+- REINDEX INDEX CONCURRENTLY of the larger, used indexes of heavily bloated
+  tables (VACUUM does not shrink index files);
+- CREATE INDEX CONCURRENTLY for the indexes the check reports missing, unless
+  an existing index already starts with those columns.
+
+Unused indexes are listed for review but never dropped. Every statement runs
+under lock_timeout and is retried a few times if it can't get its lock;
+VACUUM is throttled with vacuum_cost_delay and actions are spaced out. Before
+and after sizes and timings of each run are kept in DB_MAINT_HISTORY.
+
+Usage:
+    python db_maintenance.py plan
+    python db_maintenance.py run [--force] [--only vacuum,reindex,create_index]
+    python db_maintenance.py history
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+import psycopg2
+import psycopg2.errors
+from psycopg2 import sql
+from tabulate import tabulate
+
+from check_db_schema_issues import SchemaChecker, PG_DB_NAME, PG_DB_HOST, PG_DB_PORT
+
+logger = logging.getLogger('db_maintenance')
+
+# Maintenance windows in local time, ";"-separated "[days ]HH:MM-HH:MM" entries
+# such as "sat,sun 00:00-06:00; mon-fri 02:00-04:00" (empty = any time)
+DB_MAINT_WINDOWS = os.getenv("DB_MAINT_WINDOWS", "01:00-05:00")
+# How long each statement waits for its lock before giving up (milliseconds)
+DB_MAINT_LOCK_TIMEOUT_MS = int(os.getenv("DB_MAINT_LOCK_TIMEOUT_MS", "5000"))
+# Attempts after a lock timeout, DB_MAINT_PAUSE_SECONDS apart
+DB_MAINT_LOCK_RETRIES = int(os.getenv("DB_MAINT_LOCK_RETRIES", "3"))
+# Pause between actions so replicas and I/O can catch up
+DB_MAINT_PAUSE_SECONDS = float(os.getenv("DB_MAINT_PAUSE_SECONDS", "10"))
+# vacuum_cost_delay for VACUUM (milliseconds; 0 runs it unthrottled)
+DB_MAINT_VACUUM_COST_DELAY = os.getenv("DB_MAINT_VACUUM_COST_DELAY", "2")
+DB_MAINT_WORK_MEM = os.getenv("DB_MAINT_WORK_MEM", "256MB")
+# Bloated tables with fewer dead tuples than this are left to autovacuum
+DB_MAINT_MIN_DEAD_TUPLES = int(os.getenv("DB_MAINT_MIN_DEAD_TUPLES", "1000"))
+# Indexes of tables at least this dead are rebuilt if they are at least DB_MAINT_REINDEX_MIN_MB
+DB_MAINT_REINDEX_DEAD_RATIO = float(os.getenv("DB_MAINT_REINDEX_DEAD_RATIO", "0.4"))
+DB_MAINT_REINDEX_MIN_MB = float(os.getenv("DB_MAINT_REINDEX_MIN_MB", "8"))
+DB_MAINT_HISTORY = os.getenv("DB_MAINT_HISTORY", "db_maintenance_history.json")
+# Runs kept in the history file
+DB_MAINT_HISTORY_KEEP = int(os.getenv("DB_MAINT_HISTORY_KEEP", "50"))
+
+ACTION_KINDS = ["vacuum", "reindex", "create_index"]
+DAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+class MaintenanceError(Exception):
+    """The maintenance plan could not be built or run"""
+
+
+# --- Maintenance windows ---
+
+def _parse_days(spec):
+    days = set()
+    for part in spec.lower().split(","):
+        first, _, last = part.strip().partition("-")
+        if first not in DAY_NAMES or (last and last not in DAY_NAMES):
+            raise MaintenanceError(f"Unknown day in maintenance window: {part.strip()!r}")
+        start = DAY_NAMES.index(first)
+        end = DAY_NAMES.index(last) if last else start
+        days.update((start + i) % 7 for i in range((end - start) % 7 + 1))
+    return days
+
+
+def _parse_minutes(text):
+    try:
+        hour, minute = (int(part) for part in text.strip().split(":"))
+    except ValueError:
+        raise MaintenanceError(f"Bad time in maintenance window: {text!r} (use HH:MM)")
+    if not (0 <= hour <= 24 and 0 <= minute < 60) or hour * 60 + minute > 1440:
+        raise MaintenanceError(f"Bad time in maintenance window: {text!r}")
+    return hour * 60 + minute
+
+
+def parse_windows(spec):
+    """[(weekdays, start minute, end minute)]; an empty list means no restriction"""
+    windows = []
+    for entry in spec.split(";"):
+        entry = entry.strip()
+        if not entry:
+            continue
+        days, _, times = entry.rpartition(" ")
+        if "-" not in times:
+            raise MaintenanceError(f"Bad maintenance window: {entry!r} (use [days ]HH:MM-HH:MM)")
+        start, end = times.split("-", 1)
+        windows.append((_parse_days(days) if days.strip() else set(range(7)),
+                        _parse_minutes(start), _parse_minutes(end)))
+    return windows
+
+
+def window_end(windows, now):
+    """When the maintenance window containing now closes; None outside every window.
+    Without windows the run is never cut short"""
+    if not windows:
+        return datetime.max
+    minute = now.hour * 60 + now.minute
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for days, start, end in windows:
+        if start < end:
+            if now.weekday() in days and start <= minute < end:
+                return midnight + timedelta(minutes=end)
+        # Crosses midnight: starts on one of the days, ends the next morning
+        elif minute >= start and now.weekday() in days:
+            return midnight + timedelta(days=1, minutes=end)
+        elif minute < end and (now.weekday() - 1) % 7 in days:
+            return midnight + timedelta(minutes=end)
+    return None
+
+
+# --- Planning ---
+
+def _relation_size(cursor, name):
+    cursor.execute("SELECT COALESCE(pg_total_relation_size(to_regclass(%s)), 0)", (name,))
+    return cursor.fetchone()[0]
+
+
+def _table_indexes(cursor, table):
+    """name, validity, key columns and size of each plain index on the table"""
+    cursor.execute("""
+        SELECT i.relname,
+               ix.indisvalid,
+               ARRAY(SELECT a.attname
+                     FROM unnest(ix.indkey::int2[]) WITH ORDINALITY AS k(attnum, n)
+                     JOIN pg_attribute a ON a.attrelid = ix.indrelid AND a.attnum = k.attnum
+                     ORDER BY k.n) AS columns,
+               pg_relation_size(i.oid) AS bytes
+        FROM pg_index ix
+        JOIN pg_class i ON i.oid = ix.indexrelid
+        JOIN pg_class t ON t.oid = ix.indrelid
+        WHERE t.relname = %s
+          AND t.relnamespace = 'public'::regnamespace
+          AND ix.indexprs IS NULL
+          AND ix.indpred IS NULL
+    """, (table,))
+    return [{"name": name, "valid": valid, "columns": list(columns), "bytes": size}
+            for name, valid, columns, size in cursor.fetchall()]
+
+
+def build_plan(checker, kinds=ACTION_KINDS):
+    """Run the bloat, index and index-usage checks and turn their findings into
+    ordered actions. Returns (actions, review) where review lists the unused
+    indexes the checker reported"""
+    if "reindex" in kinds and checker.conn.server_version < 120000:
+        logger.warning("REINDEX CONCURRENTLY needs PostgreSQL 12 or later; not planning reindexes")
+        kinds = [k for k in kinds if k != "reindex"]
+    checker.check_indexes()
+    checker.check_table_bloat()
+    checker.check_index_usage()
+    for issue in checker.issues:
+        if issue['type'] == 'Error':
+            raise MaintenanceError(issue['description'])
+    findings = checker.issues + checker.warnings + checker.info
+
+    cursor = checker.conn.cursor()
+    unused = {f['index'] for f in findings if f['type'] == 'Unused Index' and 'index' in f}
+    bloated = sorted((f for f in findings if f['type'] == 'Table Bloat' and 'table' in f),
+                     key=lambda f: f['dead_tuples'], reverse=True)
+    actions = []
+
+    for finding in bloated:
+        table = finding['table']
+        if finding['dead_tuples'] < DB_MAINT_MIN_DEAD_TUPLES:
+            continue
+        if "vacuum" in kinds:
+            actions.append({
+                "kind": "vacuum",
+                "table": table,
+                "target": table,
+                "reason": f"{finding['dead_tuples']} dead tuples ({finding['dead_ratio'] * 100:.0f}%)",
+                "bytes": _relation_size(cursor, table),
+                "sql": sql.SQL("VACUUM (ANALYZE) {}").format(sql.Identifier(table)),
+            })
+        if "reindex" in kinds and finding['dead_ratio'] >= DB_MAINT_REINDEX_DEAD_RATIO:
+            for index in sorted(_table_indexes(cursor, table), key=lambda i: i["bytes"]):
+                if index["valid"] and index["name"] not in unused and \
+                        index["bytes"] >= DB_MAINT_REINDEX_MIN_MB * 1048576:
+                    actions.append({
+                        "kind": "reindex",
+                        "table": table,
+                        "target": index["name"],
+                        "reason": f"{table} is {finding['dead_ratio'] * 100:.0f}% dead",
+                        "bytes": index["bytes"],
+                        "sql": sql.SQL("REINDEX INDEX CONCURRENTLY {}").format(sql.Identifier(index["name"])),
+                    })
+
+    if "create_index" in kinds:
+        for finding in findings:
+            if finding['type'] != 'Missing Index' or 'columns' not in finding:
+                continue
+            table, columns = finding['table'], finding['columns']
+            name = f"idx_{table}_{'_'.join(columns)}"
+            existing = _table_indexes(cursor, table)
+            if any(i["valid"] and i["columns"][:len(columns)] == columns for i in existing):
+                # An index leading with these columns serves the same lookups
+                continue
+            actions.append({
+                "kind": "create_index",
+                "table": table,
+                "target": name,
+                "reason": finding['description'],
+                "bytes": _relation_size(cursor, table),
+                # A failed earlier build leaves an invalid index of that name behind
+                "drop_first": any(i["name"] == name for i in existing),
+                "sql": sql.SQL("CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON {} ({})").format(
+                    sql.Identifier(name), sql.Identifier(table),
+                    sql.SQL(", ").join(sql.Identifier(c) for c in columns)),
+            })
+    cursor.close()
+
+    review = [f for f in findings if f['type'] == 'Unused Index' and 'index' in f]
+    return actions, review
+
+
+# --- Running ---
+
+def _set_session(cursor):
+    """Guard every statement with lock_timeout; maintenance itself is not time limited"""
+    for name, value in (("lock_timeout", str(DB_MAINT_LOCK_TIMEOUT_MS)),
+                        ("statement_timeout", "0"),
+                        ("maintenance_work_mem", DB_MAINT_WORK_MEM),
+                        ("vacuum_cost_delay", str(DB_MAINT_VACUUM_COST_DELAY)),
+                        ("application_name", "db_maintenance")):
+        cursor.execute("SELECT set_config(%s, %s, false)", (name, value))
+
+
+def _drop_invalid(cursor, action):
+    """Remove the invalid index an interrupted concurrent build leaves behind"""
+    if action["kind"] == "create_index":
+        pattern = action["target"]
+    elif action["kind"] == "reindex":
+        pattern = action["target"] + "_ccnew%"
+    else:
+        return
+    cursor.execute("""
+        SELECT i.relname FROM pg_index ix JOIN pg_class i ON i.oid = ix.indexrelid
+        WHERE NOT ix.indisvalid AND i.relname LIKE %s
+    """, (pattern,))
+    for (name,) in cursor.fetchall():
+        try:
+            cursor.execute(sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(name)))
+            logger.info(f"Dropped invalid index {name}")
+        except psycopg2.Error as e:
+            logger.warning(f"Could not drop invalid index {name}: {e}")
+
+
+def run_action(conn, action):
+    """Run one action with lock-timeout retries; returns its history record"""
+    cursor = conn.cursor()
+    record = {
+        "kind": action["kind"],
+        "target": action["target"],
+        "reason": action["reason"],
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "before_bytes": _relation_size(cursor, action["target"]),
+        "attempts": 0,
+    }
+    started = time.perf_counter()
+    if action.get("drop_first"):
+        _drop_invalid(cursor, action)
+    for attempt in range(1, DB_MAINT_LOCK_RETRIES + 2):
+        record["attempts"] = attempt
+        try:
+            cursor.execute(action["sql"])
+            record["status"] = "done"
+            break
+        except psycopg2.errors.LockNotAvailable:
+            _drop_invalid(cursor, action)
+            if attempt > DB_MAINT_LOCK_RETRIES:
+                record["status"] = "lock_timeout"
+                logger.warning(f"{action['kind']} {action['target']}: no lock after {attempt} attempts, skipped")
+                break
+            logger.info(f"{action['kind']} {action['target']}: lock not available, retrying")
+            time.sleep(DB_MAINT_PAUSE_SECONDS)
+        except psycopg2.Error as e:
+            _drop_invalid(cursor, action)
+            record["status"] = "failed"
+            record["error"] = str(e).strip()
+            logger.error(f"{action['kind']} {action['target']} failed: {record['error']}")
+            break
+    record["seconds"] = round(time.perf_counter() - started, 2)
+    record["after_bytes"] = _relation_size(cursor, action["target"])
+    cursor.close()
+    if record["status"] == "done":
+        logger.info(f"{action['kind']} {action['target']} done in {record['seconds']}s "
+                    f"({record['before_bytes'] / 1048576:.1f} -> {record['after_bytes'] / 1048576:.1f} MB)")
+    return record
+
+
+def _update_metadata(cursor):
+    """Endpoint and model counts plus last_maintenance, as db_maintenance.sh kept them"""
+    try:
+        cursor.execute("""
+            INSERT INTO metadata (key, value, updated_at)
+            SELECT key, value, NOW() FROM (VALUES
+                ('verified_count', (SELECT COUNT(*) FROM endpoints WHERE verified = 1)::text),
+                ('failed_count', (SELECT COUNT(*) FROM endpoints WHERE verified = 0)::text),
+                ('model_count', (SELECT COUNT(*) FROM models)::text),
+                ('last_maintenance', NOW()::text)
+            ) AS v(key, value)
+            ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, updated_at = EXCLUDED.updated_at
+        """)
+    except psycopg2.Error as e:
+        logger.warning(f"Could not update metadata: {e}")
+
+
+def load_history(path=DB_MAINT_HISTORY):
+    if not os.path.exists(path):
+        return {"runs": []}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_history(history, path=DB_MAINT_HISTORY):
+    history["runs"] = history["runs"][-DB_MAINT_HISTORY_KEEP:]
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def run(windows, force=False, kinds=ACTION_KINDS, max_actions=None, history_path=DB_MAINT_HISTORY):
+    """Plan and run maintenance while the window is open; returns the run record,
+    or None when called outside the maintenance windows"""
+    closes = datetime.max if force else window_end(windows, datetime.now())
+    if closes is None:
+        logger.info(f"Outside the maintenance windows ({DB_MAINT_WINDOWS}); nothing to do")
+        return None
+
+    checker = SchemaChecker()
+    conn = checker.conn
+    try:
+        actions, review = build_plan(checker, kinds)
+        if max_actions is not None:
+            actions = actions[:max_actions]
+        conn.rollback()
+        # VACUUM and the concurrent index builds can't run inside a transaction
+        conn.autocommit = True
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_try_advisory_lock(hashtext('db_maintenance'))")
+        if not cursor.fetchone()[0]:
+            raise MaintenanceError("Another db_maintenance run holds the maintenance lock")
+        _set_session(cursor)
+
+        started = time.perf_counter()
+        record = {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "database": PG_DB_NAME,
+            "forced": force,
+            "windows": DB_MAINT_WINDOWS,
+            "actions": [],
+            "review": [f"{f['table']}.{f['index']}" for f in review],
+        }
+        logger.info(f"Maintenance of {PG_DB_NAME}@{PG_DB_HOST}:{PG_DB_PORT}: {len(actions)} actions planned")
+        for position, action in enumerate(actions):
+            if datetime.now() >= closes:
+                for skipped in actions[position:]:
+                    record["actions"].append({"kind": skipped["kind"], "target": skipped["target"],
+                                              "reason": skipped["reason"], "status": "deferred"})
+                logger.info(f"Maintenance window closed; {len(actions) - position} actions deferred")
+                break
+            if position:
+                time.sleep(DB_MAINT_PAUSE_SECONDS)
+            record["actions"].append(run_action(conn, action))
+
+        _update_metadata(cursor)
+        cursor.execute("SELECT pg_advisory_unlock(hashtext('db_maintenance'))")
+        record["duration_seconds"] = round(time.perf_counter() - started, 2)
+        history = load_history(history_path)
+        history["runs"].append(record)
+        save_history(history, history_path)
+        return record
+    finally:
+        checker.close()
+
+
+# --- Output ---
+
+def _mb(value):
+    return "" if value is None else f"{value / 1048576:.1f} MB"
+
+
+def format_plan(actions, review):
+    rows = [[i + 1, a["kind"], a["target"], a["reason"], _mb(a["bytes"])] for i, a in enumerate(actions)]
+    text = tabulate(rows, headers=["#", "Action", "Target", "Reason", "Size"], tablefmt="grid") if rows \
+        else "No maintenance needed"
+    if review:
+        text += "\n\nUnused indexes to review (not dropped automatically):\n"
+        text += "\n".join(f"  {f['table']}.{f['index']}" for f in review)
+    return text
+
+
+def format_run(record):
+    rows = [[a["kind"], a["target"], a["status"], _mb(a.get("before_bytes")), _mb(a.get("after_bytes")),
+             f"{a['seconds']}s" if "seconds" in a else ""] for a in record["actions"]]
+    if not rows:
+        return "No maintenance needed"
+    return tabulate(rows, headers=["Action", "Target", "Status", "Before", "After", "Took"], tablefmt="grid")
+
+
+def format_history(history):
+    rows = []
+    for run_record in history["runs"]:
+        statuses = [a["status"] for a in run_record["actions"]]
+        rows.append([
+            run_record["started_at"],
+            run_record["database"],
+            statuses.count("done"),
+            len(statuses) - statuses.count("done"),
+            _mb(sum(a.get("before_bytes", 0) - a.get("after_bytes", 0)
+                    for a in run_record["actions"] if a["status"] == "done" and a["kind"] != "create_index")),
+            f"{run_record['duration_seconds']}s",
+        ])
+    return tabulate(rows, headers=["Run", "Database", "Done", "Skipped", "Reclaimed", "Took"], tablefmt="grid")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan and run PostgreSQL maintenance for Ollama Scanner")
+    parser.add_argument("command", nargs="?", default="plan", choices=["plan", "run", "history"],
+                        help="plan (default) shows what a run would do")
+    parser.add_argument("--force", action="store_true", help="Run outside the maintenance windows")
+    parser.add_argument("--only", help=f"Comma-separated action kinds ({', '.join(ACTION_KINDS)})")
+    parser.add_argument("--max-actions", type=int, help="Run at most this many actions")
+    parser.add_argument("--history", default=DB_MAINT_HISTORY, help=f"History file (default: {DB_MAINT_HISTORY})")
+    args = parser.parse_args(argv)
+
+    logging.getLogger().addHandler(logging.FileHandler("db_maintenance.log"))
+    kinds = ACTION_KINDS
+    if args.only:
+        kinds = [k.strip() for k in args.only.split(",") if k.strip()]
+        unknown = set(kinds) - set(ACTION_KINDS)
+        if unknown:
+            parser.error(f"unknown action kinds: {', '.join(sorted(unknown))}")
+    try:
+        windows = parse_windows(DB_MAINT_WINDOWS)
+        if args.command == "history":
+            print(format_history(load_history(args.history)))
+        elif args.command == "plan":
+            checker = SchemaChecker()
+            try:
+                actions, review = build_plan(checker, kinds)
+            finally:
+                checker.close()
+            print(format_plan(actions[:args.max_actions], review))
+        else:
+            record = run(windows, args.force, kinds, args.max_actions, args.history)
+            if record is not None:
+                print(format_run(record))
+                if any(a["status"] == "failed" for a in record["actions"]):
+                    return 1
+    except (MaintenanceError, psycopg2.Error, OSError) as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
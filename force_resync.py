@@ -3,10 +3,12 @@
 Force Resync Script for Discord Commands
 
 This script forces a resync of Discord commands for a specified guild ID.
-It loads the bot token from the environment and performs a sync operation.
+It clears the recorded command schema hashes for that guild (or every scope)
+so the bot's command registry pushes those scopes on its next start-up.
+With --list it also logs in and lists the commands Discord currently has.
 
 Usage:
-    ./force_resync.py <guild_id>
+    ./force_resync.py [guild_id] [--list]
 """
 
 import os
@@ -18,6 +20,10 @@ import logging
 import argparse
 from dotenv import load_dotenv
 
+# The command registry lives with the bot code
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "DiscordBot"))
+from command_registry import forget_scopes, COMMAND_MANIFEST_PATH
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,20 +33,27 @@ logging.basicConfig(
 logger = logging.getLogger('force_resync')
 
 class ResyncBot(discord.Client):
-    def __init__(self):
+    """Read-only client used to list the commands Discord currently has.
+    Its own command tree is empty, so it must never sync."""
+    
+    def __init__(self, guild_id=None):
         intents = discord.Intents.default()
         super().__init__(intents=intents)
         self.tree = app_commands.CommandTree(self)
-        self.synced = False
+        self.guild_id = guild_id
     
     async def on_ready(self):
         logger.info(f'Logged in as {self.user} (ID: {self.user.id})')
-        logger.info('Bot is ready for command sync operations.')
         
         # List all guilds the bot is in
         logger.info(f'Bot is in {len(self.guilds)} guilds:')
         for guild in self.guilds:
             logger.info(f'- {guild.name} (ID: {guild.id})')
+        
+        commands = await self.fetch_commands(self.guild_id)
+        for command in commands:
+            logger.info(f'- /{command.name}: {command.description}')
+        await self.close()
     
     async def fetch_commands(self, guild_id=None):
         """Fetch existing commands for the specified guild or global commands"""
@@ -60,55 +73,24 @@ class ResyncBot(discord.Client):
         except Exception as e:
             logger.error(f"Error fetching commands: {e}")
             return []
-    
-    async def sync_commands(self, guild_id=None):
-        """Sync commands to the specified guild or globally"""
-        try:
-            if guild_id:
-                guild = self.get_guild(guild_id)
-                if not guild:
-                    logger.error(f"Guild with ID {guild_id} not found")
-                    return False
-                
-                # First fetch the existing commands
-                before_commands = await self.fetch_commands(guild_id)
-                logger.info(f"Before sync: {len(before_commands)} commands in guild {guild.name}")
-                
-                # Sync commands to the guild
-                synced = await self.tree.sync(guild=guild)
-                logger.info(f"Synced {len(synced)} commands to guild {guild.name}")
-                
-                # List the command names
-                command_names = [cmd.name for cmd in synced]
-                logger.info(f"Synced commands: {', '.join(command_names)}")
-                
-                self.synced = True
-                return True
-            else:
-                # First fetch the existing global commands
-                before_commands = await self.fetch_commands()
-                logger.info(f"Before sync: {len(before_commands)} global commands")
-                
-                # Sync commands globally
-                synced = await self.tree.sync()
-                logger.info(f"Synced {len(synced)} commands globally")
-                
-                # List the command names
-                command_names = [cmd.name for cmd in synced]
-                logger.info(f"Synced commands: {', '.join(command_names)}")
-                
-                self.synced = True
-                return True
-        except Exception as e:
-            logger.error(f"Error syncing commands: {e}")
-            return False
 
 async def main():
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Force resync Discord commands for a specific guild')
-    parser.add_argument('guild_id', type=int, nargs='?', help='Discord guild ID to sync commands to')
+    parser.add_argument('guild_id', type=int, nargs='?', help='Discord guild ID to resync (default: every scope)')
+    parser.add_argument('--list', action='store_true', help='Log in and list the currently registered commands')
     args = parser.parse_args()
     
+    # The bot's command registry skips scopes whose hash is recorded; forgetting
+    # them makes the next start-up push those scopes again
+    removed = forget_scopes(guild_id=args.guild_id)
+    scope = f"guild {args.guild_id}" if args.guild_id else "all scopes"
+    logger.info(f"Cleared {removed} recorded command hashes for {scope} in {COMMAND_MANIFEST_PATH}")
+    logger.info("Restart the bot (or run /refreshcommands) to push the commands")
+    
+    if not args.list:
+        return 0
+    
     # Load environment variables
     # Try loading from the current directory first
     if os.path.exists('.env'):
@@ -128,7 +110,7 @@ async def main():
         return 1
     
     # Create and start the bot
-    bot = ResyncBot()
+    bot = ResyncBot(args.guild_id)
     
     try:
         await bot.start(token)
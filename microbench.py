@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Data Layer Micro-Benchmarks
+
+Times the hot paths of the scanner, pruner and bot against a database
+seeded by synthetic_data.py: Database.fetch_one, saveStuffToDb, the database part of
+verifyEndpoint, is_likely_honeypot_response, the Discord message splitter
+and the bot's listing queries.
+
+Every (backend, size) combination runs in its own worker process, because
+database.py picks its backend and SQLite path from the environment at
+import. SQLite databases are seeded once per size and seed and copied for
+each run; Postgres runs against a separate benchmark database (never the
+production one) that is re-created from DiscordBot/postgres_init.sql.
+
+Results are written as JSON. With --baseline, the median of every case is
+compared to the baseline and the script exits with status 1 when one got
+slower than the tolerance allows.
+
+Usage:
+    python microbench.py --sizes 10000,100000 --output microbench_results.json
+    python microbench.py --baseline microbench_baseline.json --tolerance 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+import subprocess
+from datetime import datetime, timezone
+
+from synthetic_data import SyntheticDataset, endpoint_address, load_dataset
+
+logger = logging.getLogger('microbench')
+
+# Endpoint counts to seed (1000000 is supported but takes a while to seed)
+BENCH_MICRO_SIZES = os.getenv("BENCH_MICRO_SIZES", "10000,100000")
+# Allowed slowdown of a case's median before it counts as a regression
+BENCH_MICRO_TOLERANCE = float(os.getenv("BENCH_MICRO_TOLERANCE", "0.25"))
+# Timed calls per case (listing queries run a twentieth of that)
+BENCH_MICRO_REPEAT = int(os.getenv("BENCH_MICRO_REPEAT", "200"))
+# Upper bound on the time spent timing one case
+BENCH_MICRO_MAX_SECONDS = float(os.getenv("BENCH_MICRO_MAX_SECONDS", "10"))
+# Where seeded SQLite databases are cached
+BENCH_MICRO_DIR = os.getenv("BENCH_MICRO_DIR", "microbench_data")
+# Postgres database the benchmark may drop and re-create
+BENCH_MICRO_PG_DB = os.getenv("BENCH_MICRO_PG_DB", "ollama_microbench")
+BENCH_MICRO_SEED = int(os.getenv("BENCH_MICRO_SEED", "42"))
+
+# Bump when the seeded data changes, so cached databases are rebuilt
+SEED_VERSION = 2
+# Fixed end of the synthetic history, so cached databases match a fresh seed
+SEED_AS_OF = datetime(2025, 1, 1, tzinfo=timezone.utc)
+MIN_SAMPLES = 5
+WARMUP_CALLS = 3
+
+PG_INIT_SQL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DiscordBot", "postgres_init.sql")
+
+# /api/tags listing returned to verifyEndpoint instead of asking a real server
+CANNED_TAGS = {"models": [
+    {"name": "llama3.1:8b", "size": 4661224676, "details": {"parameter_size": "8.0B", "quantization_level": "Q4_K_M"}},
+    {"name": "qwen2.5:7b", "size": 4683087332, "details": {"parameter_size": "7.6B", "quantization_level": "Q4_K_M"}},
+    {"name": "nomic-embed-text:latest", "size": 274302450,
+     "details": {"parameter_size": "137M", "quantization_level": "F16"}},
+]}
+
+# Responses run through the honeypot classifier, clean and suspicious
+HONEYPOT_SAMPLES = [
+    "The capital of France is Paris.",
+    "Sure! Here is a Python function that reverses a string:\n\ndef reverse(s):\n    return s[::-1]\n",
+    "Using Model: llama3 Sending prompt to backend... Loaded Model: llama3",
+    "[INFO] request: {'model': 'llama3'} response: ok",
+    "",
+    "I am a large language model trained to help with questions. " * 40,
+    "This is a trap. honeypot active. cowrie session 1234",
+    "Quantum entanglement links the states of two particles so that measuring one "
+    "determines the other, regardless of the distance between them. " * 10,
+]
+
+# Bot listing queries, as the slash commands in DiscordBot/discord_bot.py issue them
+LISTING_QUERIES = {
+    # /allmodels
+    "listing_all_models": ("""
+        SELECT name, parameter_size, quantization_level, COUNT(*) as server_count
+        FROM models
+        GROUP BY name, parameter_size, quantization_level
+        ORDER BY server_count DESC
+        LIMIT ?
+    """, (25,)),
+    # /models_with_servers
+    "listing_models_with_servers": ("""
+        SELECT m.id, m.name, COALESCE(m.parameter_size, '') as parameter_size,
+               COALESCE(m.quantization_level, '') as quant, COALESCE(m.size_mb, 0) as size_mb,
+               e.id as endpoint_id, e.ip, e.port
+        FROM models m
+        JOIN endpoints e ON m.endpoint_id = e.id
+        WHERE e.verified = 1
+        ORDER BY m.name ASC
+        LIMIT ?
+    """, (25,)),
+    # /listmodels with a search term
+    "listing_model_search": ("""
+        SELECT m.id, m.name, m.parameter_size, m.quantization_level,
+               COUNT(DISTINCT (s.ip || ':' || s.port)) as server_count
+        FROM models m
+        JOIN endpoints s ON m.endpoint_id = s.id
+        WHERE 1=1 AND m.name LIKE ?
+        GROUP BY m.id, m.name, m.parameter_size, m.quantization_level
+        ORDER BY server_count DESC
+        LIMIT ?
+    """, ("%llama%", 25)),
+    # First keyset page of /find_model_endpoints
+    "listing_model_endpoints_page": ("""
+        SELECT m.id, e.ip, e.port, m.name, m.parameter_size, m.quantization_level, m.size_mb,
+               e.verification_date, COALESCE(e.verification_date, e.scan_date) AS page_sort_key,
+               m.id AS page_id_key
+        FROM models m
+        JOIN endpoints e ON m.endpoint_id = e.id
+        WHERE e.verified = 1 AND m.name LIKE ?
+        ORDER BY page_sort_key DESC, page_id_key DESC
+        LIMIT ?
+    """, ("%qwen%", 11)),
+    # /listservers
+    "listing_servers": ("""
+        SELECT s.id, s.ip, s.port, s.scan_date, COUNT(m.id) as model_count
+        FROM servers s
+        LEFT JOIN models m ON s.id = m.endpoint_id
+        GROUP BY s.id, s.ip, s.port, s.scan_date
+        ORDER BY s.scan_date DESC
+        LIMIT ?
+    """, (25,)),
+}
+
+CASES = ["fetch_one_by_id", "fetch_one_by_address", "save_existing_endpoint", "save_new_endpoint",
+         "verify_endpoint_db", "honeypot_classifier", "split_message"] + list(LISTING_QUERIES)
+
+
+def _seeded_sqlite_path(size, seed, db_dir):
+    return os.path.join(db_dir, f"endpoints_{size}_seed{seed}_v{SEED_VERSION}.db")
+
+def prepare_sqlite(size, seed, db_dir):
+    """Seed (or reuse) the cached SQLite database for a size and copy it for one run"""
+    os.makedirs(db_dir, exist_ok=True)
+    cached = _seeded_sqlite_path(size, seed, db_dir)
+    if not os.path.exists(cached):
+        # Seeded by a child process, since the database module binds its path at import
+        tmp_path = f"{cached}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        env = dict(os.environ, DATABASE_TYPE="sqlite", SQLITE_DB_PATH=tmp_path)
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--seed-only", "--backend", "sqlite",
+                        "--size", str(size), "--seed", str(seed)], env=env, check=True)
+        os.replace(tmp_path, cached)
+
+    fd, work_path = tempfile.mkstemp(prefix=f"microbench_{size}_", suffix=".db", dir=db_dir)
+    os.close(fd)
+    shutil.copyfile(cached, work_path)
+    return work_path
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+def time_case(call, repeat, max_seconds=BENCH_MICRO_MAX_SECONDS):
+    """
+    Call `call(i)` repeatedly and summarise the per-call time
+
+    Stops after `repeat` calls or `max_seconds`, whichever comes first (but
+    never before MIN_SAMPLES calls).
+    """
+    for i in range(WARMUP_CALLS):
+        call(i)
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for i in range(repeat):
+        started = time.perf_counter()
+        call(WARMUP_CALLS + i)
+        samples.append((time.perf_counter() - started) * 1_000_000)
+        if len(samples) >= MIN_SAMPLES and time.perf_counter() > deadline:
+            break
+    return {
+        "samples": len(samples),
+        "median_us": statistics.median(samples),
+        "p90_us": _percentile(samples, 90),
+        "mean_us": statistics.fmean(samples),
+        "min_us": min(samples),
+    }
+
+
+def build_cases(Database, size, seed):
+    """
+    Callables for each case that can run here
+
+    Returns:
+        tuple: ({case: (callable, repeat_divisor)}, {case: reason skipped})
+    """
+    cases, skipped = {}, {}
+    rng = random.Random(seed + 1)
+    ids = [rng.randint(1, size) for _ in range(1024)]
+
+    cases["fetch_one_by_id"] = (
+        lambda i: Database.fetch_one("SELECT ip, port FROM endpoints WHERE id = ?", (ids[i % len(ids)],)), 1)
+    cases["fetch_one_by_address"] = (
+        lambda i: Database.fetch_one("SELECT id FROM endpoints WHERE ip = ? AND port = ?",
+                                     endpoint_address(ids[i % len(ids)] - 1, seed)), 1)
+
+    try:
+        import ollama_scanner
+    except Exception as e:
+        for case in ("save_existing_endpoint", "save_new_endpoint", "verify_endpoint_db"):
+            skipped[case] = f"ollama_scanner not importable: {e}"
+    else:
+        existing = [endpoint_address(index, seed) for index in range(min(size, 2048))]
+        cases["save_existing_endpoint"] = (
+            lambda i: ollama_scanner.saveStuffToDb(*existing[i % len(existing)], None), 1)
+        # Seeded addresses are spread over all of IPv4; an unusual port keeps these new
+        cases["save_new_endpoint"] = (
+            lambda i: ollama_scanner.saveStuffToDb(f"192.168.{(i >> 8) & 255}.{i & 255}", 54321 + (i >> 16), None), 1)
+
+        # Only the database work: the server check returns a canned /api/tags listing
+        ollama_scanner.isOllamaServer = lambda ip, port=11434, timeout=None: (True, CANNED_TAGS)
+
+        def verify(i):
+            with contextlib.redirect_stdout(None):
+                ollama_scanner.verifyEndpoint(ids[i % len(ids)], is_valid=True)
+        cases["verify_endpoint_db"] = (verify, 1)
+
+    try:
+        from prune_bad_endpoints import is_likely_honeypot_response
+    except Exception as e:
+        skipped["honeypot_classifier"] = f"prune_bad_endpoints not importable: {e}"
+    else:
+        cases["honeypot_classifier"] = (
+            lambda i: is_likely_honeypot_response(HONEYPOT_SAMPLES[i % len(HONEYPOT_SAMPLES)]), 1)
+
+    try:
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "DiscordBot"))
+        from bot_helpers import split_message
+    except Exception as e:
+        skipped["split_message"] = f"DiscordBot/bot_helpers not importable: {e}"
+    else:
+        block = "```python\n" + "print('hello world')\n" * 40 + "```\n"
+        messages = [
+            "Model llama3:8b on 10.0.0.1:11434",
+            "**Models**\n" + "llama3:8b | 8.0B | Q4_0 | 12 | ID:1:10.0.0.1:11434\n" * 120,
+            "Server list\n" + "10.0.0.1:11434 - 3 models\n" * 200,
+            "Benchmark output\n" + block * 6,
+        ]
+        cases["split_message"] = (lambda i: split_message(messages[i % len(messages)]), 1)
+
+    for case, (query, params) in LISTING_QUERIES.items():
+        cases[case] = ((lambda query, params: lambda i: Database.fetch_all(query, params))(query, params), 20)
+
+    return cases, skipped
+
+
+def run_worker(args):
+    """Seed and/or time one (backend, size); runs in its own process"""
+    from database import Database, init_database, get_db_manager
+
+    if args.backend == "postgres":
+        # Drops and re-creates the tables; the script only points this at BENCH_MICRO_PG_DB
+        with open(PG_INIT_SQL, "r", encoding="utf-8") as f:
+            schema = f.read()
+        manager = get_db_manager()
+        conn = manager.get_connection()
+        try:
+            conn.cursor().execute(schema)
+            conn.commit()
+        finally:
+            manager.return_connection(conn)
+    else:
+        init_database()
+
+    if args.seed_only or args.backend == "postgres":
+        load_dataset(SyntheticDataset(args.size, seed=args.seed, as_of=SEED_AS_OF))
+        if args.seed_only:
+            return
+
+    cases, skipped = build_cases(Database, args.size, args.seed)
+    selected = args.cases.split(",") if args.cases else CASES
+    results = {}
+    for case in selected:
+        if case not in cases:
+            if case not in skipped:
+                skipped[case] = "unknown case"
+            continue
+        call, divisor = cases[case]
+        try:
+            results[case] = time_case(call, max(MIN_SAMPLES, args.repeat // divisor))
+        except Exception as e:
+            skipped[case] = f"failed: {e}"
+            continue
+        print(f"  {args.backend}/{args.size} {case}: median {results[case]['median_us']:.1f} us, "
+              f"p90 {results[case]['p90_us']:.1f} us ({results[case]['samples']} calls)", file=sys.stderr)
+
+    with open(args.worker_output, "w", encoding="utf-8") as f:
+        json.dump({"results": results, "skipped": {k: v for k, v in skipped.items() if k in selected}}, f)
+
+
+def run_combination(backend, size, args):
+    """Run one worker process; returns its {"results", "skipped"} (or an "error")"""
+    env = dict(os.environ, DATABASE_TYPE=backend)
+    work_path = None
+    if backend == "sqlite":
+        work_path = prepare_sqlite(size, args.seed, args.db_dir)
+        env["SQLITE_DB_PATH"] = work_path
+    else:
+        if BENCH_MICRO_PG_DB == os.getenv("POSTGRES_DB", "ollama_scanner"):
+            return {"error": f"refusing to drop and re-seed {BENCH_MICRO_PG_DB}; set BENCH_MICRO_PG_DB"}
+        env["POSTGRES_DB"] = BENCH_MICRO_PG_DB
+
+    fd, output_path = tempfile.mkstemp(prefix="microbench_", suffix=".json")
+    os.close(fd)
+    command = [sys.executable, os.path.abspath(__file__), "--worker", "--backend", backend, "--size", str(size),
+               "--seed", str(args.seed), "--repeat", str(args.repeat), "--worker-output", output_path]
+    if args.cases:
+        command += ["--cases", args.cases]
+    try:
+        completed = subprocess.run(command, env=env, stdout=subprocess.DEVNULL)
+        if completed.returncode != 0:
+            return {"error": f"worker exited with status {completed.returncode}"}
+        with open(output_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(output_path)
+        if work_path and os.path.exists(work_path):
+            os.remove(work_path)
+
+
+def postgres_available():
+    """True when psycopg2 is installed and the benchmark database accepts connections"""
+    try:
+        import psycopg2
+        conn = psycopg2.connect(dbname=BENCH_MICRO_PG_DB, user=os.getenv("POSTGRES_USER", "ollama"),
+                                password=os.getenv("POSTGRES_PASSWORD", "ollama_scanner_password"),
+                                host=os.getenv("POSTGRES_HOST", "localhost"),
+                                port=os.getenv("POSTGRES_PORT", "5432"), connect_timeout=3)
+        conn.close()
+        return True
+    except Exception as e:
+        logger.info(f"Postgres benchmark database {BENCH_MICRO_PG_DB} not available: {e}")
+        return False
+
+
+def compare_to_baseline(baseline, current, tolerance=BENCH_MICRO_TOLERANCE):
+    """
+    Compare case medians to a baseline run
+
+    Returns:
+        list: (key, baseline_us, current_us, change) for every case in both, slowest change first
+    """
+    rows = []
+    for key, result in current["results"].items():
+        before = baseline.get("results", {}).get(key)
+        if not before or not before["median_us"]:
+            continue
+        change = (result["median_us"] - before["median_us"]) / before["median_us"]
+        rows.append((key, before["median_us"], result["median_us"], change))
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the data layer and classifiers")
+    parser.add_argument("--sizes", default=BENCH_MICRO_SIZES, help="Comma list of endpoint counts to seed")
+    parser.add_argument("--backend", choices=["sqlite", "postgres", "both"], default="sqlite",
+                        help="Database backend(s); 'both' skips Postgres when it is not reachable")
+    parser.add_argument("--cases", help=f"Comma list of cases (default all: {','.join(CASES)})")
+    parser.add_argument("--repeat", type=int, default=BENCH_MICRO_REPEAT, help="Timed calls per case")
+    parser.add_argument("--seed", type=int, default=BENCH_MICRO_SEED, help="Seed for the synthetic data")
+    parser.add_argument("--db-dir", default=BENCH_MICRO_DIR, help="Directory for seeded SQLite databases")
+    parser.add_argument("--output", default="microbench_results.json", help="Results file")
+    parser.add_argument("--baseline", help="Earlier results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=BENCH_MICRO_TOLERANCE,
+                        help="Allowed relative slowdown of a case median (0.25 = 25%%)")
+    # Internal: worker mode
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--seed-only", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker or args.seed_only:
+        run_worker(args)
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    backends = ["sqlite", "postgres"] if args.backend == "both" else [args.backend]
+    if "postgres" in backends and not postgres_available():
+        if args.backend == "postgres":
+            return 2
+        backends.remove("postgres")
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "seed": args.seed,
+        "seed_version": SEED_VERSION,
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "results": {},
+        "skipped": {},
+        "errors": {},
+    }
+    for backend in backends:
+        for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            logger.info(f"Benchmarking {backend} with {size} endpoints")
+            outcome = run_combination(backend, size, args)
+            if "error" in outcome:
+                logger.error(f"{backend}/{size}: {outcome['error']}")
+                report["errors"][f"{backend}/{size}"] = outcome["error"]
+                continue
+            for case, result in outcome["results"].items():
+                report["results"][f"{backend}/{size}/{case}"] = dict(result, backend=backend, size=size, case=case)
+            for case, reason in outcome["skipped"].items():
+                report["skipped"][f"{backend}/{size}/{case}"] = reason
+
+    tmp_path = f"{args.output}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, args.output)
+    logger.info(f"Wrote {len(report['results'])} results to {args.output}")
+    for key, reason in report["skipped"].items():
+        logger.warning(f"Skipped {key}: {reason}")
+
+    if not args.baseline:
+        return 1 if report["errors"] else 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare_to_baseline(baseline, report, args.tolerance)
+    regressions = [row for row in rows if row[3] > args.tolerance]
+    print(f"\n{'Case':<56} {'Baseline':>11} {'Current':>11} {'Change':>8}")
+    print("-" * 90)
+    for key, before, after, change in rows:
+        flag = "  REGRESSION" if change > args.tolerance else ""
+        print(f"{key:<56} {before:>9.1f}us {after:>9.1f}us {change * 100:>+7.1f}%{flag}")
+    print(f"\n{len(regressions)} of {len(rows)} cases slower than the {args.tolerance * 100:.0f}% tolerance")
+    return 1 if regressions or report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+Mock Ollama Server
+Local stand-in for the Ollama HTTP API so the scanner, pruner, benchmarks and
+bot chat paths can be load-tested offline. One asyncio process serves any
+number of simulated endpoints, each on its own localhost port, implementing
+/api/tags, /api/version, /api/show, /api/generate and /api/chat (streaming
+and non-streaming) with configurable models, token rate, first-token delay,
+prefill rate, context-window truncation, error/timeout injection and
+honeypot-style responses.
+
+Uses only the standard library, so it runs anywhere Python does.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import signal
+import asyncio
+import hashlib
+import logging
+import argparse
+from datetime import datetime, timezone
+
+logger = logging.getLogger('mock_ollama_server')
+
+# Mock server defaults
+MOCK_OLLAMA_HOST = os.getenv("MOCK_OLLAMA_HOST", "127.0.0.1")
+MOCK_OLLAMA_BASE_PORT = int(os.getenv("MOCK_OLLAMA_BASE_PORT", "21434"))
+MOCK_OLLAMA_VERSION = os.getenv("MOCK_OLLAMA_VERSION", "0.5.7")
+MOCK_OLLAMA_MODELS = os.getenv("MOCK_OLLAMA_MODELS", "llama3.2:3b,qwen2.5:7b,mistral:7b-instruct-q4_K_M")
+MOCK_OLLAMA_TOKEN_RATE = float(os.getenv("MOCK_OLLAMA_TOKEN_RATE", "50"))
+MOCK_OLLAMA_FIRST_TOKEN_MS = float(os.getenv("MOCK_OLLAMA_FIRST_TOKEN_MS", "200"))
+MOCK_OLLAMA_MAX_TOKENS = int(os.getenv("MOCK_OLLAMA_MAX_TOKENS", "64"))
+MOCK_OLLAMA_HANG_SECONDS = float(os.getenv("MOCK_OLLAMA_HANG_SECONDS", "300"))
+# Model context window, the num_ctx used when a request sets none, and prompt tokens
+# evaluated per second (0 folds prefill into the first-token delay)
+MOCK_OLLAMA_CONTEXT_LENGTH = int(os.getenv("MOCK_OLLAMA_CONTEXT_LENGTH", "32768"))
+MOCK_OLLAMA_DEFAULT_NUM_CTX = int(os.getenv("MOCK_OLLAMA_DEFAULT_NUM_CTX", "2048"))
+MOCK_OLLAMA_PREFILL_RATE = float(os.getenv("MOCK_OLLAMA_PREFILL_RATE", "0"))
+
+# Longest request body accepted (prompts for context-length tests can be large)
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# Words used to build plausible-looking generated text
+FILLER_WORDS = (
+    "the model considers a short answer that explains each idea in plain terms and "
+    "keeps the response focused on what was asked while adding one useful example"
+).split()
+
+# Honeypot-style responses; placeholders: {model}, {prompt}, {ts}
+DEFAULT_HONEYPOT_TEMPLATES = [
+    "[INFO] Using Model: {model}\nSending prompt to api/generate: {prompt}",
+    "{ts} DEBUG: request: {prompt} response: ok",
+    "Loaded Model: {model} model_id: 1 endpoint_id: 1",
+    "",
+]
+
+# Approximate parameter sizes and quantizations for /api/tags details
+_KNOWN_SIZES = {"1b": 1.2, "3b": 3.2, "7b": 7.6, "8b": 8.0, "13b": 13.0, "14b": 14.8, "32b": 32.8, "70b": 70.6}
+
+
+def _utc_now():
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def model_entry(name):
+    """Build an /api/tags model record with realistic looking details"""
+    tag = name.split(":", 1)[1] if ":" in name else "latest"
+    family = name.split(":", 1)[0].rstrip("0123456789.").rstrip("-") or "llama"
+    billions = next((b for key, b in _KNOWN_SIZES.items() if key in tag.lower()), 7.6)
+    quant = next((part.upper() for part in tag.split("-") if part.lower().startswith("q")), "Q4_K_M")
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()
+    return {
+        "name": name,
+        "model": name,
+        "modified_at": "2025-01-01T00:00:00Z",
+        "size": int(billions * 0.6 * 1024 ** 3),
+        "digest": digest,
+        "details": {
+            "parent_model": "",
+            "format": "gguf",
+            "family": family,
+            "families": [family],
+            "parameter_size": f"{billions}B",
+            "quantization_level": quant,
+        },
+    }
+
+
+class EndpointProfile:
+    """Behaviour of one simulated endpoint"""
+
+    def __init__(self, port, models, token_rate=MOCK_OLLAMA_TOKEN_RATE,
+                 first_token_ms=MOCK_OLLAMA_FIRST_TOKEN_MS, error_rate=0.0, timeout_rate=0.0,
+                 honeypot=False, honeypot_templates=None, max_tokens=MOCK_OLLAMA_MAX_TOKENS,
+                 hang_seconds=MOCK_OLLAMA_HANG_SECONDS, context_length=MOCK_OLLAMA_CONTEXT_LENGTH,
+                 prefill_rate=MOCK_OLLAMA_PREFILL_RATE):
+        self.port = port
+        self.models = list(models)
+        self.token_rate = max(0.001, token_rate)
+        self.first_token_ms = max(0.0, first_token_ms)
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.honeypot = honeypot
+        self.honeypot_templates = honeypot_templates or DEFAULT_HONEYPOT_TEMPLATES
+        self.max_tokens = max_tokens
+        self.hang_seconds = hang_seconds
+        self.context_length = context_length
+        self.prefill_rate = prefill_rate
+        self.requests = 0
+
+    def to_dict(self):
+        return {
+            "port": self.port,
+            "models": self.models,
+            "token_rate": self.token_rate,
+            "first_token_ms": self.first_token_ms,
+            "error_rate": self.error_rate,
+            "timeout_rate": self.timeout_rate,
+            "honeypot": self.honeypot,
+        }
+
+
+class MockOllamaCluster:
+    """
+    Serves a set of EndpointProfiles, one listening socket per port
+
+    Can be driven from the command line or started in-process by tests and
+    benchmarks:
+
+        cluster = MockOllamaCluster(build_profiles(count=100))
+        await cluster.start()
+        ...
+        await cluster.stop()
+    """
+
+    def __init__(self, profiles, host=MOCK_OLLAMA_HOST, version=MOCK_OLLAMA_VERSION, seed=None):
+        self.host = host
+        self.version = version
+        self.profiles = {profile.port: profile for profile in profiles}
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0, "timeouts": 0, "honeypot": 0, "tokens": 0}
+        self._servers = []
+
+    @property
+    def endpoints(self):
+        """(host, port) for every simulated endpoint"""
+        return [(self.host, port) for port in self.profiles]
+
+    async def start(self):
+        """Bind every endpoint port"""
+        for port, profile in self.profiles.items():
+            server = await asyncio.start_server(
+                lambda r, w, p=profile: self._handle_connection(r, w, p),
+                self.host, port, backlog=256, reuse_address=True
+            )
+            self._servers.append(server)
+        logger.info(f"Mock Ollama serving {len(self._servers)} endpoints on {self.host} "
+                    f"ports {min(self.profiles)}-{max(self.profiles)}")
+
+    async def stop(self):
+        """Close all listening sockets"""
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+    # --- HTTP plumbing -------------------------------------------------
+
+    async def _handle_connection(self, reader, writer, profile):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+                await self._dispatch(writer, profile, method, path, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            logger.debug(f"Connection error on port {profile.port}: {e}")
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split(" ")
+        if len(parts) < 2:
+            return None
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        length = min(int(headers.get("content-length", "0") or 0), MAX_BODY_BYTES)
+        body = await reader.readexactly(length) if length else b""
+        return parts[0].upper(), parts[1].split("?", 1)[0], headers, body
+
+    async def _send_json(self, writer, status, payload, keep_alive=True):
+        body = json.dumps(payload).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                  500: "Internal Server Error"}.get(status, "OK")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            .encode("latin-1") + body
+        )
+        await writer.drain()
+
+    async def _start_stream(self, writer, keep_alive=True):
+        writer.write(
+            "HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+        )
+        await writer.drain()
+
+    async def _send_chunk(self, writer, payload):
+        data = json.dumps(payload).encode("utf-8") + b"\n"
+        writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+        await writer.drain()
+
+    async def _end_stream(self, writer):
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    # --- API -----------------------------------------------------------
+
+    async def _dispatch(self, writer, profile, method, path, body, keep_alive):
+        self.stats["requests"] += 1
+        profile.requests += 1
+
+        if path == "/api/version":
+            return await self._send_json(writer, 200, {"version": self.version}, keep_alive)
+        if path == "/api/tags":
+            return await self._send_json(writer, 200, {"models": [model_entry(m) for m in profile.models]},
+                                         keep_alive)
+        if path == "/api/show":
+            return await self._send_show(writer, profile, body, keep_alive)
+        if path not in ("/api/generate", "/api/chat"):
+            return await self._send_json(writer, 404, {"error": "404 page not found"}, keep_alive)
+        if method != "POST":
+            return await self._send_json(writer, 405, {"error": "method not allowed"}, keep_alive)
+
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            return await self._send_json(writer, 400, {"error": "invalid JSON body"}, keep_alive)
+
+        model = request.get("model", "")
+        if model not in profile.models:
+            return await self._send_json(
+                writer, 404, {"error": f"model \"{model}\" not found, try pulling it first"}, keep_alive
+            )
+
+        # Fault injection
+        roll = self.random.random()
+        if roll < profile.timeout_rate:
+            self.stats["timeouts"] += 1
+            await asyncio.sleep(profile.hang_seconds)
+            return await self._send_json(writer, 500, {"error": "context deadline exceeded"}, keep_alive)
+        if roll < profile.timeout_rate + profile.error_rate:
+            self.stats["errors"] += 1
+            return await self._send_json(writer, 500, {"error": "llama runner process has terminated"},
+                                         keep_alive)
+
+        chat = path == "/api/chat"
+        prompt = self._prompt_text(request, chat)
+        tokens = self._response_tokens(profile, request, model, prompt)
+        prompt_tokens = self._prompt_eval_count(profile, request, prompt)
+        self.stats["tokens"] += len(tokens)
+
+        if request.get("stream", True):
+            await self._stream_response(writer, profile, model, prompt_tokens, tokens, chat, keep_alive)
+        else:
+            await self._complete_response(writer, profile, model, prompt_tokens, tokens, chat, keep_alive)
+
+    async def _send_show(self, writer, profile, body, keep_alive):
+        try:
+            model = json.loads(body or b"{}").get("model") or ""
+        except ValueError:
+            model = ""
+        if model not in profile.models:
+            return await self._send_json(writer, 404, {"error": f"model '{model}' not found"}, keep_alive)
+        details = model_entry(model)["details"]
+        return await self._send_json(writer, 200, {
+            "details": details,
+            "model_info": {
+                "general.architecture": details["family"],
+                f"{details['family']}.context_length": profile.context_length,
+            },
+        }, keep_alive)
+
+    def _prompt_text(self, request, chat):
+        if chat:
+            messages = request.get("messages") or []
+            return " ".join(str(m.get("content", "")) for m in messages if isinstance(m, dict))
+        return str(request.get("prompt", ""))
+
+    def _response_tokens(self, profile, request, model, prompt):
+        if profile.honeypot:
+            self.stats["honeypot"] += 1
+            template = self.random.choice(profile.honeypot_templates)
+            text = template.format(model=model, prompt=prompt[:80],
+                                   ts=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            # Keep whitespace attached so the streamed pieces join back to the template
+            return [word + " " for word in text.split(" ")] if text else []
+
+        options = request.get("options") or {}
+        limit = options.get("num_predict") or request.get("max_tokens") or profile.max_tokens
+        try:
+            limit = int(limit)
+        except (TypeError, ValueError):
+            limit = profile.max_tokens
+        if limit < 0:
+            limit = profile.max_tokens
+        # Deterministic per prompt so repeated runs produce the same text
+        rng = random.Random(f"{model}:{prompt}")
+        count = max(1, min(limit, rng.randint(max(1, limit // 2), max(1, limit))))
+        return [("" if i == 0 else " ") + rng.choice(FILLER_WORDS) for i in range(count)] + ["."]
+
+    def _prompt_eval_count(self, profile, request, prompt):
+        # Like Ollama, prompts longer than the context window are truncated to fit
+        options = request.get("options") or {}
+        try:
+            num_ctx = int(options.get("num_ctx") or MOCK_OLLAMA_DEFAULT_NUM_CTX)
+        except (TypeError, ValueError):
+            num_ctx = MOCK_OLLAMA_DEFAULT_NUM_CTX
+        return max(1, min(len(prompt) // 4, num_ctx, profile.context_length))
+
+    def _prefill_seconds(self, profile, prompt_tokens):
+        prefill = prompt_tokens / profile.prefill_rate if profile.prefill_rate > 0 else 0.0
+        return profile.first_token_ms / 1000.0 + prefill
+
+    def _final_fields(self, profile, prompt_tokens, tokens, started, first_token_at):
+        now = time.perf_counter()
+        eval_ns = int((now - first_token_at) * 1e9)
+        return {
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((now - started) * 1e9),
+            "load_duration": 1_000_000,
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(self._prefill_seconds(profile, prompt_tokens) * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": eval_ns,
+        }
+
+    async def _stream_response(self, writer, profile, model, prompt_tokens, tokens, chat, keep_alive):
+        started = time.perf_counter()
+        await self._start_stream(writer, keep_alive)
+        await asyncio.sleep(self._prefill_seconds(profile, prompt_tokens))
+        first_token_at = time.perf_counter()
+        interval = 1.0 / profile.token_rate
+
+        for i, token in enumerate(tokens):
+            # Pace against the schedule rather than sleeping a fixed amount, so
+            # the token rate holds even when the loop is busy with other streams
+            delay = first_token_at + i * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            chunk = {"model": model, "created_at": _utc_now(), "done": False}
+            if chat:
+                chunk["message"] = {"role": "assistant", "content": token}
+            else:
+                chunk["response"] = token
+            await self._send_chunk(writer, chunk)
+
+        final = {"model": model, "created_at": _utc_now()}
+        if chat:
+            final["message"] = {"role": "assistant", "content": ""}
+        else:
+            final["response"] = ""
+            final["context"] = []
+        final.update(self._final_fields(profile, prompt_tokens, tokens, started, first_token_at))
+        await self._send_chunk(writer, final)
+        await self._end_stream(writer)
+
+    async def _complete_response(self, writer, profile, model, prompt_tokens, tokens, chat, keep_alive):
+        started = time.perf_counter()
+        await asyncio.sleep(self._prefill_seconds(profile, prompt_tokens))
+        first_token_at = time.perf_counter()
+        await asyncio.sleep(len(tokens) / profile.token_rate)
+
+        text = "".join(tokens)
+        payload = {"model": model, "created_at": _utc_now()}
+        if chat:
+            payload["message"] = {"role": "assistant", "content": text}
+        else:
+            payload["response"] = text
+            payload["context"] = []
+        payload.update(self._final_fields(profile, prompt_tokens, tokens, started, first_token_at))
+        await self._send_json(writer, 200, payload, keep_alive)
+
+    def format_stats(self):
+        """One-line summary of traffic served so far"""
+        return (f"requests={self.stats['requests']} tokens={self.stats['tokens']} "
+                f"errors={self.stats['errors']} timeouts={self.stats['timeouts']} "
+                f"honeypot={self.stats['honeypot']}")
+
+
+def build_profiles(count=1, base_port=MOCK_OLLAMA_BASE_PORT, models=None, models_per_endpoint=None,
+                   token_rate=MOCK_OLLAMA_TOKEN_RATE, first_token_ms=MOCK_OLLAMA_FIRST_TOKEN_MS,
+                   jitter=0.0, error_rate=0.0, timeout_rate=0.0, honeypot_rate=0.0,
+                   empty_rate=0.0, honeypot_templates=None, max_tokens=MOCK_OLLAMA_MAX_TOKENS,
+                   hang_seconds=MOCK_OLLAMA_HANG_SECONDS, context_length=MOCK_OLLAMA_CONTEXT_LENGTH,
+                   prefill_rate=MOCK_OLLAMA_PREFILL_RATE, seed=None):
+    """
+    Create profiles for count endpoints on consecutive ports
+
+    Args:
+        models: Model names to draw from
+        models_per_endpoint: Models per endpoint (default: all of them)
+        jitter: Relative +/- variation applied per endpoint to token rate and first-token delay
+        honeypot_rate: Fraction of endpoints that answer with honeypot templates
+        empty_rate: Fraction of endpoints that list no models at all
+        seed: Seed so the same arguments always produce the same cluster
+    """
+    rng = random.Random(seed)
+    models = list(models or [m.strip() for m in MOCK_OLLAMA_MODELS.split(",") if m.strip()])
+    profiles = []
+    for i in range(count):
+        if rng.random() < empty_rate:
+            endpoint_models = []
+        elif models_per_endpoint:
+            endpoint_models = rng.sample(models, min(models_per_endpoint, len(models)))
+        else:
+            endpoint_models = list(models)
+        scale = 1.0 + rng.uniform(-jitter, jitter) if jitter else 1.0
+        profiles.append(EndpointProfile(
+            base_port + i,
+            endpoint_models,
+            token_rate=token_rate * scale,
+            first_token_ms=first_token_ms / scale,
+            error_rate=error_rate,
+            timeout_rate=timeout_rate,
+            honeypot=rng.random() < honeypot_rate,
+            honeypot_templates=honeypot_templates,
+            max_tokens=max_tokens,
+            hang_seconds=hang_seconds,
+            context_length=context_length,
+            prefill_rate=prefill_rate,
+        ))
+    return profiles
+
+
+def raise_open_file_limit(wanted):
+    """Lift the soft descriptor limit towards the hard limit so thousands of ports can be bound"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if soft != resource.RLIM_INFINITY and soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        logger.info(f"Raised open file limit from {soft} to {target}")
+
+
+def register_endpoints(endpoints):
+    """Insert the simulated endpoints into the scanner database as unverified"""
+    from database import Database
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    added = 0
+    for ip, port in endpoints:
+        if Database.fetch_one("SELECT id FROM endpoints WHERE ip = ? AND port = ?", (ip, port)):
+            continue
+        Database.execute("INSERT INTO endpoints (ip, port, scan_date, verified) VALUES (?, ?, ?, ?)",
+                         (ip, port, now, 0))
+        added += 1
+    logger.info(f"Registered {added} new endpoints in the database")
+    return added
+
+
+def write_manifest(path, cluster):
+    """Write ip:port per line, or full profiles as JSON when the path ends in .json"""
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            json.dump([dict(profile.to_dict(), ip=cluster.host) for profile in cluster.profiles.values()],
+                      f, indent=2)
+        else:
+            for ip, port in cluster.endpoints:
+                f.write(f"{ip}:{port}\n")
+    logger.info(f"Wrote endpoint manifest to {path}")
+
+
+async def run_cluster(cluster, duration=None, stats_interval=0):
+    """Serve until interrupted (or for duration seconds)"""
+    await cluster.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    if duration:
+        loop.call_later(duration, stop.set)
+
+    async def report():
+        while not stop.is_set():
+            await asyncio.sleep(stats_interval)
+            logger.info(cluster.format_stats())
+
+    reporter = asyncio.ensure_future(report()) if stats_interval else None
+    await stop.wait()
+    if reporter:
+        reporter.cancel()
+    await cluster.stop()
+    logger.info(f"Stopped mock Ollama: {cluster.format_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Ollama API stand-in for offline performance testing")
+    parser.add_argument("--host", default=MOCK_OLLAMA_HOST, help="Address to bind")
+    parser.add_argument("--base-port", type=int, default=MOCK_OLLAMA_BASE_PORT, help="First endpoint port")
+    parser.add_argument("--count", type=int, default=1, help="Number of simulated endpoints (consecutive ports)")
+    parser.add_argument("--models", default=MOCK_OLLAMA_MODELS, help="Comma separated model names")
+    parser.add_argument("--models-per-endpoint", type=int, default=0,
+                        help="Random subset of --models per endpoint (0 = all)")
+    parser.add_argument("--token-rate", type=float, default=MOCK_OLLAMA_TOKEN_RATE, help="Tokens per second")
+    parser.add_argument("--first-token-ms", type=float, default=MOCK_OLLAMA_FIRST_TOKEN_MS,
+                        help="Delay before the first token in milliseconds")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Per-endpoint +/- fraction applied to token rate and first-token delay")
+    parser.add_argument("--max-tokens", type=int, default=MOCK_OLLAMA_MAX_TOKENS,
+                        help="Default response length when the request sets no num_predict")
+    parser.add_argument("--context-length", type=int, default=MOCK_OLLAMA_CONTEXT_LENGTH,
+                        help="Model context window; longer prompts are truncated")
+    parser.add_argument("--prefill-rate", type=float, default=MOCK_OLLAMA_PREFILL_RATE,
+                        help="Prompt tokens evaluated per second (0 = included in --first-token-ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of generations answered with HTTP 500")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of generations that hang")
+    parser.add_argument("--hang-seconds", type=float, default=MOCK_OLLAMA_HANG_SECONDS,
+                        help="How long a hanging generation stalls")
+    parser.add_argument("--honeypot-rate", type=float, default=0.0,
+                        help="Fraction of endpoints that answer with honeypot templates")
+    parser.add_argument("--honeypot-templates", help="JSON file with a list of honeypot response templates")
+    parser.add_argument("--empty-rate", type=float, default=0.0, help="Fraction of endpoints with no models")
+    parser.add_argument("--seed", type=int, help="Seed for reproducible clusters and fault injection")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    parser.add_argument("--stats-interval", type=float, default=0, help="Log traffic stats every N seconds")
+    parser.add_argument("--manifest", help="Write endpoints to this file (ip:port lines, or profiles if .json)")
+    parser.add_argument("--register", action="store_true",
+                        help="Insert the endpoints into the scanner database as unverified")
+    parser.add_argument("--verbose", action="store_true", help="Enable debug logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    templates = None
+    if args.honeypot_templates:
+        with open(args.honeypot_templates, "r", encoding="utf-8") as f:
+            templates = json.load(f)
+
+    profiles = build_profiles(
+        count=args.count,
+        base_port=args.base_port,
+        models=[m.strip() for m in args.models.split(",") if m.strip()],
+        models_per_endpoint=args.models_per_endpoint or None,
+        token_rate=args.token_rate,
+        first_token_ms=args.first_token_ms,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        honeypot_rate=args.honeypot_rate,
+        empty_rate=args.empty_rate,
+        honeypot_templates=templates,
+        max_tokens=args.max_tokens,
+        hang_seconds=args.hang_seconds,
+        context_length=args.context_length,
+        prefill_rate=args.prefill_rate,
+        seed=args.seed,
+    )
+    # Each endpoint holds a listening socket plus its client connections
+    raise_open_file_limit(args.count * 4 + 256)
+
+    cluster = MockOllamaCluster(profiles, host=args.host, seed=args.seed)
+    if args.manifest:
+        write_manifest(args.manifest, cluster)
+    if args.register:
+        register_endpoints(cluster.endpoints)
+
+    try:
+        asyncio.run(run_cluster(cluster, duration=args.duration, stats_interval=args.stats_interval))
+    except OSError as e:
+        logger.error(f"Could not bind endpoints: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ from threading import Event
 
 # Added by migration script
 from database import Database, init_database, DATABASE_TYPE
+from database.catalog import sync_endpoint_catalog, invalidate_catalog_digest
 
 # Global verbosity flag - default to False
 VERBOSE = False
@@ -315,33 +316,37 @@ def verifyEndpoint(endpointId, is_valid=None, preserve_verified=True):
         
         # Now add the models if they were found
         if model_data and "models" in model_data:
-            for model in model_data["models"]:
-                # Extract model information
-                name = model.get("name", "Unknown")
-                size = model.get("size", 0)
-                sizeMb = size / (1024 * 1024) if size else 0
-                
-                details = model.get("details", {})
-                parameter_size = details.get("parameter_size", "Unknown")
-                quantization_level = details.get("quantization_level", "Unknown")
-                
-                # Check if the model already exists for this endpoint
-                model_exists_query = 'SELECT id FROM models WHERE endpoint_id = ? AND name = ?'
-                model_exists = Database.fetch_one(model_exists_query, (endpointId, name)) is not None
-                
-                if model_exists:
-                    # Update existing model
-                    Database.execute('''
-                    UPDATE models 
-                    SET parameter_size = ?, quantization_level = ?, size_mb = ?
-                    WHERE endpoint_id = ? AND name = ?
-                    ''', (parameter_size, quantization_level, sizeMb, endpointId, name))
-                else:
-                    # Add new model
-                    Database.execute('''
-                    INSERT INTO models (endpoint_id, name, parameter_size, quantization_level, size_mb)
-                    VALUES (?, ?, ?, ?, ?)
-                    ''', (endpointId, name, parameter_size, quantization_level, sizeMb))
+            if DATABASE_TYPE == "postgres":
+                # Mirror the listing through the catalog sync so its digest stays current
+                sync_endpoint_catalog(endpointId, model_data["models"])
+            else:
+                for model in model_data["models"]:
+                    # Extract model information
+                    name = model.get("name", "Unknown")
+                    size = model.get("size", 0)
+                    sizeMb = size / (1024 * 1024) if size else 0
+                
+                    details = model.get("details", {})
+                    parameter_size = details.get("parameter_size", "Unknown")
+                    quantization_level = details.get("quantization_level", "Unknown")
+                
+                    # Check if the model already exists for this endpoint
+                    model_exists_query = 'SELECT id FROM models WHERE endpoint_id = ? AND name = ?'
+                    model_exists = Database.fetch_one(model_exists_query, (endpointId, name)) is not None
+                
+                    if model_exists:
+                        # Update existing model
+                        Database.execute('''
+                        UPDATE models 
+                        SET parameter_size = ?, quantization_level = ?, size_mb = ?
+                        WHERE endpoint_id = ? AND name = ?
+                        ''', (parameter_size, quantization_level, sizeMb, endpointId, name))
+                    else:
+                        # Add new model
+                        Database.execute('''
+                        INSERT INTO models (endpoint_id, name, parameter_size, quantization_level, size_mb)
+                        VALUES (?, ?, ?, ?, ?)
+                        ''', (endpointId, name, parameter_size, quantization_level, sizeMb))
             
             print(f"Added/updated {len(model_data['models'])} models for endpoint {ip}:{port}")
         
@@ -537,6 +542,8 @@ def removeDuplicates():
             
             for remove_id in remove_ids:
                 Database.execute("DELETE FROM models WHERE id = ?", (remove_id,))
+            if DATABASE_TYPE == "postgres":
+                invalidate_catalog_digest(endpoint_id)
     
     # Find duplicate verified_endpoints (same endpoint_id with different IDs)
     if DATABASE_TYPE == "postgres":
@@ -1491,49 +1498,53 @@ def add_server_to_db(ip, models_data, ps_data, db_path):
                       (now, now, endpoint_id))
         
         # Process models
-        for model in models_data:
-            # Ensure we're working with a valid model object
-            if not isinstance(model, dict):
-                if VERBOSE:
-                    print(f"[WARNING] Invalid model data type: {type(model)}, skipping")
-                continue
+        if DATABASE_TYPE == "postgres":
+            # Mirror the listing through the catalog sync so its digest stays current
+            sync_endpoint_catalog(endpoint_id, [model for model in models_data if isinstance(model, dict)])
+        else:
+            for model in models_data:
+                # Ensure we're working with a valid model object
+                if not isinstance(model, dict):
+                    if VERBOSE:
+                        print(f"[WARNING] Invalid model data type: {type(model)}, skipping")
+                    continue
                 
-            # Extract model properties safely
-            name = model.get("name", "Unknown")
+                # Extract model properties safely
+                name = model.get("name", "Unknown")
             
-            # Check if model exists for this endpoint
-            model_query = 'SELECT id FROM models WHERE endpoint_id = ? AND name = ?'
-            model_params = (endpoint_id, name)
-            model_exists = Database.fetch_one(model_query, model_params) is not None
+                # Check if model exists for this endpoint
+                model_query = 'SELECT id FROM models WHERE endpoint_id = ? AND name = ?'
+                model_params = (endpoint_id, name)
+                model_exists = Database.fetch_one(model_query, model_params) is not None
             
-            # Process model details
-            size = model.get("size", 0)
-            size_mb = size / (1024 * 1024) if size else 0
+                # Process model details
+                size = model.get("size", 0)
+                size_mb = size / (1024 * 1024) if size else 0
             
-            # Safely extract nested values
-            details = model.get("details", {})
-            if not isinstance(details, dict):
-                details = {}
+                # Safely extract nested values
+                details = model.get("details", {})
+                if not isinstance(details, dict):
+                    details = {}
                 
-            param_size = details.get("parameter_size", "Unknown")
-            quant_level = details.get("quantization_level", "Unknown")
+                param_size = details.get("parameter_size", "Unknown")
+                quant_level = details.get("quantization_level", "Unknown")
             
-            if model_exists:
-                # Update existing model
-                Database.execute(
-                    '''UPDATE models 
-                    SET parameter_size = ?, quantization_level = ?, size_mb = ?
-                    WHERE endpoint_id = ? AND name = ?''',
-                    (param_size, quant_level, size_mb, endpoint_id, name)
-                )
-            else:
-                # Insert new model - ensure we're passing only scalar values
-                Database.execute(
-                    '''INSERT INTO models 
-                    (endpoint_id, name, parameter_size, quantization_level, size_mb)
-                    VALUES (?, ?, ?, ?, ?)''',
-                    (endpoint_id, name, param_size, quant_level, size_mb)
-                )
+                if model_exists:
+                    # Update existing model
+                    Database.execute(
+                        '''UPDATE models 
+                        SET parameter_size = ?, quantization_level = ?, size_mb = ?
+                        WHERE endpoint_id = ? AND name = ?''',
+                        (param_size, quant_level, size_mb, endpoint_id, name)
+                    )
+                else:
+                    # Insert new model - ensure we're passing only scalar values
+                    Database.execute(
+                        '''INSERT INTO models 
+                        (endpoint_id, name, parameter_size, quantization_level, size_mb)
+                        VALUES (?, ?, ?, ?, ?)''',
+                        (endpoint_id, name, param_size, quant_level, size_mb)
+                    )
         
         return True
     except Exception as e:
@@ -403,7 +403,14 @@ class Filter:
             return {"success": False, "error": str(e)}
     
     def search_scanned_instances(self, search_params: Dict) -> Dict:
-        """Search for scanned instances based on the provided parameters."""
+        """
+        Search for scanned instances based on the provided parameters.
+        
+        One query returns the requested page of servers, each with its models
+        aggregated into a JSON array ordered by name, and the total match count
+        computed by a window function over the filtered servers. A page past
+        the end has no rows to carry that count, so it is counted separately.
+        """
         try:
             # Extract search parameters
             model_name = search_params.get('model_name', '')
@@ -419,148 +426,124 @@ class Filter:
             if sort_order.lower() not in ['asc', 'desc']:
                 sort_order = 'desc'
             
-            # Connect to database
-            conn = Database()
-            
-            # Base query
-            query = """
-            SELECT s.id, s.ip, s.port, s.scan_date, s.country_code, s.country_name, 
-                   s.city, s.organization, s.asn
-            FROM servers s
-            """
-            
-            # Conditions and parameters
-            conditions = []
+            # Server conditions and model conditions are kept apart: model
+            # filters select servers through EXISTS, so a server matching
+            # several models is still returned once and no GROUP BY is needed
+            server_conditions = []
+            model_conditions = []
             params = []
             
-            # Model name filter (requires join)
             if model_name:
-                query = """
-                SELECT s.id, s.ip, s.port, s.scan_date, s.country_code, s.country_name, 
-                       s.city, s.organization, s.asn
-                FROM servers s
-                JOIN models m ON s.id = m.server_id
-                """
-                conditions.append("m.name LIKE ?")
+                model_conditions.append("m.name LIKE ?")
                 params.append(f"%{model_name}%")
             
-            # Parameter size filter (requires join if not already joined)
             if parameter_size:
-                if 'JOIN models' not in query:
-                    query = """
-                    SELECT s.id, s.ip, s.port, s.scan_date, s.country_code, s.country_name, 
-                           s.city, s.organization, s.asn
-                    FROM servers s
-                    JOIN models m ON s.id = m.server_id
-                    """
-                conditions.append("m.parameter_size LIKE ?")
+                model_conditions.append("m.parameter_size LIKE ?")
                 params.append(f"%{parameter_size}%")
             
-            # Quantization filter (requires join if not already joined)
             if quantization:
-                if 'JOIN models' not in query:
-                    query = """
-                    SELECT s.id, s.ip, s.port, s.scan_date, s.country_code, s.country_name, 
-                           s.city, s.organization, s.asn
-                    FROM servers s
-                    JOIN models m ON s.id = m.server_id
-                    """
-                conditions.append("m.quantization_level LIKE ?")
+                model_conditions.append("m.quantization_level LIKE ?")
                 params.append(f"%{quantization}%")
             
-            # Country filter
+            if model_conditions:
+                server_conditions.append(
+                    "EXISTS (SELECT 1 FROM models m WHERE m.server_id = s.id AND "
+                    + " AND ".join(model_conditions) + ")"
+                )
+            
             if country:
-                conditions.append("(s.country_code LIKE ? OR s.country_name LIKE ?)")
+                server_conditions.append("(s.country_code LIKE ? OR s.country_name LIKE ?)")
                 params.append(f"%{country}%")
                 params.append(f"%{country}%")
             
-            # Add WHERE clause if there are conditions
-            if conditions:
-                query += " WHERE " + " AND ".join(conditions)
+            where_clause = ""
+            if server_conditions:
+                where_clause = "WHERE " + " AND ".join(server_conditions)
             
-            # Add GROUP BY to avoid duplicates when joining with models
-            if 'JOIN models' in query:
-                query += " GROUP BY s.id"
-            
-            # Add ORDER BY clause
+            # Validate sort field against the selected server columns
             valid_sort_fields = {
-                'scan_date': 's.scan_date', 
-                'country': 's.country_name',
-                'ip': 's.ip',
-                'port': 's.port',
-                'organization': 's.organization'
+                'scan_date': 'scan_date', 
+                'country': 'country_name',
+                'ip': 'ip',
+                'port': 'port',
+                'organization': 'organization'
             }
             
-            sort_field = valid_sort_fields.get(sort_by, 's.scan_date')
-            query += f" ORDER BY {sort_field} {sort_order}"
+            sort_field = valid_sort_fields.get(sort_by, 'scan_date')
+            # The id tie-breaker keeps pages stable when sort values repeat
+            order_by = f"s.{sort_field} {sort_order}, s.id {sort_order}"
+            page_order_by = f"page.{sort_field} {sort_order}, page.id {sort_order}"
             
-            # Add LIMIT and OFFSET
-            query += " LIMIT ? OFFSET ?"
+            if DATABASE_TYPE == "postgres":
+                models_agg = """json_agg(json_build_object(
+                           'name', m.name, 'parameter_size', m.parameter_size,
+                           'quantization_level', m.quantization_level, 'size_mb', m.size_mb
+                       ) ORDER BY m.name, m.id)"""
+            else:
+                models_agg = """json_group_array(json_object(
+                           'name', m.name, 'parameter_size', m.parameter_size,
+                           'quantization_level', m.quantization_level, 'size_mb', m.size_mb
+                       ))"""
+            
+            query = f"""
+            WITH page AS (
+                SELECT s.id, s.ip, s.port, s.scan_date, s.country_code, s.country_name, 
+                       s.city, s.organization, s.asn,
+                       COUNT(*) OVER () AS total_count
+                FROM servers s
+                {where_clause}
+                ORDER BY {order_by}
+                LIMIT ? OFFSET ?
+            ),
+            page_models AS (
+                SELECT m.server_id, COUNT(*) AS models_count,
+                       {models_agg} AS models
+                FROM (
+                    -- SQLite before 3.44 has no ORDER BY inside aggregates; it
+                    -- aggregates in the order of this subquery
+                    SELECT * FROM models
+                    WHERE server_id IN (SELECT id FROM page)
+                    ORDER BY server_id, name, id
+                ) m
+                GROUP BY m.server_id
+            )
+            SELECT page.id, page.ip, page.port, page.scan_date, page.country_code,
+                   page.country_name, page.city, page.organization, page.asn,
+                   page.total_count, COALESCE(page_models.models_count, 0), page_models.models
+            FROM page
+            LEFT JOIN page_models ON page_models.server_id = page.id
+            ORDER BY {page_order_by}
+            """
             params.append(limit)
             params.append(offset)
             
-            # Execute query
-            servers = Database.fetch_all(query, params)
-            
-            # Count total results (without limit/offset)
-            count_query = query.split("ORDER BY")[0]
-            if "GROUP BY" in count_query:
-                count_query = count_query.split("GROUP BY")[0] + " GROUP BY s.id"
-            count_query = f"SELECT COUNT(*) FROM ({count_query}) as count_query"
-            count_params = params[:-2]  # Remove limit and offset params
+            rows = Database.fetch_all(query, params) or []
             
-            count_result = Database.fetch_one(count_query, count_params)
-            total_count = count_result[0] if count_result else 0
+            # The window count rides on every row; an empty page past the end has none
+            if rows:
+                total_count = rows[0][9]
+            elif offset > 0:
+                count_row = Database.fetch_one(f"SELECT COUNT(*) FROM servers s {where_clause}", params[:-2])
+                total_count = count_row[0] if count_row else 0
+            else:
+                total_count = 0
             
             # Prepare results
+            keys = ['id', 'ip', 'port', 'scan_date', 'country_code', 'country_name', 
+                    'city', 'organization', 'asn']
             results = []
-            for server in servers:
-                # Convert server row to dictionary
-                if isinstance(server, dict):
-                    server_dict = server
-                else:
-                    # Create dictionary from tuple
-                    server_dict = {}
-                    keys = ['id', 'ip', 'port', 'scan_date', 'country_code', 'country_name', 
-                            'city', 'organization', 'asn']
-                    for i, key in enumerate(keys):
-                        server_dict[key] = server[i] if i < len(server) else None
+            for row in rows:
+                server_dict = {key: row[i] for i, key in enumerate(keys)}
                 
-                # Get server ID
-                server_id = server_dict.get('id')
-                if server_id:
-                    # Get models for this server
-                    models_query = """
-                    SELECT name, parameter_size, quantization_level, size_mb
-                    FROM models
-                    WHERE server_id = ?
-                    """
-                    models = Database.fetch_all(models_query, (server_id,))
-                    
-                    # Process model data
-                    model_list = []
-                    for model in models:
-                        if isinstance(model, dict):
-                            model_dict = model
-                        else:
-                            # Create dictionary from tuple
-                            model_dict = {}
-                            keys = ['name', 'parameter_size', 'quantization_level', 'size_mb']
-                            for i, key in enumerate(keys):
-                                model_dict[key] = model[i] if i < len(model) else None
-                        
-                        model_list.append(model_dict)
-                    
-                    server_dict['models'] = model_list
-                    server_dict['models_count'] = len(model_list)
-                else:
-                    server_dict['models'] = []
-                    server_dict['models_count'] = 0
+                # Postgres returns json_agg already decoded, SQLite returns text
+                models = row[11]
+                if isinstance(models, str):
+                    models = json.loads(models)
                 
+                server_dict['models'] = models or []
+                server_dict['models_count'] = row[10]
                 results.append(server_dict)
             
-            conn.close()
-            
             return {
                 "success": True,
                 "total": total_count,
@@ -5,6 +5,8 @@ Prune bad endpoints from the Ollama Scanner database
 
 # Added by migration script
 from database import Database, init_database, DATABASE_TYPE
+from database.catalog import sync_endpoint_catalog, bump_cache_version
+from verification_log import configure_event_sink, get_event_sink
 
 import os
 import sys
@@ -346,6 +348,7 @@ def mark_endpoint_as_inactive(endpoint_id, reason):
 async def check_endpoint(endpoint_id, ip, port, timeout=TIMEOUT):
     """Check if an Ollama endpoint is accessible and retrieve model information"""
     tags_url = f"http://{ip}:{port}/api/tags"
+    events = get_event_sink()
     
     try:
         # Step 1: Check if /api/tags endpoint is accessible
@@ -355,10 +358,12 @@ async def check_endpoint(endpoint_id, ip, port, timeout=TIMEOUT):
                 if response.status == 200:
                     # Successfully connected
                     data = await response.json()
-                    logger.info(f"Endpoint {ip}:{port} /api/tags response: {json.dumps(data, indent=2)}")
                     
                     # Check if there are available models
                     models = data.get("models", [])
+                    events.record("tags", ip, port, endpoint_id, payload=data,
+                                  status=response.status, models=len(models))
+                    logger.debug(f"Endpoint {ip}:{port} /api/tags returned {len(models)} models")
                     if not models:
                         reason = "No models available"
                         logger.warning(f"Endpoint {ip}:{port} has no models")
@@ -410,17 +415,19 @@ async def check_endpoint(endpoint_id, ip, port, timeout=TIMEOUT):
                                     response_text = gen_data.get("response", "")
                                     all_responses.append(response_text)
                                     
-                                    # Log the full response
-                                    logger.info(f"Endpoint {ip}:{port} generation response #{i+1}: '{response_text}'")
-                                    
                                     # Check for honeypot/invalid responses
                                     is_honeypot = is_likely_honeypot_response(response_text)
-                                    logger.info(f"Honeypot detection for prompt #{i+1}: {is_honeypot}")
+                                    events.record("generate", ip, port, endpoint_id, payload=gen_data,
+                                                  prompt=i+1, model=model_name, chars=len(response_text),
+                                                  sample=response_text, honeypot=is_honeypot)
+                                    logger.debug(f"Honeypot detection for prompt #{i+1} on {ip}:{port}: {is_honeypot}")
                                     
                                     if is_honeypot:
                                         honeypot_detections += 1
                                 else:
                                     reason = f"Generation failed: HTTP {gen_response.status}"
+                                    events.record("generate", ip, port, endpoint_id,
+                                                  prompt=i+1, model=model_name, status=gen_response.status)
                                     logger.warning(f"Endpoint {ip}:{port} generation test #{i+1} failed: {reason}")
                                     
                             # Add slight delay between requests
@@ -742,6 +749,12 @@ def has_high_gibberish_ratio(text):
 def process_models(endpoint_id, ip, port, models):
     """Process models for a verified endpoint"""
     try:
+        if DATABASE_TYPE == "postgres":
+            # Mirror the listing through the catalog sync so its digest stays current
+            sync_endpoint_catalog(endpoint_id, models)
+            logger.info(f"Processed {len(models)} models for endpoint {ip}:{port}")
+            return True
+        
         for model in models:
             name = model.get("name", "Unknown")
             
@@ -784,10 +797,16 @@ async def check_endpoints(endpoints, timeout=TIMEOUT, max_concurrent=MAX_CONCURR
     """Check multiple endpoints concurrently"""
     semaphore = asyncio.Semaphore(max_concurrent)
     
+    events = get_event_sink()
+    
     async def _check_with_semaphore(endpoint):
         endpoint_id, ip, port, status = endpoint
         async with semaphore:
-            return await check_endpoint(endpoint_id, ip, port, timeout)
+            started = time.perf_counter()
+            result = await check_endpoint(endpoint_id, ip, port, timeout)
+            events.record("result", ip, port, endpoint_id, ok=result[0], reason=result[1],
+                          ms=round((time.perf_counter() - started) * 1000))
+            return result
     
     total = len(endpoints)
     logger.info(f"Checking {total} endpoints with timeout {timeout}s")
@@ -872,6 +891,10 @@ async def prune_endpoints_batch():
         
         logger.info(f"Batch {batch_num+1} completed: {verified_count} verified, {failed_count} failed, {error_count} errors")
         
+        # Endpoint status changed, so cached bot listings are stale
+        if (verified_count or failed_count) and DATABASE_TYPE == "postgres":
+            bump_cache_version()
+        
         # Slight delay between batches to avoid overwhelming the system
         if batch_num < num_batches - 1:
             await asyncio.sleep(1)
@@ -924,9 +947,23 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help="Show what would be done without making changes")
     parser.add_argument('--verbose', '-v', action='store_true', help="Enable verbose output")
     parser.add_argument('--debug-endpoint', help='Debug a specific endpoint (format: IP:PORT)')
-    parser.add_argument('--debug-response', action='store_true', help='Save full response content to a debug file')
+    parser.add_argument('--debug-response', action='store_true', help='Capture full response payloads in the verification event log for sampled endpoints')
+    parser.add_argument('--debug-sample-rate', type=float, default=1.0, help='Fraction of endpoints whose payloads are captured with --debug-response (default: 1.0)')
+    parser.add_argument('--debug-sample-endpoint', action='append', default=[], help='Always capture payloads for this endpoint with --debug-response (IP:PORT, repeatable)')
+    parser.add_argument('--event-log', default=None, help='Path of the verification event log (default: $VERIFICATION_LOG_PATH or verification_events.jsonl)')
     args = parser.parse_args()
     
+    # Configure the verification event log; payloads are only kept when sampling selects an endpoint
+    sink_options = {}
+    if args.event_log:
+        sink_options['path'] = args.event_log
+    if args.debug_response:
+        sink_options['sample_rate'] = args.debug_sample_rate
+        sink_options['sample_endpoints'] = list(args.debug_sample_endpoint)
+        if args.debug_endpoint:
+            sink_options['sample_endpoints'].append(args.debug_endpoint)
+    configure_event_sink(**sink_options).start()
+    
     # Set logging level based on verbosity
     if args.verbose:
         logger.setLevel(logging.DEBUG)
@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Query Profiler for the Database layer
+
+Records, per query fingerprint (the SQL with literals and placeholders
+collapsed), how often it runs, how long it takes (total, mean, max and p99
+from a fixed-bucket histogram), how many rows it touches and how long the
+call waited for a connection. Every call is counted; timing is taken for a
+sampled share of calls (DB_PROFILE_SAMPLE_RATE) to keep overhead low.
+
+Each process writes its profile to DB_PROFILE_DIR/<name>-<pid>.json every
+DB_PROFILE_FLUSH_INTERVAL seconds and at exit, so the status dashboard can
+show every process's hot queries. SIGUSR1 writes the top queries to the log.
+
+Run directly to read the snapshots:
+    python query_profile.py                     # merged table
+    python query_profile.py --format prometheus # Prometheus text exposition
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import glob
+import atexit
+import random
+import signal
+import logging
+import argparse
+import threading
+from datetime import datetime
+
+logger = logging.getLogger('query_profile')
+
+# Profiler configuration
+DB_PROFILE_ENABLED = os.getenv("DB_PROFILE_ENABLED", "true").lower() in ("1", "true", "yes")
+DB_PROFILE_SAMPLE_RATE = float(os.getenv("DB_PROFILE_SAMPLE_RATE", "1.0"))
+DB_PROFILE_MAX_QUERIES = int(os.getenv("DB_PROFILE_MAX_QUERIES", "500"))
+# Anchored at the project root so the bot (started from DiscordBot/) and the scanner share it
+DB_PROFILE_DIR = os.getenv("DB_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_profiles"))
+DB_PROFILE_FLUSH_INTERVAL = float(os.getenv("DB_PROFILE_FLUSH_INTERVAL", "60"))
+
+
+def _module_name(name):
+    return name[:-len(".__main__")] if name.endswith(".__main__") else name
+
+
+def _process_name():
+    """The script name, or the module name for `python -m package`"""
+    spec = getattr(sys.modules.get("__main__"), "__spec__", None)
+    if spec is not None and spec.name:
+        return _module_name(spec.name) or "python"
+    script = sys.argv[0] if sys.argv else ""
+    if script in ("", "-c", "-m"):
+        # While `python -m` is still importing the module, argv[0] is just "-m"
+        orig_argv = getattr(sys, "orig_argv", [])
+        if "-m" in orig_argv[:-1]:
+            return _module_name(orig_argv[orig_argv.index("-m") + 1]) or "python"
+        return "python"
+    return os.path.splitext(os.path.basename(script))[0] or "python"
+
+
+DB_PROFILE_NAME = os.getenv("DB_PROFILE_NAME", "") or _process_name()
+
+# Latency histogram upper bounds in seconds: 0.1 ms doubling up to ~52 s, then +Inf
+BUCKETS = tuple(0.0001 * 2 ** i for i in range(20))
+# Fingerprints longer than this are cut in reports and metric labels
+MAX_FINGERPRINT_CHARS = 200
+# Distinct query strings whose fingerprint is remembered
+FINGERPRINT_CACHE_SIZE = 4096
+OTHER_FINGERPRINT = "<other>"
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|%\(\w+\)s|\$\d+|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUE_ROWS = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(query):
+    """SQL with comments, literals and placeholder lists collapsed, so one statement shape is one entry"""
+    text = _COMMENTS.sub(" ", query)
+    text = _STRINGS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _PLACEHOLDERS.sub("?", text)
+    text = _LISTS.sub("(?)", text)
+    text = _VALUE_ROWS.sub(r"\1", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def _percentile(buckets, count, pct):
+    """Estimate a percentile from histogram counts, interpolating inside the bucket"""
+    if not count:
+        return None
+    target = count * pct / 100.0
+    seen = 0
+    for index, bucket_count in enumerate(buckets):
+        if bucket_count and seen + bucket_count >= target:
+            lower = BUCKETS[index - 1] if index else 0.0
+            upper = BUCKETS[index] if index < len(BUCKETS) else BUCKETS[-1] * 2
+            return lower + (upper - lower) * (target - seen) / bucket_count
+        seen += bucket_count
+    return BUCKETS[-1]
+
+
+class QueryStats:
+    """Counters for one (operation, fingerprint)"""
+
+    __slots__ = ("calls", "sampled", "errors", "total", "max", "rows", "pool_wait", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.sampled = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.pool_wait = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def merge(self, data):
+        for name in ("calls", "sampled", "errors", "total", "rows", "pool_wait"):
+            setattr(self, name, getattr(self, name) + data[name])
+        self.max = max(self.max, data["max"])
+        self.buckets = [a + b for a, b in zip(self.buckets, data["buckets"])]
+
+
+class _Call:
+    """One profiled database call; set .rows before it ends"""
+
+    __slots__ = ("profiler", "operation", "query", "sampled", "started", "rows")
+
+    def __init__(self, profiler, operation, query, sampled):
+        self.profiler = profiler
+        self.operation = operation
+        self.query = query
+        self.sampled = sampled
+        self.rows = None
+
+    def __enter__(self):
+        if self.sampled:
+            self.profiler._local.pool_wait = 0.0
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started if self.sampled else 0.0
+        self.profiler._finish(self, elapsed, exc_type is not None)
+        return False
+
+
+class _NoCall:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NO_CALL = _NoCall()
+
+
+class QueryProfiler:
+    """Thread-safe per-fingerprint query statistics for one process"""
+
+    def __init__(self, enabled=DB_PROFILE_ENABLED, sample_rate=DB_PROFILE_SAMPLE_RATE,
+                 max_queries=DB_PROFILE_MAX_QUERIES, name=DB_PROFILE_NAME, directory=DB_PROFILE_DIR,
+                 flush_interval=DB_PROFILE_FLUSH_INTERVAL):
+        self.enabled = enabled
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.max_queries = max_queries
+        self.name = name
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self._stats = {}
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_flush = time.monotonic()
+        self._pruned = False
+
+    def track(self, operation, query):
+        """Context manager around one call: `with query_profiler.track("fetch_all", query) as call:`"""
+        if not self.enabled:
+            return _NO_CALL
+        return _Call(self, operation, query, self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+
+    def note_pool_wait(self, seconds):
+        """Called by the connection managers with the time spent getting a connection"""
+        if self.enabled:
+            self._local.pool_wait = getattr(self._local, "pool_wait", 0.0) + seconds
+
+    def _fingerprint(self, query):
+        key = self._fingerprints.get(query)
+        if key is None:
+            key = fingerprint(query)[:MAX_FINGERPRINT_CHARS]
+            if len(self._fingerprints) >= FINGERPRINT_CACHE_SIZE:
+                self._fingerprints.clear()
+            self._fingerprints[query] = key
+        return key
+
+    def _finish(self, call, elapsed, failed):
+        key = (call.operation, self._fingerprint(call.query))
+        flush = False
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_queries:
+                    key = (call.operation, OTHER_FINGERPRINT)
+                    stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = QueryStats()
+            stats.calls += 1
+            if failed:
+                stats.errors += 1
+            if call.sampled:
+                stats.sampled += 1
+                stats.total += elapsed
+                if elapsed > stats.max:
+                    stats.max = elapsed
+                if call.rows is not None and call.rows > 0:
+                    stats.rows += call.rows
+                stats.pool_wait += getattr(self._local, "pool_wait", 0.0)
+                index = 0
+                while index < len(BUCKETS) and elapsed > BUCKETS[index]:
+                    index += 1
+                stats.buckets[index] += 1
+                now = time.monotonic()
+                if self.flush_interval > 0 and now - self._last_flush >= self.flush_interval:
+                    self._last_flush = now
+                    flush = True
+        if flush:
+            self.write_snapshot()
+
+    def snapshot(self):
+        """This process's counters as a JSON-serialisable dict"""
+        with self._lock:
+            queries = [dict(stats.to_dict(), operation=operation, fingerprint=key)
+                       for (operation, key), stats in self._stats.items()]
+        return {
+            "name": self.name,
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "written_at": datetime.now().isoformat(timespec="seconds"),
+            "sample_rate": self.sample_rate,
+            "queries": queries,
+        }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = datetime.now().isoformat(timespec="seconds")
+
+    def _prune_dead_snapshots(self):
+        """Remove snapshots of earlier processes with this name that are no longer running,
+        so each name keeps its live processes plus this one"""
+        for path in glob.glob(os.path.join(self.directory, f"{glob.escape(self.name)}-*.json")):
+            pid = path[:-len(".json")].rsplit("-", 1)[1]
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            except OSError:
+                # Running, but owned by another user
+                pass
+
+    def write_snapshot(self):
+        """Write the snapshot to DB_PROFILE_DIR/<name>-<pid>.json atomically; failures are only logged"""
+        if not self.enabled or not self.directory:
+            return None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if not self._pruned:
+                self._pruned = True
+                self._prune_dead_snapshots()
+            path = os.path.join(self.directory, f"{self.name}-{os.getpid()}.json")
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+            return path
+        except OSError as e:
+            logger.warning(f"Could not write query profile: {e}")
+            return None
+
+    def report(self, limit=20, sort="total", width=80):
+        """This process's top queries as a plain-text table"""
+        return format_profile(summarize([self.snapshot()], sort), limit=limit, width=width)
+
+    def dump(self, limit=20):
+        """Log the top queries by total time and write the snapshot"""
+        logger.info(f"Query profile for {self.name} (pid {os.getpid()}, sample rate {self.sample_rate:g}):\n"
+                    + self.report(limit))
+        self.write_snapshot()
+
+    def _dump_in_thread(self, *_):
+        # The handler runs on the main thread, possibly while it holds _lock in _finish(),
+        # so the dump (which takes _lock and writes files) happens on a thread of its own
+        threading.Thread(target=self.dump, name="query-profile-dump", daemon=True).start()
+
+    def install_signal_handler(self, signum=getattr(signal, "SIGUSR1", None)):
+        """Dump on SIGUSR1; only possible from the main thread on POSIX"""
+        if signum is None or not self.enabled:
+            return False
+        try:
+            signal.signal(signum, self._dump_in_thread)
+            return True
+        except ValueError:
+            return False
+
+
+def summarize(snapshots, sort="total"):
+    """
+    Merge snapshots (one per process) into per-query rows
+
+    Returns:
+        list: dicts with operation, fingerprint, calls, sampled, errors, total_ms,
+        mean_ms, p99_ms, max_ms, rows, pool_wait_ms and buckets, sorted by sort
+        ("total", "calls", "mean", "p99" or "rows"), largest first
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for query in snapshot.get("queries", []):
+            key = (query["operation"], query["fingerprint"])
+            merged.setdefault(key, QueryStats()).merge(query)
+
+    rows = []
+    for (operation, key), stats in merged.items():
+        rows.append({
+            "operation": operation,
+            "fingerprint": key,
+            "calls": stats.calls,
+            "sampled": stats.sampled,
+            "errors": stats.errors,
+            "total_ms": stats.total * 1000,
+            "mean_ms": stats.total / stats.sampled * 1000 if stats.sampled else None,
+            "p99_ms": (_percentile(stats.buckets, stats.sampled, 99) or 0) * 1000 if stats.sampled else None,
+            "max_ms": stats.max * 1000,
+            "rows": stats.rows,
+            "pool_wait_ms": stats.pool_wait * 1000,
+            "buckets": stats.buckets,
+        })
+    sort_key = {"total": "total_ms", "calls": "calls", "mean": "mean_ms", "p99": "p99_ms", "rows": "rows"}.get(sort, "total_ms")
+    return sorted(rows, key=lambda row: row[sort_key] or 0, reverse=True)
+
+
+def format_profile(rows, limit=20, width=80):
+    """Plain-text table of the top rows (what SIGUSR1, /db_profile and the CLI print)"""
+    if not rows:
+        return "No queries recorded."
+    lines = [f"{'Calls':>8} {'Total ms':>10} {'Mean ms':>8} {'p99 ms':>8} {'Rows':>8} {'Wait ms':>8}  Op / Query"]
+    for row in rows[:limit]:
+        mean = "-" if row["mean_ms"] is None else f"{row['mean_ms']:.2f}"
+        p99 = "-" if row["p99_ms"] is None else f"{row['p99_ms']:.1f}"
+        lines.append(f"{row['calls']:>8} {row['total_ms']:>10.1f} {mean:>8} {p99:>8} {row['rows']:>8} "
+                     f"{row['pool_wait_ms']:>8.1f}  {row['operation']}: {row['fingerprint'][:width]}")
+    if len(rows) > limit:
+        lines.append(f"... {len(rows) - limit} more")
+    return "\n".join(lines)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def prometheus_text(snapshots):
+    """Prometheus text exposition of merged snapshots, labelled by process, operation and query"""
+    metrics = [
+        ("db_query_calls_total", "counter", "Database calls", "calls"),
+        ("db_query_sampled_total", "counter", "Database calls that were timed", "sampled"),
+        ("db_query_errors_total", "counter", "Database calls that raised", "errors"),
+        ("db_query_rows_total", "counter", "Rows returned or affected by timed calls", "rows"),
+        ("db_query_pool_wait_seconds_total", "counter", "Time timed calls waited for a connection", "pool_wait"),
+        ("db_query_max_seconds", "gauge", "Slowest timed call", "max"),
+    ]
+    lines = []
+    for name, kind, help_text, field in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for snapshot in snapshots:
+            for query in snapshot.get("queries", []):
+                labels = (f'process="{_label(snapshot["name"])}",operation="{_label(query["operation"])}",'
+                          f'query="{_label(query["fingerprint"])}"')
+                lines.append(f"{name}{{{labels}}} {query[field]}")
+
+    lines.append("# HELP db_query_duration_seconds Latency of timed database calls")
+    lines.append("# TYPE db_query_duration_seconds histogram")
+    for snapshot in snapshots:
+        for query in snapshot.get("queries", []):
+            labels = (f'process="{_label(snapshot["name"])}",operation="{_label(query["operation"])}",'
+                      f'query="{_label(query["fingerprint"])}"')
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (None,), query["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound is None else f"{bound:g}"
+                lines.append(f'db_query_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"db_query_duration_seconds_sum{{{labels}}} {query['total']}")
+            lines.append(f"db_query_duration_seconds_count{{{labels}}} {query['sampled']}")
+    return "\n".join(lines) + "\n"
+
+
+def load_snapshots(directory=DB_PROFILE_DIR):
+    """Snapshots written by every process into directory (unreadable files are skipped)"""
+    snapshots = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping query profile {path}: {e}")
+    return snapshots
+
+
+# Process-wide profiler used by database.Database
+query_profiler = QueryProfiler()
+
+
+@atexit.register
+def _write_final_snapshot():
+    if query_profiler.enabled and query_profiler._stats:
+        query_profiler.write_snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show database query profiles written by running processes")
+    parser.add_argument("--dir", default=DB_PROFILE_DIR, help="Snapshot directory")
+    parser.add_argument("--format", choices=["table", "prometheus", "json"], default="table")
+    parser.add_argument("--sort", choices=["total", "calls", "mean", "p99", "rows"], default="total")
+    parser.add_argument("--limit", type=int, default=25)
+    parser.add_argument("--process", help="Only this process name")
+    args = parser.parse_args()
+
+    snapshots = [s for s in load_snapshots(args.dir) if not args.process or s.get("name") == args.process]
+    if args.format == "prometheus":
+        sys.stdout.write(prometheus_text(snapshots))
+    elif args.format == "json":
+        print(json.dumps(summarize(snapshots, args.sort)[:args.limit], indent=2))
+    else:
+        for snapshot in snapshots:
+            print(f"{snapshot['name']} (pid {snapshot['pid']}, since {snapshot['started_at']}, "
+                  f"written {snapshot['written_at']}, sample rate {snapshot['sample_rate']:g})")
+        print(format_profile(summarize(snapshots, args.sort), limit=args.limit, width=120))
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ usage() {
     echo "  -d, --daily            Set up daily backups (default: yes)"
     echo "  -w, --weekly           Set up weekly maintenance (default: yes)"
     echo "  -m, --monthly          Set up monthly full maintenance (default: yes)"
+    echo "  -p, --planner          Run db_maintenance.py hourly; it only acts in DB_MAINT_WINDOWS (default: yes)"
     echo "  -t, --time HH:MM       Set time for scheduled tasks (default: 03:00)"
     echo "  -h, --help             Display this help message"
     echo
@@ -37,6 +38,7 @@ usage() {
 SETUP_DAILY=true
 SETUP_WEEKLY=true
 SETUP_MONTHLY=true
+SETUP_PLANNER=true
 SCHEDULED_TIME="03:00"
 
 # Parse command line arguments
@@ -60,6 +62,12 @@ while [[ $# -gt 0 ]]; do
             fi
             shift 2
             ;;
+        -p|--planner)
+            if [[ "$2" == "no" || "$2" == "false" ]]; then
+                SETUP_PLANNER=false
+            fi
+            shift 2
+            ;;
         -t|--time)
             SCHEDULED_TIME="$2"
             shift 2
@@ -114,6 +122,13 @@ if [ "$SETUP_MONTHLY" = true ]; then
     echo "Added monthly full maintenance task on the 1st at $SCHEDULED_TIME"
 fi
 
+# Add hourly maintenance planner task
+if [ "$SETUP_PLANNER" = true ]; then
+    # Vacuum, reindex and create missing indexes; exits straight away outside DB_MAINT_WINDOWS
+    echo "0 * * * * cd $APP_DIR && python3 db_maintenance.py run >> $APP_DIR/backups/cron_maintenance_planner.log 2>&1" >> "$TEMP_CRONTAB"
+    echo "Added hourly maintenance planner task (runs within DB_MAINT_WINDOWS)"
+fi
+
 # Install the new crontab
 crontab "$TEMP_CRONTAB"
 rm "$TEMP_CRONTAB"
@@ -129,7 +144,7 @@ echo
 
 # Check cron jobs
 echo "Scheduled Tasks:"
-crontab -l | grep -E 'backup_database|check_db_schema_issues|apply_db_maintenance_fixes'
+crontab -l | grep -E 'backup_database|check_db_schema_issues|apply_db_maintenance_fixes|db_maintenance.py'
 echo
 
 # Check backup files
@@ -167,7 +182,7 @@ echo "Created maintenance status script: ${APP_DIR}/check_maintenance_status.sh"
 echo
 echo "Database maintenance setup completed successfully!"
 echo "The following tasks have been scheduled:"
-crontab -l | grep -E 'backup_database|check_db_schema_issues|apply_db_maintenance_fixes'
+crontab -l | grep -E 'backup_database|check_db_schema_issues|apply_db_maintenance_fixes|db_maintenance.py'
 echo
 echo "To check maintenance status, run: ${APP_DIR}/check_maintenance_status.sh"
 echo "To backup the database immediately, run: ${APP_DIR}/backup_database.sh"
@@ -15,6 +15,8 @@ import psycopg2.extras
 from tabulate import tabulate
 import time
 
+from query_profile import load_snapshots, summarize
+
 # Load environment variables
 load_dotenv()
 
@@ -26,6 +28,9 @@ DB_NAME = os.environ.get('POSTGRES_DB', 'ollama_scanner')
 DB_USER = os.environ.get('POSTGRES_USER', 'ollama')
 DB_PASS = os.environ.get('POSTGRES_PASSWORD', '')
 
+# Rows shown in the query profile panel
+PROFILE_ROWS = int(os.environ.get('DASHBOARD_PROFILE_ROWS', '10'))
+
 def get_db_connection():
     """Get a connection to the PostgreSQL database"""
     try:
@@ -90,6 +95,33 @@ def get_endpoint_stats(conn):
         'unique_model_count': unique_model_count
     }
 
+def get_query_profile(conn):
+    """Get the hottest queries from the processes' profile snapshots and, if installed, pg_stat_statements"""
+    snapshots = load_snapshots()
+    profile = {
+        'processes': [(s['name'], s['pid'], s['written_at']) for s in snapshots],
+        'queries': summarize(snapshots)[:PROFILE_ROWS],
+        'statements': None
+    }
+    
+    cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+    try:
+        cursor.execute("""
+            SELECT calls, total_exec_time, mean_exec_time, rows, query
+            FROM pg_stat_statements
+            WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+            ORDER BY total_exec_time DESC
+            LIMIT %s
+        """, (PROFILE_ROWS,))
+        profile['statements'] = cursor.fetchall()
+    except psycopg2.Error:
+        # Extension not installed or not readable by this user
+        conn.rollback()
+    finally:
+        cursor.close()
+    
+    return profile
+
 def get_operation_status(metadata):
     """Analyze metadata to determine operation status"""
     operations = []
@@ -154,7 +186,7 @@ def get_operation_status(metadata):
     
     return operations
 
-def print_dashboard(metadata, stats, operations, continuous=False):
+def print_dashboard(metadata, stats, operations, continuous=False, profile=None):
     """Print the dashboard to the console"""
     while True:
         os.system('clear' if os.name == 'posix' else 'cls')
@@ -215,6 +247,42 @@ def print_dashboard(metadata, stats, operations, continuous=False):
         
         print(tabulate(metadata_table, headers=["Key", "Value", "Updated At"], tablefmt="grid"))
         
+        if profile is not None:
+            print("\n")
+            
+            # Print the query profile written by the scanner, pruner and bot processes
+            print("DATABASE QUERY PROFILE:")
+            if profile['queries']:
+                print("Processes: " + ", ".join(f"{name} (pid {pid}, {written})" for name, pid, written in profile['processes']))
+                profile_table = []
+                for row in profile['queries']:
+                    profile_table.append([
+                        row['operation'],
+                        row['fingerprint'][:60],
+                        row['calls'],
+                        f"{row['total_ms']:.1f}",
+                        '-' if row['mean_ms'] is None else f"{row['mean_ms']:.2f}",
+                        '-' if row['p99_ms'] is None else f"{row['p99_ms']:.1f}",
+                        row['rows'],
+                        f"{row['pool_wait_ms']:.1f}"
+                    ])
+                print(tabulate(profile_table, headers=["Op", "Query", "Calls", "Total ms", "Mean ms", "p99 ms", "Rows", "Wait ms"], tablefmt="grid"))
+            else:
+                print("No query profiles have been written yet.")
+            
+            if profile['statements']:
+                print("\nPG_STAT_STATEMENTS (server side):")
+                statement_table = []
+                for row in profile['statements']:
+                    statement_table.append([
+                        ' '.join(row['query'].split())[:60],
+                        row['calls'],
+                        f"{row['total_exec_time']:.1f}",
+                        f"{row['mean_exec_time']:.2f}",
+                        row['rows']
+                    ])
+                print(tabulate(statement_table, headers=["Query", "Calls", "Total ms", "Mean ms", "Rows"], tablefmt="grid"))
+        
         if not continuous:
             break
         
@@ -228,6 +296,8 @@ def print_dashboard(metadata, stats, operations, continuous=False):
             metadata = get_metadata(conn)
             stats = get_endpoint_stats(conn)
             operations = get_operation_status(metadata)
+            if profile is not None:
+                profile = get_query_profile(conn)
             conn.close()
         except KeyboardInterrupt:
             print("\nExiting dashboard.")
@@ -236,15 +306,17 @@ def print_dashboard(metadata, stats, operations, continuous=False):
 def main():
     parser = argparse.ArgumentParser(description="Ollama Scanner Status Dashboard")
     parser.add_argument('--continuous', '-c', action='store_true', help='Run in continuous mode, refreshing every 5 seconds')
+    parser.add_argument('--no-profile', action='store_true', help='Hide the database query profile panel')
     args = parser.parse_args()
     
     conn = get_db_connection()
     metadata = get_metadata(conn)
     stats = get_endpoint_stats(conn)
     operations = get_operation_status(metadata)
+    profile = None if args.no_profile else get_query_profile(conn)
     conn.close()
     
-    print_dashboard(metadata, stats, operations, args.continuous)
+    print_dashboard(metadata, stats, operations, args.continuous, profile)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Synthetic Dataset Generator for Ollama Scanner
+
+Generates endpoints, verified_endpoints, models, endpoint_verifications
+(verification history) and chat_history rows at production scale or above,
+with realistic shapes: most endpoints unverified, a long tail of models per
+server, popular model families and quantizations weighted the way scans find
+them, recent activity denser than old.
+
+Output is deterministic: the same seed, sizes and as-of date always produce
+the same rows. Rows are bulk-loaded with COPY on PostgreSQL and executemany
+on SQLite, in batches, so millions of endpoints load in minutes.
+
+Usage:
+    python synthetic_data.py --endpoints 1000000 --sqlite-path scale_test.db
+    DATABASE_TYPE=postgres POSTGRES_DB=ollama_scale python synthetic_data.py --endpoints 1000000
+"""
+
+import io
+import os
+import csv
+import sys
+import json
+import math
+import time
+import random
+import logging
+import argparse
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger('synthetic_data')
+
+# Generator defaults
+SYNTHETIC_SEED = int(os.getenv("SYNTHETIC_SEED", "42"))
+SYNTHETIC_BATCH_SIZE = int(os.getenv("SYNTHETIC_BATCH_SIZE", "10000"))
+# Share of endpoints that verified as Ollama servers / were pruned later
+SYNTHETIC_VERIFIED_SHARE = float(os.getenv("SYNTHETIC_VERIFIED_SHARE", "0.3"))
+SYNTHETIC_PRUNED_SHARE = float(os.getenv("SYNTHETIC_PRUNED_SHARE", "0.1"))
+# Average verification history rows per verified or pruned endpoint
+SYNTHETIC_VERIFICATIONS = float(os.getenv("SYNTHETIC_VERIFICATIONS", "3"))
+# chat_history rows per endpoint when --chats isn't given
+SYNTHETIC_CHATS_PER_ENDPOINT = float(os.getenv("SYNTHETIC_CHATS_PER_ENDPOINT", "0.1"))
+
+HONEYPOT_SHARE = 0.04
+INACTIVE_SHARE = 0.08
+# Mean models per verified endpoint (exponential tail, capped)
+MEAN_MODELS = 3.5
+MAX_MODELS = 40
+# Days of scan history; activity is exponentially denser towards the as-of date
+HISTORY_DAYS = 365
+SCAN_MEAN_DAYS = 60
+CHAT_MEAN_DAYS = 20
+
+# (port, weight) as seen in scans
+PORTS = [(11434, 86), (8080, 4), (80, 3), (443, 2), (8000, 2), (11435, 1), (3000, 1), (5000, 1)]
+
+# (family, popularity weight, [(tag, parameter_size, billions of parameters)])
+MODEL_FAMILIES = [
+    ("llama3.2", 18, [("1b", "1.2B", 1.24), ("3b", "3.2B", 3.21)]),
+    ("llama3.1", 16, [("8b", "8.0B", 8.03), ("70b", "70.6B", 70.6)]),
+    ("llama3", 8, [("8b", "8.0B", 8.03), ("70b", "70.6B", 70.6)]),
+    ("qwen2.5", 14, [("0.5b", "494.03M", 0.49), ("1.5b", "1.5B", 1.54), ("7b", "7.6B", 7.62),
+                     ("14b", "14.8B", 14.8), ("32b", "32.8B", 32.8), ("72b", "72.7B", 72.7)]),
+    ("qwen2.5-coder", 6, [("1.5b", "1.5B", 1.54), ("7b", "7.6B", 7.62), ("32b", "32.8B", 32.8)]),
+    ("deepseek-r1", 12, [("1.5b", "1.8B", 1.78), ("7b", "7.6B", 7.62), ("8b", "8.0B", 8.03),
+                         ("14b", "14.8B", 14.8), ("32b", "32.8B", 32.8), ("70b", "70.6B", 70.6)]),
+    ("mistral", 8, [("7b", "7.2B", 7.25)]),
+    ("gemma2", 6, [("2b", "2.6B", 2.61), ("9b", "9.2B", 9.24), ("27b", "27.2B", 27.2)]),
+    ("gemma3", 6, [("1b", "999.89M", 1.0), ("4b", "4.3B", 4.3), ("12b", "12.2B", 12.2), ("27b", "27.4B", 27.4)]),
+    ("phi3", 4, [("mini", "3.8B", 3.82), ("medium", "14.0B", 14.0)]),
+    ("phi4", 3, [("14b", "14.7B", 14.7)]),
+    ("codellama", 3, [("7b", "7B", 6.74), ("13b", "13B", 13.0), ("34b", "34B", 33.7)]),
+    ("llava", 3, [("7b", "7B", 7.24), ("13b", "13B", 13.4)]),
+    ("nomic-embed-text", 5, [("latest", "137M", 0.137)]),
+    ("mxbai-embed-large", 2, [("latest", "334M", 0.334)]),
+    ("tinyllama", 2, [("latest", "1B", 1.1)]),
+    ("smollm2", 2, [("135m", "134.52M", 0.135), ("1.7b", "1.7B", 1.71)]),
+]
+
+# (quantization_level, weight, bits per weight)
+QUANTIZATIONS = [("Q4_K_M", 45, 4.85), ("Q4_0", 22, 4.55), ("Q8_0", 10, 8.5), ("Q5_K_M", 7, 5.7),
+                 ("F16", 5, 16.0), ("Q6_K", 4, 6.6), ("Q3_K_M", 3, 3.9), ("Q2_K", 2, 3.35), ("Q4_K_S", 2, 4.6)]
+# Quantizations served under the bare "family:tag" name
+DEFAULT_QUANTIZATIONS = ("Q4_K_M", "Q4_0")
+
+HONEYPOT_REASONS = ["Suspicious response patterns", "Responses contain log output",
+                    "Gibberish response to known prompts", "Identical response to every prompt",
+                    "Reveals honeypot tooling"]
+INACTIVE_REASONS = ["Connection timeout", "Connection refused", "HTTP 404 on /api/tags",
+                    "No models available", "TLS handshake failed"]
+
+CLEAN_RESPONSES = [
+    "The capital of France is Paris.",
+    "2 + 2 equals 4.",
+    "Hello! How can I help you today?",
+    "Photosynthesis is the process plants use to turn sunlight, water and carbon dioxide into glucose and oxygen.",
+    "Here is a Python function that reverses a string:\n\ndef reverse(s):\n    return s[::-1]",
+]
+HONEYPOT_RESPONSES = [
+    "Using Model: llama3 Sending prompt to backend... Loaded Model: llama3",
+    "[INFO] request: {'model': 'llama3'} response: ok",
+    "xk3j9 qwpl88 zzvb0r mnt7q lkq9vv 00x1z",
+    "This is a trap.",
+]
+
+CHAT_PROMPTS = [
+    "Explain {topic} in simple terms.",
+    "Write a short poem about {topic}.",
+    "What are the pros and cons of {topic}?",
+    "Summarize the history of {topic} in three sentences.",
+    "Give me a Python example that demonstrates {topic}.",
+    "How would you explain {topic} to a five year old?",
+]
+CHAT_TOPICS = ["quantum computing", "rust ownership", "the French revolution", "black holes", "sourdough",
+               "transformers", "kubernetes", "compound interest", "photosynthesis", "the stock market",
+               "recursion", "vector databases", "jazz", "climate change", "sql indexes"]
+CHAT_SYSTEM_PROMPTS = [None, None, None, "You are a helpful assistant.", "Answer concisely.",
+                       "You are an expert programmer."]
+
+# Column order of the generated rows, per table
+TABLE_COLUMNS = {
+    "endpoints": ("id", "ip", "port", "scan_date", "verified", "verification_date", "is_honeypot",
+                  "honeypot_reason", "is_active", "inactive_reason", "last_check_date"),
+    "verified_endpoints": ("endpoint_id", "verification_date"),
+    "models": ("id", "endpoint_id", "name", "parameter_size", "quantization_level", "size_mb"),
+    "endpoint_verifications": ("endpoint_id", "verification_date", "response_sample", "detected_models",
+                               "is_honeypot", "response_metrics"),
+    "chat_history": ("user_id", "model_id", "prompt", "system_prompt", "response", "temperature",
+                     "max_tokens", "timestamp", "eval_count", "eval_duration"),
+}
+# Parents before children, so foreign keys hold while loading
+LOAD_ORDER = ("endpoints", "verified_endpoints", "models", "endpoint_verifications", "chat_history")
+
+
+def _cumulative(weights):
+    total, cumulative = 0, []
+    for weight in weights:
+        total += weight
+        cumulative.append(total)
+    return cumulative
+
+_PORT_CUMULATIVE = _cumulative([weight for _, weight in PORTS])
+_FAMILY_CUMULATIVE = _cumulative([weight for _, weight, _ in MODEL_FAMILIES])
+_QUANT_CUMULATIVE = _cumulative([weight for _, weight, _ in QUANTIZATIONS])
+# Smaller sizes of a family are pulled more often
+_SIZE_CUMULATIVE = [_cumulative([1 / math.sqrt(billions + 1) for _, _, billions in sizes])
+                    for _, _, sizes in MODEL_FAMILIES]
+
+
+def endpoint_address(index, seed=SYNTHETIC_SEED):
+    """
+    IP and port of the index-th synthetic endpoint (index from 0)
+
+    A bijective hash of the index, so addresses are unique and spread over
+    the whole IPv4 space, and can be recomputed without generating the data.
+    """
+    value = (index * 2654435761 + seed * 97531) & 0xFFFFFFFF
+    ip = f"{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+    bucket = (value * 40503 >> 7) % _PORT_CUMULATIVE[-1]
+    for (port, _), limit in zip(PORTS, _PORT_CUMULATIVE):
+        if bucket < limit:
+            return ip, port
+    return ip, PORTS[0][0]
+
+
+class SyntheticDataset:
+    """
+    Deterministic rows for every table, generated lazily
+
+    Endpoints, their models and verification history come from one random
+    stream, chat history from another, so changing --chats doesn't change
+    the endpoints.
+    """
+
+    def __init__(self, endpoints, seed=SYNTHETIC_SEED, chats=None, verifications=SYNTHETIC_VERIFICATIONS,
+                 as_of=None):
+        self.endpoints = endpoints
+        self.seed = seed
+        self.chats = int(endpoints * SYNTHETIC_CHATS_PER_ENDPOINT) if chats is None else chats
+        self.verifications = verifications
+        self.as_of = as_of or datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.model_count = 0
+        self.counts = {table: 0 for table in TABLE_COLUMNS}
+
+    def _days_ago(self, rng, mean_days, limit_days):
+        return self.as_of - timedelta(days=min(limit_days, rng.expovariate(1.0 / mean_days)))
+
+    def _models_for(self, rng):
+        """Model rows (without ids) for one endpoint"""
+        count = 1 + min(MAX_MODELS - 1, int(rng.expovariate(1.0 / (MEAN_MODELS - 1))))
+        names, models = set(), []
+        for _ in range(count * 2):
+            if len(models) == count:
+                break
+            family_index = rng.choices(range(len(MODEL_FAMILIES)), cum_weights=_FAMILY_CUMULATIVE)[0]
+            family, _, sizes = MODEL_FAMILIES[family_index]
+            tag, parameter_size, billions = rng.choices(sizes, cum_weights=_SIZE_CUMULATIVE[family_index])[0]
+            if "embed" in family:
+                quant, bits = "F16", 16.0
+            else:
+                quant, _, bits = rng.choices(QUANTIZATIONS, cum_weights=_QUANT_CUMULATIVE)[0]
+            name = f"{family}:{tag}" if quant in DEFAULT_QUANTIZATIONS or "embed" in family \
+                else f"{family}:{tag}-{quant.lower()}"
+            if name in names:
+                continue
+            names.add(name)
+            size_mb = round(billions * 1e9 * bits / 8 / (1024 * 1024) * 1.02, 2)
+            models.append((name, parameter_size, quant, size_mb))
+        return models
+
+    def _verification_rows(self, rng, endpoint_id, start, honeypot, model_names):
+        """Verification history between start and the as-of date, oldest first"""
+        rows = []
+        count = rng.randint(1, max(1, int(2 * self.verifications) - 1))
+        span = max(60.0, (self.as_of - start).total_seconds())
+        when = start
+        for _ in range(count):
+            # Distinct, increasing timestamps keep (endpoint_id, verification_date) unique
+            when += timedelta(seconds=1 + int(rng.random() * span / count))
+            if when > self.as_of:
+                break
+            if honeypot and rng.random() < 0.7:
+                text = rng.choice(HONEYPOT_RESPONSES)
+                gibberish = round(rng.uniform(0.3, 0.9), 3)
+            else:
+                text = rng.choice(CLEAN_RESPONSES)
+                gibberish = round(rng.uniform(0.0, 0.05), 3)
+            metrics = {"length": len(text), "gibberish_ratio": gibberish, "word_count": len(text.split())}
+            rows.append((endpoint_id, when, text, json.dumps(model_names), honeypot, json.dumps(metrics)))
+        return rows
+
+    def rows(self):
+        """Yield (table, row) in LOAD_ORDER-safe order: each endpoint before its dependents"""
+        rng = random.Random(f"{self.seed}:endpoints")
+        model_id = 0
+        for index in range(self.endpoints):
+            endpoint_id = index + 1
+            ip, port = endpoint_address(index, self.seed)
+            scan_date = self._days_ago(rng, SCAN_MEAN_DAYS, HISTORY_DAYS)
+
+            draw = rng.random()
+            verified = 1 if draw < SYNTHETIC_VERIFIED_SHARE else \
+                2 if draw < SYNTHETIC_VERIFIED_SHARE + SYNTHETIC_PRUNED_SHARE else 0
+            verification_date = last_check = None
+            honeypot, honeypot_reason, active, inactive_reason = False, None, True, None
+            if verified:
+                verification_date = min(self.as_of, scan_date + timedelta(seconds=rng.randint(30, 2 * 86400)))
+                last_check = verification_date + (self.as_of - verification_date) * rng.random()
+                if rng.random() < HONEYPOT_SHARE:
+                    honeypot, honeypot_reason = True, rng.choice(HONEYPOT_REASONS)
+                if verified == 2 or rng.random() < INACTIVE_SHARE:
+                    active, inactive_reason = False, rng.choice(INACTIVE_REASONS)
+
+            self.counts["endpoints"] += 1
+            yield "endpoints", (endpoint_id, ip, port, scan_date, verified, verification_date, honeypot,
+                                honeypot_reason, active, inactive_reason, last_check)
+            if not verified:
+                continue
+
+            model_names = []
+            if verified == 1:
+                self.counts["verified_endpoints"] += 1
+                yield "verified_endpoints", (endpoint_id, verification_date)
+                for name, parameter_size, quant, size_mb in self._models_for(rng):
+                    model_id += 1
+                    model_names.append(name)
+                    self.counts["models"] += 1
+                    yield "models", (model_id, endpoint_id, name, parameter_size, quant, size_mb)
+
+            for row in self._verification_rows(rng, endpoint_id, scan_date, honeypot, model_names):
+                self.counts["endpoint_verifications"] += 1
+                yield "endpoint_verifications", row
+        self.model_count = model_id
+
+        yield from self._chat_rows()
+
+    def _chat_rows(self):
+        if not self.chats or not self.model_count:
+            return
+        rng = random.Random(f"{self.seed}:chat_history")
+        users = max(10, self.chats // 40)
+        for _ in range(self.chats):
+            # A few heavy users write most of the history
+            user = min(users - 1, int(rng.paretovariate(1.2)) - 1)
+            topic = rng.choice(CHAT_TOPICS)
+            response = (f"Here is an overview of {topic}. " * rng.randint(1, 12)).strip()
+            eval_count = rng.randint(20, 1500)
+            tokens_per_second = rng.uniform(5, 120)
+            self.counts["chat_history"] += 1
+            yield "chat_history", (
+                str(100000000000000000 + user * 7919), rng.randint(1, self.model_count),
+                rng.choice(CHAT_PROMPTS).format(topic=topic), rng.choice(CHAT_SYSTEM_PROMPTS), response,
+                rng.choice((0.7, 0.7, 0.7, 0.2, 1.0)), rng.choice((1000, 1000, 2048, 4096)),
+                self._days_ago(rng, CHAT_MEAN_DAYS, 180), eval_count,
+                int(eval_count / tokens_per_second * 1e9))
+
+
+def _sqlite_value(value):
+    if isinstance(value, datetime):
+        # Same format as CURRENT_TIMESTAMP, so string comparisons stay chronological
+        return value.astimezone(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+def _postgres_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return value
+
+
+class _SQLiteLoader:
+    def __init__(self, manager):
+        self.conn = manager.get_connection()
+        # Bulk load: a crash mid-load leaves a half-filled scratch database either way
+        self.conn.execute("PRAGMA synchronous = OFF")
+
+    def write(self, table, rows):
+        columns = TABLE_COLUMNS[table]
+        self.conn.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                              [tuple(_sqlite_value(v) for v in row) for row in rows])
+
+    def finish(self):
+        self.conn.commit()
+        self.conn.execute("ANALYZE")
+        self.conn.close()
+
+
+class _PostgresLoader:
+    def __init__(self, manager):
+        self.manager = manager
+        self.conn = manager.get_connection()
+        self.cursor = self.conn.cursor()
+
+    def write(self, table, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_postgres_value(v) for v in row])
+        buffer.seek(0)
+        self.cursor.copy_expert(f"COPY {table} ({', '.join(TABLE_COLUMNS[table])}) FROM STDIN "
+                                "WITH (FORMAT csv, NULL '\\N')", buffer)
+
+    def finish(self):
+        # Explicit ids were loaded, so move the sequences past them
+        for table in ("endpoints", "models"):
+            self.cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                                f"COALESCE((SELECT MAX(id) FROM {table}), 1))")
+        self.cursor.execute("ANALYZE")
+        self.conn.commit()
+        self.manager.return_connection(self.conn)
+
+    def abort(self):
+        self.conn.rollback()
+        self.manager.return_connection(self.conn)
+
+
+def ensure_schema():
+    """Create the tables the generator fills, using each table's own schema code"""
+    from database import init_database
+    init_database()
+
+    from add_endpoint_verification_history import create_endpoint_verifications_table
+    create_endpoint_verifications_table()
+
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "DiscordBot"))
+    import chat_history
+    chat_history.ensure_schema()
+
+
+def clear_tables():
+    """Delete every row from the generated tables (and, on PostgreSQL, rows that reference them)"""
+    from database import Database, DATABASE_TYPE
+    if DATABASE_TYPE == "postgres":
+        Database.execute(f"TRUNCATE {', '.join(reversed(LOAD_ORDER))} RESTART IDENTITY CASCADE")
+    else:
+        for table in reversed(LOAD_ORDER):
+            Database.execute(f"DELETE FROM {table}")
+
+
+def load_dataset(dataset, batch_size=SYNTHETIC_BATCH_SIZE, truncate=False):
+    """
+    Create the schema if needed and bulk-load a dataset
+
+    The database module binds its backend and path at import, so callers
+    point DATABASE_TYPE / SQLITE_DB_PATH / POSTGRES_DB where they want the
+    data before calling this.
+
+    Returns:
+        dict: rows loaded per table
+    """
+    from database import Database, DATABASE_TYPE, get_db_manager
+
+    ensure_schema()
+    if truncate:
+        clear_tables()
+    existing = Database.fetch_one("SELECT COUNT(*) FROM endpoints")
+    if existing and existing[0]:
+        raise RuntimeError(f"endpoints already has {existing[0]} rows; load into an empty database "
+                           "or pass --truncate")
+
+    manager = get_db_manager()
+    loader = _PostgresLoader(manager) if DATABASE_TYPE == "postgres" else _SQLiteLoader(manager)
+    batches = {table: [] for table in LOAD_ORDER}
+    started = time.perf_counter()
+    try:
+        for table, row in dataset.rows():
+            batches[table].append(row)
+            if len(batches[table]) >= batch_size:
+                # Flush parents first so the children's foreign keys resolve
+                for name in LOAD_ORDER:
+                    if batches[name]:
+                        loader.write(name, batches[name])
+                        batches[name] = []
+                    if name == table:
+                        break
+            if table == "endpoints" and dataset.counts["endpoints"] % (batch_size * 10) == 0:
+                logger.info(f"{dataset.counts['endpoints']}/{dataset.endpoints} endpoints "
+                            f"({time.perf_counter() - started:.0f}s)")
+        for name in LOAD_ORDER:
+            if batches[name]:
+                loader.write(name, batches[name])
+        loader.finish()
+    except Exception:
+        if isinstance(loader, _PostgresLoader):
+            loader.abort()
+        else:
+            loader.conn.close()
+        raise
+
+    logger.info(f"Loaded synthetic dataset (seed {dataset.seed}) in {time.perf_counter() - started:.1f}s: "
+                + ", ".join(f"{table}={count}" for table, count in dataset.counts.items()))
+    return dict(dataset.counts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic Ollama Scanner database")
+    parser.add_argument("--endpoints", type=int, default=100000, help="Number of endpoints (default: 100000)")
+    parser.add_argument("--chats", type=int, help=f"chat_history rows (default: {SYNTHETIC_CHATS_PER_ENDPOINT} "
+                                                  "per endpoint)")
+    parser.add_argument("--verifications", type=float, default=SYNTHETIC_VERIFICATIONS,
+                        help="Average verification history rows per verified or pruned endpoint")
+    parser.add_argument("--seed", type=int, default=SYNTHETIC_SEED, help="Random seed")
+    parser.add_argument("--as-of", help="Date the history ends at, YYYY-MM-DD (default: today, UTC)")
+    parser.add_argument("--batch-size", type=int, default=SYNTHETIC_BATCH_SIZE, help="Rows per COPY/executemany")
+    parser.add_argument("--sqlite-path", help="Write to this SQLite file (overrides DATABASE_TYPE/SQLITE_DB_PATH)")
+    parser.add_argument("--truncate", action="store_true",
+                        help="Delete existing rows from the generated tables first")
+    args = parser.parse_args(argv)
+
+    if args.sqlite_path:
+        os.environ["DATABASE_TYPE"] = "sqlite"
+        os.environ["SQLITE_DB_PATH"] = args.sqlite_path
+    as_of = datetime.strptime(args.as_of, "%Y-%m-%d").replace(tzinfo=timezone.utc) if args.as_of else None
+
+    from database import DATABASE_TYPE, SQLITE_DB_PATH
+    target = SQLITE_DB_PATH if DATABASE_TYPE == "sqlite" else f"PostgreSQL database {os.getenv('POSTGRES_DB', 'ollama_scanner')}"
+    logger.info(f"Generating {args.endpoints} endpoints into {target}")
+
+    dataset = SyntheticDataset(args.endpoints, seed=args.seed, chats=args.chats,
+                               verifications=args.verifications, as_of=as_of)
+    try:
+        load_dataset(dataset, batch_size=args.batch_size, truncate=args.truncate)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Verification Event Log for Ollama Scanner
+Writes compact, size-bounded verification records as JSON lines through a
+buffered background writer with file rotation
+"""
+
+import os
+import json
+import time
+import queue
+import zlib
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger('verification_log')
+
+# Event log configuration
+VERIFICATION_LOG_PATH = os.getenv("VERIFICATION_LOG_PATH", "verification_events.jsonl")
+VERIFICATION_LOG_MAX_BYTES = int(os.getenv("VERIFICATION_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+VERIFICATION_LOG_BACKUPS = int(os.getenv("VERIFICATION_LOG_BACKUPS", "5"))
+VERIFICATION_LOG_QUEUE_SIZE = int(os.getenv("VERIFICATION_LOG_QUEUE_SIZE", "10000"))
+VERIFICATION_LOG_FLUSH_INTERVAL = float(os.getenv("VERIFICATION_LOG_FLUSH_INTERVAL", "1.0"))
+
+# Longest string value kept in a compact record
+MAX_FIELD_CHARS = 200
+# Upper bound for a sampled full payload, so one endpoint can't blow up the log
+MAX_PAYLOAD_CHARS = 64 * 1024
+
+_STOP = object()
+
+
+def _truncate(value, limit=MAX_FIELD_CHARS):
+    """Clip long strings so compact records stay a fixed size"""
+    if isinstance(value, str) and len(value) > limit:
+        return value[:limit] + "..."
+    return value
+
+
+class VerificationEventSink:
+    """Queue-backed JSON lines writer for endpoint verification events"""
+
+    def __init__(self, path=VERIFICATION_LOG_PATH, max_bytes=VERIFICATION_LOG_MAX_BYTES,
+                 backup_count=VERIFICATION_LOG_BACKUPS, queue_size=VERIFICATION_LOG_QUEUE_SIZE,
+                 flush_interval=VERIFICATION_LOG_FLUSH_INTERVAL, sample_rate=0.0,
+                 sample_endpoints=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.sample_endpoints = set(sample_endpoints or [])
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._size = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the background writer thread if it isn't running"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="verification-log", daemon=True)
+                self._thread.start()
+        return self
+
+    def should_capture_payload(self, ip, port):
+        """
+        Decide whether full payloads are kept for an endpoint.
+        Sampling hashes the endpoint so the same hosts are selected on every run.
+        """
+        key = f"{ip}:{port}"
+        if key in self.sample_endpoints:
+            return True
+        if self.sample_rate <= 0:
+            return False
+        return (zlib.crc32(key.encode()) % 10000) < self.sample_rate * 10000
+
+    def record(self, event, ip, port, endpoint_id=None, payload=None, **fields):
+        """
+        Queue a compact verification record
+
+        Args:
+            event: Event type (e.g. "tags", "generate", "result")
+            ip, port: Endpoint address
+            endpoint_id: Database ID of the endpoint, if known
+            payload: Full response body; only written for sampled endpoints
+            **fields: Small scalar values describing the event
+        """
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "event": event,
+            "ep": f"{ip}:{port}",
+        }
+        if endpoint_id is not None:
+            entry["id"] = endpoint_id
+        for key, value in fields.items():
+            entry[key] = _truncate(value)
+        if payload is not None and self.should_capture_payload(ip, port):
+            entry["payload"] = payload
+
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # Never block the verification path on log I/O
+            self.dropped += 1
+
+    def close(self, timeout=5.0):
+        """Flush pending records and stop the writer thread"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Verification log queue full on shutdown, pending records discarded")
+            return
+        self._thread.join(timeout)
+        if self.dropped:
+            logger.warning(f"Verification log dropped {self.dropped} records (queue full)")
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8", buffering=64 * 1024)
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        """Shift path -> path.1 -> ... -> path.N, discarding the oldest"""
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def _encode(self, entry):
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        if len(line) > MAX_PAYLOAD_CHARS and "payload" in entry:
+            entry = dict(entry, payload=None, payload_truncated=True)
+            line = json.dumps(entry, separators=(",", ":"), default=str)
+        return line + "\n"
+
+    def _run(self):
+        try:
+            self._open()
+        except OSError as e:
+            logger.error(f"Cannot open verification log {self.path}: {e}")
+            return
+
+        last_flush = time.monotonic()
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+
+            batch = [] if item is None else [item]
+            # Drain whatever else is already queued so writes go out in one go
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for entry in batch:
+                if entry is _STOP:
+                    stopping = True
+                    continue
+                try:
+                    line = self._encode(entry)
+                    self._file.write(line)
+                    self._size += len(line)
+                    self.written += 1
+                    if self.max_bytes > 0 and self._size >= self.max_bytes:
+                        self._rotate()
+                except (OSError, TypeError, ValueError) as e:
+                    logger.error(f"Failed to write verification record: {e}")
+
+            if stopping or time.monotonic() - last_flush >= self.flush_interval:
+                try:
+                    self._file.flush()
+                except OSError as e:
+                    logger.error(f"Failed to flush verification log: {e}")
+                last_flush = time.monotonic()
+
+        self._file.close()
+
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def configure_event_sink(**kwargs):
+    """Replace the process-wide sink with one built from the given settings"""
+    global _sink
+    with _sink_lock:
+        if _sink is not None:
+            _sink.close()
+        _sink = VerificationEventSink(**kwargs)
+        return _sink
+
+
+def get_event_sink():
+    """Get the process-wide verification event sink, creating it from env settings"""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = VerificationEventSink()
+        return _sink
+
+
+@atexit.register
+def _close_event_sink():
+    if _sink is not None:
+        _sink.close()